@@ -1,6 +1,7 @@
 from flask import Flask, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from werkzeug.exceptions import HTTPException
 from config import Config
 import logging
 import traceback
@@ -25,6 +26,10 @@ def create_app(config_class=Config):
     from app.routes import main
     app.register_blueprint(main)
 
+    # Content-Encoding: gzip/zstd ile gönderilen upload/deployment gövdeleri
+    from app.utils.request_encoding import DecompressRequestMiddleware
+    app.wsgi_app = DecompressRequestMiddleware(app.wsgi_app, app.config.get('MAX_CONTENT_LENGTH'))
+
     with app.app_context():
         db.create_all()
 
@@ -37,6 +42,9 @@ def create_app(config_class=Config):
 
     @app.errorhandler(Exception)
     def handle_exception(error):
+        # 404, 413 gibi HTTP hataları kendi durum koduyla döner
+        if isinstance(error, HTTPException):
+            return error
         app.logger.error(f'Unhandled Exception: {error}')
         app.logger.error(traceback.format_exc())
         return jsonify({'error': 'Unhandled Exception', 'message': str(error)}), 500
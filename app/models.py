@@ -41,6 +41,23 @@ class Project(db.Model):
     env_vars = db.Column(db.Text, default='{}') # JSON string for environment variables
     ssl_enabled = db.Column(db.Boolean, default=False)
     status = db.Column(db.String(20), default='stopped') # stopped, running, error
+    launch_signature = db.Column(db.Text) # JSON: entry point/venv/packages at last start (graceful reload)
+    ready_timeout = db.Column(db.Integer) # Seconds to wait for the app to serve after start (None = APP_READY_TIMEOUT)
+    health_path = db.Column(db.String(256)) # Optional readiness path, e.g. /health (None = DEPLOY_HEALTH_PATH)
+    last_ready_seconds = db.Column(db.Float) # Measured time-to-ready of the last start
+    # Gunicorn worker settings (Python projects)
+    worker_count = db.Column(db.Integer) # None = 4, or auto when worker_auto is set
+    worker_auto = db.Column(db.Boolean, default=False) # Size workers from CPU count, free memory, measured worker RSS
+    worker_threads = db.Column(db.Integer) # None = 1 (gthread: 4)
+    worker_class = db.Column(db.String(20), default='sync') # sync, gthread, gevent, uvicorn
+    worker_timeout = db.Column(db.Integer) # None = 30 s
+    max_requests = db.Column(db.Integer) # Recycle workers after N requests (None/0 = never)
+    worker_rss = db.Column(db.BigInteger) # Measured average RSS per worker (bytes, moving average)
+    # cgroup v2 limits (None = unlimited)
+    cpu_limit = db.Column(db.Float) # CPU cores (cpu.max), e.g. 1.5
+    memory_max_mb = db.Column(db.Integer) # memory.max
+    memory_high_mb = db.Column(db.Integer) # memory.high (throttle/reclaim above this)
+    io_weight = db.Column(db.Integer) # io.weight, 1-10000 (default 100)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     versions = db.relationship('ProjectVersion', backref='project', lazy='dynamic', cascade='all, delete-orphan')
 
@@ -90,6 +107,9 @@ class FileManifest(db.Model):
     file_hash = db.Column(db.String(64), nullable=False)  # SHA256 hash
     file_size = db.Column(db.Integer, default=0)
     last_modified = db.Column(db.DateTime, default=datetime.utcnow)
+    # Hash cache anahtarı: (file_path, file_size, mtime_ns, inode) değişmediyse hash yeniden hesaplanmaz
+    mtime_ns = db.Column(db.BigInteger)
+    inode = db.Column(db.BigInteger)
     
     # Unique constraint: one entry per file per project
     __table_args__ = (db.UniqueConstraint('project_id', 'file_path', name='uix_project_file'),)
@@ -100,6 +120,28 @@ class FileManifest(db.Model):
         return f'<FileManifest {self.file_path}>'
 
 
+class FileChunkSignature(db.Model):
+    """
+    Büyük dosyalar için parça imzaları (content-defined chunking)
+    Delta deployment'ta client sadece server'da olmayan parçaları gönderir.
+    file_hash, FileManifest'teki hash ile eşleşmiyorsa imza geçersizdir.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    file_path = db.Column(db.String(512), nullable=False)  # Relative path from project root
+    file_hash = db.Column(db.String(64), nullable=False)  # İmzanın ait olduğu dosya hash'i
+    file_size = db.Column(db.Integer, default=0)
+    chunks = db.Column(db.Text, nullable=False)  # JSON: [[offset, length, sha256], ...]
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('project_id', 'file_path', name='uix_project_chunk_file'),)
+    
+    project = db.relationship('Project', backref=db.backref('chunk_signatures', lazy='dynamic', cascade='all, delete-orphan'))
+    
+    def __repr__(self):
+        return f'<FileChunkSignature {self.file_path}>'
+
+
 class AppState(db.Model):
     """
     Uygulama durumu - server restart sonrası hangi uygulamaların çalışması gerektiğini tutar
@@ -135,3 +177,26 @@ class DeploymentLog(db.Model):
     
     def __repr__(self):
         return f'<DeploymentLog {self.project_id} @ {self.deployed_at}>'
+
+
+class Job(db.Model):
+    """
+    Arka plan işi - kurulum, başlatma, auto-fix gibi uzun işlemler HTTP isteği dışında çalışır
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), index=True)
+    kind = db.Column(db.String(32), nullable=False)  # start, setup
+    status = db.Column(db.String(20), default='queued', index=True)  # queued, running, succeeded, failed
+    params = db.Column(db.Text)  # JSON
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    messages = db.Column(db.Text)  # JSON: [{'at', 'step', 'message', 'level'}]
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    reported_at = db.Column(db.DateTime)  # Sonuç mesajları proje sayfasında gösterildiğinde
+    
+    project = db.relationship('Project', backref=db.backref('jobs', lazy='dynamic', cascade='all, delete-orphan'))
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
@@ -1,8 +1,9 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, jsonify, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, send_file, jsonify, current_app, Response
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import HTTPException
 from app import db
-from app.models import User, Project, SubRoute, FileManifest, AppState, DeploymentLog
+from app.models import User, Project, SubRoute, FileManifest, AppState, DeploymentLog, Job
 import os
 import json
 import signal
@@ -10,9 +11,11 @@ import shutil
 import hashlib
 import tempfile
 import zipfile
+import tarfile
 import time
 import traceback
 from datetime import datetime
+from file_compressor import supported_encodings
 
 main = Blueprint('main', __name__)
 
@@ -128,7 +131,8 @@ def new_project():
         db.session.commit()
 
         # System configurations
-        from app.utils.system import generate_nginx_config, reload_nginx, generate_supervisor_config, reload_supervisor, detect_entry_point
+        from app.utils.system import generate_nginx_config, reload_nginx, generate_supervisor_config, reload_supervisor, detect_entry_point, start_options
+        from app.utils.reload_manager import record_launch
         
         try:
             # Only generate Nginx config if domain is provided
@@ -143,10 +147,12 @@ def new_project():
             project.entry_point = entry_point
             
             # Start the project
-            pid = generate_supervisor_config(name, project_type, path, port, entry_point=entry_point)
+            pid = generate_supervisor_config(name, project_type, path, port, entry_point=entry_point,
+                                             **start_options(project))
             if pid:
                 project.pid = pid
                 project.status = 'running'
+                record_launch(project)
                 db.session.commit()
                 flash(f'Project {name} created and started (PID: {pid})!', 'success')
             else:
@@ -169,52 +175,21 @@ def project_details(id):
     if project.pid and project.status == 'running':
         from app.utils.system import check_process_status
         if not check_process_status(project.pid):
-            project.status = 'stopped'
+            # Not 'stopped': the supervisor treats 'stopped' as an intentional stop
+            project.status = 'crashed'
             project.pid = None
             db.session.commit()
             flash(f'Project {project.name} process died unexpectedly.', 'error')
     
-    # Read logs - check multiple possible locations
-    stdout_log = ""
-    stderr_log = ""
-    
-    # Try project directory first (for local development)
-    log_paths = [
-        os.path.join(project.path, f"{project.name}.out.log"),
-        os.path.join(project.path, project.name, f"{project.name}.out.log"),  # Nested structure
-        f"{project.name}.out.log",  # Current directory (VDS Panel root)
-        f"/var/log/{project.name}.out.log"  # Linux supervisor logs
-    ]
-    
-    for log_path in log_paths:
-        try:
-            with open(log_path, "r") as f:
-                stdout_log = f.read()[-10000:] # Last 10000 chars for better error visibility
-                break
-        except FileNotFoundError:
-            continue
-    
-    if not stdout_log:
-        stdout_log = "Log file not found. Start the project to generate logs."
-    
-    # Same for stderr
-    err_log_paths = [
-        os.path.join(project.path, f"{project.name}.err.log"),
-        os.path.join(project.path, project.name, f"{project.name}.err.log"),  # Nested structure
-        f"{project.name}.err.log",
-        f"/var/log/{project.name}.err.log"
-    ]
-    
-    for log_path in err_log_paths:
-        try:
-            with open(log_path, "r") as f:
-                stderr_log = f.read()[-10000:]  # Last 10000 chars for better error visibility
-                break
-        except FileNotFoundError:
-            continue
-    
-    if not stderr_log:
-        stderr_log = "Log file not found. Start the project to generate logs."
+    # Read the end of the logs (seeks from EOF; access logs can be huge)
+    from app.utils.log_manager import find_log, tail_file, read_log
+    missing = "Log file not found. Start the project to generate logs."
+    stdout_path = find_log(project, 'out')
+    stderr_path = find_log(project, 'err')
+    stdout_log = tail_file(stdout_path) if stdout_path else missing
+    stderr_log = tail_file(stderr_path) if stderr_path else missing
+    # Error output of the previous run (kept as <log>.1 on restart)
+    previous_stderr_log = read_log(stderr_path, max_bytes=10000, previous=True) if stderr_path else ''
 
     # Get sub-routes for this project
     sub_routes = SubRoute.query.filter_by(host_project_id=id).all()
@@ -222,17 +197,75 @@ def project_details(id):
     # Get all other projects for sub-route selection
     all_projects = Project.query.filter(Project.id != id).all()
 
+    # Effective gunicorn worker settings (auto mode resolved)
+    worker_settings = None
+    if project.project_type not in ('nodejs', 'php'):
+        from app.utils.worker_sizing import resolve_worker_settings
+        worker_settings = resolve_worker_settings(project)
+
+    # Usage counters of the project's cgroup (None without cgroup v2)
+    from app.utils.cgroups import project_usage
+    cgroup_usage = project_usage(project)
+    
+    # Next.js build cache statistics (builds vs. reused outputs)
+    build_stats = None
+    if project.project_type == 'nodejs':
+        from app.utils.next_build import build_summary
+        build_stats = build_summary(project.name, project.path)
+    
+    # Queued or running background job (setup/start progress panel)
+    from app.utils.job_runner import active_job, unreported_job
+    job = active_job(id)
+    if job is None:
+        # The progress panel reloads the page when a job ends: show its outcome once
+        finished = unreported_job(id)
+        if finished:
+            _flash_job_messages(finished)
+    
     return render_template('project_details.html', 
                            project=project, 
                            stdout_log=stdout_log, 
                            stderr_log=stderr_log,
+                           previous_stderr_log=previous_stderr_log,
                            sub_routes=sub_routes,
-                           all_projects=all_projects)
+                           all_projects=all_projects,
+                           worker_settings=worker_settings,
+                           cgroup_usage=cgroup_usage,
+                           active_job=job,
+                           build_stats=build_stats)
+
+@main.route('/projects/<int:id>/logs/stream')
+@login_required
+def stream_project_log(id):
+    """
+    Follow a project log live as Server-Sent Events.
+    ?log= out | err | nginx_access | nginx_error
+    """
+    from app.utils.log_manager import find_log
+    from app.utils.log_stream import stream_log
+    
+    project = Project.query.get_or_404(id)
+    log = request.args.get('log', 'err')
+    if log in ('out', 'err'):
+        # Follow the default location even before the first start creates it
+        path = find_log(project, log) or os.path.join(project.path, f"{project.name}.{log}.log")
+    elif log in ('nginx_access', 'nginx_error'):
+        path = f"/var/log/nginx/{project.name}_{log.split('_')[1]}.log"
+    else:
+        return jsonify({'success': False, 'error': f'Unknown log: {log}'}), 400
+    
+    return Response(stream_log(path, initial_lines=request.args.get('lines', 200, type=int)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @main.route('/projects/<int:id>/stop', methods=['POST'])
 @login_required
 def stop_project(id):
     project = Project.query.get_or_404(id)
+    # A queued/running start or setup job would relaunch the app after the stop
+    pending = _refuse_during_job(project, 'stopping')
+    if pending:
+        return pending
     if project.pid:
         try:
             import psutil
@@ -283,196 +316,78 @@ def stop_project(id):
 @login_required
 def start_project(id):
     project = Project.query.get_or_404(id)
-    from app.utils.system import generate_supervisor_config, get_project_venv_python, auto_setup_project, open_firewall_port
+    from app.utils.system import check_process_status
+    from app.utils.job_runner import enqueue, active_job
     
     # Check if path still exists
     if not os.path.exists(project.path):
         flash(f'Project path no longer exists: {project.path}', 'error')
         return redirect(url_for('main.project_details', id=id))
     
-    # AUTO-SETUP: Check and fix project environment
-    venv_python = get_project_venv_python(project.path)
-    gunicorn_path = None
-    
-    if venv_python:
-        gunicorn_path = os.path.join(os.path.dirname(venv_python), 'gunicorn')
+    # Already running: reload in place instead of starting a second instance on the same port
+    if project.status == 'running' and check_process_status(project.pid):
+        return reload_project(id)
     
-    # If venv missing or gunicorn missing, run auto-setup
-    if not venv_python or not os.path.exists(gunicorn_path):
-        flash('🔧 Auto-setup: Preparing project environment...', 'info')
-        
-        try:
-            success, message = auto_setup_project(project.path, project.name)
-            if success:
-                flash(f'✓ Auto-setup complete: {message}', 'success')
-                # Re-check venv after setup
-                venv_python = get_project_venv_python(project.path)
-            else:
-                flash(f'Auto-setup failed: {message}', 'error')
-                flash('Please manually create venv and install dependencies', 'warning')
-                return redirect(url_for('main.project_details', id=id))
-        except Exception as e:
-            flash(f'Auto-setup error: {str(e)}', 'error')
-            return redirect(url_for('main.project_details', id=id))
-    else:
-        flash('✓ Project environment ready', 'success')
-    
-    # Parse environment variables
-    env_vars = {}
-    if project.env_vars:
-        try:
-            env_vars = json.loads(project.env_vars)
-        except:
-            pass
+    # A start already waiting in the queue covers this request
+    pending = active_job(id)
+    if pending and pending.kind == 'start':
+        flash(f'Project start is already in progress (job #{pending.id})', 'info')
+        return redirect(url_for('main.project_details', id=id))
     
+    # Auto-setup, startup and auto-fix run in the background job runner
     try:
-        # Start the project
-        flash('🚀 Starting project...', 'info')
-        pid = generate_supervisor_config(project.name, project.project_type, project.path, project.port, env_vars, project.entry_point)
-        
-        if pid:
-            project.pid = pid
-            project.status = 'running'
-            db.session.commit()
-            
-            # Update app state - mark as should run on restart
-            from app.utils.deployment_manager import set_app_should_run
-            set_app_should_run(id, True)
-            
-            # Open firewall port
-            if open_firewall_port(project.port):
-                flash(f'✓ Firewall: Port {project.port} opened', 'success')
-            
-            flash(f'✓ Project {project.name} is now running (PID: {pid})', 'success')
-            flash(f'Access at: http://localhost:{project.port}', 'info')
-        else:
-            # Startup failed - attempt auto-fix
-            flash('⚠ Initial startup failed. Attempting auto-fix...', 'warning')
-            
-            # Wait a bit for error log to be written
-            time.sleep(1)
-            
-            error_log_candidates = [
-                os.path.join(project.path, f"{project.name}.err.log"),
-                f"/var/log/{project.name}.err.log",
-            ]
-            error_log_path = None
-            for candidate in error_log_candidates:
-                if os.path.exists(candidate):
-                    error_log_path = candidate
-                    break
-            if not error_log_path:
-                error_log_path = error_log_candidates[0]
-            
-            # PRIORITY 1: Check for missing dependencies (with retry loop for chain dependencies)
-            from app.utils.dependency_fix import auto_fix_dependencies
-            
-            fixed = False
-            max_dependency_retries = 3
-            retry_count = 0
-            all_installed = []
-            
-            while not fixed and retry_count < max_dependency_retries:
-                retry_count += 1
-                
-                # Wait for fresh error log if this is a retry
-                if retry_count > 1:
-                    time.sleep(1)
-                
-                dep_success, dep_message, installed = auto_fix_dependencies(project.path, error_log_path)
-                
-                if dep_success and installed:
-                    # Dependencies were missing and now installed
-                    all_installed.extend(installed)
-                    
-                    if retry_count == 1:
-                        flash(f'🔧 Detected missing dependencies. Auto-fixing...', 'info')
-                    else:
-                        flash(f'🔧 Found more missing dependencies (chain dependencies)...', 'info')
-                    
-                    flash(f'✓ Installed: {", ".join(installed)}', 'success')
-                    flash(f'🔄 Retrying startup (attempt {retry_count}/{max_dependency_retries})...', 'info')
-                    
-                    # Retry startup
-                    pid = generate_supervisor_config(project.name, project.project_type, project.path, project.port, env_vars, project.entry_point)
-                    
-                    if pid:
-                        project.pid = pid
-                        project.status = 'running'
-                        db.session.commit()
-                        
-                        # Update app state - mark as should run on restart
-                        set_app_should_run(id, True)
-                        
-                        # Open firewall port
-                        if open_firewall_port(project.port):
-                            flash(f'✓ Firewall: Port {project.port} opened', 'success')
-                        
-                        total_installed = len(set(all_installed))
-                        flash(f'✓✓ Project started successfully after installing {total_installed} packages! (PID: {pid})', 'success')
-                        flash(f'Packages: {", ".join(set(all_installed))}', 'info')
-                        fixed = True
-                        break
-                    else:
-                        # Still failing, loop will continue if more retries available
-                        if retry_count < max_dependency_retries:
-                            flash(f'Still failing, checking for more missing dependencies...', 'warning')
-                        else:
-                            flash(f'Max retries ({max_dependency_retries}) reached. Checking entry point...', 'warning')
-                else:
-                    # No more dependencies to fix
-                    break
-            
-            # PRIORITY 2: If dependencies OK or fix didn't work, check entry point
-            if not fixed:
-                from app.utils.auto_fix import should_attempt_auto_fix, auto_fix_entry_point
-                
-                if should_attempt_auto_fix(error_log_path):
-                    flash('🔧 Checking entry point...', 'info')
-                    
-                    # Get venv python for testing
-                    venv_python = get_project_venv_python(project.path)
-                    if venv_python:
-                        success, new_entry_point, message = auto_fix_entry_point(
-                        project.name, 
-                        project.path, 
-                        project.project_type, 
-                        project.port, 
-                        venv_python
-                        )
-                        
-                        if success and new_entry_point:
-                            # Update entry point in database
-                            project.entry_point = new_entry_point
-                            db.session.commit()
-                            
-                            flash(f'✓ {message}', 'success')
-                            flash('🔄 Retrying startup with corrected entry point...', 'info')
-                            
-                            # Try starting again with new entry point
-                            pid = generate_supervisor_config(project.name, project.project_type, project.path, project.port, env_vars, new_entry_point)
-                            
-                            if pid:
-                                project.pid = pid
-                                project.status = 'running'
-                                db.session.commit()
-                                
-                                # Update app state - mark as should run on restart
-                                set_app_should_run(id, True)
-                                
-                                flash(f'✓✓ Project started successfully (PID: {pid})', 'success')
-                                flash(f'Updated entry point: {new_entry_point}', 'info')
-                            else:
-                                flash('Entry point updated but startup still failed. Check logs.', 'error')
-                        else:
-                            flash(f'Auto-fix failed: {message}', 'error')
-                    else:
-                        flash('Cannot auto-fix: No virtual environment found', 'error')
-                else:
-                    flash('Failed to start project. Check logs tab for details.', 'error')
+        job = enqueue('start', project_id=id)
     except Exception as e:
         flash(f'Error starting project: {str(e)}', 'error')
-        
+        return redirect(url_for('main.project_details', id=id))
+    
+    if job.status == 'queued':
+        flash(f'🚀 Start queued (job #{job.id}). Progress is shown below.', 'info')
+    else:
+        _flash_job_messages(job)
+    return redirect(url_for('main.project_details', id=id))
+
+def _refuse_during_job(project, action):
+    """Redirect with a warning while the project has a queued or running job, else None"""
+    from app.utils.job_runner import active_job
+    job = active_job(project.id)
+    if not job:
+        return None
+    flash(f'Project {project.name} has a {job.kind} job in progress (job #{job.id}). '
+          f'Wait for it to finish before {action} the project.', 'warning')
+    return redirect(url_for('main.project_details', id=project.id))
+
+def _flash_job_messages(job):
+    """Flash the progress messages of a finished job once (inline run or first page view afterwards)"""
+    messages = json.loads(job.messages or '[]')
+    for entry in messages:
+        flash(entry['message'], entry['level'])
+    if job.status == 'failed' and job.error and not messages:
+        flash(f'Error: {job.error}', 'error')
+    job.reported_at = datetime.utcnow()
+    db.session.commit()
+
+@main.route('/projects/<int:id>/reload', methods=['POST'])
+@login_required
+def reload_project(id):
+    """Reload a running gunicorn project with SIGHUP/SIGUSR2 (full restart if the venv or entry point changed)"""
+    project = Project.query.get_or_404(id)
+    from app.utils.reload_manager import reload_project as graceful_reload
+    
+    pending = _refuse_during_job(project, 'reloading')
+    if pending:
+        return pending
+    
+    result = graceful_reload(project)
+    if not result['success']:
+        flash(f'Reload failed: {result.get("error")}. Check logs tab for details.', 'error')
+    elif result['method'] == 'restart':
+        if result.get('fallback_from'):
+            flash(f'⚠ Graceful reload failed ({result["error"]}), project was restarted instead', 'warning')
+        flash(f'✓ Project {project.name} restarted ({result["reason"]}, PID: {result["pid"]})', 'success')
+    else:
+        flash(f'✓ Project {project.name} reloaded with {"SIGHUP" if result["method"] == "hup" else "SIGUSR2"}: '
+              f'{len(result["new_workers"])} new workers in {result["elapsed"]}s ({result["reason"]})', 'success')
     return redirect(url_for('main.project_details', id=id))
 
 @main.route('/projects/<int:id>/delete', methods=['POST'])
@@ -487,6 +402,10 @@ def delete_project(id):
         except:
             pass
     
+    # Remove the (now empty) cgroup
+    from app.utils.cgroups import remove_project_cgroup
+    remove_project_cgroup(project)
+    
     # Delete sub-routes where this project is mounted (as a child)
     mounted_routes = SubRoute.query.filter_by(mounted_project_id=id).all()
     for sr in mounted_routes:
@@ -533,9 +452,49 @@ def edit_project(id):
         project.path = new_path
         project.entry_point = request.form.get('entry_point')
         project.ssl_enabled = 'ssl_enabled' in request.form
+        ready_timeout = request.form.get('ready_timeout', '').strip()
+        project.ready_timeout = int(ready_timeout) if ready_timeout else None
+        health_path = request.form.get('health_path', '').strip()
+        if health_path and not health_path.startswith('/'):
+            health_path = '/' + health_path
+        project.health_path = health_path or None
+        
+        # Gunicorn worker settings (empty = default, worker count sized automatically only on opt-in)
+        from app.utils.worker_sizing import WORKER_CLASSES, missing_worker_package
+        worker_class = request.form.get('worker_class') or 'sync'
+        if worker_class not in WORKER_CLASSES:
+            raise ValueError(f'Unknown worker class: {worker_class}')
+        project.worker_class = worker_class
+        project.worker_auto = 'worker_auto' in request.form
+        for field in ('worker_count', 'worker_threads', 'worker_timeout', 'max_requests'):
+            value = request.form.get(field, '').strip()
+            if value and int(value) < 0:
+                raise ValueError(f'{field.replace("_", " ").capitalize()} cannot be negative')
+            setattr(project, field, int(value) if value else None)
+        missing_package = missing_worker_package(project.path, worker_class)
+        if missing_package:
+            flash(f'Worker class {worker_class} needs "{missing_package}" in the project venv (add it to requirements.txt)', 'warning')
+        
+        # cgroup resource limits (empty = unlimited)
+        cpu_limit = request.form.get('cpu_limit', '').strip()
+        project.cpu_limit = float(cpu_limit) if cpu_limit else None
+        if project.cpu_limit is not None and project.cpu_limit <= 0:
+            raise ValueError('CPU limit must be positive')
+        for field in ('memory_max_mb', 'memory_high_mb', 'io_weight'):
+            value = request.form.get(field, '').strip()
+            if value and int(value) <= 0:
+                raise ValueError(f'{field.replace("_", " ").capitalize()} must be positive')
+            setattr(project, field, int(value) if value else None)
+        if project.io_weight is not None and project.io_weight > 10000:
+            raise ValueError('IO weight must be between 1 and 10000')
         
         db.session.commit()
         
+        # Limits take effect immediately on a running project's cgroup
+        from app.utils.cgroups import apply_project_limits
+        if project.status == 'running':
+            apply_project_limits(project)
+        
         # Re-generate configs
         from app.utils.system import generate_nginx_config, reload_nginx
         if project.domain:
@@ -654,20 +613,15 @@ def upload_project():
             
             if is_update and os.path.exists(project_path):
                 # INCREMENTAL UPDATE: Only upload changed files
-                from app.utils.deployment_manager import calculate_file_hash, should_ignore, IGNORE_PATTERNS
+                from app.utils.deployment_manager import calculate_file_hash, scan_project_files
                 
-                # Calculate hashes of existing files
-                existing_files = {}
-                for root, dirs, filenames in os.walk(project_path):
-                    dirs[:] = [d for d in dirs if not should_ignore(root, d)]
-                    for fname in filenames:
-                        if should_ignore(root, fname):
-                            continue
-                        full_path = os.path.join(root, fname)
-                        rel_path = os.path.relpath(full_path, project_path)
-                        file_hash = calculate_file_hash(full_path)
-                        if file_hash:
-                            existing_files[rel_path] = file_hash
+                # Calculate hashes of existing files (parallel)
+                existing_files = {
+                    rel_path: info['hash']
+                    for rel_path, info in scan_project_files(
+                        project_path, workers=current_app.config.get('HASH_WORKERS')
+                    ).items()
+                }
                 
                 # Process uploaded files and track changes
                 uploaded_files = set()
@@ -785,7 +739,7 @@ def upload_project():
                 print(f"[UPLOAD] Project files found at root level, using root path")
             
             # Create or update project in database
-            from app.utils.system import detect_entry_point, auto_setup_project
+            from app.utils.system import detect_entry_point
             entry_point = detect_entry_point(project_path, project_type)
             
             if is_update:
@@ -814,63 +768,25 @@ def upload_project():
                 db.session.add(project)
                 db.session.commit()
             
-            # AUTO-SETUP: Prepare project environment
-            flash('🔧 Setting up project environment...', 'info')
-            
             # Get dependency change flags (set during incremental update, default False for new projects)
             pkg_json_changed = locals().get('package_json_changed', False)
             req_txt_changed = locals().get('requirements_txt_changed', False)
             
-            # Progress messages list
-            setup_messages = []
-            def progress_callback(step, msg):
-                setup_messages.append(msg)
-            
-            try:
-                success, message = auto_setup_project(
-                    project_path, 
-                    project_name,
-                    package_json_changed=pkg_json_changed,
-                    requirements_txt_changed=req_txt_changed,
-                    progress_callback=progress_callback
-                )
-                
-                # Show progress messages
-                for msg in setup_messages:
-                    flash(f'📦 {msg}', 'info')
-                
-                if success:
-                    flash(f'✓ {message}', 'success')
-                else:
-                    flash(f'⚠ Auto-setup warning: {message}', 'warning')
-            except Exception as e:
-                flash(f'⚠ Auto-setup warning: {str(e)}', 'warning')
-            
-            # Setup SSL if requested
-            if enable_ssl and domain and ssl_email:
-                from app.utils.ssl_manager import request_ssl_certificate, install_certbot
-                install_certbot()
-                if request_ssl_certificate(domain, ssl_email):
-                    project.ssl_enabled = True
-                    db.session.commit()
-                    flash(f'SSL certificate obtained for {domain}', 'success')
-                else:
-                    flash('SSL certificate request failed. You can try again later.', 'warning')
+            # AUTO-SETUP, SSL, nginx and firewall run in the background job runner
+            from app.utils.job_runner import enqueue
+            job = enqueue(
+                'setup',
+                project_id=project.id,
+                package_json_changed=pkg_json_changed,
+                requirements_txt_changed=req_txt_changed,
+                enable_ssl=enable_ssl,
+                ssl_email=ssl_email
+            )
             
-            # Configure nginx if domain provided
-            if domain:
-                from app.utils.system import generate_nginx_config, reload_nginx, open_firewall_port
-                generate_nginx_config(project_name, domain, port, project.ssl_enabled)
-                reload_nginx()
+            if job.status == 'queued':
+                flash(f'Project {project_name} uploaded successfully! Environment setup queued (job #{job.id}).', 'success')
             else:
-                # Open firewall port even without domain
-                from app.utils.system import open_firewall_port
-            
-            # Open firewall port for direct access
-            if open_firewall_port(port):
-                flash(f'✓ Firewall: Port {port} opened', 'success')
-            
-            flash(f'Project {project_name} uploaded successfully! Start it from the project page.', 'success')
+                _flash_job_messages(job)
             return redirect(url_for('main.project_details', id=project.id))
             
         except Exception as e:
@@ -899,10 +815,10 @@ def project_versions(id):
     version_data = []
     for version in versions:
         size = vm.get_version_size(version.id)
-        size_mb = size / (1024 * 1024)
         version_data.append({
             'version': version,
-            'size_mb': round(size_mb, 2)
+            'size_mb': round(size['logical_bytes'] / (1024 * 1024), 2),
+            'unique_mb': round(size['unique_bytes'] / (1024 * 1024), 2)
         })
     
     # Get deployment data
@@ -1036,47 +952,12 @@ def revoke_ssl(id):
 @main.route('/system-status')
 @login_required
 def system_status():
-    import psutil
-    import subprocess
-    
-    # Get system info
-    cpu_percent = psutil.cpu_percent(interval=1)
-    memory = psutil.virtual_memory()
-    disk = psutil.disk_usage('/')
+    from app.utils.metrics import current_snapshot
     
-    # Get network connections and listening ports
-    listening_ports = []
-    try:
-        connections = psutil.net_connections(kind='inet')
-        port_map = {}
-        
-        for conn in connections:
-            if conn.status == 'LISTEN' and conn.laddr:
-                port = conn.laddr.port
-                if port not in port_map:
-                    # Try to get process info
-                    try:
-                        if conn.pid:
-                            proc = psutil.Process(conn.pid)
-                            process_name = proc.name()
-                            process_cmdline = ' '.join(proc.cmdline()[:3])  # First 3 args
-                        else:
-                            process_name = 'Unknown'
-                            process_cmdline = ''
-                    except:
-                        process_name = 'Unknown'
-                        process_cmdline = ''
-                    
-                    port_map[port] = {
-                        'port': port,
-                        'process': process_name,
-                        'cmdline': process_cmdline,
-                        'pid': conn.pid or 'N/A'
-                    }
-        
-        listening_ports = sorted(port_map.values(), key=lambda x: x['port'])
-    except:
-        pass
+    # Cached sample from the background metrics sampler (no blocking CPU measurement here)
+    snapshot = current_snapshot(current_app._get_current_object())
+    host = snapshot['host']
+    listening_ports = [dict(port_info) for port_info in snapshot['listening_ports']]
     
     # Get all projects with their ports
     projects = Project.query.all()
@@ -1087,28 +968,78 @@ def system_status():
         port_info['project'] = project_ports.get(str(port_info['port']), None)
     
     # System uptime
-    boot_time = psutil.boot_time()
-    uptime_seconds = time.time() - boot_time
+    uptime_seconds = time.time() - host['boot_time']
     uptime_days = int(uptime_seconds // 86400)
     uptime_hours = int((uptime_seconds % 86400) // 3600)
     uptime_minutes = int((uptime_seconds % 3600) // 60)
     
-    system_info = {
-        'cpu_percent': cpu_percent,
-        'cpu_count': psutil.cpu_count(),
-        'memory_total': memory.total,
-        'memory_used': memory.used,
-        'memory_percent': memory.percent,
-        'disk_total': disk.total,
-        'disk_used': disk.used,
-        'disk_percent': disk.percent,
-        'uptime': f"{uptime_days}d {uptime_hours}h {uptime_minutes}m"
-    }
+    system_info = dict(host)
+    system_info['uptime'] = f"{uptime_days}d {uptime_hours}h {uptime_minutes}m"
+    system_info['sampled_at'] = snapshot['at']
     
     return render_template('system_status.html', 
                          system_info=system_info,
                          listening_ports=listening_ports,
-                         projects=projects)
+                         projects=projects,
+                         project_metrics=snapshot['projects'])
+
+@main.route('/api/metrics')
+@login_required
+def api_metrics():
+    """
+    Latest metrics snapshot plus sparkline series from the ring buffer.
+    ?project=<id> selects a project (default: host), ?seconds= limits the range,
+    ?points= downsamples, ?fields=a,b picks series.
+    """
+    from app.utils.metrics import current_snapshot, read_series, HOST_KEY, HOST_FIELDS, PROJECT_FIELDS
+    
+    app = current_app._get_current_object()
+    project_id = request.args.get('project', type=int)
+    seconds = request.args.get('seconds', type=int)
+    points = request.args.get('points', 120, type=int)
+    default_fields = PROJECT_FIELDS if project_id else HOST_FIELDS
+    fields = [f for f in request.args.get('fields', '').split(',') if f] or default_fields
+    
+    snapshot = current_snapshot(app)
+    if project_id:
+        Project.query.get_or_404(project_id)
+        latest = snapshot['projects'].get(str(project_id))
+    else:
+        latest = snapshot['host']
+    
+    response = {
+        'success': True,
+        'at': snapshot['at'],
+        'interval': snapshot['interval'],
+        'latest': latest,
+        'series': read_series(app, project_id or HOST_KEY, fields, seconds=seconds, points=points)
+    }
+    if project_id and str(project_id) in snapshot.get('no_history', []):
+        response['warning'] = 'No history is kept for this project: all metrics slots are in use (raise METRICS_MAX_PROJECTS)'
+    return jsonify(response)
+
+@main.route('/api/jobs/<int:id>')
+@login_required
+def api_job(id):
+    """Status and progress messages of a background job (?after=N skips already seen messages)"""
+    from app.utils.job_runner import job_to_dict
+    
+    job = Job.query.get_or_404(id)
+    return jsonify({'success': True, 'job': job_to_dict(job, after=request.args.get('after', 0, type=int))})
+
+@main.route('/api/jobs')
+@login_required
+def api_jobs():
+    """Recent background jobs, optionally filtered by ?project=<id>"""
+    from app.utils.job_runner import job_to_dict
+    
+    query = Job.query
+    project_id = request.args.get('project', type=int)
+    if project_id:
+        query = query.filter_by(project_id=project_id)
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+    return jsonify({'success': True, 'jobs': [job_to_dict(job, messages=False) for job in jobs]})
 
 @main.route('/kill-process/<int:pid>', methods=['POST'])
 @login_required
@@ -1883,13 +1814,20 @@ def change_password():
     flash('Password changed successfully!', 'success')
     return redirect(url_for('main.settings'))
 
-def generate_nginx_config(project, sub_routes=None):
-    """Generate Nginx configuration for a project with domain and sub-routes"""
+def generate_nginx_config(project, sub_routes=None, port_overrides=None):
+    """
+    Generate Nginx configuration for a project with domain and sub-routes
+    
+    port_overrides: {project_id: port} - temporary upstream ports (blue/green deploys)
+    """
     if not project.domain:
         return None
+    port_overrides = port_overrides or {}
     
     # Determine upstream based on project type
-    if project.project_type == 'nodejs':
+    if project.id in port_overrides:
+        upstream_port = port_overrides[project.id]
+    elif project.project_type == 'nodejs':
         upstream_port = project.port or 3000
     elif project.project_type == 'python':
         upstream_port = project.port or 5000
@@ -1909,7 +1847,7 @@ def generate_nginx_config(project, sub_routes=None):
     sub_route_blocks = ""
     if sub_routes:
         for sr in sub_routes:
-            mounted_port = sr.mounted_project.port
+            mounted_port = port_overrides.get(sr.mounted_project_id, sr.mounted_project.port)
             route_path = sr.route_path
             
             if sr.strip_prefix:
@@ -2023,6 +1961,62 @@ server {{
 """
     return config
 
+def install_nginx_config(project, port_overrides=None):
+    """
+    Write the project's Nginx config, enable it, test and reload Nginx.
+    On a failed test the previous config is put back.
+    
+    Returns:
+        (bool, str): success, error message
+    """
+    import subprocess
+    
+    sub_routes = SubRoute.query.filter_by(host_project_id=project.id).all()
+    config_content = generate_nginx_config(project, sub_routes, port_overrides)
+    if not config_content:
+        return False, 'Project does not have a domain configured'
+    
+    config_path = f'/etc/nginx/sites-available/{project.name}'
+    previous_content = None
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            previous_content = f.read()
+    
+    # Write config file directly (Flask runs as root via systemd)
+    with open(config_path, 'w') as f:
+        f.write(config_content)
+    
+    # Create symlink to sites-enabled
+    enabled_path = f'/etc/nginx/sites-enabled/{project.name}'
+    if os.path.lexists(enabled_path):
+        os.remove(enabled_path)
+    os.symlink(config_path, enabled_path)
+    
+    # Test nginx configuration
+    test_result = subprocess.run(
+        ['/usr/sbin/nginx', '-t'],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    
+    if test_result.returncode != 0:
+        if previous_content is not None:
+            with open(config_path, 'w') as f:
+                f.write(previous_content)
+        return False, f'Nginx configuration test failed: {test_result.stderr}'
+    
+    # Reload nginx (graceful: old workers finish their requests)
+    reload_result = subprocess.run(
+        ['/usr/bin/systemctl', 'reload', 'nginx'],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    if reload_result.returncode != 0:
+        return False, f'Failed to reload Nginx: {reload_result.stderr}'
+    return True, None
+
 @main.route('/configure-nginx/<int:project_id>', methods=['POST'])
 @login_required
 def configure_nginx(project_id):
@@ -2052,41 +2046,10 @@ def configure_nginx(project_id):
         # Get sub-routes for this project
         sub_routes = SubRoute.query.filter_by(host_project_id=project_id).all()
         
-        # Generate config with sub-routes
-        config_content = generate_nginx_config(project, sub_routes)
+        # Generate, write, test and reload
+        success, error = install_nginx_config(project)
         
-        # Write config file directly (Flask runs as root via systemd)
-        config_path = f'/etc/nginx/sites-available/{project.name}'
-        with open(config_path, 'w') as f:
-            f.write(config_content)
-        
-        # Create symlink to sites-enabled
-        enabled_path = f'/etc/nginx/sites-enabled/{project.name}'
-        if os.path.exists(enabled_path):
-            os.remove(enabled_path)
-        os.symlink(config_path, enabled_path)
-        
-        # Test nginx configuration
-        test_result = subprocess.run(
-            ['/usr/sbin/nginx', '-t'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if test_result.returncode != 0:
-            flash(f'Nginx configuration test failed: {test_result.stderr}', 'error')
-            return redirect(url_for('main.project_details', id=project_id))
-        
-        # Reload nginx
-        reload_result = subprocess.run(
-            ['/usr/bin/systemctl', 'reload', 'nginx'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if reload_result.returncode == 0:
+        if success:
             if ssl_available:
                 flash(f'✓ Nginx configured with SSL for {project.domain}', 'success')
             else:
@@ -2096,7 +2059,7 @@ def configure_nginx(project_id):
             if sub_routes:
                 flash(f'✓ {len(sub_routes)} sub-route(s) configured', 'info')
         else:
-            flash(f'Failed to reload Nginx: {reload_result.stderr}', 'error')
+            flash(error, 'error')
             
     except Exception as e:
         flash(f'Error configuring Nginx: {str(e)}', 'error')
@@ -2667,7 +2630,9 @@ def api_deployment_get_manifest(project_id):
             'project_id': project_id,
             'project_name': project.name,
             'manifest': manifest,
-            'file_count': len(manifest)
+            'file_count': len(manifest),
+            'hash_cache': dm.last_scan_stats,
+            'encodings': supported_encodings()
         })
     except Exception as e:
         db.session.rollback()
@@ -2707,8 +2672,13 @@ def api_deployment_compare(project_id):
                 'deleted': diff['deleted'],
                 'unchanged_count': len(diff['unchanged'])
             },
-            'total_changes': len(diff['added']) + len(diff['modified']) + len(diff['deleted'])
+            'total_changes': len(diff['added']) + len(diff['modified']) + len(diff['deleted']),
+            'hash_cache': dm.last_scan_stats,
+            'encodings': supported_encodings()
         })
+    except HTTPException:
+        # Ör. açılmış gövde MAX_CONTENT_LENGTH'i aşarsa 413
+        raise
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Deployment compare error for project {project_id}: {e}")
@@ -2716,6 +2686,38 @@ def api_deployment_compare(project_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@main.route('/api/deployment/<int:project_id>/signatures', methods=['POST'])
+@login_required
+def api_deployment_signatures(project_id):
+    """
+    Değişen büyük dosyaların parça imzalarını getir (delta deployment için)
+
+    Body: {'paths': [relative_path, ...]}
+    """
+    try:
+        Project.query.get_or_404(project_id)
+        data = request.get_json()
+
+        if not data or 'paths' not in data:
+            return jsonify({'success': False, 'error': 'paths required'}), 400
+
+        from app.utils.deployment_manager import DeploymentManager
+        dm = DeploymentManager(project_id)
+
+        return jsonify({
+            'success': True,
+            'project_id': project_id,
+            'signatures': dm.get_chunk_signatures(data['paths'])
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Deployment signatures error for project {project_id}: {e}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @main.route('/api/deployment/<int:project_id>/deploy', methods=['POST'])
 @login_required
 def api_deployment_deploy(project_id):
@@ -2731,50 +2733,37 @@ def api_deployment_deploy(project_id):
         deleted_files = data.get('deleted_files', [])
         description = data.get('description', 'Deployment from panel')
         restart_after = data.get('restart_after', True)
+        strategy = data.get('strategy') or current_app.config.get('DEPLOY_STRATEGY')
         
         if not package and not deleted_files:
             return jsonify({'success': False, 'error': 'No files to deploy'}), 400
         
+        busy = deployment_job_conflict(project)
+        if busy:
+            return busy
+        
         from app.utils.deployment_manager import DeploymentManager
         dm = DeploymentManager(project_id)
         
-        # Projeyi durdur (gerekirse)
-        was_running = project.status == 'running'
-        if was_running:
-            stop_project_process(project)
-        
-        # Deploy et
-        result = dm.receive_deployment(package, deleted_files, description)
-        
-        # Projeyi yeniden başlat
-        if restart_after and was_running:
-            from app.utils.system import generate_supervisor_config
-            env_vars = json.loads(project.env_vars) if project.env_vars else {}
-            pid = generate_supervisor_config(
-                project.name,
-                project.project_type,
-                project.path,
-                project.port,
-                env_vars=env_vars,
-                entry_point=project.entry_point
-            )
-            if pid:
-                project.pid = pid
-                project.status = 'running'
-                db.session.commit()
-                result['restarted'] = True
-                result['new_pid'] = pid
-            else:
-                result['restarted'] = False
-                result['restart_error'] = 'Failed to restart'
+        result = run_deployment(
+            project, restart_after, strategy,
+            lambda before_apply: dm.receive_deployment(package, deleted_files, description, before_apply)
+        )
         
         return jsonify({
             'success': result['success'],
+            'rejected': result.get('rejected', False),
             'applied': result['applied'],
             'deleted': result.get('deleted', 0),
             'errors': result.get('errors', []),
-            'restarted': result.get('restarted', False)
-        })
+            'base_mismatch': result.get('base_mismatch', []),
+            'restarted': result.get('restarted', False),
+            'strategy': result.get('strategy', 'restart'),
+            'reload': result.get('reload'),
+            'job_id': result.get('job_id')
+        }), 409 if result.get('rejected') else 200
+    except HTTPException:
+        raise
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Deployment deploy error for project {project_id}: {e}")
@@ -2782,6 +2771,171 @@ def api_deployment_deploy(project_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@main.route('/api/deployment/<int:project_id>/deploy-stream', methods=['POST'])
+@login_required
+def api_deployment_deploy_stream(project_id):
+    """
+    Dosyaları binary tar stream olarak deploy et
+    
+    Body: tar arşivi (ilk üye .vdspanel-deploy.json metadata), chunked gönderilebilir.
+    Dosyalar geldikçe diske yazılır ve hash'leri yazılırken doğrulanır.
+    Query: ?restart_after=0 ile restart devre dışı bırakılır,
+           ?strategy=restart|reload|blue_green ile yeniden başlatma yöntemi seçilir.
+    """
+    try:
+        project = Project.query.get_or_404(project_id)
+        restart_after = request.args.get('restart_after', '1').lower() not in ('0', 'false', 'no')
+        strategy = request.args.get('strategy') or current_app.config.get('DEPLOY_STRATEGY')
+        
+        busy = deployment_job_conflict(project)
+        if busy:
+            # Gövdeyi okuyup at: client yanıtı yükleme bitince okur
+            from app.utils.deployment_manager import STREAM_BLOCK_SIZE
+            for _ in iter(lambda: request.stream.read(STREAM_BLOCK_SIZE), b""):
+                pass
+            return busy
+        
+        from app.utils.deployment_manager import DeploymentManager
+        dm = DeploymentManager(project_id)
+        
+        def receive(before_apply):
+            try:
+                return dm.receive_deployment_stream(request.stream, before_apply)
+            except (ValueError, tarfile.TarError) as e:
+                return {'success': False, 'applied': 0, 'deleted': 0, 'errors': [f'Invalid deployment stream: {e}']}
+        
+        result = run_deployment(project, restart_after, strategy, receive)
+        
+        return jsonify({
+            'success': result['success'],
+            'rejected': result.get('rejected', False),
+            'applied': result['applied'],
+            'deleted': result.get('deleted', 0),
+            'total_size': result.get('total_size', 0),
+            'errors': result.get('errors', []),
+            'base_mismatch': result.get('base_mismatch', []),
+            'restarted': result.get('restarted', False),
+            'strategy': result.get('strategy', 'restart'),
+            'reload': result.get('reload'),
+            'job_id': result.get('job_id')
+        }), 409 if result.get('rejected') else 200
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Deployment stream error for project {project_id}: {e}")
+        current_app.logger.error(traceback.format_exc())
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def deployment_job_conflict(project):
+    """
+    Projenin bekleyen veya çalışan bir işi varsa 409 yanıtı, yoksa None
+    
+    Deploy, kurulum işi aynı dizinde pip/npm çalıştırırken dosyaları değiştirmesin
+    ve başlatma işi deploy'un durdurduğu uygulamayı yeniden açmasın diye reddedilir.
+    """
+    from app.utils.job_runner import active_job
+    job = active_job(project.id)
+    if not job:
+        return None
+    return jsonify({
+        'success': False,
+        'error': f'Project has a {job.kind} job in progress (job #{job.id}), deploy again when it finishes',
+        'job_id': job.id
+    }), 409
+
+
+def run_deployment(project, restart_after, strategy, receive):
+    """
+    Deploy'u uygula ve projeyi seçilen yöntemle yeniden başlat
+    
+    receive(before_apply) deploy'u alır; before_apply dosyalar yazılmadan
+    hemen önce çağrılır. Deploy reddedilirse (ör. delta tabanı değişmiş)
+    proje hiç durdurulmaz ve yeniden başlatılmaz.
+    
+    Returns:
+        dict: receive'in döndürdüğü sonuç (restart bilgileri eklenmiş)
+    """
+    was_running = project.status == 'running'
+    restart_method = choose_restart_method(project, strategy) if restart_after and was_running else 'restart'
+    applying = []
+    
+    def before_apply():
+        # Projeyi durdur (gerekirse); blue/green ve reload'da eski süreç yeni sürüm hazır olana kadar çalışır
+        if was_running and restart_method == 'restart':
+            stop_project_process(project)
+        applying.append(True)
+    
+    result = receive(before_apply)
+    
+    # Projeyi yeniden başlat
+    if restart_after and was_running and applying:
+        if restart_method == 'blue_green':
+            from app.utils.blue_green import blue_green_restart
+            blue_green_restart(project, result)
+        elif restart_method == 'reload':
+            reload_project_after_deploy(project, result)
+        else:
+            restart_project_after_deploy(project, result)
+    return result
+
+
+def choose_restart_method(project, strategy):
+    """
+    Deployment sonrası yeniden başlatma yöntemi: 'blue_green', 'reload' veya 'restart'
+    (istenen yöntem mümkün değilse bir sonrakine düşülür)
+    """
+    if strategy == 'blue_green':
+        from app.utils.blue_green import can_blue_green
+        if can_blue_green(project):
+            return 'blue_green'
+    if strategy in ('blue_green', 'reload'):
+        from app.utils.reload_manager import plan_reload
+        if plan_reload(project)[0] != 'restart':
+            return 'reload'
+    return 'restart'
+
+
+def reload_project_after_deploy(project, result):
+    """Deployment sonrası projeyi gunicorn sinyaliyle yeniden yükle, sonucu result'a yaz"""
+    from app.utils.reload_manager import reload_project
+    reload = reload_project(project)
+    result['strategy'] = 'reload' if reload['method'] != 'restart' else 'restart'
+    result['reload'] = reload
+    result['restarted'] = reload['success']
+    if reload['success']:
+        result['new_pid'] = reload['pid']
+    else:
+        result['restart_error'] = reload.get('error', 'Failed to reload')
+
+
+def restart_project_after_deploy(project, result):
+    """Deployment sonrası projeyi yeniden başlat, sonucu result'a yaz"""
+    from app.utils.system import generate_supervisor_config, start_options
+    from app.utils.reload_manager import record_launch
+    env_vars = json.loads(project.env_vars) if project.env_vars else {}
+    pid = generate_supervisor_config(
+        project.name,
+        project.project_type,
+        project.path,
+        project.port,
+        env_vars=env_vars,
+        entry_point=project.entry_point,
+        **start_options(project)
+    )
+    if pid:
+        project.pid = pid
+        project.status = 'running'
+        record_launch(project)
+        db.session.commit()
+        result['restarted'] = True
+        result['new_pid'] = pid
+    else:
+        result['restarted'] = False
+        result['restart_error'] = 'Failed to restart'
+
+
 @main.route('/api/deployment/<int:project_id>/history')
 @login_required
 def api_deployment_history(project_id):
@@ -2848,15 +3002,22 @@ def api_set_app_state(project_id):
 @main.route('/api/app-state/restore-all', methods=['POST'])
 @login_required
 def api_restore_all_apps():
-    """Tüm should_run=True olan uygulamaları başlat"""
+    """Tüm should_run=True olan uygulamaları başlat (?concurrency=N ile eşzamanlılık)"""
     from app.utils.deployment_manager import restore_app_states
     
-    results = restore_app_states()
+    concurrency = request.args.get('concurrency', type=int)
+    if concurrency is not None and concurrency < 1:
+        return jsonify({'success': False, 'error': 'concurrency must be at least 1'}), 400
+    
+    restore = restore_app_states(concurrency=concurrency)
+    results = restore['results']
     
     return jsonify({
         'success': True,
         'results': results,
-        'restored_count': len([r for r in results if r['status'] == 'started'])
+        'restored_count': len([r for r in results if r['status'] == 'started']),
+        'total_seconds': restore['total_seconds'],
+        'concurrency': restore['concurrency']
     })
 
 
@@ -2,8 +2,82 @@
 Auto-fix utilities for self-healing project startup issues
 """
 import os
+import json
+import socket
 import subprocess
-import time
+from app.utils.system import wait_for_ready
+from app.utils.worker_sizing import WORKER_CLASSES
+
+# Upper bound for one candidate; a working entry point returns as soon as it serves
+ENTRY_POINT_TEST_TIMEOUT = 15
+# In-process probe: per-candidate import limit and limit for the whole probe run
+PROBE_CANDIDATE_TIMEOUT = 10
+PROBE_TIMEOUT = 60
+PROBE_WORKERS = 8
+# Probe winners confirmed with a real gunicorn bind before giving up
+MAX_CONFIRMATIONS = 3
+
+# Runs inside the project's venv interpreter: imports every candidate concurrently
+# and reports whether the attribute is a WSGI or ASGI callable. Reads the
+# candidate list as JSON on stdin, writes one JSON object to stdout.
+PROBE_SCRIPT = r"""
+import importlib, inspect, json, os, sys
+from concurrent.futures import ThreadPoolExecutor, wait
+
+candidates, timeout, workers = json.load(sys.stdin)
+out = sys.stdout
+# Imported modules may print; keep stdout for the result only
+sys.stdout = sys.stderr
+sys.path.insert(0, os.getcwd())
+
+def kind_of(obj):
+    call = getattr(obj, '__call__', None)
+    if inspect.iscoroutinefunction(obj) or inspect.iscoroutinefunction(call):
+        return 'asgi'
+    if not callable(obj) or inspect.isclass(obj):
+        return None
+    try:
+        params = [p for p in inspect.signature(obj).parameters.values()
+                  if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    except (TypeError, ValueError):
+        return 'wsgi'
+    if len(params) == 2:
+        return 'wsgi'
+    # ASGI 2 style: app(scope) returns an awaitable instance
+    return 'asgi' if len(params) == 1 else None
+
+def probe(entry_point):
+    module_name, _, attr = entry_point.partition(':')
+    try:
+        obj = importlib.import_module(module_name)
+        factory = attr.endswith('()')
+        for part in (attr[:-2] if factory else attr).split('.'):
+            obj = getattr(obj, part)
+        if factory:
+            obj = obj()
+        kind = kind_of(obj)
+        if kind:
+            return {'ok': True, 'kind': kind}
+        return {'ok': False, 'error': f'{type(obj).__name__} is not a WSGI/ASGI callable'}
+    except BaseException as e:
+        return {'ok': False, 'error': f'{type(e).__name__}: {e}'[:300]}
+
+pool = ThreadPoolExecutor(max_workers=workers)
+futures = {entry_point: pool.submit(probe, entry_point) for entry_point in candidates}
+wait(futures.values(), timeout=timeout)
+results = {}
+for entry_point, future in futures.items():
+    results[entry_point] = future.result() if future.done() else {'ok': False, 'error': 'timed out'}
+try:
+    import uvicorn
+    has_uvicorn = True
+except BaseException:
+    has_uvicorn = False
+out.write(json.dumps({'results': results, 'uvicorn': has_uvicorn}))
+out.flush()
+# Candidates stuck in import (e.g. an unguarded app.run()) must not keep us alive
+os._exit(0)
+"""
 
 def detect_entry_point_error(log_content):
     """
@@ -141,7 +215,34 @@ def get_all_possible_entry_points(project_path, project_type):
     print(f"[AUTO-FIX] Total entry points to test: {len(entry_points)}")
     return entry_points
 
-def test_entry_point(project_path, entry_point, port, venv_python):
+def free_port():
+    """Ephemeral port for a test bind (the project's own port may still be held)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def probe_entry_points(project_path, entry_points, venv_python):
+    """
+    Imports all candidates concurrently inside one interpreter of the project venv.
+    Returns ({entry_point: {'ok', 'kind' or 'error'}}, uvicorn_available) or (None, False)
+    if the probe itself could not run.
+    """
+    try:
+        result = subprocess.run(
+            [venv_python, '-c', PROBE_SCRIPT],
+            cwd=project_path,
+            input=json.dumps([entry_points, PROBE_CANDIDATE_TIMEOUT, PROBE_WORKERS]),
+            capture_output=True,
+            text=True,
+            timeout=PROBE_TIMEOUT
+        )
+        data = json.loads(result.stdout)
+        return data['results'], data['uvicorn']
+    except (OSError, subprocess.TimeoutExpired, ValueError, KeyError) as e:
+        print(f"[AUTO-FIX] Probe failed, falling back to gunicorn trials: {e}")
+        return None, False
+
+def test_entry_point(project_path, entry_point, port, venv_python, worker_class=None):
     """
     Tests if an entry point works by trying to start gunicorn briefly.
     Returns True if successful, False otherwise.
@@ -163,6 +264,8 @@ def test_entry_point(project_path, entry_point, port, venv_python):
         '--timeout', '5',
         entry_point
     ]
+    if worker_class:
+        command[1:1] = ['-k', worker_class]
     
     try:
         # Start the process
@@ -174,21 +277,23 @@ def test_entry_point(project_path, entry_point, port, venv_python):
             text=True
         )
         
-        # Wait a bit to see if it starts successfully
-        time.sleep(2)
-        
-        # Check if process is still running
+        # Wait until a worker answers HTTP (or the process dies)
+        ready = wait_for_ready(port, timeout=ENTRY_POINT_TEST_TIMEOUT, process=process, require_http=True)
         poll_result = process.poll()
         
         if poll_result is None:
-            # Process is running! Kill it and return success
+            # Stop the test instance; wait so the port is free for the next candidate
             process.terminate()
             try:
                 process.wait(timeout=2)
             except:
                 process.kill()
-            print(f"[AUTO-FIX] ✓ Entry point works: {entry_point}")
-            return True
+                process.wait()
+            if ready:
+                print(f"[AUTO-FIX] ✓ Entry point works: {entry_point}")
+            else:
+                print(f"[AUTO-FIX] ✗ Entry point did not serve within {ENTRY_POINT_TEST_TIMEOUT}s: {entry_point}")
+            return ready
         else:
             # Process died, check stderr for specific errors
             stderr = process.stderr.read()
@@ -205,7 +310,10 @@ def test_entry_point(project_path, entry_point, port, venv_python):
 def auto_fix_entry_point(project_name, project_path, project_type, port, venv_python):
     """
     Automatically detects and fixes entry point issues.
-    Returns (success, new_entry_point, message)
+    All candidates are probed in-process first; only probe winners are confirmed
+    with a real gunicorn bind on an ephemeral port.
+    Returns (success, new_entry_point, kind, message); kind is 'wsgi' or 'asgi'
+    (None on failure) and decides the worker class the project must run with.
     """
     print(f"[AUTO-FIX] === Starting entry point auto-fix for {project_name} ===")
     
@@ -214,31 +322,52 @@ def auto_fix_entry_point(project_name, project_path, project_type, port, venv_py
     
     print(f"[AUTO-FIX] Found {len(possible_entry_points)} possible entry points to test")
     
-    # Test each entry point
-    for i, entry_point in enumerate(possible_entry_points, 1):
-        print(f"[AUTO-FIX] Testing {i}/{len(possible_entry_points)}: {entry_point}")
+    results, has_uvicorn = probe_entry_points(project_path, possible_entry_points, venv_python)
+    if results is None:
+        # Probe unavailable: test each entry point with gunicorn
+        candidates = [(entry_point, 'wsgi') for entry_point in possible_entry_points]
+    else:
+        candidates = []
+        for entry_point in possible_entry_points:
+            result = results.get(entry_point) or {}
+            if result.get('ok'):
+                print(f"[AUTO-FIX] ✓ Probe: {entry_point} is a {result['kind'].upper()} callable")
+                candidates.append((entry_point, result['kind']))
+            else:
+                print(f"[AUTO-FIX] ✗ Probe: {entry_point}: {result.get('error')}")
+        candidates = candidates[:MAX_CONFIRMATIONS]
+    
+    # Confirm in candidate order
+    for i, (entry_point, kind) in enumerate(candidates, 1):
+        worker_class = None
+        if kind == 'asgi':
+            if not has_uvicorn:
+                print(f"[AUTO-FIX] ✗ {entry_point} is an ASGI app but uvicorn is not installed in the venv")
+                continue
+            worker_class = WORKER_CLASSES['uvicorn']
+        test_port = free_port()
+        print(f"[AUTO-FIX] Testing {i}/{len(candidates)}: {entry_point} on port {test_port}")
         
-        if test_entry_point(project_path, entry_point, port, venv_python):
+        if test_entry_point(project_path, entry_point, test_port, venv_python, worker_class):
             print(f"[AUTO-FIX] ✓✓✓ Found working entry point: {entry_point}")
-            return True, entry_point, f"Auto-fixed: Found working entry point '{entry_point}'"
-        
-        # Small delay between tests
-        time.sleep(0.5)
+            return True, entry_point, kind, f"Auto-fixed: Found working entry point '{entry_point}'"
     
     # No working entry point found
     print(f"[AUTO-FIX] ✗ No working entry point found")
-    return False, None, "Could not find a working entry point. Please check your application structure."
+    return False, None, None, "Could not find a working entry point. Please check your application structure."
 
 def should_attempt_auto_fix(error_log_path):
     """
     Checks if we should attempt auto-fix based on error log content.
     """
+    from app.utils.log_manager import read_log
+    
     if not os.path.exists(error_log_path):
         return False
     
     try:
-        with open(error_log_path, 'r') as f:
-            content = f.read()
-            return detect_entry_point_error(content)
+        # Current run first, then the previous run's log (kept as <log>.1 on restart)
+        return (detect_entry_point_error(read_log(error_log_path))
+                or detect_entry_point_error(read_log(error_log_path, previous=True)))
     except:
         return False
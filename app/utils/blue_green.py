@@ -0,0 +1,212 @@
+"""
+Blue/Green Restart - deployment sonrası kesintisiz yeniden başlatma
+
+Yeni sürüm boş bir portta geçici instance olarak başlatılır, hazır olunca
+Nginx upstream'i ona çevrilir ve deploy isteği yanıtlanır. Geri kalanı
+'blue_green_settle' işinde çalışır: eski süreç işlerini bitirerek (drain)
+kapanır, yeni sürüm projenin kendi portunda tekrar başlatılıp upstream geri
+çevrilir ve geçici instance drain edilir; böylece project.port her zaman
+kalıcı port olarak kalır.
+
+Geçici instance'ın kendi log dosyaları (<proje>.spare.out/err.log) ve cgroup'u
+vardır: çalışan sürümün logları döndürülmez, iki sürüm aynı memory.max'i
+paylaşıp sağlıklı olanı OOM'a sokmaz. Host'ta ikinci bir kopyaya yetecek boş
+bellek yoksa normal restart kullanılır.
+
+Sadece Nginx arkasındaki (domain'i veya mount edildiği host'u olan) çalışan
+Python projeleri için kullanılabilir; diğerleri normal stop/start ile yeniden
+başlatılır.
+"""
+
+import os
+import json
+import time
+import psutil
+from flask import current_app
+from app import db
+from app.models import SubRoute
+from app.utils.system import (
+    generate_supervisor_config, find_free_port, wait_for_ready, drain_process, check_process_status,
+    readiness_options, start_options
+)
+from app.utils.reload_manager import record_launch
+
+NGINX_SITES_AVAILABLE = '/etc/nginx/sites-available'
+
+# Nginx reload sonrası eski worker'ların mevcut bağlantıları bitirmesi için beklenen süre
+NGINX_SETTLE_SECONDS = 2
+
+# Geçici instance'ın log/cgroup adı eki (system.instance_name)
+SPARE_INSTANCE = 'spare'
+
+
+def nginx_fronted_projects(project):
+    """Trafiği bu projeye yönlendiren Nginx config'leri olan projeler (kendisi ve mount eden host'lar)"""
+    candidates = [project] + [
+        sr.host_project for sr in SubRoute.query.filter_by(mounted_project_id=project.id).all()
+    ]
+    fronted = []
+    for p in candidates:
+        if p in fronted or not p.domain:
+            continue
+        if os.path.exists(os.path.join(NGINX_SITES_AVAILABLE, p.name)):
+            fronted.append(p)
+    return fronted
+
+
+def can_blue_green(project):
+    """Proje blue/green ile yeniden başlatılabilir mi"""
+    if project.status != 'running' or not check_process_status(project.pid):
+        return False
+    if project.project_type in ('php', 'nodejs'):
+        # Node.js: yeni instance kurulumu canlı dizinde node_modules ve .next'i
+        # yeniden oluşturur, monorepo backend'i de sabit portu kullanır; eski
+        # süreç çalışırken güvenli değil, normal restart kullanılır
+        return False
+    from app.utils.worker_sizing import project_memory
+    needed = project_memory(project)
+    if needed and psutil.virtual_memory().available < needed:
+        # Geçiş sırasında iki sürüm birlikte çalışır
+        print(f"[BLUE-GREEN] {project.name}: not enough free memory for a second instance "
+              f"({needed // (1024 * 1024)} MB needed), using a plain restart")
+        return False
+    return bool(nginx_fronted_projects(project))
+
+
+def _start_instance(project, port, instance=None):
+    env_vars = json.loads(project.env_vars) if project.env_vars else {}
+    return generate_supervisor_config(
+        project.name,
+        project.project_type,
+        project.path,
+        port,
+        env_vars=env_vars,
+        entry_point=project.entry_point,
+        instance=instance,
+        **start_options(project)
+    )
+
+
+def _switch_upstream(project, fronted, port):
+    """Nginx upstream'ini verilen porta çevir; hata mesajı veya None döner"""
+    from app.routes import install_nginx_config
+    overrides = {project.id: port} if port != project.port else None
+    for p in fronted:
+        success, error = install_nginx_config(p, overrides)
+        if not success:
+            return f"{p.name}: {error}"
+    return None
+
+
+def _start_and_wait(project, port, timeout, health_path, instance=None):
+    """Yeni instance başlat ve hazır olmasını bekle; başarısızsa durdurup None döner"""
+    pid = _start_instance(project, port, instance)
+    if pid and wait_for_ready(port, timeout=timeout, health_path=health_path, pid=pid):
+        return pid
+    if pid:
+        drain_process(pid, timeout=5)
+    return None
+
+
+def _drain_spare(project, pid, timeout):
+    """Geçici instance'ı drain et ve boşalan cgroup'unu sil"""
+    from app.utils.cgroups import remove_project_cgroup
+    drain_process(pid, timeout=timeout)
+    remove_project_cgroup(project, SPARE_INSTANCE)
+
+
+def blue_green_restart(project, result):
+    """
+    Projeyi kesintisiz yeniden başlat, sonucu result'a yaz
+
+    Yeni sürüm hazır olmazsa eski süreç çalışmaya devam eder ve Nginx'e dokunulmaz.
+    Trafik yeni sürüme geçince eski sürecin drain'i ve kalıcı porta dönüş
+    'blue_green_settle' işine bırakılır (result['job_id']).
+
+    Returns:
+        bool: Yeni sürüm trafiği alıyorsa True
+    """
+    from app.utils.job_runner import enqueue
+    config = current_app.config
+    ready_timeout = config.get('BLUE_GREEN_READY_TIMEOUT', 60)
+    health_path = readiness_options(project)['health_path']
+
+    fronted = nginx_fronted_projects(project)
+    blue_pid = project.pid
+    result['strategy'] = 'blue_green'
+    result.setdefault('errors', [])
+
+    # 1. Yeni sürümü boş bir portta geçici instance olarak başlat
+    spare_port = find_free_port()
+    print(f"[BLUE-GREEN] {project.name}: starting new version on port {spare_port}")
+    green_pid = _start_and_wait(project, spare_port, ready_timeout, health_path, SPARE_INSTANCE)
+    if not green_pid:
+        result['errors'].append('New version failed health check; previous process kept running')
+        result['restarted'] = False
+        return False
+
+    # 2. Trafiği yeni sürüme çevir
+    error = _switch_upstream(project, fronted, spare_port)
+    if error:
+        _switch_upstream(project, fronted, project.port)
+        _drain_spare(project, green_pid, 5)
+        result['errors'].append(f'Could not switch Nginx upstream: {error}')
+        result['restarted'] = False
+        return False
+
+    project.pid = green_pid
+    record_launch(project)
+    db.session.commit()
+
+    # 3. Eski sürecin drain'i ve kalıcı porta dönüş deploy isteğini bekletmez
+    job = enqueue('blue_green_settle', project_id=project.id, blue_pid=blue_pid,
+                  green_pid=green_pid, spare_port=spare_port)
+    result['restarted'] = True
+    result['new_pid'] = green_pid
+    result['job_id'] = job.id
+    return True
+
+
+def settle_blue_green(ctx, project, blue_pid, green_pid, spare_port):
+    """
+    Geçişi tamamla: eski süreci drain et, yeni sürümü kalıcı portta başlatıp
+    upstream'i geri çevir ve geçici instance'ı drain et
+
+    Kalıcı porta dönülemezse yeni sürüm geçici portta trafiği almaya devam eder.
+
+    Returns:
+        dict: İş sonucu
+    """
+    config = current_app.config
+    ready_timeout = config.get('BLUE_GREEN_READY_TIMEOUT', 60)
+    health_path = readiness_options(project)['health_path']
+    drain_timeout = config.get('DEPLOY_DRAIN_TIMEOUT', 30)
+    fronted = nginx_fronted_projects(project)
+
+    time.sleep(NGINX_SETTLE_SECONDS)
+    ctx.progress(f'Draining previous process (PID {blue_pid})...')
+    drain_process(blue_pid, timeout=drain_timeout)
+
+    ctx.progress(f'Moving back to port {project.port}...')
+    final_pid = _start_and_wait(project, project.port, ready_timeout, health_path)
+    error = None if final_pid else 'instance did not become ready'
+    if final_pid:
+        error = _switch_upstream(project, fronted, project.port)
+        if error:
+            drain_process(final_pid, timeout=5)
+
+    if error:
+        message = (f'New version is serving on temporary port {spare_port}; could not move back to '
+                   f'port {project.port} ({error}). Reconfigure Nginx after the next restart.')
+        ctx.progress(message, 'warning')
+        return {'success': False, 'error': message, 'pid': green_pid}
+
+    project.pid = final_pid
+    project.status = 'running'
+    record_launch(project)
+    db.session.commit()
+
+    time.sleep(NGINX_SETTLE_SECONDS)
+    _drain_spare(project, green_pid, drain_timeout)
+    ctx.progress(f'✓ New version is serving on port {project.port} (PID: {final_pid})', 'success')
+    return {'success': True, 'pid': final_pid}
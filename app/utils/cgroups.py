@@ -0,0 +1,241 @@
+"""
+cgroup v2 - proje bazında kaynak sınırları ve kullanım ölçümü
+
+Her proje /sys/fs/cgroup/<CGROUP_PARENT>/<proje> cgroup'unda çalıştırılır:
+    cpu.max      <- project.cpu_limit (CPU çekirdeği, örn. 1.5)
+    memory.max   <- project.memory_max_mb
+    memory.high  <- project.memory_high_mb (bu sınırın üstünde bellek geri kazanılır/yavaşlatılır)
+    io.weight    <- project.io_weight (1-10000, varsayılan 100)
+
+Süreç exec edilmeden önce cgroup'a taşınır (sh sarmalayıcı ile), böylece
+fork edilen worker'lar ve arka plana atılan alt süreçler de cgroup içinde kalır
+ve kullanım sayaçları (cpu.stat, memory.current, io.stat) eksiksizdir.
+
+cgroup v2 yoksa veya yazma yetkisi devredilmemişse (delegation) sessizce normal
+başlatmaya düşülür.
+"""
+
+import os
+import re
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+CONTROLLERS = ('cpu', 'memory', 'io')
+CPU_PERIOD_USEC = 100000
+
+# Parent cgroup hazırlama sonucu (süreç başına bir kez denenir): parent yolu veya None
+_parent_state = {}
+
+
+def cgroup_name(project_name):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', project_name)
+
+
+def _write(path, value):
+    with open(path, 'w') as f:
+        f.write(value)
+
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read().strip()
+
+
+def _enable_controllers(cgroup_dir):
+    """cgroup_dir'in çocukları için cpu/memory/io controller'larını etkinleştir"""
+    try:
+        available = _read(os.path.join(cgroup_dir, 'cgroup.controllers')).split()
+    except OSError:
+        return
+    wanted = ' '.join(f'+{c}' for c in CONTROLLERS if c in available)
+    if wanted:
+        try:
+            _write(os.path.join(cgroup_dir, 'cgroup.subtree_control'), wanted)
+        except OSError:
+            pass
+
+
+def prepare_parent(parent):
+    """
+    Panel cgroup'unu oluştur ve controller'ları etkinleştir
+
+    Returns:
+        str: Parent cgroup yolu, cgroup v2 kullanılamıyorsa None
+    """
+    if parent in _parent_state:
+        return _parent_state[parent]
+    path = None
+    if os.path.exists(os.path.join(CGROUP_ROOT, 'cgroup.controllers')):
+        candidate = os.path.join(CGROUP_ROOT, parent.strip('/'))
+        try:
+            os.makedirs(candidate, exist_ok=True)
+            # Root'tan parent'a kadar her seviyede controller'ları aşağı aç
+            current = CGROUP_ROOT
+            _enable_controllers(current)
+            for part in parent.strip('/').split('/'):
+                current = os.path.join(current, part)
+                _enable_controllers(current)
+            if os.access(os.path.join(candidate, 'cgroup.procs'), os.W_OK):
+                path = candidate
+        except OSError as e:
+            print(f"[CGROUP] cgroup v2 not usable under {candidate}: {e}")
+    if not path:
+        print(f"[CGROUP] cgroup v2 not available or not delegated; starting without resource limits")
+    _parent_state[parent] = path
+    return path
+
+
+def project_cgroup_path(parent, project_name):
+    return os.path.join(CGROUP_ROOT, parent.strip('/'), cgroup_name(project_name))
+
+
+def cgroup_limits(project):
+    """Projenin cgroup ayarları (start_options için); cgroup'lar kapalıysa None"""
+    from flask import current_app
+    if not current_app.config.get('CGROUPS_ENABLED'):
+        return None
+    return {
+        'parent': current_app.config.get('CGROUP_PARENT', 'vdspanel'),
+        'cpu_limit': project.cpu_limit,
+        'memory_max_mb': project.memory_max_mb,
+        'memory_high_mb': project.memory_high_mb,
+        'io_weight': project.io_weight,
+    }
+
+
+def project_usage(project):
+    """Projenin cgroup kullanım sayaçları (read_usage), cgroup yoksa None"""
+    limits = cgroup_limits(project)
+    if not limits:
+        return None
+    return read_usage(project_cgroup_path(limits['parent'], project.name))
+
+
+def limit_values(limits):
+    """Proje ayarlarını cgroup dosya değerlerine çevir ({dosya: değer})"""
+    cpu = limits.get('cpu_limit')
+    memory_max = limits.get('memory_max_mb')
+    memory_high = limits.get('memory_high_mb')
+    io_weight = limits.get('io_weight')
+    return {
+        'cpu.max': f"{int(cpu * CPU_PERIOD_USEC)} {CPU_PERIOD_USEC}" if cpu else f"max {CPU_PERIOD_USEC}",
+        'memory.max': str(memory_max * 1024 * 1024) if memory_max else 'max',
+        'memory.high': str(memory_high * 1024 * 1024) if memory_high else 'max',
+        'io.weight': f"default {io_weight}" if io_weight else 'default 100',
+    }
+
+
+def apply_limits(cgroup_path, limits):
+    """Sınırları cgroup'a yaz (çalışan süreçler için de anında geçerli olur)"""
+    for filename, value in limit_values(limits).items():
+        path = os.path.join(cgroup_path, filename)
+        if not os.path.exists(path):
+            # Controller bu seviyede etkin değil
+            continue
+        try:
+            _write(path, value)
+        except OSError as e:
+            print(f"[CGROUP] Could not set {filename}={value} for {cgroup_path}: {e}")
+
+
+def prepare_project_cgroup(project_name, limits):
+    """
+    Projenin cgroup'unu oluştur ve sınırları uygula
+
+    Args:
+        limits: {'parent', 'cpu_limit', 'memory_max_mb', 'memory_high_mb', 'io_weight'}
+
+    Returns:
+        str: cgroup yolu, kullanılamıyorsa None
+    """
+    if not limits or not prepare_parent(limits['parent']):
+        return None
+    path = project_cgroup_path(limits['parent'], project_name)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        print(f"[CGROUP] Could not create {path}: {e}")
+        return None
+    apply_limits(path, limits)
+    return path
+
+
+def wrap_command(args, cgroup_path):
+    """
+    Komutu, exec'den önce kendini cgroup'a taşıyan bir sh ile sarmala
+
+    Taşıma başarısız olursa komut yine de cgroup'suz çalışır.
+    """
+    if not cgroup_path:
+        return args
+    script = 'echo $$ > "$0/cgroup.procs" 2>/dev/null; exec "$@"'
+    return ['/bin/sh', '-c', script, cgroup_path] + list(args)
+
+
+def _read_keyed(path):
+    values = {}
+    try:
+        for line in _read(path).splitlines():
+            key, _, value = line.partition(' ')
+            values[key] = value
+    except OSError:
+        pass
+    return values
+
+
+def read_usage(cgroup_path):
+    """
+    cgroup'un kendi kullanım sayaçları
+
+    Returns:
+        dict: {'cpu_usec', 'memory_current', 'memory_peak', 'io_read_bytes',
+               'io_write_bytes', 'processes'} veya cgroup yoksa None
+    """
+    if not cgroup_path or not os.path.isdir(cgroup_path):
+        return None
+    usage = {'cpu_usec': None, 'memory_current': None, 'memory_peak': None,
+             'io_read_bytes': 0, 'io_write_bytes': 0, 'processes': 0}
+    cpu_stat = _read_keyed(os.path.join(cgroup_path, 'cpu.stat'))
+    if 'usage_usec' in cpu_stat:
+        usage['cpu_usec'] = int(cpu_stat['usage_usec'])
+    for key, filename in (('memory_current', 'memory.current'), ('memory_peak', 'memory.peak')):
+        try:
+            usage[key] = int(_read(os.path.join(cgroup_path, filename)))
+        except (OSError, ValueError):
+            pass
+    try:
+        # io.stat: "<maj:min> rbytes=.. wbytes=.. rios=.. ..." (aygıt başına bir satır)
+        for line in _read(os.path.join(cgroup_path, 'io.stat')).splitlines():
+            fields = dict(item.split('=', 1) for item in line.split()[1:] if '=' in item)
+            usage['io_read_bytes'] += int(fields.get('rbytes', 0))
+            usage['io_write_bytes'] += int(fields.get('wbytes', 0))
+    except (OSError, ValueError):
+        pass
+    try:
+        usage['processes'] = len(_read(os.path.join(cgroup_path, 'cgroup.procs')).split())
+    except OSError:
+        pass
+    return usage
+
+
+def apply_project_limits(project):
+    """Düzenlenen sınırları çalışan projenin cgroup'una uygula (restart gerekmez)"""
+    limits = cgroup_limits(project)
+    if not limits:
+        return False
+    path = project_cgroup_path(limits['parent'], project.name)
+    if not os.path.isdir(path):
+        return False
+    apply_limits(path, limits)
+    return True
+
+
+def remove_project_cgroup(project, instance=None):
+    """Boş proje (veya instance) cgroup'unu sil (içinde süreç varsa dokunulmaz)"""
+    from app.utils.system import instance_name
+    limits = cgroup_limits(project)
+    if not limits:
+        return
+    try:
+        os.rmdir(project_cgroup_path(limits['parent'], instance_name(project.name, instance)))
+    except OSError:
+        pass
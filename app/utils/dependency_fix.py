@@ -4,6 +4,7 @@ Auto-fix missing dependencies from import errors
 import re
 import subprocess
 import os
+from app.utils.wheelhouse import pip_install
 
 # Common package name mappings (import name -> pip package name)
 PACKAGE_MAPPINGS = {
@@ -102,13 +103,7 @@ def install_requirements_if_present(venv_pip, project_path):
         return True, "requirements.txt not present"
 
     try:
-        result = subprocess.run(
-            [venv_pip, 'install', '-r', 'requirements.txt'],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
+        result = pip_install(venv_pip, requirements='requirements.txt', cwd=project_path)
         if result.returncode == 0:
             return True, "requirements.txt installed"
         return False, result.stderr or result.stdout or "pip install -r requirements.txt failed"
@@ -154,12 +149,7 @@ def install_missing_packages(venv_path, missing_modules):
         print(f"[DEPENDENCY-FIX] Installing {package_name} (for module '{module}')...")
         
         try:
-            result = subprocess.run(
-                [venv_pip, 'install', package_name],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
+            result = pip_install(venv_pip, [package_name], timeout=120)
             
             if result.returncode == 0:
                 # Verify installation
@@ -203,18 +193,19 @@ def auto_fix_dependencies(project_path, error_log_path):
     """
     print(f"[DEPENDENCY-FIX] === Starting dependency auto-fix ===")
     
-    # Read error log
+    from app.utils.log_manager import read_log
+    
+    # Read error log (tail only; the previous run's log is used if this run shows nothing)
     if not os.path.exists(error_log_path):
         return False, "Error log not found", []
     
-    try:
-        with open(error_log_path, 'r') as f:
-            log_content = f.read()
-    except Exception as e:
-        return False, f"Could not read error log: {e}", []
-    
-    # Extract missing modules
+    log_content = read_log(error_log_path)
     missing_modules = extract_missing_modules(log_content)
+    if not missing_modules:
+        previous_content = read_log(error_log_path, previous=True)
+        missing_modules = extract_missing_modules(previous_content)
+        if missing_modules:
+            log_content = previous_content
     
     if not missing_modules:
         return False, "No missing modules detected in error log", []
@@ -7,9 +7,19 @@ import os
 import hashlib
 import json
 import base64
+import io
+import tarfile
+import tempfile
+import time
 from datetime import datetime
+from stat import S_IMODE
+from flask import current_app
+from sqlalchemy import select, insert, update, delete, bindparam
 from app import db
-from app.models import Project, FileManifest, AppState, DeploymentLog
+from app.models import Project, FileManifest, FileChunkSignature, AppState, DeploymentLog
+from file_hasher import hash_file, hash_files
+from file_chunker import DELTA_MIN_SIZE, chunk_file, apply_delta
+from file_compressor import DecompressingReader, decompress_bytes
 
 
 # Yoksayılacak dosya/dizin kalıpları
@@ -27,14 +37,14 @@ IGNORE_PATTERNS = {
 }
 
 
-def should_ignore(path, name):
+def should_ignore(path, name, patterns=IGNORE_PATTERNS):
     """Dosya/dizinin yoksayılıp yoksayılmayacağını kontrol et"""
     # Exact matches
-    if name in IGNORE_PATTERNS:
+    if name in patterns:
         return True
     
     # Pattern matches
-    for pattern in IGNORE_PATTERNS:
+    for pattern in patterns:
         if pattern.startswith('*') and name.endswith(pattern[1:]):
             return True
     
@@ -43,34 +53,59 @@ def should_ignore(path, name):
 
 def calculate_file_hash(file_path):
     """Dosyanın SHA256 hash'ini hesapla"""
-    sha256_hash = hashlib.sha256()
-    try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception:
-        return None
+    return hash_file(file_path)
+
+
+# Stream deployment arşivinin ilk üyesi (dosya listesi, hash'ler, silinecekler)
+STREAM_METADATA_NAME = '.vdspanel-deploy.json'
+STREAM_METADATA_MAX_SIZE = 64 * 1024 * 1024
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+# Manifest'ten silinen kayıtlar bu boyutta gruplarla silinir (SQLite parametre limiti)
+MANIFEST_DELETE_BATCH = 500
 
 
-def scan_project_files(project_path):
+# mtime çözünürlüğü nedeniyle hash'lendiği anda yeni değişmiş dosyalara güvenilmez
+# (hash'ten hemen sonra aynı mtime tick'i içinde yazılan içerik stat ile görülemez);
+# bu dosyalar cache'e mtime_ns/inode olmadan yazılır ve sonraki taramada yeniden hash'lenir
+HASH_CACHE_RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+def scan_project_files(project_path, cache=None, stats=None, workers=None, skip_dirs=(), ignore=IGNORE_PATTERNS):
     """
     Proje dizinindeki tüm dosyaları tarar ve hash'lerini hesaplar
     
+    Args:
+        project_path: Proje kök dizini
+        cache: Önceki tarama bilgisi {relative_path: {'hash', 'size', 'mtime_ns', 'inode'}}
+               (path, size, mtime_ns, inode) aynıysa dosya yeniden hash'lenmez
+        stats: Verilirse {'hits': int, 'misses': int} sayaçları güncellenir
+        workers: Paralel hash thread sayısı (None ise file_hasher varsayılanı)
+        skip_dirs: ignore'a ek olarak atlanacak dizin adları (örn. '.next')
+        ignore: Yoksayılacak dosya/dizin adları ve *.uzantı kalıpları
+    
     Returns:
-        dict: {relative_path: {'hash': str, 'size': int, 'mtime': float}}
+        dict: {relative_path: {'hash': str, 'size': int, 'mtime': float, 'mtime_ns': int, 'inode': int}}
+              (tarama sırasında değişmekte olan dosyalarda mtime_ns/inode None)
     """
     files = {}
+    cache = cache or {}
+    if stats is not None:
+        stats.setdefault('hits', 0)
+        stats.setdefault('misses', 0)
     
     if not os.path.exists(project_path):
         return files
     
+    scan_started_ns = time.time_ns()
+    to_hash = {}  # full_path -> (relative_path, stat)
+    
     for root, dirs, filenames in os.walk(project_path):
         # Filter out ignored directories
-        dirs[:] = [d for d in dirs if not should_ignore(root, d)]
+        dirs[:] = [d for d in dirs if not should_ignore(root, d, ignore) and d not in skip_dirs]
         
         for filename in filenames:
-            if should_ignore(root, filename):
+            if should_ignore(root, filename, ignore):
                 continue
             
             full_path = os.path.join(root, filename)
@@ -78,20 +113,45 @@ def scan_project_files(project_path):
             
             try:
                 stat = os.stat(full_path)
-                file_hash = calculate_file_hash(full_path)
-                
-                if file_hash:
-                    files[relative_path] = {
-                        'hash': file_hash,
-                        'size': stat.st_size,
-                        'mtime': stat.st_mtime
-                    }
             except (OSError, IOError):
                 continue
+            
+            cached = cache.get(relative_path)
+            if (cached
+                    and cached.get('hash')
+                    and cached.get('size') == stat.st_size
+                    and cached.get('mtime_ns') == stat.st_mtime_ns
+                    and cached.get('inode') == stat.st_ino):
+                files[relative_path] = _file_entry(cached['hash'], stat)
+                if stats is not None:
+                    stats['hits'] += 1
+            else:
+                to_hash[full_path] = (relative_path, stat)
+    
+    # Cache'te olmayan dosyaları paralel hash'le
+    if stats is not None:
+        stats['misses'] += len(to_hash)
+    hashes = hash_files(to_hash.keys(), workers=workers)
+    for full_path, (relative_path, stat) in to_hash.items():
+        file_hash = hashes.get(full_path)
+        if file_hash:
+            racy = scan_started_ns - stat.st_mtime_ns <= HASH_CACHE_RACY_WINDOW_NS
+            files[relative_path] = _file_entry(file_hash, stat, trusted=not racy)
     
     return files
 
 
+def _file_entry(file_hash, stat, trusted=True):
+    """Tarama kaydı; trusted değilse stat anahtarı yazılmaz ve kayıt cache'te eşleşmez"""
+    return {
+        'hash': file_hash,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'mtime_ns': stat.st_mtime_ns if trusted else None,
+        'inode': stat.st_ino if trusted else None
+    }
+
+
 def get_project_manifest(project_id):
     """
     Veritabanından projenin mevcut manifest'ini getir
@@ -103,29 +163,106 @@ def get_project_manifest(project_id):
     return {m.file_path: m.file_hash for m in manifests}
 
 
+def get_project_hash_cache(project_id):
+    """
+    Manifest kayıtlarından hash cache'ini oluştur
+    
+    Returns:
+        dict: {relative_path: {'hash': str, 'size': int, 'mtime_ns': int, 'inode': int}}
+    """
+    manifests = FileManifest.query.filter_by(project_id=project_id).all()
+    return {
+        m.file_path: {
+            'hash': m.file_hash,
+            'size': m.file_size,
+            'mtime_ns': m.mtime_ns,
+            'inode': m.inode
+        }
+        for m in manifests
+        if m.mtime_ns is not None and m.inode is not None
+    }
+
+
 def update_project_manifest(project_id, files_dict):
     """
     Projenin manifest'ini güncelle
     
+    Mevcut kayıtlarla karşılaştırılır; sadece yeni dosyalar eklenir, değişenler
+    güncellenir ve silinenler kaldırılır. Tüm yazma işlemleri tek transaction'da
+    executemany ile toplu yapılır (ORM nesnesi oluşturulmaz).
+    
     Args:
         project_id: Proje ID'si
-        files_dict: {relative_path: {'hash': str, 'size': int}}
+        files_dict: {relative_path: {'hash': str, 'size': int, 'mtime_ns': int, 'inode': int}}
+    
+    Returns:
+        dict: {'inserted': int, 'updated': int, 'deleted': int, 'unchanged': int}
     """
-    # Mevcut manifest kayıtlarını sil
-    FileManifest.query.filter_by(project_id=project_id).delete()
+    table = FileManifest.__table__
+    now = datetime.utcnow()
+    
+    existing = {
+        row.file_path: row
+        for row in db.session.execute(
+            select(table.c.id, table.c.file_path, table.c.file_hash, table.c.file_size,
+                   table.c.mtime_ns, table.c.inode, table.c.last_modified)
+            .where(table.c.project_id == project_id)
+        )
+    }
     
-    # Yeni kayıtları ekle
+    inserts = []
+    updates = []
+    unchanged = 0
     for file_path, info in files_dict.items():
-        manifest = FileManifest(
-            project_id=project_id,
-            file_path=file_path,
-            file_hash=info['hash'],
-            file_size=info.get('size', 0),
-            last_modified=datetime.utcnow()
+        values = (info['hash'], info.get('size', 0), info.get('mtime_ns'), info.get('inode'))
+        row = existing.pop(file_path, None)
+        
+        if row is None:
+            inserts.append({
+                'project_id': project_id,
+                'file_path': file_path,
+                'file_hash': values[0],
+                'file_size': values[1],
+                'mtime_ns': values[2],
+                'inode': values[3],
+                'last_modified': now
+            })
+        elif (row.file_hash, row.file_size, row.mtime_ns, row.inode) != values:
+            updates.append({
+                'row_id': row.id,
+                'file_hash': values[0],
+                'file_size': values[1],
+                'mtime_ns': values[2],
+                'inode': values[3],
+                # Sadece içerik değiştiğinde güncellenir
+                'last_modified': now if row.file_hash != values[0] else row.last_modified
+            })
+        else:
+            unchanged += 1
+    
+    # Dict'te kalanlar diskte artık yok
+    deleted_ids = [row.id for row in existing.values()]
+    
+    if inserts:
+        db.session.execute(insert(table), inserts)
+    if updates:
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('row_id')).values(
+                file_hash=bindparam('file_hash'), file_size=bindparam('file_size'),
+                mtime_ns=bindparam('mtime_ns'), inode=bindparam('inode'),
+                last_modified=bindparam('last_modified')),
+            updates
         )
-        db.session.add(manifest)
+    for i in range(0, len(deleted_ids), MANIFEST_DELETE_BATCH):
+        db.session.execute(delete(table).where(table.c.id.in_(deleted_ids[i:i + MANIFEST_DELETE_BATCH])))
     
     db.session.commit()
+    return {
+        'inserted': len(inserts),
+        'updated': len(updates),
+        'deleted': len(deleted_ids),
+        'unchanged': unchanged
+    }
 
 
 def compare_manifests(local_files, remote_manifest):
@@ -210,6 +347,9 @@ def apply_deployment_package(project_path, package, deleted_files=None):
     Args:
         project_path: Hedef proje dizini
         package: {path: {'content': base64_string, 'size': int, 'hash': str}}
+                 Delta gönderilen dosyalarda ayrıca 'delta': {'base_hash': str, 'ops': [...]}
+                 bulunur ve content sadece literal parçaları içerir.
+                 'encoding' ('gzip'/'zstd') varsa content sıkıştırılmıştır.
         deleted_files: Silinecek dosya yolları listesi
     
     Returns:
@@ -223,24 +363,7 @@ def apply_deployment_package(project_path, package, deleted_files=None):
     }
     
     # Dosyaları sil
-    if deleted_files:
-        for file_path in deleted_files:
-            full_path = os.path.join(project_path, file_path)
-            try:
-                if os.path.exists(full_path):
-                    os.remove(full_path)
-                    result['deleted'] += 1
-                    
-                    # Boş dizinleri temizle
-                    dir_path = os.path.dirname(full_path)
-                    while dir_path != project_path:
-                        if os.path.isdir(dir_path) and not os.listdir(dir_path):
-                            os.rmdir(dir_path)
-                            dir_path = os.path.dirname(dir_path)
-                        else:
-                            break
-            except Exception as e:
-                result['errors'].append(f"Delete error {file_path}: {str(e)}")
+    delete_deployed_files(project_path, deleted_files, result)
     
     # Dosyaları yaz
     for file_path, file_info in package.items():
@@ -254,6 +377,15 @@ def apply_deployment_package(project_path, package, deleted_files=None):
             
             # Dosyayı yaz
             content = base64.b64decode(file_info['content'])
+            if file_info.get('encoding'):
+                content = decompress_bytes(content, file_info['encoding'], limit=file_info.get('size'))
+            
+            if file_info.get('delta'):
+                # Delta: content sadece literal parçaları içerir, dosya mevcut sürümden yeniden oluşturulur
+                if not write_delta_file(full_path, file_path, file_info, io.BytesIO(content).read, result):
+                    continue
+                result['applied'] += 1
+                continue
             
             # Hash doğrulaması
             if hashlib.sha256(content).hexdigest() != file_info['hash']:
@@ -273,12 +405,365 @@ def apply_deployment_package(project_path, package, deleted_files=None):
     return result
 
 
+def delete_deployed_files(project_path, deleted_files, result):
+    """
+    Deployment sırasında silinen dosyaları kaldır ve boş dizinleri temizle
+    
+    Args:
+        project_path: Hedef proje dizini
+        deleted_files: Silinecek dosya yolları listesi
+        result: 'deleted' ve 'errors' alanları güncellenecek sonuç dict'i
+    """
+    if not deleted_files:
+        return
+    
+    root = os.path.abspath(project_path)
+    for file_path in deleted_files:
+        full_path = resolve_deploy_path(project_path, file_path)
+        if not full_path:
+            result['errors'].append(f"Invalid path {file_path}")
+            continue
+        try:
+            if os.path.exists(full_path):
+                os.remove(full_path)
+                result['deleted'] += 1
+                
+                # Boş dizinleri temizle
+                dir_path = os.path.dirname(full_path)
+                while dir_path.startswith(root + os.sep):
+                    if os.path.isdir(dir_path) and not os.listdir(dir_path):
+                        os.rmdir(dir_path)
+                        dir_path = os.path.dirname(dir_path)
+                    else:
+                        break
+        except Exception as e:
+            result['errors'].append(f"Delete error {file_path}: {str(e)}")
+
+
+def open_deploy_tmp(full_path):
+    """
+    Hedefin dizininde benzersiz geçici dosya aç (aynı projeye eşzamanlı
+    deploy'lar aynı geçici dosyayı paylaşmaz)
+    
+    Returns:
+        tuple: (yazılabilir dosya nesnesi, geçici dosya yolu)
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(full_path)}.", suffix='.vdspanel-tmp',
+                                    dir=os.path.dirname(full_path))
+    return os.fdopen(fd, 'wb'), tmp_path
+
+
+def replace_deployed_file(tmp_path, full_path, mode=None):
+    """
+    Doğrulanmış geçici dosyayı hedefin yerine koy
+    
+    Hedef varsa izinleri (ör. start.sh'nin +x biti) korunur, yoksa mode
+    (tar üyesinin izinleri) kullanılır; mkstemp dosyayı 0600 oluşturur.
+    """
+    try:
+        mode = S_IMODE(os.stat(full_path).st_mode)
+    except FileNotFoundError:
+        pass
+    os.chmod(tmp_path, mode if mode is not None else 0o644)
+    os.replace(tmp_path, full_path)
+
+
+def _remove_tmp(tmp_path):
+    if tmp_path and os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def write_delta_file(full_path, file_path, file_info, read_literal, result):
+    """
+    Delta op'larından dosyayı mevcut sürüm üzerine yeniden oluştur
+    
+    Mevcut dosyadan referans verilen parçalar kopyalanır, literal parçalar
+    read_literal ile okunur. Sonuç geçici dosyaya yazılır, hash doğrulanırsa
+    os.replace ile yerine konur.
+    
+    Mevcut dosya delta'nın hesaplandığı sürüm (base_hash) değilse op'lar
+    uygulanmaz ve dosya result['base_mismatch']'e eklenir. Tabanlar deploy
+    başında find_stale_delta_bases ile doğrulanır; bu kontrol sadece
+    arada değişen dosyaları yakalar.
+    
+    Returns:
+        bool: Başarılı ise True (hata result['errors']'a yazılır)
+    """
+    base_hash = file_info['delta'].get('base_hash')
+    if not os.path.isfile(full_path) or (base_hash and hash_file(full_path) != base_hash):
+        reason = 'mismatch' if os.path.isfile(full_path) else 'missing'
+        result['errors'].append(f"Delta base {reason} for {file_path}")
+        result.setdefault('base_mismatch', []).append(file_path)
+        result['success'] = False
+        return False
+    
+    tmp_path = None
+    try:
+        out_file, tmp_path = open_deploy_tmp(full_path)
+        with open(full_path, 'rb') as base_file, out_file:
+            file_hash, size = apply_delta(base_file, file_info['delta']['ops'], read_literal, out_file)
+        
+        if file_hash != file_info['hash'] or size != file_info.get('size', size):
+            os.remove(tmp_path)
+            result['errors'].append(f"Hash mismatch for {file_path} (delta)")
+            result['success'] = False
+            return False
+        
+        replace_deployed_file(tmp_path, full_path)
+        return True
+    except Exception as e:
+        _remove_tmp(tmp_path)
+        result['errors'].append(f"Delta error {file_path}: {str(e)}")
+        result['success'] = False
+        return False
+
+
+def get_chunk_signatures(project, paths):
+    """
+    Delta deployment için dosyaların parça imzalarını getir (gerekirse hesapla)
+    
+    İmzalar FileChunkSignature tablosunda dosya hash'i ile saklanır; manifest'teki
+    hash değişmediyse yeniden hesaplanmaz. DELTA_MIN_SIZE altındaki dosyalar atlanır.
+    
+    Args:
+        project: Project nesnesi
+        paths: İmzası istenen relative path listesi
+    
+    Returns:
+        dict: {path: {'hash': str, 'size': int, 'chunks': [[offset, length, sha256], ...]}}
+    """
+    manifest = {
+        m.file_path: m
+        for m in FileManifest.query.filter_by(project_id=project.id).all()
+    }
+    stored = {
+        sig.file_path: sig
+        for sig in FileChunkSignature.query.filter_by(project_id=project.id).all()
+    }
+    
+    signatures = {}
+    for path in paths:
+        entry = manifest.get(path)
+        if not entry or (entry.file_size or 0) < DELTA_MIN_SIZE:
+            continue
+        
+        sig = stored.get(path)
+        if sig and sig.file_hash == entry.file_hash:
+            signatures[path] = {'hash': sig.file_hash, 'size': sig.file_size, 'chunks': json.loads(sig.chunks)}
+            continue
+        
+        full_path = resolve_deploy_path(project.path, path)
+        computed = chunk_file(full_path) if full_path else None
+        if not computed or computed['hash'] != entry.file_hash:
+            # Dosya manifest'ten sonra değişmiş; delta için güvenilmez
+            continue
+        
+        if not sig:
+            sig = FileChunkSignature(project_id=project.id, file_path=path)
+            db.session.add(sig)
+        sig.file_hash = computed['hash']
+        sig.file_size = computed['size']
+        sig.chunks = json.dumps(computed['chunks'])
+        signatures[path] = computed
+    
+    db.session.commit()
+    return signatures
+
+
+def prune_chunk_signatures(project_id, files_dict):
+    """Silinen veya değişen dosyaların parça imzalarını temizle"""
+    for sig in FileChunkSignature.query.filter_by(project_id=project_id).all():
+        info = files_dict.get(sig.file_path)
+        if not info or info['hash'] != sig.file_hash:
+            db.session.delete(sig)
+    db.session.commit()
+
+
+def find_stale_delta_bases(project_path, files):
+    """
+    Delta tabanı server'daki dosyayla eşleşmeyen yollar
+    
+    Deploy uygulanmadan (proje durdurulmadan, backup alınmadan) önce
+    kontrol edilir; eşleşmeyen dosya varsa deploy bütünüyle reddedilir ve
+    client bu dosyaları tam içerikle yeniden gönderir.
+    
+    Args:
+        files: {path: file_info} (paket veya stream metadata'sındaki 'files')
+    
+    Returns:
+        list: Tabanı eksik veya farklı olan dosya yolları
+    """
+    stale = []
+    for file_path, file_info in files.items():
+        delta = file_info.get('delta')
+        if not delta:
+            continue
+        full_path = resolve_deploy_path(project_path, file_path)
+        if not full_path or not os.path.isfile(full_path):
+            stale.append(file_path)
+        elif delta.get('base_hash') and hash_file(full_path) != delta['base_hash']:
+            stale.append(file_path)
+    return stale
+
+
+def stale_delta_result(stale):
+    """Delta tabanları eşleşmediği için uygulanmayan deploy'un sonucu"""
+    return {
+        'success': False,
+        'rejected': True,
+        'applied': 0,
+        'deleted': 0,
+        'total_size': 0,
+        'errors': [f"Delta base changed for {file_path}" for file_path in stale],
+        'base_mismatch': stale
+    }
+
+
+def resolve_deploy_path(project_path, relative_path):
+    """
+    Deploy edilen dosya yolunu proje dizini içinde çöz
+    
+    Returns:
+        str: Tam yol, proje dizini dışına çıkıyorsa None
+    """
+    if not relative_path or os.path.isabs(relative_path):
+        return None
+    root = os.path.abspath(project_path)
+    full_path = os.path.normpath(os.path.join(root, relative_path))
+    if not full_path.startswith(root + os.sep):
+        return None
+    return full_path
+
+
+def read_stream_metadata(tar):
+    """
+    Stream deployment arşivinin ilk üyesinden metadata'yı oku
+    
+    Returns:
+        dict: {'files': {path: {'hash': str, 'size': int}}, 'deleted_files': [...], ...}
+    """
+    member = tar.next()
+    if member is None or member.name != STREAM_METADATA_NAME:
+        raise ValueError(f"Stream must start with {STREAM_METADATA_NAME}")
+    if member.size > STREAM_METADATA_MAX_SIZE:
+        raise ValueError("Stream metadata too large")
+    return json.loads(tar.extractfile(member).read().decode('utf-8'))
+
+
+def open_stream_member(tar, member, file_info):
+    """
+    Stream üyesinin içeriğini okumak için dosya nesnesi
+    
+    file_info'da 'encoding' varsa üye sıkıştırılmıştır ve okunurken açılır;
+    açılan veri beklenen dosya boyutunu aşamaz.
+    """
+    source = tar.extractfile(member)
+    encoding = file_info.get('encoding')
+    if encoding:
+        return DecompressingReader(source, encoding, limit=file_info.get('size'))
+    return source
+
+
+def apply_deployment_stream(project_path, tar, metadata):
+    """
+    Tar stream'indeki dosyaları geldikçe diske yaz
+    
+    Her dosya hedef dizinde geçici bir dosyaya yazılır, yazılırken hash'lenir
+    ve hash/boyut metadata ile eşleşirse mevcut dosyanın izinleriyle
+    os.replace ile yerine konur.
+    Sıkıştırılmış üyeler ('encoding') yazılırken açılır. Paket belleğe alınmaz.
+    
+    Args:
+        project_path: Hedef proje dizini
+        tar: tarfile.open(mode='r|*') ile açılmış, metadata üyesi okunmuş arşiv
+        metadata: read_stream_metadata() sonucu
+    
+    Returns:
+        dict: {'success': bool, 'applied': int, 'deleted': int, 'errors': [], 'total_size': int}
+    """
+    result = {
+        'success': True,
+        'applied': 0,
+        'deleted': 0,
+        'errors': [],
+        'total_size': 0
+    }
+    expected = metadata.get('files', {})
+    seen = set()
+    
+    delete_deployed_files(project_path, metadata.get('deleted_files'), result)
+    
+    for member in tar:
+        # Iterasyon daha önce okunan metadata üyesini de döndürür
+        if not member.isfile() or member.name == STREAM_METADATA_NAME:
+            continue
+        
+        file_path = member.name
+        file_info = expected.get(file_path)
+        full_path = resolve_deploy_path(project_path, file_path)
+        seen.add(file_path)
+        
+        if not file_info or not full_path:
+            result['errors'].append(f"Unexpected file in stream: {file_path}")
+            result['success'] = False
+            continue
+        
+        try:
+            source = open_stream_member(tar, member, file_info)
+        except ValueError as e:
+            result['errors'].append(f"{file_path}: {e}")
+            result['success'] = False
+            continue
+        
+        if file_info.get('delta'):
+            if write_delta_file(full_path, file_path, file_info, source.read, result):
+                result['applied'] += 1
+                result['total_size'] += file_info.get('size', 0)
+            continue
+        
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            
+            sha256_hash = hashlib.sha256()
+            size = 0
+            f, tmp_path = open_deploy_tmp(full_path)
+            with f:
+                for block in iter(lambda: source.read(STREAM_BLOCK_SIZE), b""):
+                    sha256_hash.update(block)
+                    f.write(block)
+                    size += len(block)
+            
+            # Hash doğrulaması
+            if sha256_hash.hexdigest() != file_info['hash'] or size != file_info.get('size', size):
+                os.remove(tmp_path)
+                result['errors'].append(f"Hash mismatch for {file_path}")
+                result['success'] = False
+                continue
+            
+            replace_deployed_file(tmp_path, full_path, S_IMODE(member.mode))
+            result['applied'] += 1
+            result['total_size'] += size
+            
+        except Exception as e:
+            _remove_tmp(tmp_path)
+            result['errors'].append(f"Write error {file_path}: {str(e)}")
+            result['success'] = False
+    
+    for file_path in set(expected) - seen:
+        result['errors'].append(f"Missing from stream: {file_path}")
+        result['success'] = False
+    
+    return result
+
+
 class DeploymentManager:
     """Ana deployment yönetici sınıfı"""
     
     def __init__(self, project_id=None):
         self.project_id = project_id
         self.project = None
+        self.last_scan_stats = {'hits': 0, 'misses': 0}
         if project_id:
             self.project = Project.query.get(project_id)
     
@@ -293,11 +778,26 @@ class DeploymentManager:
         if not self.project:
             return {}
         
-        files = scan_project_files(self.project.path)
+        stats = {'hits': 0, 'misses': 0}
+        files = scan_project_files(
+            self.project.path,
+            cache=get_project_hash_cache(self.project_id),
+            stats=stats,
+            workers=current_app.config.get('HASH_WORKERS')
+        )
+        self.last_scan_stats = stats
+        print(f"[DEPLOY] Hash cache for {self.project.name}: {stats['hits']} hits, {stats['misses']} misses")
         update_project_manifest(self.project_id, files)
+        prune_chunk_signatures(self.project_id, files)
         return {path: info['hash'] for path, info in files.items()}
     
-    def receive_deployment(self, package, deleted_files=None, description=None):
+    def get_chunk_signatures(self, paths):
+        """Delta deployment için server'daki dosyaların parça imzalarını getir"""
+        if not self.project:
+            return {}
+        return get_chunk_signatures(self.project, paths)
+    
+    def receive_deployment(self, package, deleted_files=None, description=None, before_apply=None):
         """
         Deployment paketini al ve uygula
         
@@ -305,20 +805,22 @@ class DeploymentManager:
             package: Dosya paketi
             deleted_files: Silinecek dosyalar
             description: Deployment açıklaması
+            before_apply: Delta tabanları doğrulandıktan sonra, dosyalar
+                          yazılmadan önce çağrılır (ör. projeyi durdurmak için)
         
         Returns:
-            dict: Deployment sonucu
+            dict: Deployment sonucu ('rejected' ise hiçbir şey uygulanmadı)
         """
         if not self.project:
             return {'success': False, 'error': 'Project not found'}
         
-        # Deployment öncesi backup
-        from app.utils.version_manager import VersionManager
-        vm = VersionManager()
-        try:
-            vm.create_backup(self.project, description=f"Pre-deployment backup: {description or 'No description'}")
-        except Exception as e:
-            print(f"Backup failed: {e}")
+        stale = find_stale_delta_bases(self.project.path, package)
+        if stale:
+            return stale_delta_result(stale)
+        
+        if before_apply:
+            before_apply()
+        self._backup_before_deploy(description)
         
         # Paketi uygula
         result = apply_deployment_package(
@@ -327,6 +829,61 @@ class DeploymentManager:
             deleted_files
         )
         
+        self._finish_deployment(result, sum(f.get('size', 0) for f in package.values()), description)
+        return result
+    
+    def receive_deployment_stream(self, stream, before_apply=None):
+        """
+        Binary tar stream olarak gelen deployment'ı al ve uygula
+        
+        Arşivin ilk üyesi STREAM_METADATA_NAME olmalıdır:
+        {'files': {path: {'hash', 'size'}}, 'deleted_files': [...], 'description': str}
+        
+        Args:
+            stream: Okunabilir dosya benzeri nesne (request.stream)
+            before_apply: Delta tabanları doğrulandıktan sonra, dosyalar
+                          yazılmadan önce çağrılır (ör. projeyi durdurmak için)
+        
+        Returns:
+            dict: Deployment sonucu (metadata 'metadata' anahtarında,
+                  'rejected' ise hiçbir şey uygulanmadı)
+        """
+        if not self.project:
+            return {'success': False, 'error': 'Project not found'}
+        
+        with tarfile.open(fileobj=stream, mode='r|*') as tar:
+            metadata = read_stream_metadata(tar)
+            description = metadata.get('description')
+            
+            stale = find_stale_delta_bases(self.project.path, metadata.get('files', {}))
+            if stale:
+                # Gövdenin kalanı okunmadan yanıt verilirse client gönderirken bağlantı hatası alır
+                for _ in iter(lambda: stream.read(STREAM_BLOCK_SIZE), b""):
+                    pass
+                result = stale_delta_result(stale)
+                result['metadata'] = metadata
+                return result
+            
+            if before_apply:
+                before_apply()
+            self._backup_before_deploy(description)
+            result = apply_deployment_stream(self.project.path, tar, metadata)
+        
+        self._finish_deployment(result, result['total_size'], description)
+        result['metadata'] = metadata
+        return result
+    
+    def _backup_before_deploy(self, description):
+        """Deployment öncesi backup"""
+        from app.utils.version_manager import VersionManager
+        vm = VersionManager()
+        try:
+            vm.create_backup(self.project, description=f"Pre-deployment backup: {description or 'No description'}")
+        except Exception as e:
+            print(f"Backup failed: {e}")
+    
+    def _finish_deployment(self, result, total_size, description):
+        """Manifest'i güncelle ve deployment log'unu kaydet"""
         # Manifest'i güncelle
         if result['success'] or result['applied'] > 0:
             self.scan_server_files()
@@ -336,14 +893,12 @@ class DeploymentManager:
             project_id=self.project_id,
             files_changed=result['applied'],
             files_deleted=result.get('deleted', 0),
-            total_size=sum(f.get('size', 0) for f in package.values()),
+            total_size=total_size,
             description=description,
             status='success' if result['success'] else 'partial' if result['applied'] > 0 else 'failed'
         )
         db.session.add(log)
         db.session.commit()
-        
-        return result
     
     def get_deployment_history(self, limit=20):
         """Deployment geçmişini getir"""
@@ -394,61 +949,127 @@ def get_apps_to_restore():
     return [state.project for state in states if state.project]
 
 
-def restore_app_states():
+def restore_dependencies(project_ids):
+    """
+    Restore sırası için bağımlılıklar: host proje, SubRoute ile mount ettiği
+    projelerden sonra başlatılır
+
+    Returns:
+        dict: {project_id: {önce başlaması gereken project_id'ler}}
+    """
+    from app.models import SubRoute
+    project_ids = set(project_ids)
+    dependencies = {project_id: set() for project_id in project_ids}
+    for sub_route in SubRoute.query.filter(SubRoute.host_project_id.in_(project_ids)).all():
+        if sub_route.mounted_project_id in project_ids and sub_route.mounted_project_id != sub_route.host_project_id:
+            dependencies[sub_route.host_project_id].add(sub_route.mounted_project_id)
+    return dependencies
+
+
+def restore_app(project_id):
+    """Tek bir projeyi başlat (zaten çalışıyorsa dokunma); sonuç dict'i döner"""
+    from app.utils.system import generate_supervisor_config, start_options, check_process_status
+    from app.utils.reload_manager import record_launch
+    
+    project = db.session.get(Project, project_id)
+    started = time.monotonic()
+    try:
+        # Proje zaten çalışıyor mu kontrol et
+        if project.status == 'running' and project.pid and check_process_status(project.pid):
+            return {
+                'project': project.name,
+                'status': 'already_running',
+                'pid': project.pid
+            }
+        
+        # Projeyi başlat
+        env_vars = json.loads(project.env_vars) if project.env_vars else {}
+        pid = generate_supervisor_config(
+            project.name,
+            project.project_type,
+            project.path,
+            project.port,
+            env_vars=env_vars,
+            entry_point=project.entry_point,
+            **start_options(project)
+        )
+        
+        if pid:
+            project.pid = pid
+            project.status = 'running'
+            project.last_ready_seconds = None
+            record_launch(project)
+            db.session.commit()
+            return {
+                'project': project.name,
+                'status': 'started',
+                'pid': pid,
+                'ready_seconds': project.last_ready_seconds,
+                'elapsed': round(time.monotonic() - started, 2)
+            }
+        return {
+            'project': project.name,
+            'status': 'failed',
+            'error': 'Could not start process',
+            'elapsed': round(time.monotonic() - started, 2)
+        }
+    except Exception as e:
+        db.session.rollback()
+        return {
+            'project': project.name,
+            'status': 'error',
+            'error': str(e),
+            'elapsed': round(time.monotonic() - started, 2)
+        }
+
+
+def restore_app_states(concurrency=None):
     """
     Server restart sonrası uygulamaları eski durumlarına getir
-    should_run=True olan tüm projeleri başlat
+    should_run=True olan tüm projeleri en fazla `concurrency` tanesi aynı anda
+    olacak şekilde başlat. SubRoute ile mount edilen projeler host'larından önce
+    başlatılır (başlatılamasalar da host beklemez, sadece sıralama garanti edilir).
+    
+    Returns:
+        dict: {'results': [...], 'total_seconds': float, 'concurrency': int}
+              Her sonuçta 'ready_seconds' (hazır olma süresi) ve 'elapsed' bulunur.
     """
-    from app.utils.system import generate_supervisor_config
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
     
-    apps_to_restore = get_apps_to_restore()
+    if not concurrency:
+        concurrency = current_app.config.get('RESTORE_CONCURRENCY', 8)
+    # ThreadPoolExecutor en az bir worker ister
+    concurrency = max(1, concurrency)
+    app = current_app._get_current_object()
+    started = time.monotonic()
+    
+    dependencies = restore_dependencies(p.id for p in get_apps_to_restore())
+    remaining = set(dependencies)
+    done = set()
     results = []
     
-    for project in apps_to_restore:
-        try:
-            # Proje zaten çalışıyor mu kontrol et
-            if project.status == 'running' and project.pid:
-                from app.utils.system import check_process_status
-                if check_process_status(project.pid):
-                    results.append({
-                        'project': project.name,
-                        'status': 'already_running',
-                        'pid': project.pid
-                    })
-                    continue
-            
-            # Projeyi başlat
-            env_vars = json.loads(project.env_vars) if project.env_vars else {}
-            pid = generate_supervisor_config(
-                project.name,
-                project.project_type,
-                project.path,
-                project.port,
-                env_vars=env_vars,
-                entry_point=project.entry_point
-            )
-            
-            if pid:
-                project.pid = pid
-                project.status = 'running'
-                db.session.commit()
-                results.append({
-                    'project': project.name,
-                    'status': 'started',
-                    'pid': pid
-                })
-            else:
-                results.append({
-                    'project': project.name,
-                    'status': 'failed',
-                    'error': 'Could not start process'
-                })
-                
-        except Exception as e:
-            results.append({
-                'project': project.name,
-                'status': 'error',
-                'error': str(e)
-            })
+    def run(project_id):
+        # Her thread kendi app context'i ve veritabanı oturumu ile çalışır
+        with app.app_context():
+            return restore_app(project_id)
     
-    return results
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        running = {}
+        while remaining or running:
+            ready = sorted(pid for pid in remaining if dependencies[pid] <= done)
+            if not ready and not running:
+                # Döngüsel mount: kalanları sırasız başlat
+                ready = sorted(remaining)
+            for project_id in ready:
+                remaining.discard(project_id)
+                running[executor.submit(run, project_id)] = project_id
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done.add(running.pop(future))
+                results.append(future.result())
+    
+    return {
+        'results': results,
+        'total_seconds': round(time.monotonic() - started, 2),
+        'concurrency': concurrency
+    }
@@ -0,0 +1,255 @@
+"""
+Job Runner - uzun işlemleri (pip/npm kurulumu, build, auto-fix) HTTP isteği dışında çalıştırır
+
+- İşler Job tablosunda kalıcı bir kuyrukta tutulur (queued -> running -> succeeded/failed).
+- Panel süreçlerinden sadece dosya kilidini alan biri JOB_WORKERS thread'lik
+  havuzu çalıştırır (start_supervisor ile aynı düzen).
+- Aynı projenin işleri sırayla çalışır: projesinin çalışan bir işi varsa
+  sıradaki iş beklemeye devam eder, diğer projelerin işleri paralel ilerler.
+- İşlerin progress_callback mesajları Job.messages'a yazılır; arayüz
+  /api/jobs/<id> üzerinden ilerlemeyi izler.
+- Runner kapalıysa (JOB_RUNNER=0 veya test) iş, kuyruğa alındığı istekte çalıştırılır.
+"""
+
+import os
+import json
+import time
+import fcntl
+import importlib
+import threading
+import traceback
+from datetime import datetime
+from flask import current_app
+from app import db
+from app.models import Job, Project
+
+POLL_INTERVAL = 1.0
+
+# kind -> handler(ctx, project, **params) -> dict
+HANDLERS = {}
+
+# Aynı süreçte kuyruğa alınan işler runner'ı beklemeden uyandırır
+_wakeup = threading.Event()
+
+
+def _load_handlers():
+    # Proje işlerinin handler'ları (döngüsel import olmasın diye geç yüklenir)
+    importlib.import_module('app.utils.project_jobs')
+
+
+def job_handler(kind):
+    """İş türü için handler kaydet"""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+class JobContext:
+    """Handler'a verilen ilerleme bildirimi arayüzü"""
+
+    def __init__(self, job):
+        self.job = job
+        self.messages = json.loads(job.messages or '[]')
+
+    def progress(self, message, level='info', step=None):
+        print(f"[JOB {self.job.id}] {message}")
+        self.messages.append({'at': time.time(), 'step': step, 'message': message, 'level': level})
+        self.job.messages = json.dumps(self.messages)
+        db.session.commit()
+
+    def callback(self, step, message):
+        """Mevcut progress_callback(step, message) imzası ile uyumlu"""
+        self.progress(message, step=step)
+
+
+def runner_enabled(app):
+    return bool(app.config.get('JOB_RUNNER')) and not app.testing
+
+
+def enqueue(kind, project_id=None, **params):
+    """
+    İşi kuyruğa al
+
+    Returns:
+        Job: Kuyruğa alınan (runner kapalıysa tamamlanmış) iş
+    """
+    _load_handlers()
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    job = Job(kind=kind, project_id=project_id, params=json.dumps(params), messages='[]', status='queued')
+    db.session.add(job)
+    db.session.commit()
+    if runner_enabled(current_app):
+        _wakeup.set()
+    else:
+        execute(job)
+    return job
+
+
+def execute(job):
+    """İşi bu thread'de çalıştır ve sonucunu kaydet"""
+    if job.status != 'running':
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+    ctx = JobContext(job)
+    project = db.session.get(Project, job.project_id) if job.project_id else None
+    try:
+        result = HANDLERS[job.kind](ctx, project, **json.loads(job.params or '{}')) or {}
+        job.result = json.dumps(result)
+        job.status = 'succeeded' if result.get('success', True) else 'failed'
+        job.error = None if job.status == 'succeeded' else result.get('error')
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        job.status = 'failed'
+        job.error = str(e)
+        ctx.messages.append({'at': time.time(), 'step': None, 'message': f'Error: {e}', 'level': 'error'})
+        job.messages = json.dumps(ctx.messages)
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+def job_to_dict(job, after=0, messages=True):
+    """API için iş bilgisi; after verilirse sadece o sıradan sonraki mesajlar"""
+    entries = json.loads(job.messages or '[]')
+    data = {
+        'id': job.id,
+        'project_id': job.project_id,
+        'kind': job.kind,
+        'status': job.status,
+        'error': job.error,
+        'result': json.loads(job.result) if job.result else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'message_count': len(entries),
+        'done': job.status in ('succeeded', 'failed')
+    }
+    if messages:
+        data['messages'] = entries[after:]
+    return data
+
+
+def active_job(project_id):
+    """Projenin bekleyen veya çalışan son işi"""
+    return Job.query.filter(
+        Job.project_id == project_id,
+        Job.status.in_(('queued', 'running'))
+    ).order_by(Job.id.desc()).first()
+
+
+def unreported_job(project_id):
+    """Projenin sonucu henüz proje sayfasında gösterilmemiş son biten işi"""
+    job = Job.query.filter(
+        Job.project_id == project_id,
+        Job.status.in_(('succeeded', 'failed'))
+    ).order_by(Job.id.desc()).first()
+    return job if job and job.reported_at is None else None
+
+
+class JobRunner:
+    """Kuyruktaki işleri çalıştıran thread havuzu"""
+
+    def __init__(self, app, workers=None):
+        self.app = app
+        self.workers = workers or app.config.get('JOB_WORKERS', 2)
+        self._claim_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def recover(self):
+        """Panel yeniden başladığında yarım kalan işleri başarısız say"""
+        interrupted = Job.query.filter_by(status='running').all()
+        for job in interrupted:
+            job.status = 'failed'
+            job.error = 'Interrupted: the panel restarted while the job was running'
+            job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return len(interrupted)
+
+    def claim(self):
+        """
+        Sıradaki uygun işi 'running' yap
+
+        Returns:
+            int: İş ID'si, uygun iş yoksa None
+        """
+        with self._claim_lock:
+            busy = {
+                row.project_id for row in
+                Job.query.filter(Job.status == 'running', Job.project_id.isnot(None)).all()
+            }
+            for job in Job.query.filter_by(status='queued').order_by(Job.id).all():
+                if job.project_id is not None and job.project_id in busy:
+                    continue
+                claimed = Job.query.filter_by(id=job.id, status='queued').update(
+                    {'status': 'running', 'started_at': datetime.utcnow()}
+                )
+                db.session.commit()
+                if claimed:
+                    return job.id
+                busy.add(job.project_id)
+            return None
+
+    def run_once(self):
+        """Bir iş çalıştır; çalıştırılacak iş yoksa False"""
+        with self.app.app_context():
+            job_id = self.claim()
+            if job_id is None:
+                return False
+            execute(db.session.get(Job, job_id))
+            db.session.remove()
+            return True
+
+    def work(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                traceback.print_exc()
+            _wakeup.wait(POLL_INTERVAL)
+            _wakeup.clear()
+
+    def run(self):
+        with self.app.app_context():
+            recovered = self.recover()
+        print(f"[JOBS] Runner started in PID {os.getpid()} with {self.workers} workers"
+              + (f" ({recovered} interrupted jobs marked failed)" if recovered else ""))
+        threads = [
+            threading.Thread(target=self.work, name=f'job-worker-{n}', daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self):
+        self._stop.set()
+        _wakeup.set()
+
+
+def start_job_runner(app):
+    """
+    Runner'ı arka planda başlat
+
+    Kilit dosyası sayesinde birden fazla panel süreci olsa da tek bir runner aktif olur.
+    """
+    if not runner_enabled(app):
+        return None
+    _load_handlers()
+    lock_path = app.config['JOB_LOCK_FILE']
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+    def run():
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            JobRunner(app).run()
+
+    thread = threading.Thread(target=run, name='job-runner', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,234 @@
+"""
+Log Manager - proje loglarının sondan okunması ve rotasyonu
+
+- tail_file: dosyanın tamamını okumak yerine sondan geriye doğru blok blok
+  okur; çok GB'lık access log'larda da sadece istenen kadar byte okunur.
+- rotate_log: <log>, <log>.1, <log>.2.gz ... <log>.N.gz düzeninde döndürür.
+  <log>.1 bir önceki çalıştırmanın (veya bir önceki parçanın) sıkıştırılmamış
+  logudur; auto-fix onu doğrudan okuyabilir. Daha eskiler gzip'lenir.
+- Her başlatmada mevcut log silinmek yerine döndürülür (start_log), çalışan
+  projelerin logları da boyut/süre sınırını aşınca supervisor tarafından
+  döndürülür (rotate_running_logs).
+"""
+
+import os
+import gzip
+import time
+import shutil
+import signal
+import threading
+
+TAIL_BLOCK_SIZE = 8192
+DEFAULT_TAIL_BYTES = 10000
+
+# Yol başına kilit: rotasyon ve arka plandaki sıkıştırma aynı anda çalışmasın
+_locks = {}
+_locks_guard = threading.Lock()
+# Çalışan projelerde son rotasyon zamanı (süre bazlı rotasyon için)
+_last_rotation = {}
+
+
+def _lock(path):
+    with _locks_guard:
+        return _locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def _config(key, default):
+    from flask import current_app, has_app_context
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def log_file_paths(project, kind):
+    """Projenin 'out' veya 'err' logu için olası konumlar (öncelik sırasıyla)"""
+    filename = f"{project.name}.{kind}.log"
+    return [
+        os.path.join(project.path, filename),
+        os.path.join(project.path, project.name, filename),  # Nested structure
+        filename,  # Current directory (VDS Panel root)
+        f"/var/log/{filename}"  # Linux supervisor logs
+    ]
+
+
+def find_log(project, kind):
+    """İlk mevcut log dosyası, hiçbiri yoksa None"""
+    for path in log_file_paths(project, kind):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def tail_file(path, max_bytes=DEFAULT_TAIL_BYTES, lines=None, block_size=TAIL_BLOCK_SIZE):
+    """
+    Dosyanın sonunu oku (sondan geriye blok blok)
+
+    Args:
+        max_bytes: En fazla bu kadar byte
+        lines: Verilirse en fazla bu kadar satır
+
+    Returns:
+        str: Dosyanın sonu (UTF-8, bozuk byte'lar değiştirilir)
+
+    Raises:
+        FileNotFoundError: Dosya yoksa
+    """
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        chunks = []
+        size = 0
+        newlines = 0
+        while position > 0 and size < max_bytes:
+            if lines is not None and newlines > lines:
+                break
+            read_size = min(block_size, position, max_bytes - size)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size)
+            chunks.append(chunk)
+            size += len(chunk)
+            newlines += chunk.count(b'\n')
+
+    data = b''.join(reversed(chunks))
+    if lines is not None:
+        # Sondaki satır sonu boş bir "satır" üretir
+        keep = lines + 1 if data.endswith(b'\n') else lines
+        data = b'\n'.join(data.split(b'\n')[-keep:])
+    return data.decode('utf-8', errors='replace')
+
+
+def previous_log_path(path):
+    return f"{path}.1"
+
+
+def read_log(path, max_bytes=None, previous=False):
+    """
+    Logun sonunu oku; previous=True ise bir önceki çalıştırmanın logunu (<log>.1)
+
+    Returns:
+        str: İçerik, dosya yoksa boş string
+    """
+    if previous:
+        path = previous_log_path(path)
+    if max_bytes is None:
+        max_bytes = _config('LOG_READ_MAX_BYTES', 1024 * 1024)
+    try:
+        return tail_file(path, max_bytes=max_bytes)
+    except OSError:
+        return ''
+
+
+def _compress(path, keep_lock):
+    """<log>.2 -> <log>.2.gz (kilit tutularak, arka planda)"""
+    try:
+        with open(path, 'rb') as src, gzip.open(f"{path}.gz.tmp", 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(f"{path}.gz.tmp", f"{path}.gz")
+        os.remove(path)
+    except OSError as e:
+        print(f"[LOGS] Could not compress {path}: {e}")
+    finally:
+        keep_lock.release()
+
+
+def rotate_log(path, archives=5, copy_truncate=False, background=True):
+    """
+    Logu döndür: <log> -> <log>.1, <log>.1 -> <log>.2.gz, ... (archives adet gz tutulur)
+
+    Args:
+        copy_truncate: Dosyayı taşımak yerine kopyalayıp yerinde sıfırla (logu
+            yeniden açamayan çalışan süreçler için; kopya ile sıfırlama arasında
+            yazılan satırlar kaybolabilir)
+        background: Sıkıştırmayı arka plan thread'inde yap
+
+    Returns:
+        bool: Döndürüldüyse True (dosya yoksa veya boşsa False)
+    """
+    lock = _lock(path)
+    lock.acquire()
+    try:
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            lock.release()
+            return False
+
+        oldest = f"{path}.{archives + 1}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for n in range(archives, 1, -1):
+            if os.path.exists(f"{path}.{n}.gz"):
+                os.replace(f"{path}.{n}.gz", f"{path}.{n + 1}.gz")
+
+        previous = previous_log_path(path)
+        to_compress = None
+        if os.path.exists(previous):
+            to_compress = f"{path}.2"
+            os.replace(previous, to_compress)
+
+        if copy_truncate:
+            shutil.copyfile(path, previous)
+            os.truncate(path, 0)
+        else:
+            os.replace(path, previous)
+        _last_rotation[os.path.abspath(path)] = time.time()
+    except OSError as e:
+        lock.release()
+        print(f"[LOGS] Could not rotate {path}: {e}")
+        return False
+
+    if not to_compress:
+        lock.release()
+    elif background:
+        threading.Thread(target=_compress, args=(to_compress, lock), daemon=True).start()
+    else:
+        _compress(to_compress, lock)
+    return True
+
+
+def start_log(path, archives=None):
+    """
+    Yeni çalıştırma için logu aç: önceki log <log>.1 olarak saklanır, dosya
+    append modunda açılır (copy_truncate rotasyonu ile uyumlu)
+    """
+    if archives is None:
+        archives = _config('LOG_ARCHIVES', 5)
+    rotate_log(path, archives=archives)
+    return open(path, 'a', buffering=1)
+
+
+def rotate_running_logs(project, config):
+    """
+    Çalışan projenin logları LOG_MAX_BYTES'ı veya LOG_ROTATE_SECONDS'ı aştıysa döndür
+
+    Gunicorn logları yeniden açabildiği için taşınır ve master'a SIGUSR1
+    gönderilir; diğer süreçler (Node.js) için copy_truncate kullanılır.
+
+    Returns:
+        list: Döndürülen log yolları
+    """
+    from app.utils.reload_manager import is_gunicorn_master
+
+    max_bytes = config.get('LOG_MAX_BYTES', 0)
+    max_age = config.get('LOG_ROTATE_SECONDS', 0)
+    archives = config.get('LOG_ARCHIVES', 5)
+    now = time.time()
+
+    due = []
+    for kind in ('out', 'err'):
+        path = os.path.join(project.path, f"{project.name}.{kind}.log")
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        rotated_at = _last_rotation.setdefault(os.path.abspath(path), now)
+        if size and ((max_bytes and size >= max_bytes) or (max_age and now - rotated_at >= max_age)):
+            due.append(path)
+    if not due:
+        return []
+
+    gunicorn = project.pid and is_gunicorn_master(project.pid)
+    rotated = [path for path in due if rotate_log(path, archives=archives, copy_truncate=not gunicorn)]
+    if rotated and gunicorn:
+        try:
+            os.kill(project.pid, signal.SIGUSR1)
+        except OSError:
+            pass
+    return rotated
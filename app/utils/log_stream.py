@@ -0,0 +1,308 @@
+"""
+Log Stream - canlı log takibi (SSE) için paylaşılan dosya izleyicileri
+
+Her log dosyası için panel sürecinde tek bir LogFollower thread'i çalışır;
+o logu izleyen bütün tarayıcılar (Subscriber) aynı follower'dan beslenir.
+Son izleyici ayrılınca follower durur.
+
+- Dosya değişiklikleri inotify ile (ctypes, ek paket gerekmez) beklenir;
+  inotify yoksa STAT_POLL_INTERVAL ile stat kontrol edilir.
+- Rotasyon (inode değişti) ve truncate (boyut küçüldü) algılanır; eski
+  dosyada kalan satırlar okunup yeni dosyanın başından devam edilir.
+- Backpressure: her izleyicinin kuyruğu SUBSCRIBER_MAX_LINES satırla
+  sınırlıdır. Yavaş bir istemcinin kuyruğu dolarsa en eski satırlar atılır
+  ve istemciye kaç satır kaçırdığı bildirilir; bellek sınırsız büyümez.
+"""
+
+import os
+import json
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+from collections import deque
+
+STAT_POLL_INTERVAL = 0.5
+READ_CHUNK = 64 * 1024
+MAX_LINE_LENGTH = 8192
+SUBSCRIBER_MAX_LINES = 2000
+# Bir SSE mesajında en fazla bu kadar satır
+BATCH_LINES = 500
+HEARTBEAT_SECONDS = 15
+# Bağlantı bu süreden sonra kapatılır (EventSource otomatik yeniden bağlanır)
+STREAM_MAX_SECONDS = 3600
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_EVENT = struct.Struct('iIII')
+
+_libc = None
+
+
+def _inotify_libc():
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            libc.inotify_init1
+            _libc = libc
+        except (OSError, AttributeError, TypeError):
+            _libc = False
+    return _libc
+
+
+class InotifyWatch:
+    """Log'un bulunduğu dizini izler; sadece o dosyaya ait olaylarda uyanır"""
+
+    def __init__(self, path):
+        libc = _inotify_libc()
+        if not libc:
+            raise OSError('inotify is not available')
+        self.name = os.path.basename(path).encode()
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        directory = os.path.dirname(os.path.abspath(path))
+        if libc.inotify_add_watch(self.fd, directory.encode(), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout):
+        """Dosyaya ait bir olay gelene veya timeout dolana kadar bekle"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+                offset += _EVENT.size + length
+                if name == self.name:
+                    return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class StatWatch:
+    """inotify yoksa: sabit aralıkla uyan, değişikliği follower stat ile bulur"""
+
+    def __init__(self, stop_event):
+        self.stop_event = stop_event
+
+    def wait(self, timeout):
+        self.stop_event.wait(min(timeout, STAT_POLL_INTERVAL))
+        return True
+
+    def close(self):
+        pass
+
+
+class Subscriber:
+    """Bir izleyicinin sınırlı kuyruğu"""
+
+    def __init__(self, max_lines=SUBSCRIBER_MAX_LINES):
+        self.max_lines = max_lines
+        self.lines = deque()
+        self.dropped = 0
+        self.events = []
+        self.cond = threading.Condition()
+
+    def put(self, lines=(), event=None):
+        with self.cond:
+            self.lines.extend(lines)
+            overflow = len(self.lines) - self.max_lines
+            if overflow > 0:
+                for _ in range(overflow):
+                    self.lines.popleft()
+                self.dropped += overflow
+            if event:
+                self.events.append(event)
+            self.cond.notify()
+
+    def get(self, timeout):
+        """
+        Yeni satırları bekle
+
+        Returns:
+            (lines, dropped, events): timeout dolduysa boş listeler
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.lines or self.dropped or self.events, timeout)
+            count = min(len(self.lines), BATCH_LINES)
+            lines = [self.lines.popleft() for _ in range(count)]
+            dropped, self.dropped = self.dropped, 0
+            events, self.events = self.events, []
+            return lines, dropped, events
+
+
+class LogFollower:
+    """Tek bir log dosyasını izleyip satırları izleyicilere dağıtan thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        # İzleyici ve dosya hemen (sondan) açılır: abone olunduktan sonra yazılan satırlar kaçmaz
+        try:
+            self.watch = InotifyWatch(path)
+        except OSError:
+            self.watch = StatWatch(self.stop_event)
+        self.file, self.inode = self._open(at_end=True)
+        self.thread = threading.Thread(target=self.run, name=f'log-follower:{os.path.basename(path)}',
+                                       daemon=True)
+
+    def publish(self, lines=(), event=None):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.put(lines, event)
+
+    def _open(self, at_end):
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return None, None
+        if at_end:
+            f.seek(0, os.SEEK_END)
+        return f, os.fstat(f.fileno()).st_ino
+
+    def _read_lines(self, f, partial):
+        """Dosyadaki yeni veriyi oku; tamamlanmış satırları yayınla, yarım satırı döndür"""
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return partial
+            data = partial + chunk
+            *complete, partial = data.split(b'\n')
+            if len(partial) > MAX_LINE_LENGTH:
+                complete.append(partial)
+                partial = b''
+            if complete:
+                self.publish([line[:MAX_LINE_LENGTH].decode('utf-8', errors='replace') for line in complete])
+
+    def run(self):
+        watch = self.watch
+        f, inode = self.file, self.inode
+        partial = b''
+        try:
+            while not self.stop_event.is_set():
+                watch.wait(HEARTBEAT_SECONDS)
+                if self.stop_event.is_set():
+                    break
+                try:
+                    st = os.stat(self.path)
+                except OSError:
+                    st = None
+
+                if f is not None:
+                    if st is None or st.st_ino != inode:
+                        # Rotasyon: eski dosyada kalanları oku, yenisine geç
+                        partial = self._read_lines(f, partial)
+                        f.close()
+                        f = None
+                        self.publish(event='rotated')
+                    elif st.st_size < f.tell():
+                        f.seek(0)
+                        partial = b''
+                        self.publish(event='truncated')
+                if f is None and st is not None:
+                    f, inode = self._open(at_end=False)
+                    partial = b''
+                if f is not None:
+                    partial = self._read_lines(f, partial)
+        finally:
+            watch.close()
+            if f is not None:
+                f.close()
+
+
+_followers = {}
+_followers_lock = threading.Lock()
+
+
+def subscribe(path):
+    """Logu izlemeye başla; (follower, subscriber) döner"""
+    path = os.path.abspath(path)
+    subscriber = Subscriber()
+    with _followers_lock:
+        follower = _followers.get(path)
+        if follower is None:
+            follower = LogFollower(path)
+            _followers[path] = follower
+            follower.thread.start()
+        with follower.lock:
+            follower.subscribers.add(subscriber)
+    return follower, subscriber
+
+
+def unsubscribe(follower, subscriber):
+    """İzleyiciyi çıkar; son izleyici buysa follower'ı durdur"""
+    with _followers_lock:
+        with follower.lock:
+            follower.subscribers.discard(subscriber)
+            empty = not follower.subscribers
+        if empty and _followers.get(follower.path) is follower:
+            del _followers[follower.path]
+            follower.stop_event.set()
+
+
+def _sse(data, event=None, event_id=None):
+    message = ''
+    if event:
+        message += f'event: {event}\n'
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    return message + f'data: {json.dumps(data)}\n\n'
+
+
+def stream_log(path, initial_lines=200):
+    """
+    SSE generator: önce logun son satırları ('snapshot'), ardından yeni satırlar
+
+    Olaylar: snapshot {'lines'}, mesaj {'lines'}, gap {'dropped'},
+    rotated/truncated {}; HEARTBEAT_SECONDS'ta bir yorum satırı gönderilir.
+    """
+    from app.utils.log_manager import tail_file
+
+    # Önce abone ol ki snapshot ile ilk mesaj arasında satır kaçmasın
+    follower, subscriber = subscribe(path)
+    try:
+        yield 'retry: 3000\n\n'
+        try:
+            initial = tail_file(path, max_bytes=256 * 1024, lines=initial_lines).splitlines()
+        except OSError:
+            initial = []
+        yield _sse({'lines': initial, 'path': path}, event='snapshot')
+
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            lines, dropped, events = subscriber.get(HEARTBEAT_SECONDS)
+            if dropped:
+                yield _sse({'dropped': dropped}, event='gap')
+            for event in events:
+                yield _sse({}, event=event)
+            if lines:
+                yield _sse({'lines': lines})
+            if not (lines or dropped or events):
+                yield ': keepalive\n\n'
+    finally:
+        unsubscribe(follower, subscriber)
@@ -0,0 +1,510 @@
+"""
+Metrics Sampler - host ve proje kaynak kullanımının arka planda örneklenmesi
+
+system_status sayfası her istekte CPU'yu 1 saniye ölçmek ve tüm bağlantıları
+taramak yerine buradaki önbelleği okur.
+
+- Sampler METRICS_INTERVAL saniyede bir host (CPU, bellek, disk/ağ I/O) ve
+  çalışan projeler (CPU, RSS, açık FD, bağlantı, disk I/O) için örnek alır.
+- Sayısal seriler sabit boyutlu, mmap ile dosyaya eşlenmiş bir halka tamponda
+  tutulur (METRICS_HISTORY_HOURS kadar geçmiş). Panelin bütün gunicorn
+  worker'ları aynı dosyayı okur; yazan tek sampler'dır (dosya kilidi).
+- Proje slot sayısı sampler başlarken METRICS_MAX_PROJECTS ile toplam proje
+  sayısının büyüğüdür. Boyut değişirse ring yeni bir dosya olarak oluşturulur
+  (okuyucular eski dosyayı bırakıp yenisini açar). Slot bulamayan projeler
+  loglanır ve snapshot'ta 'no_history' altında listelenir.
+- Son örneğin tamamı (dinlenen portlar dahil) snapshot.json olarak atomik
+  yazılır.
+"""
+
+import os
+import json
+import math
+import mmap
+import time
+import fcntl
+import struct
+import threading
+import traceback
+import psutil
+
+HOST_KEY = 0
+HOST_FIELDS = ('cpu_percent', 'memory_percent', 'disk_read_bps', 'disk_write_bps',
+               'net_sent_bps', 'net_recv_bps')
+PROJECT_FIELDS = ('cpu_percent', 'rss', 'fds', 'connections', 'io_read_bps', 'io_write_bps')
+# Her slot aynı sayıda alan taşır (host ve projeler için ayrı anlamlarla)
+FIELD_COUNT = 6
+# Config'te METRICS_MAX_PROJECTS yoksa
+MAX_PROJECT_SLOTS = 64
+
+_MAGIC = b'VDSM'
+_VERSION = 1
+# magic, version, capacity, slots, fields, write_count
+_HEADER = struct.Struct('<4sIIIIQ')
+_HEADER_SIZE = 64
+_FREE = -1
+
+
+class MetricsRing:
+    """
+    mmap'li sabit boyutlu halka tampon
+
+    Düzen: başlık | slot anahtarları (int64) | zaman damgaları (double x capacity) |
+    değerler (float32 x slots x FIELD_COUNT x capacity). Slot 0 host'a, diğerleri
+    proje ID'lerine aittir. Boş değer NaN'dır.
+    """
+
+    def __init__(self, path, capacity, slots=MAX_PROJECT_SLOTS + 1):
+        self.path = path
+        self.capacity = capacity
+        self.slots = slots
+        keys_size = 8 * slots
+        ts_size = 8 * capacity
+        values_size = 4 * slots * FIELD_COUNT * capacity
+        size = _HEADER_SIZE + keys_size + ts_size + values_size
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) != size
+        if fresh:
+            # Boyut değişti: dosya yerinde küçültülmez/büyütülmez, eski dosyayı
+            # mmap'lemiş okuyucular (SIGBUS olmadan) yeni dosyaya geçer
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.truncate(size)
+            os.replace(tmp_path, path)
+        fd = os.open(path, os.O_RDWR)
+        try:
+            self.inode = os.fstat(fd).st_ino
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._unslotted = set()
+
+        buf = memoryview(self._mmap)
+        offset = _HEADER_SIZE
+        self._keys = buf[offset:offset + keys_size].cast('q')
+        offset += keys_size
+        self._ts = buf[offset:offset + ts_size].cast('d')
+        offset += ts_size
+        self._values = buf[offset:offset + values_size].cast('f')
+
+        header = _HEADER.unpack_from(self._mmap, 0)
+        if fresh or header[:5] != (_MAGIC, _VERSION, capacity, slots, FIELD_COUNT):
+            self._reset()
+
+    def _reset(self):
+        for i in range(self.slots):
+            self._keys[i] = _FREE
+        self._keys[0] = HOST_KEY
+        for i in range(self.capacity):
+            self._ts[i] = 0.0
+        for i in range(len(self._values)):
+            self._values[i] = math.nan
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, _VERSION, self.capacity, self.slots, FIELD_COUNT, 0)
+
+    def is_stale(self):
+        """Dosya yeniden oluşturulduysa (sampler farklı boyutla başladıysa) True"""
+        try:
+            return os.stat(self.path).st_ino != self.inode
+        except OSError:
+            return True
+
+    @property
+    def write_count(self):
+        return _HEADER.unpack_from(self._mmap, 0)[5]
+
+    def _offset(self, slot, field):
+        return (slot * FIELD_COUNT + field) * self.capacity
+
+    def _slot(self, key):
+        for slot in range(self.slots):
+            if self._keys[slot] == key:
+                return slot
+        return None
+
+    def _allocate(self, key, active):
+        """Anahtara slot ayır; yer yoksa bu örnekte olmayan (durmuş) bir projenin slotunu devral"""
+        slot = self._slot(_FREE)
+        if slot is None:
+            slot = next((s for s in range(1, self.slots) if self._keys[s] not in active), None)
+            if slot is None:
+                return None
+        base = self._offset(slot, 0)
+        for i in range(base, base + FIELD_COUNT * self.capacity):
+            self._values[i] = math.nan
+        self._keys[slot] = key
+        return slot
+
+    def append(self, timestamp, samples):
+        """
+        Bir örnek ekle
+
+        Args:
+            samples: {anahtar: [FIELD_COUNT değer]} (HOST_KEY host için, diğerleri proje ID'si)
+
+        Returns:
+            list: Slot bulunamadığı için geçmişi tutulmayan anahtarlar
+        """
+        count = self.write_count
+        index = count % self.capacity
+        slots = {}
+        unslotted = []
+        for key in samples:
+            slot = self._slot(key)
+            if slot is None:
+                slot = self._allocate(key, samples)
+            if slot is not None:
+                slots[slot] = samples[key]
+                continue
+            unslotted.append(key)
+            if key not in self._unslotted:
+                self._unslotted.add(key)
+                print(f"[METRICS] No history slot for project {key}: all {self.slots - 1} slots "
+                      f"are in use, raise METRICS_MAX_PROJECTS")
+
+        for slot in range(self.slots):
+            values = slots.get(slot)
+            for field in range(FIELD_COUNT):
+                value = values[field] if values and values[field] is not None else math.nan
+                self._values[self._offset(slot, field) + index] = value
+        # Okuyucular zaman damgasına bakar: değerlerden sonra yazılır
+        self._ts[index] = timestamp
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, _VERSION, self.capacity, self.slots, FIELD_COUNT, count + 1)
+        return unslotted
+
+    def series(self, key, field, seconds=None, points=None):
+        """
+        Bir alanın zaman serisi (eskiden yeniye)
+
+        Args:
+            seconds: Sadece son N saniye
+            points: En fazla bu kadar nokta (kovalara ortalama alınarak seyreltilir)
+
+        Returns:
+            dict: {'t': [...], 'v': [...]} (değer yoksa None)
+        """
+        slot = self._slot(key)
+        if slot is None:
+            return {'t': [], 'v': []}
+        count = self.write_count
+        length = min(count, self.capacity)
+        start = count - length
+        since = time.time() - seconds if seconds else 0
+        base = self._offset(slot, field)
+
+        times, values = [], []
+        for n in range(start, count):
+            index = n % self.capacity
+            ts = self._ts[index]
+            if ts < since:
+                continue
+            times.append(ts)
+            values.append(self._values[base + index])
+
+        if points and len(times) > points:
+            times, values = _downsample(times, values, points)
+        return {'t': [round(t, 1) for t in times],
+                'v': [None if math.isnan(v) else round(v, 2) for v in values]}
+
+    def close(self):
+        self._keys.release()
+        self._ts.release()
+        self._values.release()
+        self._mmap.close()
+
+
+def ring_dimensions(path):
+    """Dosyadaki ring'in (capacity, slots) değerleri; geçerli bir ring yoksa None"""
+    try:
+        with open(path, 'rb') as f:
+            header = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if header[0] != _MAGIC or header[1] != _VERSION or header[4] != FIELD_COUNT:
+        return None
+    return header[2], header[3]
+
+
+def _downsample(times, values, points):
+    size = len(times) / points
+    out_t, out_v = [], []
+    for i in range(points):
+        lo, hi = int(i * size), int((i + 1) * size)
+        bucket = [v for v in values[lo:hi] if not math.isnan(v)]
+        out_t.append(times[hi - 1])
+        out_v.append(sum(bucket) / len(bucket) if bucket else math.nan)
+    return out_t, out_v
+
+
+def _rate(current, previous, elapsed):
+    if previous is None or elapsed <= 0:
+        return None
+    return max(current - previous, 0) / elapsed
+
+
+def listening_ports(connections):
+    """net_connections sonucundan dinlenen portlar (port, süreç adı, komut satırı, PID)"""
+    port_map = {}
+    for conn in connections:
+        if conn.status != psutil.CONN_LISTEN or not conn.laddr or conn.laddr.port in port_map:
+            continue
+        process_name, process_cmdline = 'Unknown', ''
+        if conn.pid:
+            try:
+                proc = psutil.Process(conn.pid)
+                process_name = proc.name()
+                process_cmdline = ' '.join(proc.cmdline()[:3])  # İlk 3 argüman
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        port_map[conn.laddr.port] = {
+            'port': conn.laddr.port,
+            'process': process_name,
+            'cmdline': process_cmdline,
+            'pid': conn.pid or 'N/A'
+        }
+    return sorted(port_map.values(), key=lambda x: x['port'])
+
+
+class MetricsSampler:
+    """Periyodik örnekleyici; ring'e ve snapshot dosyasına yazar"""
+
+    def __init__(self, app, ring=True):
+        self.app = app
+        self.interval = app.config.get('METRICS_INTERVAL', 10)
+        self.ring = open_ring(app) if ring else None
+        self._procs = {}        # pid -> psutil.Process (cpu_percent önceki ölçüme göre hesaplanır)
+        self._io = {}           # anahtar -> (okunan, yazılan) byte
+        self._last_time = None
+        self._stop = threading.Event()
+        psutil.cpu_percent(interval=None)
+
+    def _process(self, pid):
+        proc = self._procs.get(pid)
+        if proc is None:
+            proc = psutil.Process(pid)
+            proc.cpu_percent(interval=None)
+            self._procs[pid] = proc
+        return proc
+
+    def _io_rates(self, key, read, write, elapsed):
+        previous = self._io.get(key)
+        self._io[key] = (read, write)
+        if previous is None:
+            return None, None
+        return _rate(read, previous[0], elapsed), _rate(write, previous[1], elapsed)
+
+    def _project_sample(self, project, conn_counts, elapsed, seen):
+        try:
+            root = psutil.Process(project.pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+        cpu = rss = fds = connections = read = write = 0
+        for p in tree:
+            seen.add(p.pid)
+            try:
+                proc = self._process(p.pid)
+                with proc.oneshot():
+                    cpu += proc.cpu_percent(interval=None)
+                    rss += proc.memory_info().rss
+                    fds += proc.num_fds()
+                    io = proc.io_counters()
+                    read += io.read_bytes
+                    write += io.write_bytes
+            except (psutil.NoSuchProcess, psutil.AccessDenied, AttributeError):
+                continue
+            connections += conn_counts.get(p.pid, 0)
+        read_bps, write_bps = self._io_rates(project.id, read, write, elapsed)
+        return [cpu, rss, fds, connections, read_bps, write_bps]
+
+    def collect(self):
+        """Bir örnek al (ring varsa ona da ekle); snapshot dict döner"""
+        from app.models import Project
+
+        now = time.time()
+        elapsed = now - self._last_time if self._last_time else 0
+        self._last_time = now
+
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        disk_io = psutil.disk_io_counters()
+        net_io = psutil.net_io_counters()
+        disk_read, disk_write = self._io_rates('disk', disk_io.read_bytes, disk_io.write_bytes, elapsed) if disk_io else (None, None)
+        net_sent, net_recv = self._io_rates('net', net_io.bytes_sent, net_io.bytes_recv, elapsed) if net_io else (None, None)
+        host = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'cpu_count': psutil.cpu_count(),
+            'memory_total': memory.total,
+            'memory_used': memory.used,
+            'memory_percent': memory.percent,
+            'disk_total': disk.total,
+            'disk_used': disk.used,
+            'disk_percent': disk.percent,
+            'disk_read_bps': disk_read,
+            'disk_write_bps': disk_write,
+            'net_sent_bps': net_sent,
+            'net_recv_bps': net_recv,
+            'boot_time': psutil.boot_time(),
+        }
+
+        # Tüm bağlantılar örnek başına bir kez taranır
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except (psutil.AccessDenied, OSError):
+            connections = []
+        conn_counts = {}
+        for conn in connections:
+            if conn.pid and conn.status == psutil.CONN_ESTABLISHED:
+                conn_counts[conn.pid] = conn_counts.get(conn.pid, 0) + 1
+
+        projects = {}
+        samples = {HOST_KEY: [host[f] for f in HOST_FIELDS]}
+        seen = set()
+        for project in Project.query.filter_by(status='running').all():
+            if not project.pid:
+                continue
+            values = self._project_sample(project, conn_counts, elapsed, seen)
+            if values is None:
+                continue
+            samples[project.id] = values
+            # JSON'a yazıldığında da aynı kalsın diye anahtar string
+            projects[str(project.id)] = dict(zip(PROJECT_FIELDS, values))
+
+        # Çıkmış süreçlerin önbelleğini temizle
+        for pid in set(self._procs) - seen:
+            del self._procs[pid]
+        for key in set(self._io) - set(samples) - {'disk', 'net'}:
+            del self._io[key]
+
+        unslotted = self.ring.append(now, samples) if self.ring else []
+        return {
+            'at': now,
+            'interval': self.interval,
+            'host': host,
+            'projects': projects,
+            'no_history': [str(key) for key in unslotted],
+            'listening_ports': listening_ports(connections)
+        }
+
+    def sample(self):
+        snapshot = self.collect()
+        path = metrics_path(self.app, 'snapshot.json')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+        return snapshot
+
+    def run(self):
+        print(f"[METRICS] Sampler started in PID {os.getpid()} (every {self.interval}s)")
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                with self.app.app_context():
+                    self.sample()
+            except Exception:
+                traceback.print_exc()
+            self._stop.wait(max(self.interval - (time.monotonic() - started), 0))
+
+    def stop(self):
+        self._stop.set()
+
+
+def metrics_path(app, filename):
+    return os.path.join(app.config['METRICS_DIR'], filename)
+
+
+def open_ring(app):
+    """Sampler'ın ring'i: slot sayısı METRICS_MAX_PROJECTS ile proje sayısının büyüğü"""
+    from app.models import Project
+    interval = app.config.get('METRICS_INTERVAL', 10)
+    capacity = int(app.config.get('METRICS_HISTORY_HOURS', 6) * 3600 // interval)
+    with app.app_context():
+        project_count = Project.query.count()
+    max_projects = max(app.config.get('METRICS_MAX_PROJECTS', MAX_PROJECT_SLOTS), project_count)
+    return MetricsRing(metrics_path(app, 'ring.bin'), capacity, slots=max_projects + 1)
+
+
+def start_metrics_sampler(app):
+    """
+    Sampler'ı arka plan thread'inde başlat
+
+    start_supervisor gibi dosya kilidiyle tek bir panel sürecinde çalışır.
+    """
+    if app.testing or not app.config.get('METRICS_SAMPLER'):
+        return None
+    os.makedirs(app.config['METRICS_DIR'], exist_ok=True)
+    lock_path = metrics_path(app, 'sampler.lock')
+
+    def run():
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            MetricsSampler(app).run()
+
+    thread = threading.Thread(target=run, name='metrics-sampler', daemon=True)
+    thread.start()
+    return thread
+
+
+# Okuyucu tarafı (her panel süreci)
+_reader = {'ring': None, 'snapshot': None, 'mtime': None, 'fallback': None}
+_reader_lock = threading.Lock()
+
+
+def current_snapshot(app):
+    """
+    system_status için güncel snapshot
+
+    Sampler çalışmıyorsa (kapalı, test) bu süreçte ring'siz bir sampler ile
+    bekleme yapmadan ölçülür; CPU yüzdesi bir önceki çağrıya göre hesaplanır.
+    """
+    snapshot = read_snapshot(app, max_age=3 * app.config.get('METRICS_INTERVAL', 10))
+    if snapshot:
+        return snapshot
+    with _reader_lock:
+        if _reader['fallback'] is None:
+            _reader['fallback'] = MetricsSampler(app, ring=False)
+        return _reader['fallback'].collect()
+
+
+def read_snapshot(app, max_age=None):
+    """
+    Sampler'ın son snapshot'ı (mtime değişmedikçe önbellekten)
+
+    Returns:
+        dict veya None: Snapshot yoksa ya da max_age saniyeden eskiyse None
+    """
+    path = metrics_path(app, 'snapshot.json')
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if max_age is not None and time.time() - mtime > max_age:
+        return None
+    with _reader_lock:
+        if _reader['mtime'] != mtime:
+            try:
+                with open(path, 'r') as f:
+                    _reader['snapshot'] = json.load(f)
+                _reader['mtime'] = mtime
+            except (OSError, ValueError):
+                return _reader['snapshot']
+        return _reader['snapshot']
+
+
+def read_series(app, key, fields, seconds=None, points=None):
+    """Ring'den seriler: {alan: {'t': [...], 'v': [...]}}; ring yoksa boş dict"""
+    path = metrics_path(app, 'ring.bin')
+    names = HOST_FIELDS if key == HOST_KEY else PROJECT_FIELDS
+    with _reader_lock:
+        ring = _reader['ring']
+        if ring is None or ring.is_stale():
+            # Boyutlar sampler'ın yazdığı başlıktan alınır (okuyucu ring'i sıfırlamaz)
+            dimensions = ring_dimensions(path)
+            if dimensions is None:
+                return {}
+            if ring is not None:
+                ring.close()
+            ring = _reader['ring'] = MetricsRing(path, *dimensions)
+        return {name: ring.series(key, names.index(name), seconds=seconds, points=points)
+                for name in fields if name in names}
@@ -0,0 +1,300 @@
+"""
+Next Build - kaynak hash'i ile anahtarlanan Next.js build cache'i
+
+- Build anahtarı: build dizinindeki kaynak dosyaların hash'leri (package.json
+  ve lockfile dahil; .next ve KEY_IGNORE_PATTERNS hariç) + .env/.env.*
+  dosyaları + build sırasında koda gömülen NEXT_PUBLIC_* ortam değişkenleri +
+  Node sürümü. Hash'ler scan_project_files ile hesaplanır; projenin deploy
+  manifest'i varsa değişmemiş dosyalar yeniden hash'lenmez.
+- .next/.vdspanel-build.json içindeki anahtar güncelse build atlanır; .next
+  silinmiş olsa bile aynı anahtarın önceki çıktısı (NEXT_BUILD_KEEP adet
+  tutulur) kopyalanarak geri konur. Rollback sonrası yeniden build gerekmez.
+  (Hardlink kullanılmaz: next start ISR sayfalarını .next içinde yerinde
+  yeniden yazar, saklanan çıktı da değişirdi.)
+- .next/cache (Next.js'in artımlı derleme cache'i) deploy'lar arasında
+  saklanır; .next silinse de yeni build bu cache ile başlar.
+- Her build/yeniden kullanım süresiyle birlikte builds.json'a kaydedilir.
+"""
+
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+from file_hasher import hash_file
+
+MARKER_NAME = '.vdspanel-build.json'
+HISTORY_NAME = 'builds.json'
+HISTORY_LIMIT = 50
+COMPILE_CACHE = 'cache'
+
+
+def _key_ignore_patterns():
+    """
+    Deploy'un IGNORE_PATTERNS'ı, 'dist' ve 'build' hariç: bu adlar her
+    derinlikte eşleşir ve src/build gibi kaynak dizinlerini de düşürürdü.
+    (.env ise build_key'de ayrıca hash'lenir.)
+    """
+    from app.utils.deployment_manager import IGNORE_PATTERNS
+    return frozenset(IGNORE_PATTERNS - {'dist', 'build'})
+
+
+def _config(key, default):
+    from flask import current_app, has_app_context
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def store_dir(project_name, project_path, build_cwd, create=True):
+    """Projenin (monorepo'da alt dizinin) build cache dizini, kapalıysa None"""
+    root = _config('NEXT_BUILD_CACHE_DIR', None)
+    if not root or not _config('NEXT_BUILD_CACHE_ENABLED', True):
+        return None
+    subdir = os.path.relpath(build_cwd, project_path)
+    name = project_name if subdir == '.' else f"{project_name}--{subdir.replace(os.sep, '-')}"
+    path = os.path.join(root, name)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _manifest_cache(project_name, project_path, build_cwd):
+    """Deploy manifest'indeki hash'ler (build_cwd'ye göre yollarla)"""
+    from flask import has_app_context
+    if not has_app_context():
+        return {}
+    from app.models import Project
+    from app.utils.deployment_manager import get_project_hash_cache
+    try:
+        project = Project.query.filter_by(name=project_name).first()
+        cache = get_project_hash_cache(project.id) if project else {}
+    except Exception as e:
+        # Manifest sadece hash'lemeyi hızlandırır; okunamazsa her dosya hash'lenir
+        print(f"[NEXT-BUILD] Manifest hashes unavailable: {e}")
+        return {}
+    prefix = os.path.relpath(build_cwd, project_path)
+    if prefix == '.':
+        return cache
+    prefix += os.sep
+    return {path[len(prefix):]: entry for path, entry in cache.items() if path.startswith(prefix)}
+
+
+def build_key(build_cwd, env=None, cache=None, node_version=None):
+    """Kaynak ağacı + .env dosyaları + NEXT_PUBLIC_* ortamı + Node sürümü için build anahtarı"""
+    from app.utils.deployment_manager import scan_project_files
+    files = scan_project_files(build_cwd, cache=cache, skip_dirs=('.next',), ignore=_key_ignore_patterns(),
+                               workers=_config('HASH_WORKERS', None))
+    # Next.js .env dosyalarındaki NEXT_PUBLIC_* değerlerini build sırasında koda gömer;
+    # .env deploy taramasında yoksayıldığı için burada ayrıca eklenir
+    for path in glob.glob(os.path.join(glob.escape(build_cwd), '.env*')):
+        name = os.path.basename(path)
+        if (name == '.env' or name.startswith('.env.')) and name not in files and os.path.isfile(path):
+            files[name] = {'hash': hash_file(path)}
+    h = hashlib.sha256()
+    h.update(f"node={node_version}\n".encode())
+    for name in sorted(env or {}):
+        if name.startswith('NEXT_PUBLIC_'):
+            h.update(f"env:{name}={env[name]}\n".encode())
+    for path in sorted(files):
+        h.update(f"{path}\0{files[path]['hash']}\n".encode())
+    return h.hexdigest()[:24]
+
+
+def read_marker(next_dir):
+    try:
+        with open(os.path.join(next_dir, MARKER_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(next_dir, key, source):
+    with open(os.path.join(next_dir, MARKER_NAME), 'w') as f:
+        json.dump({'key': key, 'source': source, 'at': time.time()}, f)
+
+
+def _copy_tree(src, dst, skip=()):
+    """src'yi dst'ye kopyala (skip: kökte atlanacak adlar)"""
+    shutil.copytree(src, dst, symlinks=True,
+                    ignore=lambda directory, names: [n for n in names if directory == src and n in skip])
+
+
+def _replace_dir(tmp_path, path):
+    if os.path.lexists(path):
+        shutil.rmtree(path)
+    os.rename(tmp_path, path)
+
+
+def save_build(store, key, next_dir):
+    """Build çıktısını (cache hariç) ve derleme cache'ini sakla"""
+    builds = os.path.join(store, 'builds')
+    os.makedirs(builds, exist_ok=True)
+    target = os.path.join(builds, key)
+    if not os.path.exists(target):
+        tmp_path = f"{target}.tmp-{os.getpid()}"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        _copy_tree(next_dir, tmp_path, skip=(COMPILE_CACHE, MARKER_NAME))
+        os.rename(tmp_path, target)
+    else:
+        os.utime(target)
+    save_compile_cache(store, next_dir)
+    prune_builds(store)
+
+
+def restore_build(store, key, next_dir):
+    """
+    Anahtarın saklanan çıktısını .next olarak geri koy (.next/cache korunur)
+
+    Returns:
+        bool: Saklanan çıktı varsa True
+    """
+    saved = os.path.join(store, 'builds', key)
+    if not os.path.isdir(saved):
+        return False
+    tmp_path = f"{next_dir}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    _copy_tree(saved, tmp_path)
+    current_cache = os.path.join(next_dir, COMPILE_CACHE)
+    if os.path.isdir(current_cache):
+        os.rename(current_cache, os.path.join(tmp_path, COMPILE_CACHE))
+    _replace_dir(tmp_path, next_dir)
+    restore_compile_cache(store, next_dir)
+    # Son kullanım zamanı (prune için)
+    os.utime(saved)
+    return True
+
+
+def save_compile_cache(store, next_dir):
+    compile_cache = os.path.join(next_dir, COMPILE_CACHE)
+    if not os.path.isdir(compile_cache):
+        return
+    target = os.path.join(store, COMPILE_CACHE)
+    tmp_path = f"{target}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    shutil.copytree(compile_cache, tmp_path, symlinks=True)
+    _replace_dir(tmp_path, target)
+
+
+def restore_compile_cache(store, next_dir):
+    """.next/cache yoksa saklanan derleme cache'ini geri koy"""
+    saved = os.path.join(store, COMPILE_CACHE)
+    compile_cache = os.path.join(next_dir, COMPILE_CACHE)
+    if os.path.isdir(compile_cache) or not os.path.isdir(saved):
+        return False
+    os.makedirs(next_dir, exist_ok=True)
+    shutil.copytree(saved, compile_cache, symlinks=True)
+    return True
+
+
+def prune_builds(store, keep=None):
+    """En uzun süredir kullanılmayan build çıktılarını sil"""
+    if keep is None:
+        keep = _config('NEXT_BUILD_KEEP', 3)
+    builds = os.path.join(store, 'builds')
+    entries = [entry for entry in os.scandir(builds) if entry.is_dir() and '.tmp-' not in entry.name]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def record_build(store, key, result, duration):
+    """builds.json'a kayıt ekle (result: built, restored, failed)"""
+    path = os.path.join(store, HISTORY_NAME)
+    history = build_history(store)
+    history.append({'key': key, 'result': result, 'duration': round(duration, 2), 'at': time.time()})
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history[-HISTORY_LIMIT:], f)
+    os.replace(tmp_path, path)
+
+
+def build_history(store):
+    try:
+        with open(os.path.join(store, HISTORY_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def build_summary(project_name, project_path):
+    """
+    Proje sayfası için build istatistikleri (kayıt yoksa None)
+
+    Returns:
+        dict: builds, reused, last, avg_build, saved_seconds
+    """
+    history = []
+    for build_cwd in (project_path, os.path.join(project_path, 'frontend')):
+        store = store_dir(project_name, project_path, build_cwd, create=False)
+        history = build_history(store) if store else []
+        if history:
+            break
+    if not history:
+        return None
+    builds = [entry['duration'] for entry in history if entry['result'] == 'built']
+    reused = [entry for entry in history if entry['result'] == 'restored']
+    avg_build = sum(builds) / len(builds) if builds else None
+    return {
+        'builds': len(builds),
+        'reused': len(reused),
+        'last': history[-1],
+        'avg_build': round(avg_build, 1) if avg_build is not None else None,
+        # Yeniden kullanılan her build, ortalama build süresi kadar kazanç
+        'saved_seconds': round(sum(max(avg_build - entry['duration'], 0) for entry in reused))
+        if avg_build is not None else None
+    }
+
+
+def ensure_build(project_name, project_path, build_cwd, env, run_build, can_build=True, node_version=None):
+    """
+    .next çıktısının kaynak ağacıyla güncel olmasını sağla
+
+    Args:
+        run_build: Build'i çalıştıran fonksiyon, başarıda True döner
+        can_build: package.json'da build script'i var mı
+
+    Returns:
+        bool: Kullanılabilir bir build varsa True
+    """
+    next_dir = os.path.join(build_cwd, '.next')
+    store = store_dir(project_name, project_path, build_cwd)
+    if store is None:
+        # Cache kapalı: eski davranış, sadece .next yoksa build
+        return os.path.exists(next_dir) or (can_build and run_build())
+
+    started = time.time()
+    key = build_key(build_cwd, env, cache=_manifest_cache(project_name, project_path, build_cwd),
+                    node_version=node_version)
+    marker = read_marker(next_dir)
+    if marker and marker.get('key') == key:
+        print(f"[NEXT-BUILD] ✓ .next is up to date with the source ({key})")
+        return True
+
+    if restore_build(store, key, next_dir):
+        write_marker(next_dir, key, 'restored')
+        print(f"[NEXT-BUILD] ✓ Reused stored build {key}")
+        record_build(store, key, 'restored', time.time() - started)
+        return True
+
+    if not can_build:
+        # Build script'i yok: yüklenen hazır .next kullanılır
+        return os.path.exists(next_dir)
+
+    restore_compile_cache(store, next_dir)
+    print(f"[NEXT-BUILD] Source changed, building {key} in {build_cwd}...")
+    build_started = time.time()
+    if not run_build():
+        record_build(store, key, 'failed', time.time() - build_started)
+        return False
+    duration = time.time() - build_started
+    record_build(store, key, 'built', duration)
+    print(f"[NEXT-BUILD] ✓ Build {key} took {duration:.1f}s")
+    try:
+        write_marker(next_dir, key, 'built')
+        save_build(store, key, next_dir)
+    except OSError as e:
+        print(f"[NEXT-BUILD] Warning: Could not store build output: {e}")
+    return True
@@ -0,0 +1,310 @@
+"""
+Node Store - lockfile hash'i ile npm kurulumunu atlama ve ortak node_modules deposu
+
+- Bağımlılık anahtarı: Node sürümü + package.json'daki bağımlılık alanları +
+  lockfile (package-lock.json / npm-shrinkwrap.json) içeriği. Kurulumdan sonra
+  node_modules'a işaret dosyası (MARKER_NAME) yazılır; anahtar değişmediyse
+  npm hiç çalıştırılmaz.
+- Depo: <root>/ab/cdef... (object_store ile aynı düzen). Dosya sistemi
+  destekliyorsa (btrfs, XFS) node_modules'taki her dosya depodaki aynı
+  içerikli objenin FICLONE reflink'i ile değiştirilir; aynı sunucudaki on
+  Next.js projesi React'in verisini diskte tek kez tutar.
+
+Hardlink kullanılmaz: paneli ve uygulamaları root çalıştırır, dosya modları
+hiçbir yazmayı engellemez. patch-package, prisma generate gibi node_modules
+içinde dosyaları yerinde değiştiren araçlar hardlink'li bir dosyayı bütün
+projeler için değiştirirdi. Reflink copy-on-write'tır: her projenin dosyası
+ayrı inode'dur, yazma sadece o projeyi etkiler. Reflink desteği depo kökü
+ve node_modules'un dosya sistemi için bir kez küçük bir dosyayla denenir;
+desteklenmiyorsa (ör. ext4) node_modules hash'lenmeden olduğu gibi bırakılır
+(normal kopya yer kazandırmaz).
+"""
+
+import os
+import json
+import time
+import stat
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from file_hasher import hash_files
+from app.utils.object_store import clone_file, _reflink_unsupported
+
+MARKER_NAME = '.vdspanel-deps.json'
+LOCKFILES = ('npm-shrinkwrap.json', 'package-lock.json')
+DEPENDENCY_FIELDS = ('dependencies', 'devDependencies', 'optionalDependencies',
+                     'peerDependencies', 'overrides', 'workspaces')
+# Araçların çalışma sırasında yazdığı dizinler depoya alınmaz
+SKIP_DIRS = {'.cache'}
+# Bu süredir hiçbir kurulumda kullanılmayan objeler silinir. Silmek projeleri
+# etkilemez (reflink'li dosyalar objeden bağımsızdır), sadece paylaşım biter.
+GC_MAX_AGE_SECONDS = 30 * 86400
+
+_node_versions = {}
+
+# (depo kökü, node_modules dosya sistemi) -> reflink desteklenmiyorsa hata mesajı, destekleniyorsa None
+_reflink_state = {}
+
+
+def _config(key, default):
+    from flask import current_app, has_app_context
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def node_version(node_path):
+    """`node --version` (yorumlayıcı başına bir kez çalıştırılır)"""
+    if not node_path:
+        return None
+    if node_path not in _node_versions:
+        try:
+            result = subprocess.run([node_path, '--version'], capture_output=True, text=True, timeout=10)
+            _node_versions[node_path] = result.stdout.strip() or None
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+    return _node_versions[node_path]
+
+
+def find_lockfile(project_path):
+    for name in LOCKFILES:
+        path = os.path.join(project_path, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def dependency_key(project_path, node_version=None):
+    """
+    Bağımlılık anahtarı (package.json okunamazsa None)
+
+    Script, versiyon gibi bağımlılık dışı alanlardaki değişiklikler anahtarı
+    değiştirmez.
+    """
+    try:
+        with open(os.path.join(project_path, 'package.json')) as f:
+            package = json.load(f)
+    except (OSError, ValueError):
+        return None
+    h = hashlib.sha256()
+    h.update(f"node={node_version}\n".encode())
+    fields = {field: package.get(field) for field in DEPENDENCY_FIELDS if field in package}
+    h.update(json.dumps(fields, sort_keys=True).encode())
+    lockfile = find_lockfile(project_path)
+    if lockfile:
+        h.update(f"\n{os.path.basename(lockfile)}\n".encode())
+        with open(lockfile, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:24]
+
+
+def read_marker(node_modules):
+    try:
+        with open(os.path.join(node_modules, MARKER_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(node_modules, key, source, **extra):
+    marker = dict(extra, key=key, source=source, installed_at=time.time())
+    tmp_path = os.path.join(node_modules, MARKER_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(marker, f)
+    os.replace(tmp_path, os.path.join(node_modules, MARKER_NAME))
+    return marker
+
+
+def is_current(node_modules, key):
+    marker = read_marker(node_modules)
+    return key is not None and marker is not None and marker.get('key') == key
+
+
+def store_root():
+    """Depo dizini, kapalıysa None"""
+    if not _config('NODE_STORE_ENABLED', True):
+        return None
+    return _config('NODE_STORE_DIR', None)
+
+
+class NodeStore:
+    """node_modules dosyaları için reflink'li içerik adresli depo"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def object_path(self, file_hash):
+        return os.path.join(self.root, file_hash[:2], file_hash[2:])
+
+    def reflink_error(self, node_modules):
+        """
+        node_modules'tan depoya reflink yapılamıyorsa nedeni, yapılabiliyorsa None
+
+        Küçük bir dosyanın klonu ile denenir; sonuç depo kökü ve dosya sistemi
+        başına saklanır.
+        """
+        key = (self.root, os.stat(node_modules).st_dev)
+        if key in _reflink_state:
+            return _reflink_state[key]
+        error = None
+        fd, probe_path = tempfile.mkstemp(prefix=MARKER_NAME + '.probe-', dir=node_modules)
+        clone_fd, clone_path = tempfile.mkstemp(prefix='.probe-', dir=self.root)
+        os.close(clone_fd)
+        try:
+            os.write(fd, b'reflink probe\n')
+            os.close(fd)
+            clone_file(probe_path, clone_path)
+        except OSError as e:
+            if not _reflink_unsupported(e):
+                raise
+            error = f"reflink not supported ({e.strerror})"
+        finally:
+            os.remove(probe_path)
+            os.remove(clone_path)
+        _reflink_state[key] = error
+        return error
+
+    def _candidates(self, node_modules):
+        """Depoya alınacak normal dosyalar"""
+        for root, dirs, files in os.walk(node_modules):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in files:
+                if name.startswith(MARKER_NAME):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode) and st.st_size:
+                    yield path, st
+
+    def link_tree(self, node_modules, workers=None):
+        """
+        node_modules'taki dosyaları depoyla paylaştır
+
+        Depoda aynı içerik varsa dosya objenin reflink'i ile değiştirilir, yoksa
+        dosyanın reflink'i depoya eklenir. Reflink desteklenmiyorsa dosyalar
+        hiç hash'lenmez.
+
+        Returns:
+            dict: files, cloned, adopted, saved_bytes (dosya sistemi reflink
+            desteklemiyorsa 'error')
+        """
+        stats = {'files': 0, 'cloned': 0, 'adopted': 0, 'saved_bytes': 0}
+        candidates = dict(self._candidates(node_modules))
+        stats['files'] = len(candidates)
+        error = self.reflink_error(node_modules)
+        if error:
+            stats['error'] = error
+            stats['unshared'] = self._break_hardlinks(candidates)
+            return stats
+        hashes = hash_files(candidates.keys(), workers=workers)
+
+        for path, file_hash in hashes.items():
+            if not file_hash:
+                continue
+            st = candidates[path]
+            object_path = self.object_path(file_hash)
+            try:
+                if self._clone_existing(object_path, path, st):
+                    stats['cloned'] += 1
+                    stats['saved_bytes'] += st.st_size
+                    continue
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                # Paralel kurulum işleri aynı objeyi ekleyebilir: geçici dosya benzersizdir
+                fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(object_path) + '.', suffix='.tmp',
+                                                dir=os.path.dirname(object_path))
+                os.close(fd)
+                try:
+                    clone_file(path, tmp_path)
+                    os.chmod(tmp_path, 0o444)
+                    os.replace(tmp_path, object_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                stats['adopted'] += 1
+            except OSError as e:
+                if _reflink_unsupported(e):
+                    stats['error'] = f"reflink not supported ({e.strerror})"
+                    stats['unshared'] = self._break_hardlinks(candidates)
+                else:
+                    stats['error'] = str(e)
+                break
+        return stats
+
+    @staticmethod
+    def _break_hardlinks(candidates):
+        """Önceki sürümün hardlink'lediği dosyaları projeye özel kopyalarla değiştir"""
+        count = 0
+        for path, st in candidates.items():
+            if st.st_nlink < 2:
+                continue
+            tmp_path = f"{path}.vdsclone"
+            shutil.copy2(path, tmp_path)
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode) | stat.S_IWUSR)
+            os.replace(tmp_path, path)
+            count += 1
+        return count
+
+    @staticmethod
+    def _clone_existing(object_path, path, st):
+        """Depodaki objenin reflink'ini path'in yerine koy (mod korunur)"""
+        try:
+            if os.path.getsize(object_path) != st.st_size:
+                return False
+        except OSError:
+            return False
+        tmp_path = f"{path}.vdsclone"
+        try:
+            clone_file(object_path, tmp_path)
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        # Son kullanım zamanı (GC için)
+        os.utime(object_path)
+        return True
+
+    def collect_garbage(self, max_age=GC_MAX_AGE_SECONDS):
+        """
+        max_age saniyedir hiçbir kurulumda kullanılmayan objeleri sil
+
+        Returns:
+            (silinen obje sayısı, boşaltılan byte)
+        """
+        removed = 0
+        freed = 0
+        cutoff = time.time() - max_age
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for entry in os.scandir(prefix_dir):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    if st.st_mtime > cutoff:
+                        continue
+                    os.remove(entry.path)
+                    removed += 1
+                    freed += st.st_size
+                except OSError:
+                    continue
+        return removed, freed
+
+
+def share_node_modules(node_modules):
+    """
+    Kurulumdan sonra node_modules'u ortak depoya linkle ve kullanılmayan objeleri temizle
+
+    Returns:
+        dict: link_tree istatistikleri, depo kapalıysa None
+    """
+    root = store_root()
+    if not root or not os.path.isdir(node_modules):
+        return None
+    store = NodeStore(root)
+    stats = store.link_tree(node_modules, workers=_config('HASH_WORKERS', None))
+    stats['removed'], stats['freed_bytes'] = store.collect_garbage()
+    return stats
@@ -0,0 +1,317 @@
+"""
+Object Store - içerik adresli (SHA256) dosya deposu
+Versiyon yedekleri dosya kopyası yerine bu depodaki blob'lara işaret eden
+manifest'ler olarak saklanır; aynı içerik versiyonlar ve projeler arasında
+tek kez tutulur.
+
+Depo yapısı:
+    <root>/ab/cdef...   (hash'in ilk 2 karakteri dizin, kalanı dosya adı)
+
+Dosya sistemi destekliyorsa (btrfs, XFS) blob'lar ve geri yüklenen dosyalar
+FICLONE reflink ile oluşturulur (veri kopyalanmaz, copy-on-write). Destek
+aygıt bazında bir kez test edilir, desteklenmiyorsa normal kopyaya düşülür.
+Hardlink kullanılmaz: proje dosyası yerinde değiştirilirse blob da değişirdi.
+"""
+
+import os
+import json
+import time
+import hashlib
+import shutil
+import fnmatch
+import errno
+from file_hasher import hash_file, hash_files
+
+# Yedeklere alınmayacak dosya/dizinler (shutil.ignore_patterns ile aynı anlamda)
+BACKUP_IGNORE_PATTERNS = (
+    '__pycache__', '*.pyc', '*.pyo', '.git', 'venv', 'env', 'node_modules',
+    '*.log', '.DS_Store'
+)
+
+MANIFEST_FORMAT = 1
+COPY_BLOCK_SIZE = 1024 * 1024
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+# Önceki manifest'teki hash bu süreden yeni mtime'lı dosyalar için kullanılmaz
+# (snapshot sırasında aynı mtime tick'i içinde değişmiş olabilirler)
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+# Bu süreden yeni blob'lar temizlenmez (manifest'i henüz yazılmamış yedekler için)
+GC_GRACE_SECONDS = 3600
+
+
+def is_ignored(name, patterns=BACKUP_IGNORE_PATTERNS):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def clone_file(src_path, dst_path):
+    """
+    src_path'i dst_path'e reflink (FICLONE) ile kopyala
+
+    Raises:
+        OSError: Dosya sistemi reflink desteklemiyorsa
+    """
+    import fcntl
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _reflink_unsupported(error):
+    return error.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS)
+
+
+def is_manifest_backup(backup_path):
+    """backup_path bir manifest dosyası mı (eski yedekler dizindir)"""
+    return backup_path.endswith('.json') and os.path.isfile(backup_path)
+
+
+def read_manifest(manifest_path):
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(manifest_path, manifest):
+    """Manifest'i atomik olarak yaz (geçici dosya + os.replace)"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+class ObjectStore:
+    """İçerik adresli blob deposu"""
+
+    def __init__(self, root, use_reflink=True):
+        self.root = root
+        self.use_reflink = use_reflink
+        # st_dev -> reflink destekleniyor mu (ilk denemede belirlenir)
+        self._reflink_devices = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    def _can_reflink(self, src_path, dst_dir):
+        if not self.use_reflink:
+            return False
+        try:
+            src_dev = os.stat(src_path).st_dev
+            if src_dev != os.stat(dst_dir).st_dev:
+                return False
+        except OSError:
+            return False
+        return self._reflink_devices.get(src_dev, True)
+
+    def copy_file(self, src_path, dst_path):
+        """
+        Dosyayı reflink ile (destekleniyorsa), değilse normal kopya ile oluştur
+
+        Returns:
+            bool: Reflink kullanıldıysa True
+        """
+        dst_dir = os.path.dirname(dst_path)
+        if self._can_reflink(src_path, dst_dir):
+            try:
+                clone_file(src_path, dst_path)
+                self._reflink_devices[os.stat(dst_dir).st_dev] = True
+                return True
+            except OSError as e:
+                if not _reflink_unsupported(e):
+                    raise
+                self._reflink_devices[os.stat(dst_dir).st_dev] = False
+        shutil.copyfile(src_path, dst_path)
+        return False
+
+    def object_path(self, file_hash):
+        return os.path.join(self.root, file_hash[:2], file_hash[2:])
+
+    def has(self, file_hash):
+        return os.path.exists(self.object_path(file_hash))
+
+    def put(self, source_path, file_hash):
+        """
+        Dosyayı depoya ekle (zaten varsa kopyalanmaz)
+
+        Blob yazılırken hash yeniden doğrulanır; dosya hash'lendikten sonra
+        değiştiyse depoya yanlış içerik yazılmaz.
+
+        Returns:
+            str: Yeni blob yazıldıysa 'reflink' veya 'copy', zaten varsa None
+        """
+        object_path = self.object_path(file_hash)
+        if os.path.exists(object_path):
+            # GC'nin bu blob'u yeni bir yedek yazılırken silmemesi için
+            os.utime(object_path)
+            return None
+
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        tmp_path = f"{object_path}.{os.getpid()}.tmp"
+        try:
+            if self._can_reflink(source_path, os.path.dirname(object_path)) and \
+                    self.copy_file(source_path, tmp_path):
+                method = 'reflink'
+                # Klon veri yazmaz; doğrulama için sadece okunur
+                actual_hash = hash_file(tmp_path)
+            else:
+                method = 'copy'
+                sha256_hash = hashlib.sha256()
+                with open(source_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    for block in iter(lambda: src.read(COPY_BLOCK_SIZE), b''):
+                        sha256_hash.update(block)
+                        dst.write(block)
+                actual_hash = sha256_hash.hexdigest()
+            if actual_hash != file_hash:
+                raise IOError(f"Dosya yedeklenirken değişti: {source_path}")
+            os.chmod(tmp_path, 0o444)
+            os.replace(tmp_path, object_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return method
+
+    def snapshot(self, source_dir, workers=None, ignore=BACKUP_IGNORE_PATTERNS, previous=None):
+        """
+        Dizini depoya al ve manifest içeriğini döndür
+
+        Args:
+            previous: Aynı dizinin önceki manifest'i; (size, mtime_ns, inode) değişmeyen
+                      dosyaların hash'i yeniden hesaplanmaz, dosya okunmaz
+
+        Returns:
+            (manifest dict, stats dict {'files', 'logical_bytes', 'new_objects', 'new_bytes',
+                                        'reused', 'reflinked'})
+        """
+        snapshot_ns = time.time_ns()
+        previous_files = {}
+        if previous and previous.get('snapshot_ns'):
+            trusted_before = previous['snapshot_ns'] - RACY_WINDOW_NS
+            previous_files = {
+                path: info for path, info in previous.get('files', {}).items()
+                if info.get('mtime_ns') is not None and info['mtime_ns'] < trusted_before
+            }
+        files = {}
+        symlinks = {}
+        dirs = []
+        to_hash = {}
+
+        for root, dirnames, filenames in os.walk(source_dir):
+            dirnames[:] = [d for d in dirnames if not is_ignored(d, ignore)]
+            rel_root = os.path.relpath(root, source_dir)
+
+            for name in list(dirnames):
+                full_path = os.path.join(root, name)
+                if os.path.islink(full_path):
+                    # Dizin linkleri link olarak saklanır, içine girilmez
+                    symlinks[os.path.normpath(os.path.join(rel_root, name))] = os.readlink(full_path)
+                    dirnames.remove(name)
+
+            if rel_root != '.' and not filenames and not dirnames:
+                dirs.append(rel_root)
+
+            for name in filenames:
+                if is_ignored(name, ignore):
+                    continue
+                full_path = os.path.join(root, name)
+                rel_path = os.path.normpath(os.path.join(rel_root, name))
+                if os.path.islink(full_path):
+                    symlinks[rel_path] = os.readlink(full_path)
+                    continue
+                st = os.stat(full_path)
+                to_hash[full_path] = (rel_path, st)
+
+        stats = {'files': 0, 'logical_bytes': 0, 'new_objects': 0, 'new_bytes': 0,
+                 'reused': 0, 'reflinked': 0}
+
+        hashes = {}
+        for full_path, (rel_path, st) in to_hash.items():
+            old = previous_files.get(rel_path)
+            if old and (old['size'], old['mtime_ns'], old.get('inode')) == \
+                    (st.st_size, st.st_mtime_ns, st.st_ino) and self.has(old['hash']):
+                hashes[full_path] = old['hash']
+        stats['reused'] = len(hashes)
+        hashes.update(hash_files([p for p in to_hash if p not in hashes], workers=workers))
+
+        for full_path, (rel_path, st) in to_hash.items():
+            file_hash = hashes.get(full_path)
+            if not file_hash:
+                raise IOError(f"Dosya okunamadı: {rel_path}")
+            method = self.put(full_path, file_hash)
+            if method:
+                stats['new_objects'] += 1
+                stats['new_bytes'] += st.st_size
+                if method == 'reflink':
+                    stats['reflinked'] += 1
+            files[rel_path] = {
+                'hash': file_hash,
+                'size': st.st_size,
+                'mode': st.st_mode & 0o7777,
+                'mtime_ns': st.st_mtime_ns,
+                'inode': st.st_ino
+            }
+            stats['files'] += 1
+            stats['logical_bytes'] += st.st_size
+
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'snapshot_ns': snapshot_ns,
+            'files': files,
+            'symlinks': symlinks,
+            'dirs': dirs
+        }
+        return manifest, stats
+
+    def checkout(self, manifest, target_dir):
+        """Manifest'teki ağacı target_dir altında yeniden oluştur"""
+        os.makedirs(target_dir, exist_ok=True)
+
+        for rel_dir in manifest.get('dirs', []):
+            os.makedirs(os.path.join(target_dir, rel_dir), exist_ok=True)
+
+        for rel_path, info in manifest.get('files', {}).items():
+            dest = os.path.join(target_dir, rel_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            object_path = self.object_path(info['hash'])
+            if not os.path.exists(object_path):
+                raise IOError(f"Depoda blob bulunamadı: {rel_path} ({info['hash']})")
+            self.copy_file(object_path, dest)
+            os.chmod(dest, info.get('mode', 0o644))
+
+        for rel_path, link_target in manifest.get('symlinks', {}).items():
+            dest = os.path.join(target_dir, rel_path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.symlink(link_target, dest)
+
+    def iter_objects(self):
+        """Depodaki (hash, path, size) kayıtları"""
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(prefix_dir, name)
+                yield prefix + name, path, os.path.getsize(path)
+
+    def collect_garbage(self, live_hashes, grace_seconds=GC_GRACE_SECONDS):
+        """
+        Hiçbir manifest tarafından kullanılmayan blob'ları sil
+        (grace_seconds'tan yeni blob'lara dokunulmaz)
+
+        Returns:
+            (silinen blob sayısı, boşaltılan byte)
+        """
+        removed = 0
+        freed = 0
+        cutoff = time.time() - grace_seconds
+        for file_hash, path, size in list(self.iter_objects()):
+            if file_hash in live_hashes:
+                continue
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+                freed += size
+            except OSError:
+                continue
+        return removed, freed
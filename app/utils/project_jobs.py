@@ -0,0 +1,216 @@
+"""
+Proje işleri - job_runner üzerinde çalışan başlatma ve kurulum işleri
+
+start: gerekirse auto-setup, başlatma, başarısızlıkta bağımlılık ve entry point auto-fix
+setup: yükleme sonrası ortam kurulumu (venv/pip, npm), SSL, Nginx ve firewall
+"""
+
+import os
+import json
+import time
+from app import db
+from app.utils.job_runner import job_handler
+
+
+def _launch(ctx, project, env_vars, entry_point):
+    """Projeyi başlat; başarılıysa durumu kaydeder ve PID döner"""
+    from app.utils.system import generate_supervisor_config, start_options
+    from app.utils.reload_manager import record_launch
+    from app.utils.deployment_manager import set_app_should_run
+
+    pid = generate_supervisor_config(project.name, project.project_type, project.path, project.port,
+                                     env_vars, entry_point, **start_options(project))
+    if pid:
+        project.pid = pid
+        project.status = 'running'
+        record_launch(project)
+        db.session.commit()
+        # Update app state - mark as should run on restart
+        set_app_should_run(project.id, True)
+    return pid
+
+
+@job_handler('start')
+def start_project_job(ctx, project):
+    """Projeyi başlat (start_project route'unun uzun süren kısmı)"""
+    from app.utils.system import get_project_venv_python, auto_setup_project, open_firewall_port
+
+    if not os.path.exists(project.path):
+        return {'success': False, 'error': f'Project path no longer exists: {project.path}'}
+
+    # AUTO-SETUP: Check and fix project environment
+    venv_python = get_project_venv_python(project.path)
+    gunicorn_path = os.path.join(os.path.dirname(venv_python), 'gunicorn') if venv_python else None
+
+    # If venv missing or gunicorn missing, run auto-setup
+    if not venv_python or not os.path.exists(gunicorn_path):
+        ctx.progress('🔧 Auto-setup: Preparing project environment...')
+        success, message = auto_setup_project(project.path, project.name, progress_callback=ctx.callback)
+        if not success:
+            ctx.progress(f'Auto-setup failed: {message}', 'error')
+            ctx.progress('Please manually create venv and install dependencies', 'warning')
+            return {'success': False, 'error': f'Auto-setup failed: {message}'}
+        ctx.progress(f'✓ Auto-setup complete: {message}', 'success')
+    else:
+        ctx.progress('✓ Project environment ready', 'success')
+
+    # Parse environment variables
+    env_vars = {}
+    if project.env_vars:
+        try:
+            env_vars = json.loads(project.env_vars)
+        except ValueError:
+            pass
+
+    ctx.progress('🚀 Starting project...')
+    pid = _launch(ctx, project, env_vars, project.entry_point)
+    if pid:
+        if open_firewall_port(project.port):
+            ctx.progress(f'✓ Firewall: Port {project.port} opened', 'success')
+        ctx.progress(f'✓ Project {project.name} is now running (PID: {pid})', 'success')
+        ctx.progress(f'Access at: http://localhost:{project.port}')
+        return {'success': True, 'pid': pid}
+
+    # Startup failed - attempt auto-fix
+    ctx.progress('⚠ Initial startup failed. Attempting auto-fix...', 'warning')
+
+    # Wait a bit for error log to be written
+    time.sleep(1)
+
+    error_log_candidates = [
+        os.path.join(project.path, f"{project.name}.err.log"),
+        f"/var/log/{project.name}.err.log",
+    ]
+    error_log_path = next((c for c in error_log_candidates if os.path.exists(c)), error_log_candidates[0])
+
+    # PRIORITY 1: Check for missing dependencies (with retry loop for chain dependencies)
+    from app.utils.dependency_fix import auto_fix_dependencies
+
+    max_dependency_retries = 3
+    all_installed = []
+    for retry_count in range(1, max_dependency_retries + 1):
+        # Wait for fresh error log if this is a retry
+        if retry_count > 1:
+            time.sleep(1)
+
+        dep_success, dep_message, installed = auto_fix_dependencies(project.path, error_log_path)
+        if not (dep_success and installed):
+            # No more dependencies to fix
+            break
+
+        all_installed.extend(installed)
+        if retry_count == 1:
+            ctx.progress('🔧 Detected missing dependencies. Auto-fixing...')
+        else:
+            ctx.progress('🔧 Found more missing dependencies (chain dependencies)...')
+        ctx.progress(f'✓ Installed: {", ".join(installed)}', 'success')
+        ctx.progress(f'🔄 Retrying startup (attempt {retry_count}/{max_dependency_retries})...')
+
+        pid = _launch(ctx, project, env_vars, project.entry_point)
+        if pid:
+            if open_firewall_port(project.port):
+                ctx.progress(f'✓ Firewall: Port {project.port} opened', 'success')
+            packages = set(all_installed)
+            ctx.progress(f'✓✓ Project started successfully after installing {len(packages)} packages! (PID: {pid})', 'success')
+            ctx.progress(f'Packages: {", ".join(packages)}')
+            return {'success': True, 'pid': pid, 'installed': sorted(packages)}
+
+        if retry_count < max_dependency_retries:
+            ctx.progress('Still failing, checking for more missing dependencies...', 'warning')
+        else:
+            ctx.progress(f'Max retries ({max_dependency_retries}) reached. Checking entry point...', 'warning')
+
+    # PRIORITY 2: If dependencies OK or fix didn't work, check entry point
+    from app.utils.auto_fix import should_attempt_auto_fix, auto_fix_entry_point
+
+    if not should_attempt_auto_fix(error_log_path):
+        ctx.progress('Failed to start project. Check logs tab for details.', 'error')
+        return {'success': False, 'error': 'Failed to start project'}
+
+    ctx.progress('🔧 Checking entry point...')
+    venv_python = get_project_venv_python(project.path)
+    if not venv_python:
+        ctx.progress('Cannot auto-fix: No virtual environment found', 'error')
+        return {'success': False, 'error': 'No virtual environment found'}
+
+    success, new_entry_point, kind, message = auto_fix_entry_point(
+        project.name, project.path, project.project_type, project.port, venv_python
+    )
+    if not (success and new_entry_point):
+        ctx.progress(f'Auto-fix failed: {message}', 'error')
+        return {'success': False, 'error': message}
+
+    # Update entry point in database
+    project.entry_point = new_entry_point
+    # The sync worker cannot serve an ASGI app, and UvicornWorker cannot serve a WSGI one
+    worker_class = project.worker_class or 'sync'
+    if kind == 'asgi':
+        worker_class = 'uvicorn'
+    elif worker_class == 'uvicorn':
+        worker_class = 'sync'
+    switched = worker_class != (project.worker_class or 'sync')
+    project.worker_class = worker_class
+    db.session.commit()
+    ctx.progress(f'✓ {message}', 'success')
+    if switched:
+        ctx.progress(f'Switched worker class to {worker_class} ({kind.upper()} app)')
+    ctx.progress('🔄 Retrying startup with corrected entry point...')
+
+    pid = _launch(ctx, project, env_vars, new_entry_point)
+    if not pid:
+        ctx.progress('Entry point updated but startup still failed. Check logs.', 'error')
+        return {'success': False, 'error': 'Startup failed after entry point fix'}
+    ctx.progress(f'✓✓ Project started successfully (PID: {pid})', 'success')
+    ctx.progress(f'Updated entry point: {new_entry_point}')
+    return {'success': True, 'pid': pid, 'entry_point': new_entry_point, 'worker_class': worker_class}
+
+
+@job_handler('blue_green_settle')
+def blue_green_settle_job(ctx, project, blue_pid, green_pid, spare_port):
+    """Blue/green geçişini deploy isteğinin dışında tamamla (eski sürecin drain'i, kalıcı porta dönüş)"""
+    from app.utils.blue_green import settle_blue_green
+    return settle_blue_green(ctx, project, blue_pid, green_pid, spare_port)
+
+
+@job_handler('setup')
+def setup_project_job(ctx, project, package_json_changed=False, requirements_txt_changed=False,
+                      enable_ssl=False, ssl_email=None):
+    """Yüklenen projenin ortamını kur (upload_project'in uzun süren kısmı)"""
+    from app.utils.system import auto_setup_project, generate_nginx_config, reload_nginx, open_firewall_port
+
+    # AUTO-SETUP: Prepare project environment
+    ctx.progress('🔧 Setting up project environment...')
+    success, message = auto_setup_project(
+        project.path,
+        project.name,
+        package_json_changed=package_json_changed,
+        requirements_txt_changed=requirements_txt_changed,
+        progress_callback=ctx.callback
+    )
+    if success:
+        ctx.progress(f'✓ {message}', 'success')
+    else:
+        ctx.progress(f'⚠ Auto-setup warning: {message}', 'warning')
+
+    # Setup SSL if requested
+    if enable_ssl and project.domain and ssl_email:
+        from app.utils.ssl_manager import request_ssl_certificate, install_certbot
+        install_certbot()
+        if request_ssl_certificate(project.domain, ssl_email):
+            project.ssl_enabled = True
+            db.session.commit()
+            ctx.progress(f'SSL certificate obtained for {project.domain}', 'success')
+        else:
+            ctx.progress('SSL certificate request failed. You can try again later.', 'warning')
+
+    # Configure nginx if domain provided
+    if project.domain:
+        generate_nginx_config(project.name, project.domain, project.port, project.ssl_enabled)
+        reload_nginx()
+
+    # Open firewall port for direct access
+    if open_firewall_port(project.port):
+        ctx.progress(f'✓ Firewall: Port {project.port} opened', 'success')
+
+    ctx.progress(f'Project {project.name} is ready. Start it from the project page.', 'success')
+    return {'success': True, 'setup_ok': success, 'message': message}
@@ -0,0 +1,305 @@
+"""
+Graceful Reload - gunicorn projelerini süreç ağacını öldürmeden yeniden yükleme
+
+Proje başlatılırken başlatma imzası (entry point, port, env, venv, kurulu
+paketler) kaydedilir. Reload istendiğinde imza karşılaştırılır:
+
+    sadece uygulama kodu değişti  -> SIGHUP  (master aynı kalır, worker'lar yenilenir)
+    kurulu paketler değişti       -> SIGUSR2 (yeni master exec edilir, eski master kapatılır)
+    venv / entry point / env / port / worker ayarları değişti
+    veya süreç gunicorn değil     -> tam restart
+
+Reload'un başarısı worker PID'lerinin değişmesiyle (eski worker'ların hepsi
+çıktı, en az aynı sayıda yeni worker ayakta) takip edilir.
+"""
+
+import os
+import glob
+import json
+import time
+import signal
+import hashlib
+import psutil
+from flask import current_app
+from app import db
+from app.utils.worker_sizing import worker_signature, update_worker_rss
+from app.utils.system import (
+    generate_supervisor_config, get_project_venv_python, check_process_status, wait_for_ready,
+    readiness_options, start_options, pop_ready_time
+)
+
+# İmzada bu alanlardan biri değişirse reload yerine tam restart yapılır
+RESTART_KEYS = ('project_type', 'entry_point', 'port', 'env', 'venv', 'workers')
+
+POLL_INTERVAL = 0.25
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def _packages_digest(venv_dir):
+    """site-packages'daki dağıtımların (isim + versiyon) özeti"""
+    pattern = os.path.join(venv_dir, 'lib', 'python*', 'site-packages', '*.*-info')
+    names = sorted(os.path.basename(path) for path in glob.glob(pattern))
+    return _digest('\n'.join(names))
+
+
+def launch_signature(project):
+    """Projenin şu anki başlatma imzası (dict)"""
+    venv = None
+    packages = None
+    if project.project_type != 'nodejs':
+        python = get_project_venv_python(project.path)
+        if python:
+            venv_dir = os.path.dirname(os.path.dirname(python))
+            venv = {'python': os.path.realpath(python)}
+            try:
+                # venv yeniden oluşturulduysa pyvenv.cfg yeni bir dosyadır
+                st = os.stat(os.path.join(venv_dir, 'pyvenv.cfg'))
+                venv['cfg'] = [st.st_ino, st.st_mtime_ns]
+            except OSError:
+                pass
+            packages = _packages_digest(venv_dir)
+
+    return {
+        'project_type': project.project_type,
+        'entry_point': project.entry_point,
+        'port': project.port,
+        'env': _digest(project.env_vars or '{}'),
+        'venv': venv,
+        'packages': packages,
+        'workers': worker_signature(project)
+    }
+
+
+def record_launch(project):
+    """
+    Başarılı başlatma/reload sonrası imzayı ve (ölçüldüyse) hazır olma süresini kaydet
+    (commit çağırana aittir)
+    """
+    project.launch_signature = json.dumps(launch_signature(project))
+    ready_seconds = pop_ready_time(project.pid)
+    if ready_seconds is not None:
+        project.last_ready_seconds = ready_seconds
+
+
+def is_gunicorn_master(pid):
+    try:
+        cmdline = psutil.Process(pid).cmdline()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+    return any(os.path.basename(arg) == 'gunicorn' for arg in cmdline[:2])
+
+
+def worker_pids(master_pid, exclude=()):
+    """Master'ın doğrudan çocukları (gunicorn worker'ları)"""
+    try:
+        children = psutil.Process(master_pid).children()
+    except psutil.NoSuchProcess:
+        return set()
+    pids = set()
+    for child in children:
+        try:
+            if child.pid not in exclude and child.status() != psutil.STATUS_ZOMBIE:
+                pids.add(child.pid)
+        except psutil.NoSuchProcess:
+            pass
+    return pids
+
+
+def plan_reload(project):
+    """
+    Reload yöntemi seç
+
+    Returns:
+        (method, reason): method 'hup', 'usr2' veya 'restart'
+    """
+    if project.status != 'running' or not check_process_status(project.pid):
+        return 'restart', 'process is not running'
+    if project.project_type in ('nodejs', 'php') or not is_gunicorn_master(project.pid):
+        return 'restart', 'not a gunicorn process'
+    if not project.launch_signature:
+        return 'restart', 'launch configuration unknown'
+
+    previous = json.loads(project.launch_signature)
+    current = launch_signature(project)
+    for key in RESTART_KEYS:
+        if previous.get(key) != current[key]:
+            return 'restart', f'{key.replace("_", " ")} changed'
+    if previous.get('packages') != current['packages']:
+        return 'usr2', 'installed packages changed'
+    return 'hup', 'application code changed'
+
+
+def _wait_for_workers(master_pid, expected, timeout, old_workers=()):
+    """
+    Eski worker'ların hepsi çıkana ve en az expected yeni worker ayağa kalkana kadar bekle
+
+    Returns:
+        set: Yeni worker PID'leri, zaman aşımında veya master öldüyse None
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not check_process_status(master_pid):
+            return None
+        workers = worker_pids(master_pid)
+        if not workers & set(old_workers) and len(workers) >= expected:
+            return workers
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+def _wait_for_new_master(old_master, old_workers, timeout):
+    """
+    USR2 sonrası eski master'ın exec ettiği yeni master'ın PID'i
+
+    Worker'lar master ile aynı komut satırına sahip olduğundan yeni master,
+    eski worker olmayan ve kendi worker'larını başlatmış çocuktur.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for pid in worker_pids(old_master, exclude=old_workers):
+            if worker_pids(pid):
+                return pid
+        time.sleep(POLL_INTERVAL)
+    return None
+
+
+def _terminate(pids, timeout):
+    procs = []
+    for pid in pids:
+        try:
+            procs.append(psutil.Process(pid))
+        except psutil.NoSuchProcess:
+            pass
+    for p in procs:
+        try:
+            p.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    gone, alive = psutil.wait_procs(procs, timeout=timeout)
+    for p in alive:
+        try:
+            p.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+def _hup_reload(project, result, timeout, health_path):
+    master = project.pid
+    old_workers = worker_pids(master)
+    result['old_workers'] = sorted(old_workers)
+
+    os.kill(master, signal.SIGHUP)
+    new_workers = _wait_for_workers(master, max(len(old_workers), 1), timeout, old_workers=old_workers)
+    if new_workers is None:
+        result['error'] = 'workers were not replaced after SIGHUP'
+        return False
+    result['new_workers'] = sorted(new_workers)
+    if not wait_for_ready(project.port, timeout=timeout, health_path=health_path, pid=master):
+        result['error'] = 'app did not become ready after SIGHUP'
+        return False
+    return True
+
+
+def _usr2_reload(project, result, timeout, health_path, drain_timeout):
+    old_master = project.pid
+    old_workers = worker_pids(old_master)
+    result['old_workers'] = sorted(old_workers)
+
+    os.kill(old_master, signal.SIGUSR2)
+    new_master = _wait_for_new_master(old_master, old_workers, timeout)
+    new_workers = None
+    if new_master:
+        new_workers = _wait_for_workers(new_master, max(len(old_workers), 1), timeout)
+    if not new_workers:
+        # Eski master trafiği almaya devam eder
+        if new_master:
+            _terminate([new_master], 5)
+        result['error'] = 'new master did not boot after SIGUSR2; previous process kept running'
+        result['keep_running'] = True
+        return False
+    result['new_workers'] = sorted(new_workers)
+
+    # Eski master'ı kapat: worker'ları mevcut istekleri bitirip çıkar, yeni master ayakta kalır.
+    # PID önce güncellenir ki eski master'ın çıkışı crash sanılmasın.
+    project.pid = new_master
+    db.session.commit()
+    _terminate([old_master] + list(old_workers), drain_timeout)
+
+    if not wait_for_ready(project.port, timeout=timeout, health_path=health_path, pid=new_master):
+        result['error'] = 'app did not become ready after SIGUSR2'
+        return False
+    return True
+
+
+def full_restart(project):
+    """Süreç ağacını durdurup yeniden başlat; yeni PID veya None döner"""
+    from app.routes import stop_project_process
+    stop_project_process(project)
+
+    env_vars = json.loads(project.env_vars) if project.env_vars else {}
+    pid = generate_supervisor_config(
+        project.name,
+        project.project_type,
+        project.path,
+        project.port,
+        env_vars=env_vars,
+        entry_point=project.entry_point,
+        **start_options(project)
+    )
+    if pid:
+        project.pid = pid
+        project.status = 'running'
+        record_launch(project)
+        db.session.commit()
+    return pid
+
+
+def reload_project(project):
+    """
+    Projeyi mümkünse sinyal ile yeniden yükle, değilse tam restart yap
+
+    Returns:
+        dict: {'success', 'method', 'reason', 'pid', 'old_workers', 'new_workers',
+               'elapsed', 'error', 'fallback_from'}
+    """
+    config = current_app.config
+    timeout = config.get('GRACEFUL_RELOAD_TIMEOUT', 60)
+    health_path = readiness_options(project)['health_path']
+    drain_timeout = config.get('DEPLOY_DRAIN_TIMEOUT', 30)
+
+    start = time.monotonic()
+    # Eski worker'lar sıcakken ölç (auto worker sayısı bu ölçümü kullanır)
+    update_worker_rss(project)
+    method, reason = plan_reload(project)
+    result = {'method': method, 'reason': reason, 'old_workers': [], 'new_workers': []}
+    print(f"[RELOAD] {project.name}: {method} ({reason})")
+
+    success = False
+    if method != 'restart':
+        try:
+            if method == 'hup':
+                success = _hup_reload(project, result, timeout, health_path)
+            else:
+                success = _usr2_reload(project, result, timeout, health_path, drain_timeout)
+        except (OSError, psutil.Error) as e:
+            result['error'] = str(e)
+        if success:
+            record_launch(project)
+            db.session.commit()
+        elif not result.pop('keep_running', False):
+            print(f"[RELOAD] {project.name}: {result['error']}, falling back to full restart")
+            result['fallback_from'] = method
+            method = result['method'] = 'restart'
+
+    if method == 'restart':
+        success = bool(full_restart(project))
+        if not success:
+            result['error'] = 'Failed to restart'
+
+    result['success'] = success
+    result['pid'] = project.pid
+    result['elapsed'] = round(time.monotonic() - start, 2)
+    return result
@@ -0,0 +1,59 @@
+"""
+Sıkıştırılmış istek gövdeleri (Content-Encoding: gzip / zstd)
+
+Upload ve deployment istekleri sıkıştırılmış gönderilebilir; gövde uygulama
+tarafından okunurken parça parça açılır (tamamı belleğe alınmaz).
+Açılan veriye MAX_CONTENT_LENGTH uygulanır; aşılırsa 413 döner.
+"""
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import LimitedStream, get_content_length
+from file_compressor import DecompressingReader, supported_encodings
+
+
+class _LimitedDecompressingReader(DecompressingReader):
+    """Açılmış veri max_length'i aşınca RequestEntityTooLarge fırlatan okuyucu"""
+
+    def __init__(self, fileobj, encoding, max_length):
+        super().__init__(fileobj, encoding)
+        self.max_length = max_length
+
+    def _fill(self):
+        super()._fill()
+        if self._total > self.max_length:
+            raise RequestEntityTooLarge(f'Decompressed request body exceeds {self.max_length} bytes')
+
+
+class DecompressRequestMiddleware:
+    """Content-Encoding başlıklı istek gövdelerini açan WSGI middleware"""
+
+    def __init__(self, wsgi_app, max_content_length=None):
+        self.wsgi_app = wsgi_app
+        self.max_content_length = max_content_length
+
+    def __call__(self, environ, start_response):
+        encoding = environ.get('HTTP_CONTENT_ENCODING', '').strip().lower()
+        if not encoding or encoding == 'identity':
+            return self.wsgi_app(environ, start_response)
+
+        if encoding not in supported_encodings():
+            start_response('415 Unsupported Media Type', [
+                ('Content-Type', 'text/plain'),
+                ('Accept-Encoding', ', '.join(supported_encodings()))
+            ])
+            return [f'Unsupported Content-Encoding: {encoding}'.encode('utf-8')]
+
+        stream = environ['wsgi.input']
+        content_length = get_content_length(environ)
+        if content_length is not None:
+            stream = LimitedStream(stream, content_length)
+
+        if self.max_content_length is None:
+            environ['wsgi.input'] = DecompressingReader(stream, encoding)
+        else:
+            environ['wsgi.input'] = _LimitedDecompressingReader(stream, encoding, self.max_content_length)
+        # Açılmış boyut bilinmiyor; uzunluk okunurken MAX_CONTENT_LENGTH ile kontrol edilir
+        environ['wsgi.input_terminated'] = True
+        environ.pop('CONTENT_LENGTH', None)
+        environ.pop('HTTP_CONTENT_ENCODING', None)
+        return self.wsgi_app(environ, start_response)
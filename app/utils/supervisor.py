@@ -0,0 +1,298 @@
+"""
+Process Supervisor - çöken uygulamaları otomatik yeniden başlatır
+
+Panel içinde tek bir arka plan thread'i olarak çalışır (gunicorn worker'larından
+sadece dosya kilidini alan çalıştırır, o worker ölürse kilidi bir diğeri alır).
+
+- Çalışan projelerin PID'leri pidfd (Linux 5.3+) ile izlenir; süreç çıktığında
+  çekirdek haber verir, polling yapılmaz. pidfd yoksa senkronizasyon aralığında
+  süreç kontrol edilir. Panelin kendi başlattığı süreçler waitpid ile toplanır.
+- Çıkış, EXIT_GRACE_SECONDS sonra değerlendirilir: bu sürede proje durdurulduysa
+  ('stopped') veya yeni bir PID aldıysa (restart, reload, blue/green) çıkış
+  bilinçlidir, aksi halde crash sayılır.
+- Crash'ler üstel bekleme ile yeniden başlatılır; kısa sürede çok fazla crash
+  olursa proje 'crash_loop' durumuna alınır ve elle başlatılana kadar bekler.
+- AppState.auto_restart kapalıysa proje sadece 'crashed' olarak işaretlenir.
+- Worker başına RSS periyodik ölçülür (auto worker sayısı bunu kullanır).
+- Çalışan projelerin logları boyut/süre sınırını aşınca döndürülür (log_manager).
+"""
+
+import os
+import time
+import fcntl
+import selectors
+import threading
+import traceback
+from collections import deque
+from app import db
+from app.models import Project
+from app.utils.system import check_process_status
+
+EXIT_GRACE_SECONDS = 5
+BACKOFF_BASE_SECONDS = 1
+BACKOFF_MAX_SECONDS = 60
+# CRASH_LOOP_WINDOW saniye içinde CRASH_LOOP_LIMIT crash -> crash_loop
+CRASH_LOOP_WINDOW = 300
+CRASH_LOOP_LIMIT = 5
+# Bu süreden uzun çalışmış bir süreç çökerse crash geçmişi sıfırlanır
+STABLE_SECONDS = 60
+# Worker RSS örnekleme aralığı (auto worker sayısı için)
+RSS_SAMPLE_INTERVAL = 300
+# Log rotasyonu kontrol aralığı
+LOG_ROTATE_CHECK_INTERVAL = 60
+
+
+def open_pidfd(pid):
+    """
+    Süreç için pidfd aç
+
+    Returns:
+        int: pidfd, çekirdek/Python desteklemiyorsa None
+
+    Raises:
+        ProcessLookupError: Süreç zaten yoksa
+    """
+    if not hasattr(os, 'pidfd_open'):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:
+        return None
+
+
+def reap(pid):
+    """Panelin çocuğu olan süreci topla (zombie kalmasın); çıkış kodu veya None"""
+    try:
+        waited_pid, status = os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        return None
+    if waited_pid == 0:
+        return None
+    return os.waitstatus_to_exitcode(status)
+
+
+def backoff_delay(crash_count):
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(crash_count - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+class ProcessSupervisor:
+    """Çalışan projeleri izleyen ve çökenleri yeniden başlatan döngü"""
+
+    def __init__(self, app):
+        self.app = app
+        self.sync_interval = app.config.get('SUPERVISOR_SYNC_INTERVAL', 5)
+        self.exit_grace = EXIT_GRACE_SECONDS
+        self.selector = selectors.DefaultSelector()
+        self.watches = {}   # project_id -> {'pid', 'fd', 'since'}
+        self.exited = {}    # project_id -> {'pid', 'exit_code', 'at', 'lifetime'}
+        self.crashes = {}   # project_id -> deque(crash zamanları)
+        self.pending = {}   # project_id -> yeniden başlatma zamanı (monotonic)
+        self._last_rss_sample = 0
+        self._last_log_check = 0
+        self._stop = threading.Event()
+
+    # --- İzleme ---
+
+    def watch(self, project_id, pid):
+        self.unwatch(project_id)
+        now = time.monotonic()
+        try:
+            fd = open_pidfd(pid)
+        except ProcessLookupError:
+            self.exited[project_id] = {'pid': pid, 'exit_code': reap(pid), 'at': now, 'lifetime': None}
+            return
+        self.watches[project_id] = {'pid': pid, 'fd': fd, 'since': now}
+        if fd is not None:
+            self.selector.register(fd, selectors.EVENT_READ, project_id)
+
+    def unwatch(self, project_id):
+        watch = self.watches.pop(project_id, None)
+        if watch and watch['fd'] is not None:
+            self.selector.unregister(watch['fd'])
+            os.close(watch['fd'])
+
+    def _on_exit(self, project_id):
+        watch = self.watches.get(project_id)
+        if not watch:
+            return
+        self.unwatch(project_id)
+        now = time.monotonic()
+        self.exited[project_id] = {
+            'pid': watch['pid'],
+            'exit_code': reap(watch['pid']),
+            'at': now,
+            'lifetime': now - watch['since']
+        }
+
+    def sync(self):
+        """Veritabanındaki çalışan projelerle izlenen PID'leri eşitle"""
+        running = {
+            p.id: p.pid for p in Project.query.filter_by(status='running').all() if p.pid
+        }
+        for project_id, watch in list(self.watches.items()):
+            if running.get(project_id) != watch['pid']:
+                # Durduruldu veya yeni PID ile başlatıldı; eski PID artık yönetilmiyor
+                self.unwatch(project_id)
+
+        for project_id, pid in running.items():
+            # Bekleme sırasında elle başlatıldıysa planlanan restart iptal
+            self.pending.pop(project_id, None)
+            if project_id not in self.watches and project_id not in self.exited:
+                self.watch(project_id, pid)
+
+        # pidfd desteklenmiyorsa süreçleri burada kontrol et
+        for project_id, watch in list(self.watches.items()):
+            if watch['fd'] is None:
+                exit_code = reap(watch['pid'])
+                if exit_code is not None or not check_process_status(watch['pid']):
+                    self._on_exit(project_id)
+                    if exit_code is not None:
+                        self.exited[project_id]['exit_code'] = exit_code
+
+    # --- Crash yönetimi ---
+
+    def _check_exited(self):
+        now = time.monotonic()
+        for project_id, info in list(self.exited.items()):
+            if now - info['at'] < self.exit_grace:
+                continue
+            del self.exited[project_id]
+            project = db.session.get(Project, project_id)
+            if project is None or project.status == 'stopped':
+                continue
+            if project.pid and project.pid != info['pid']:
+                continue
+            self._handle_crash(project, info['exit_code'], info['lifetime'])
+
+    def _handle_crash(self, project, exit_code, lifetime):
+        from app.utils.deployment_manager import get_or_create_app_state
+
+        now = time.monotonic()
+        history = self.crashes.setdefault(project.id, deque())
+        if lifetime is not None and lifetime >= STABLE_SECONDS:
+            history.clear()
+        history.append(now)
+        while history and now - history[0] > CRASH_LOOP_WINDOW:
+            history.popleft()
+
+        project.pid = None
+        state = get_or_create_app_state(project.id)
+        if not state.auto_restart:
+            project.status = 'crashed'
+            print(f"[SUPERVISOR] {project.name} exited (code {exit_code}); auto-restart disabled")
+        elif len(history) >= CRASH_LOOP_LIMIT:
+            project.status = 'crash_loop'
+            print(f"[SUPERVISOR] {project.name} crashed {len(history)} times in "
+                  f"{CRASH_LOOP_WINDOW}s; giving up until it is started manually")
+        else:
+            delay = backoff_delay(len(history))
+            project.status = 'crashed'
+            self.pending[project.id] = now + delay
+            print(f"[SUPERVISOR] {project.name} exited (code {exit_code}); restarting in {delay}s")
+        db.session.commit()
+
+    def _restart_due(self):
+        from app.utils.reload_manager import full_restart
+
+        now = time.monotonic()
+        for project_id, due in list(self.pending.items()):
+            if due > now:
+                continue
+            del self.pending[project_id]
+            project = db.session.get(Project, project_id)
+            if project is None or project.status != 'crashed':
+                continue
+            pid = full_restart(project)
+            if pid:
+                print(f"[SUPERVISOR] {project.name} restarted (PID: {pid})")
+                self.watch(project.id, pid)
+            else:
+                # Başlatılamaması da crash sayılır (backoff devam eder)
+                self._handle_crash(project, None, 0)
+
+    # --- Döngü ---
+
+    def _next_timeout(self):
+        deadlines = list(self.pending.values())
+        deadlines += [info['at'] + self.exit_grace for info in self.exited.values()]
+        timeout = self.sync_interval
+        if deadlines:
+            timeout = min(timeout, min(deadlines) - time.monotonic())
+        return max(timeout, 0)
+
+    def run_once(self, timeout=None):
+        timeout = self._next_timeout() if timeout is None else timeout
+        if self.selector.get_map():
+            for key, _ in self.selector.select(timeout):
+                self._on_exit(key.data)
+        elif timeout:
+            self._stop.wait(timeout)
+
+        with self.app.app_context():
+            self._check_exited()
+            self._restart_due()
+            self.sync()
+            if time.monotonic() - self._last_rss_sample >= RSS_SAMPLE_INTERVAL:
+                self.sample_worker_rss()
+            if time.monotonic() - self._last_log_check >= LOG_ROTATE_CHECK_INTERVAL:
+                self.rotate_logs()
+
+    def sample_worker_rss(self):
+        """İzlenen projelerin worker başına RSS ölçümünü güncelle"""
+        from app.utils.worker_sizing import update_worker_rss
+
+        self._last_rss_sample = time.monotonic()
+        for project_id in self.watches:
+            project = db.session.get(Project, project_id)
+            if project:
+                update_worker_rss(project)
+        db.session.commit()
+
+    def rotate_logs(self):
+        """Sınırı aşan logları döndür (gunicorn: taşı + SIGUSR1, diğerleri: copy-truncate)"""
+        from app.utils.log_manager import rotate_running_logs
+
+        self._last_log_check = time.monotonic()
+        for project_id in self.watches:
+            project = db.session.get(Project, project_id)
+            if project:
+                for path in rotate_running_logs(project, self.app.config):
+                    print(f"[SUPERVISOR] Rotated {path}")
+
+    def run(self):
+        print(f"[SUPERVISOR] Started in PID {os.getpid()}")
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                traceback.print_exc()
+                with self.app.app_context():
+                    db.session.rollback()
+                self._stop.wait(self.sync_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_supervisor(app):
+    """
+    Supervisor'ı arka plan thread'inde başlat
+
+    Kilit dosyası sayesinde birden fazla panel süreci (gunicorn worker'ları)
+    olsa da tek bir supervisor aktif olur; diğerleri kilidi bekler.
+    """
+    if app.testing or not app.config.get('PROCESS_SUPERVISOR'):
+        return None
+    lock_path = app.config['SUPERVISOR_LOCK_FILE']
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+
+    def run():
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            ProcessSupervisor(app).run()
+
+    thread = threading.Thread(target=run, name='process-supervisor', daemon=True)
+    thread.start()
+    return thread
@@ -2,6 +2,19 @@ import os
 import subprocess
 import sys
 import shlex
+import time
+import socket
+import http.client
+import psutil
+
+# Readiness probing: backoff between probes grows from READY_POLL_MIN to READY_POLL_MAX
+DEFAULT_READY_TIMEOUT = 60
+READY_POLL_MIN = 0.05
+READY_POLL_MAX = 1.0
+READY_PROBE_TIMEOUT = 5
+
+# PID -> seconds until the app was ready (read by record_launch)
+_ready_times = {}
 
 def is_linux():
     return os.name == 'posix' and os.uname().sysname == 'Linux'
@@ -102,9 +115,14 @@ def open_firewall_port(port):
         print(f"[FIREWALL] [MOCK] Would open port {port}")
         return True
 
-def start_local_process(project_name, command, directory, env_vars=None):
+def start_local_process(project_name, command, directory, env_vars=None, port=None, ready_timeout=None, health_path=None, cgroup=None, instance=None):
     """
     Starts a local process for development (when not using Supervisor).
+    If port is given, returns as soon as the app answers HTTP on it (see wait_for_ready);
+    a process that is not serving within ready_timeout is stopped and treated as failed.
+    With cgroup limits (see app.utils.cgroups) the process runs in the project's cgroup v2.
+    A named instance (e.g. the temporary blue/green instance) gets its own log files and
+    cgroup, see instance_name.
     Returns PID if successful, None otherwise.
     """
     import subprocess
@@ -116,12 +134,15 @@ def start_local_process(project_name, command, directory, env_vars=None):
         env.update(env_vars)
     
     # Open log files first
-    stdout_log_path = os.path.join(directory, f"{project_name}.out.log")
-    stderr_log_path = os.path.join(directory, f"{project_name}.err.log")
+    name = instance_name(project_name, instance)
+    stdout_log_path = os.path.join(directory, f"{name}.out.log")
+    stderr_log_path = os.path.join(directory, f"{name}.err.log")
     
     try:
-        stdout_log = open(stdout_log_path, "w", buffering=1)  # Line buffered
-        stderr_log = open(stderr_log_path, "w", buffering=1)
+        # Previous run is kept as <log>.1 (auto-fix and crash diagnosis read it)
+        from app.utils.log_manager import start_log
+        stdout_log = start_log(stdout_log_path)  # Line buffered
+        stderr_log = start_log(stderr_log_path)
         
         # Write startup info
         stderr_log.write(f"=== Starting {project_name} ===\n")
@@ -147,6 +168,14 @@ def start_local_process(project_name, command, directory, env_vars=None):
             print(f"[START] {error_msg}")
             return None
         
+        # Place the process in the project's cgroup before exec (workers inherit it)
+        from app.utils.cgroups import prepare_project_cgroup, wrap_command
+        cgroup_path = prepare_project_cgroup(name, cgroup)
+        if cgroup_path:
+            stderr_log.write(f"cgroup: {cgroup_path}\n\n")
+            stderr_log.flush()
+        args = wrap_command(args, cgroup_path)
+        
         # Start process
         process = subprocess.Popen(
             args,
@@ -159,40 +188,46 @@ def start_local_process(project_name, command, directory, env_vars=None):
         
         print(f"[START] ✓ Process started with PID: {process.pid}")
         
-        # Wait a bit to see if it crashes immediately
-        time.sleep(0.5)
+        # Wait until the workers actually serve requests (or the process dies)
+        print(f"[START] Waiting for workers to boot...")
+        started = time.monotonic()
+        ready_timeout = ready_timeout or DEFAULT_READY_TIMEOUT
+        if port:
+            ready = wait_for_ready(port, timeout=ready_timeout, health_path=health_path,
+                                   process=process, require_http=True)
+        else:
+            time.sleep(0.5)
+            ready = process.poll() is None
         poll_result = process.poll()
         
         if poll_result is not None:
-            # Process already died
-            print(f"[START] ✗ Process died immediately (exit code: {poll_result})")
-            stderr_log.write(f"\n\nERROR: Process died immediately (exit code: {poll_result})\n")
-            stderr_log.write("Check the error output above for details.\n")
+            # Process died (import error, worker boot failure, ...)
+            print(f"[START] ✗ Process died with exit code {poll_result} (workers failed to boot)")
+            stderr_log.write(f"\n\nERROR: Process died with exit code {poll_result} (likely worker boot failure)\n")
+            stderr_log.write("Check the error output above for worker errors.\n")
             stderr_log.close()
             stdout_log.close()
             return None
         
-        # For gunicorn, wait a bit longer to check if workers boot successfully
-        print(f"[START] Waiting for workers to boot...")
-        time.sleep(3)
-        poll_result = process.poll()
-        
-        if poll_result is not None:
-            # Process died after workers failed
-            print(f"[START] ✗ Process died after {poll_result} (workers failed to boot)")
-            stderr_log.write(f"\n\nERROR: Process died with exit code {poll_result} (likely worker boot failure)\n")
-            stderr_log.write("Check the error output above for worker errors.\n")
+        if not ready:
+            # Still running but not serving: fail loudly instead of reporting a broken start
+            stop_process_group(process)
+            print(f"[START] ✗ Process did not become ready within {ready_timeout}s")
+            stderr_log.write(f"\n\nERROR: App did not answer on port {port}"
+                             f"{' ' + health_path if health_path else ''} within {ready_timeout}s, process stopped\n")
             stderr_log.close()
             stdout_log.close()
             return None
         
-        print(f"[START] ✓ Process and workers running successfully")
+        elapsed = time.monotonic() - started
+        _ready_times[process.pid] = round(elapsed, 3)
+        print(f"[START] ✓ Process and workers running successfully (ready in {elapsed:.2f}s)")
         return process.pid
         
     except FileNotFoundError as e:
         error_msg = f"ERROR: Command not found: {e}\n"
         try:
-            with open(stderr_log_path, "w") as f:
+            with open(stderr_log_path, "a") as f:
                 f.write(error_msg)
                 f.write(f"\nCommand: {command}\n")
                 f.write(f"Working directory: {directory}\n")
@@ -208,7 +243,7 @@ def start_local_process(project_name, command, directory, env_vars=None):
     except Exception as e:
         error_msg = f"ERROR: Failed to start process: {e}\n"
         try:
-            with open(stderr_log_path, "w") as f:
+            with open(stderr_log_path, "a") as f:
                 f.write(error_msg)
                 import traceback
                 f.write("\nFull traceback:\n")
@@ -406,7 +441,8 @@ def auto_setup_nodejs_project(project_path, project_name, package_json_changed=F
     Args:
         project_path: Path to the project
         project_name: Name of the project
-        package_json_changed: If True, runs incremental update (npm prune + npm install)
+        package_json_changed: Kept for callers; the lockfile-hash marker in node_modules decides whether
+            npm runs (a node_modules without a marker is reinstalled once, then marked)
         progress_callback: Optional callback function for progress updates - progress_callback(step, message)
     
     Returns (success, message)
@@ -446,79 +482,95 @@ def auto_setup_nodejs_project(project_path, project_name, package_json_changed=F
     env = os.environ.copy()
     env['PATH'] = f"{node_dir}:/usr/local/bin:/usr/bin:/bin:{env.get('PATH', '')}"
     
-    # Check if node_modules exists
-    node_modules = os.path.join(project_path, 'node_modules')
+    def run_npm(args, timeout):
+        return subprocess.run(
+            [npm_path] + args,
+            cwd=project_path,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            env=env
+        )
     
-    if not os.path.exists(node_modules):
-        # Fresh install
-        report_progress("npm_install", "Installing dependencies (npm install)...")
+    # Dependency key: node version + package.json dependencies + lockfile
+    from app.utils import node_store
+    node_modules = os.path.join(project_path, 'node_modules')
+    node_version = node_store.node_version(node_path)
+    deps_key = node_store.dependency_key(project_path, node_version)
+    lockfile = node_store.find_lockfile(project_path)
+    marker_source = None
+    
+    if os.path.exists(node_modules) and node_store.is_current(node_modules, deps_key):
+        report_progress("skip", "✓ Dependencies unchanged (lockfile hash matches), skipping npm")
+    elif lockfile:
+        # Clean, reproducible install from the lockfile
+        report_progress("npm_ci", f"Installing dependencies from {os.path.basename(lockfile)} (npm ci)...")
         try:
-            result = subprocess.run(
-                [npm_path, 'install'],
-                cwd=project_path,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                env=env
-            )
+            result = run_npm(['ci'], 300)
             if result.returncode != 0:
-                print(f"[AUTO-SETUP-NODEJS] npm install stderr: {result.stderr}")
-                return False, f"npm install failed: {result.stderr[:500]}"
+                # Lockfile out of sync with package.json: let npm install update it
+                print(f"[AUTO-SETUP-NODEJS] npm ci stderr: {result.stderr}")
+                report_progress("npm_install", "npm ci failed (lockfile out of sync?), falling back to npm install...")
+                result = run_npm(['install'], 300)
+                if result.returncode != 0:
+                    print(f"[AUTO-SETUP-NODEJS] npm install stderr: {result.stderr}")
+                    return False, f"npm install failed: {result.stderr[:500]}"
+            marker_source = 'npm'
             report_progress("npm_done", "✓ Dependencies installed")
         except subprocess.TimeoutExpired:
             return False, "npm install timed out (>5 min)"
         except Exception as e:
             return False, f"npm install error: {str(e)}"
-    elif package_json_changed:
-        # Incremental update: prune unused + install new
-        report_progress("npm_prune", "Removing unused packages (npm prune)...")
-        try:
-            result = subprocess.run(
-                [npm_path, 'prune'],
-                cwd=project_path,
-                capture_output=True,
-                text=True,
-                timeout=120,
-                env=env
-            )
-            if result.returncode != 0:
-                print(f"[AUTO-SETUP-NODEJS] npm prune stderr: {result.stderr}")
-            else:
-                # Parse prune output to show what was removed
-                if result.stdout.strip():
-                    report_progress("npm_prune_done", f"Pruned: {result.stdout.strip()[:200]}")
+    else:
+        if os.path.exists(node_modules):
+            # Incremental update: prune unused + install new
+            report_progress("npm_prune", "Removing unused packages (npm prune)...")
+            try:
+                result = run_npm(['prune'], 120)
+                if result.returncode != 0:
+                    print(f"[AUTO-SETUP-NODEJS] npm prune stderr: {result.stderr}")
                 else:
-                    report_progress("npm_prune_done", "✓ No unused packages to remove")
-        except Exception as e:
-            print(f"[AUTO-SETUP-NODEJS] npm prune error (non-fatal): {e}")
+                    # Parse prune output to show what was removed
+                    if result.stdout.strip():
+                        report_progress("npm_prune_done", f"Pruned: {result.stdout.strip()[:200]}")
+                    else:
+                        report_progress("npm_prune_done", "✓ No unused packages to remove")
+            except Exception as e:
+                print(f"[AUTO-SETUP-NODEJS] npm prune error (non-fatal): {e}")
         
-        report_progress("npm_install", "Installing/updating packages (npm install)...")
+        report_progress("npm_install", "Installing dependencies (npm install)...")
         try:
-            result = subprocess.run(
-                [npm_path, 'install'],
-                cwd=project_path,
-                capture_output=True,
-                text=True,
-                timeout=300,
-                env=env
-            )
+            result = run_npm(['install'], 300)
             if result.returncode != 0:
                 print(f"[AUTO-SETUP-NODEJS] npm install stderr: {result.stderr}")
                 return False, f"npm install failed: {result.stderr[:500]}"
+            marker_source = 'npm'
             
             # Parse output to show what changed
-            added = result.stdout.count('added')
-            updated = result.stdout.count('updated')
             if 'up to date' in result.stdout:
                 report_progress("npm_done", "✓ All packages up to date")
             else:
+                added = result.stdout.count('added')
+                updated = result.stdout.count('updated')
                 report_progress("npm_done", f"✓ Packages updated (added: {added}, updated: {updated})")
         except subprocess.TimeoutExpired:
             return False, "npm install timed out (>5 min)"
         except Exception as e:
             return False, f"npm install error: {str(e)}"
-    else:
-        report_progress("skip", "✓ node_modules already exists, no changes needed")
+    
+    if marker_source:
+        # npm install may have written a new lockfile: key the marker on the final state
+        node_store.write_marker(node_modules, node_store.dependency_key(project_path, node_version),
+                                marker_source, node=node_version)
+        try:
+            stats = node_store.share_node_modules(node_modules)
+            if stats and stats.get('cloned'):
+                report_progress("npm_store", f"✓ Shared package store: {stats['cloned']} files reflinked "
+                                             f"({stats['saved_bytes'] // (1024 * 1024)} MB saved)")
+            if stats and stats.get('error'):
+                print(f"[AUTO-SETUP-NODEJS] Package store skipped: {stats['error']}")
+        except OSError as e:
+            print(f"[AUTO-SETUP-NODEJS] Package store error (non-fatal): {e}")
     
     # Check if project needs build (TypeScript, Next.js, NestJS, etc.)
     import json
@@ -542,7 +594,8 @@ def auto_setup_nodejs_project(project_path, project_name, package_json_changed=F
             
             # Determine if build is needed
             if 'next' in str(scripts.get('build', '')).lower() or 'next' in str(pkg_data.get('dependencies', {})):
-                needs_build = not os.path.exists(next_path)
+                # Built by start_nodejs_process through the source-hash keyed build cache (next_build)
+                needs_build = False
             elif os.path.exists(os.path.join(project_path, 'backend')) and os.path.exists(os.path.join(project_path, 'frontend')):
                 # Monorepo - check both
                 needs_build = not os.path.exists(backend_dist) or not os.path.exists(frontend_next)
@@ -585,9 +638,9 @@ def auto_setup_nodejs_project(project_path, project_name, package_json_changed=F
     print(f"[AUTO-SETUP-NODEJS] Setup complete!")
     return True, "Node.js project setup completed successfully"
 
-def start_nodejs_process(project_name, project_path, port, env_vars=None, start_script='start'):
+def start_nodejs_process(project_name, project_path, port, env_vars=None, start_script='start', ready_timeout=None, health_path=None, cgroup=None):
     """
-    Starts a Node.js process.
+    Starts a Node.js process and waits until it answers HTTP on the port.
     Returns PID if successful, None otherwise.
     Automatically builds Next.js projects if .next folder is missing.
     """
@@ -621,7 +674,7 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
     frontend_package_json = os.path.join(project_path, 'frontend', 'package.json')
     
     def run_nextjs_build(build_path, pkg_json_path, build_cwd):
-        """Helper to run Next.js build if .next folder is missing"""
+        """Helper to make sure the Next.js build in build_cwd matches its source (next_build cache)"""
         if not os.path.exists(pkg_json_path):
             return True  # No package.json, skip
         
@@ -640,48 +693,54 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
                 'next start' in str(scripts.get('start', '')) or
                 'next dev' in str(scripts.get('dev', ''))
             )
+            if not is_nextjs:
+                return True
             
-            if is_nextjs and not os.path.exists(build_path):
-                print(f"[START-NODEJS] ⚠ Next.js project detected but .next folder missing at {build_path}")
+            def build():
                 print(f"[START-NODEJS] Running npm run build in {build_cwd}...")
-                
-                if 'build' in scripts:
-                    try:
-                        build_result = subprocess.run(
-                            [npm_path, 'run', 'build'],
-                            cwd=build_cwd,
-                            capture_output=True,
-                            text=True,
-                            timeout=600,  # 10 min timeout
-                            env=env
-                        )
-                        
-                        if build_result.returncode != 0:
-                            print(f"[START-NODEJS] ✗ Build failed: {build_result.stderr[-500:]}")
-                            # Write error to log file
-                            stderr_log_path = os.path.join(project_path, f"{project_name}.err.log")
-                            with open(stderr_log_path, 'w') as f:
-                                f.write(f"=== Build Failed ===\n")
-                                f.write(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                                f.write(f"Build directory: {build_cwd}\n")
-                                f.write(f"Exit code: {build_result.returncode}\n\n")
-                                f.write(f"STDOUT:\n{build_result.stdout}\n\n")
-                                f.write(f"STDERR:\n{build_result.stderr}\n")
-                            return False
-                        
-                        print(f"[START-NODEJS] ✓ Build completed successfully")
-                        return True
-                        
-                    except subprocess.TimeoutExpired:
-                        print(f"[START-NODEJS] ✗ Build timed out (>10 min)")
-                        return False
-                    except Exception as e:
-                        print(f"[START-NODEJS] ✗ Build error: {e}")
+                try:
+                    build_result = subprocess.run(
+                        [npm_path, 'run', 'build'],
+                        cwd=build_cwd,
+                        capture_output=True,
+                        text=True,
+                        timeout=600,  # 10 min timeout
+                        env=env
+                    )
+                    
+                    if build_result.returncode != 0:
+                        print(f"[START-NODEJS] ✗ Build failed: {build_result.stderr[-500:]}")
+                        # Write error to log file
+                        stderr_log_path = os.path.join(project_path, f"{project_name}.err.log")
+                        from app.utils.log_manager import start_log
+                        with start_log(stderr_log_path) as f:
+                            f.write(f"=== Build Failed ===\n")
+                            f.write(f"Time: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+                            f.write(f"Build directory: {build_cwd}\n")
+                            f.write(f"Exit code: {build_result.returncode}\n\n")
+                            f.write(f"STDOUT:\n{build_result.stdout}\n\n")
+                            f.write(f"STDERR:\n{build_result.stderr}\n")
                         return False
-                else:
-                    print(f"[START-NODEJS] ✗ No build script found in package.json at {pkg_json_path}")
+                    
+                    print(f"[START-NODEJS] ✓ Build completed successfully")
+                    return True
+                    
+                except subprocess.TimeoutExpired:
+                    print(f"[START-NODEJS] ✗ Build timed out (>10 min)")
                     return False
-            return True
+                except Exception as e:
+                    print(f"[START-NODEJS] ✗ Build error: {e}")
+                    return False
+            
+            if 'build' not in scripts and not os.path.exists(build_path):
+                print(f"[START-NODEJS] ✗ No build script found in package.json at {pkg_json_path}")
+                return False
+            
+            # Rebuild only when the source tree changed; reuse stored builds otherwise
+            from app.utils.next_build import ensure_build
+            from app.utils.node_store import node_version
+            return ensure_build(project_name, project_path, build_cwd, env, build,
+                                can_build='build' in scripts, node_version=node_version(node_path))
         except Exception as e:
             print(f"[START-NODEJS] Warning: Could not check for Next.js: {e}")
             return True  # Continue anyway
@@ -700,8 +759,9 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
     stderr_log_path = os.path.join(project_path, f"{project_name}.err.log")
     
     try:
-        stdout_log = open(stdout_log_path, "w", buffering=1)
-        stderr_log = open(stderr_log_path, "w", buffering=1)
+        from app.utils.log_manager import start_log
+        stdout_log = start_log(stdout_log_path)
+        stderr_log = start_log(stderr_log_path)
         
         # Write startup info
         stderr_log.write(f"=== Starting Node.js project {project_name} ===\n")
@@ -766,7 +826,13 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
                 print(f"[START-NODEJS] Running fallback: node index.js")
         
         stderr_log.write(f"Command: {' '.join(command)}\n\n")
+        
+        from app.utils.cgroups import prepare_project_cgroup, wrap_command
+        cgroup_path = prepare_project_cgroup(project_name, cgroup)
+        if cgroup_path:
+            stderr_log.write(f"cgroup: {cgroup_path}\n\n")
         stderr_log.flush()
+        command = wrap_command(command, cgroup_path)
         
         # Start process
         process = subprocess.Popen(
@@ -780,8 +846,11 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
         
         print(f"[START-NODEJS] ✓ Process started with PID: {process.pid}")
         
-        # Wait a bit to see if it crashes immediately
-        time.sleep(2)
+        # Wait until the app serves requests (or the process dies)
+        started = time.monotonic()
+        ready_timeout = ready_timeout or DEFAULT_READY_TIMEOUT
+        ready = wait_for_ready(port, timeout=ready_timeout, health_path=health_path,
+                               process=process, require_http=True)
         poll_result = process.poll()
         
         if poll_result is not None:
@@ -791,13 +860,23 @@ def start_nodejs_process(project_name, project_path, port, env_vars=None, start_
             stdout_log.close()
             return None
         
-        print(f"[START-NODEJS] ✓ Process running successfully")
+        if not ready:
+            stop_process_group(process)
+            print(f"[START-NODEJS] ✗ Process did not become ready within {ready_timeout}s")
+            stderr_log.write(f"\n\nERROR: App did not answer on port {port} within {ready_timeout}s, process stopped\n")
+            stderr_log.close()
+            stdout_log.close()
+            return None
+        
+        elapsed = time.monotonic() - started
+        _ready_times[process.pid] = round(elapsed, 3)
+        print(f"[START-NODEJS] ✓ Process running successfully (ready in {elapsed:.2f}s)")
         return process.pid
         
     except Exception as e:
         error_msg = f"ERROR: Failed to start Node.js process: {e}\n"
         try:
-            with open(stderr_log_path, "w") as f:
+            with open(stderr_log_path, "a") as f:
                 f.write(error_msg)
                 import traceback
                 f.write("\nFull traceback:\n")
@@ -829,7 +908,8 @@ def auto_setup_project(project_path, project_name, package_json_changed=False, r
         project_path: Path to the project
         project_name: Name of the project
         package_json_changed: If True, runs incremental npm update for Node.js
-        requirements_txt_changed: If True, runs incremental pip update for Python
+        requirements_txt_changed: Kept for compatibility; the venv marker (venv_cache) decides
+            whether requirements.txt has to be installed again
         progress_callback: Optional callback for progress updates - progress_callback(step, message)
     
     Returns (success, message)
@@ -848,10 +928,26 @@ def auto_setup_project(project_path, project_name, package_json_changed=False, r
         return auto_setup_nodejs_project(project_path, project_name, package_json_changed, progress_callback)
     
     report_progress("detect", "Detected Python project")
+    from app.utils.wheelhouse import pip_install
+    from app.utils import venv_cache
     
-    # Check if venv exists
     venv_path = os.path.join(project_path, 'venv')
+    requirements_file = os.path.join(project_path, 'requirements.txt')
     
+    # Venv key: Python version + normalized requirements.txt
+    venv_key = venv_cache.requirements_key(requirements_file) if os.path.exists(requirements_file) else None
+    if venv_key:
+        if venv_cache.is_current(venv_path, venv_key) and os.path.exists(os.path.join(venv_path, 'bin', 'gunicorn')):
+            report_progress("venv_current", "✓ Virtual environment matches requirements.txt, skipping install")
+            return True, "Project setup completed successfully (environment up to date)"
+        try:
+            if venv_cache.restore_from_template(venv_key, venv_path):
+                report_progress("venv_clone", "✓ Virtual environment cloned from a cached template with the same requirements")
+                return True, "Project setup completed successfully (environment cloned from cache)"
+        except OSError as e:
+            report_progress("venv_clone_error", f"Warning: Could not clone cached environment: {e}")
+    
+    # Check if venv exists
     if not os.path.exists(venv_path):
         report_progress("venv_create", "Creating virtual environment...")
         try:
@@ -874,32 +970,23 @@ def auto_setup_project(project_path, project_name, package_json_changed=False, r
         return False, "pip not found in venv"
     
     # Check for requirements.txt
-    requirements_file = os.path.join(project_path, 'requirements.txt')
-    
-    if os.path.exists(requirements_file):
-        if requirements_txt_changed:
-            # Incremental update: only install changed/new packages
-            report_progress("pip_update", "Updating packages incrementally (pip install -r requirements.txt)...")
-            try:
-                result = subprocess.run(
-                    [pip_path, 'install', '-r', 'requirements.txt'],
-                    cwd=project_path,
-                    capture_output=True,
-                    text=True,
-                    timeout=300
-                )
-                # Parse output to count changes
-                installed = result.stdout.count('Successfully installed')
-                already = result.stdout.count('already satisfied')
-                if installed > 0:
-                    report_progress("pip_done", f"✓ Packages updated ({installed} new/updated)")
-                else:
-                    report_progress("pip_done", "✓ All packages already up to date")
-            except Exception as e:
-                report_progress("pip_error", f"Warning: Some dependencies failed: {e}")
-        else:
-            # No changes to requirements.txt, skip if packages already installed
-            report_progress("pip_skip", "✓ requirements.txt unchanged, skipping pip install")
+    requirements_installed = False
+    if venv_key:
+        # requirements.txt differs from what the venv marker records: install (incremental)
+        report_progress("pip_update", "Installing packages (pip install -r requirements.txt)...")
+        try:
+            result = pip_install(pip_path, requirements='requirements.txt', cwd=project_path)
+            requirements_installed = result.returncode == 0
+            # Parse output to count changes
+            installed = result.stdout.count('Successfully installed')
+            if not requirements_installed:
+                report_progress("pip_error", f"Warning: Some dependencies failed: {(result.stderr or result.stdout).strip()[-300:]}")
+            elif installed > 0:
+                report_progress("pip_done", f"✓ Packages updated ({installed} new/updated)")
+            else:
+                report_progress("pip_done", "✓ All packages already up to date")
+        except Exception as e:
+            report_progress("pip_error", f"Warning: Some dependencies failed: {e}")
     else:
         # No requirements.txt, try to generate one
         print(f"[AUTO-SETUP] No requirements.txt found, attempting to generate...")
@@ -910,28 +997,18 @@ def auto_setup_project(project_path, project_name, package_json_changed=False, r
             if success and packages:
                 print(f"[AUTO-SETUP] ✓ Generated requirements.txt with {len(packages)} packages")
                 print(f"[AUTO-SETUP] Installing generated dependencies...")
-                subprocess.run(
-                    [pip_path, 'install', '-r', 'requirements.txt', '-q'],
-                    cwd=project_path,
-                    timeout=300
-                )
+                pip_install(pip_path, requirements='requirements.txt', cwd=project_path, quiet=True)
                 print(f"[AUTO-SETUP] ✓ Dependencies installed")
             else:
                 # Fallback: install basics
                 print(f"[AUTO-SETUP] Could not generate requirements.txt, installing basic packages...")
-                subprocess.run(
-                    [pip_path, 'install', 'flask', 'gunicorn', '-q'],
-                    timeout=120
-                )
+                pip_install(pip_path, ['flask', 'gunicorn'], timeout=120, quiet=True)
                 print(f"[AUTO-SETUP] ✓ Basic packages installed (Flask, Gunicorn)")
         except Exception as e:
             print(f"[AUTO-SETUP] Warning during requirements generation: {e}")
             # Fallback: install basics
             try:
-                subprocess.run(
-                    [pip_path, 'install', 'flask', 'gunicorn', '-q'],
-                    timeout=120
-                )
+                pip_install(pip_path, ['flask', 'gunicorn'], timeout=120, quiet=True)
                 print(f"[AUTO-SETUP] ✓ Basic packages installed (Flask, Gunicorn)")
             except Exception as e2:
                 return False, f"Failed to install basic packages: {e2}"
@@ -941,16 +1018,22 @@ def auto_setup_project(project_path, project_name, package_json_changed=False, r
     if not os.path.exists(gunicorn_path):
         print(f"[AUTO-SETUP] Installing gunicorn...")
         try:
-            subprocess.run(
-                [pip_path, 'install', 'gunicorn', '-q'],
-                timeout=60
-            )
+            pip_install(pip_path, ['gunicorn'], timeout=60, quiet=True)
             print(f"[AUTO-SETUP] ✓ Gunicorn installed")
         except Exception as e:
             return False, f"Failed to install gunicorn: {str(e)}"
     else:
         print(f"[AUTO-SETUP] ✓ Gunicorn found")
     
+    # Record what is installed and keep a template for projects with the same requirements
+    if requirements_installed and os.path.exists(gunicorn_path):
+        venv_cache.write_marker(venv_path, venv_key, 'install')
+        try:
+            if venv_cache.save_template(venv_key, venv_path):
+                print(f"[AUTO-SETUP] ✓ Environment cached as template {venv_key}")
+        except OSError as e:
+            print(f"[AUTO-SETUP] Warning: Could not cache environment: {e}")
+    
     print(f"[AUTO-SETUP] Setup complete!")
     return True, "Project setup completed successfully"
 
@@ -988,11 +1071,16 @@ def detect_entry_point(path, project_type):
         
     return 'app:app' # Default
 
-def generate_supervisor_config(project_name, project_type, path, port, env_vars=None, entry_point=None):
+def instance_name(project_name, instance=None):
+    """Log file and cgroup name of a project instance (the project's own name unless instance is given)."""
+    return f"{project_name}.{instance}" if instance else project_name
+
+def generate_supervisor_config(project_name, project_type, path, port, env_vars=None, entry_point=None, ready_timeout=None, health_path=None, worker_args=None, cgroup=None, instance=None):
     print(f"\n[CONFIG] === Generating configuration for {project_name} ===")
     print(f"[CONFIG] Project path: {path}")
     print(f"[CONFIG] Port: {port}")
     print(f"[CONFIG] Project type: {project_type}")
+    from app.utils.log_manager import start_log
     
     # Handle Node.js projects separately
     if project_type == 'nodejs':
@@ -1005,7 +1093,7 @@ def generate_supervisor_config(project_name, project_type, path, port, env_vars=
             # Create error log
             error_log_path = os.path.join(path, f"{project_name}.err.log")
             try:
-                with open(error_log_path, "w") as f:
+                with start_log(error_log_path) as f:
                     f.write(f"ERROR: Node.js setup failed\n")
                     f.write(f"{message}\n")
             except:
@@ -1013,7 +1101,8 @@ def generate_supervisor_config(project_name, project_type, path, port, env_vars=
             return None
         
         # Start Node.js process
-        pid = start_nodejs_process(project_name, path, port, env_vars)
+        pid = start_nodejs_process(project_name, path, port, env_vars,
+                                   ready_timeout=ready_timeout, health_path=health_path, cgroup=cgroup)
         return pid
     
     # Auto-detect entry point if not provided (Python projects)
@@ -1036,7 +1125,7 @@ def generate_supervisor_config(project_name, project_type, path, port, env_vars=
             # Create error log
             error_log_path = os.path.join(path, f"{project_name}.err.log")
             try:
-                with open(error_log_path, "w") as f:
+                with start_log(error_log_path) as f:
                     f.write("ERROR: Gunicorn not found in project venv\n")
                     f.write(f"Expected location: {gunicorn_path}\n")
                     f.write("\nThis is a configuration error. Please check:\n")
@@ -1052,7 +1141,7 @@ def generate_supervisor_config(project_name, project_type, path, port, env_vars=
         # Create error log
         error_log_path = os.path.join(path, f"{project_name}.err.log")
         try:
-            with open(error_log_path, "w") as f:
+            with start_log(error_log_path) as f:
                 f.write("ERROR: No virtual environment found\n")
                 f.write(f"Project path: {path}\n")
                 f.write("\nExpected folders: venv/, .venv/, or env/\n")
@@ -1070,9 +1159,10 @@ def generate_supervisor_config(project_name, project_type, path, port, env_vars=
     
     # Build command with detailed logging
     # Use explicit log file paths and debug level to capture all errors including tracebacks
-    stdout_log = os.path.join(path, f"{project_name}.out.log")
-    stderr_log = os.path.join(path, f"{project_name}.err.log")
-    command = f"{gunicorn_path} -w 4 -b 0.0.0.0:{port} --log-level debug --access-logfile {stdout_log} --error-logfile {stderr_log} --capture-output --enable-stdio-inheritance {entry_point}"
+    stdout_log = os.path.join(path, f"{instance_name(project_name, instance)}.out.log")
+    stderr_log = os.path.join(path, f"{instance_name(project_name, instance)}.err.log")
+    worker_args = worker_args or "-w 4"
+    command = f"{gunicorn_path} {worker_args} -b 0.0.0.0:{port} --log-level debug --access-logfile {stdout_log} --error-logfile {stderr_log} --capture-output --enable-stdio-inheritance {entry_point}"
     print(f"[CONFIG] Command: {command}")
 
     # Format env vars for Supervisor (KEY="VAL",KEY2="VAL2")
@@ -1097,7 +1187,9 @@ stdout_logfile=/var/log/{project_name}.out.log
     # For now, always use local process (not supervisor)
     # TODO: Add proper supervisor integration later
     print(f"[CONFIG] Starting as local process (PID-based management)...")
-    pid = start_local_process(project_name, command, path, env_vars)
+    pid = start_local_process(project_name, command, path, env_vars,
+                              port=port, ready_timeout=ready_timeout, health_path=health_path, cgroup=cgroup,
+                              instance=instance)
     
     if pid:
         print(f"[CONFIG] ✓ Process started successfully with PID: {pid}")
@@ -1109,15 +1201,140 @@ stdout_logfile=/var/log/{project_name}.out.log
 def check_process_status(pid):
     """
     Checks if a process with the given PID is running.
+    A zombie (exited but not yet reaped by its parent) counts as not running.
     """
     if not pid:
         return False
     try:
         # Signal 0 does nothing but checks if process exists
         os.kill(pid, 0)
-        return True
     except OSError:
         return False
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+    except psutil.AccessDenied:
+        return True
+
+def find_free_port():
+    """
+    Returns a free TCP port chosen by the kernel (used for temporary blue/green instances).
+    """
+    import socket
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('0.0.0.0', 0))
+        return s.getsockname()[1]
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a unix domain socket (apps bound to unix:/path)"""
+
+    def __init__(self, socket_path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+def _probe(address, health_path, require_http):
+    """One readiness probe: connect, then optionally make an HTTP request."""
+    if isinstance(address, str):
+        conn = _UnixHTTPConnection(address, READY_PROBE_TIMEOUT)
+    else:
+        conn = http.client.HTTPConnection('127.0.0.1', address, timeout=READY_PROBE_TIMEOUT)
+    try:
+        conn.connect()
+        if not health_path and not require_http:
+            return True
+        conn.request('GET', health_path or '/')
+        status = conn.getresponse().status
+        # Without a health path any HTTP answer means a worker is serving
+        return status < 500 if health_path else True
+    finally:
+        conn.close()
+
+def wait_for_ready(port, timeout=30, health_path=None, pid=None, process=None, require_http=False):
+    """
+    Waits until the app accepts connections on the port (an int, or a unix socket path).
+    With health_path the path must answer with a status below 500; with require_http
+    any HTTP response is enough (gunicorn accepts connections before workers boot).
+    Polls with exponential backoff. Returns False on timeout or if the process
+    (pid, or a Popen object) exits meanwhile.
+    """
+    deadline = time.monotonic() + timeout
+    delay = READY_POLL_MIN
+    while True:
+        if process is not None and process.poll() is not None:
+            return False
+        if pid and not check_process_status(pid):
+            return False
+        try:
+            if _probe(port, health_path, require_http):
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, READY_POLL_MAX)
+
+def pop_ready_time(pid):
+    """Seconds it took the process started with this PID to become ready (None if unknown)."""
+    return _ready_times.pop(pid, None)
+
+def readiness_options(project):
+    """Per-project readiness settings for generate_supervisor_config (app config as fallback)."""
+    from flask import current_app
+    return {
+        'ready_timeout': project.ready_timeout or current_app.config.get('APP_READY_TIMEOUT', DEFAULT_READY_TIMEOUT),
+        'health_path': project.health_path or current_app.config.get('DEPLOY_HEALTH_PATH'),
+    }
+
+def start_options(project):
+    """Keyword arguments for generate_supervisor_config: readiness, gunicorn worker and cgroup settings."""
+    from app.utils.cgroups import cgroup_limits
+    options = readiness_options(project)
+    options['cgroup'] = cgroup_limits(project)
+    if project.project_type not in ('nodejs', 'php'):
+        from app.utils.worker_sizing import resolve_worker_settings, gunicorn_worker_args
+        options['worker_args'] = gunicorn_worker_args(resolve_worker_settings(project))
+    return options
+
+def stop_process_group(process, timeout=5):
+    """Stops a process started with start_new_session=True together with its children."""
+    import signal
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except OSError:
+            return
+        try:
+            process.wait(timeout=timeout)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+
+def drain_process(pid, timeout=30):
+    """
+    Gracefully stops a process: SIGTERM to the master only (gunicorn finishes
+    in-flight requests in its workers), then kills whatever is left after timeout.
+    """
+    import psutil
+    try:
+        parent = psutil.Process(pid)
+        children = parent.children(recursive=True)
+        parent.terminate()
+    except psutil.NoSuchProcess:
+        return
+    gone, alive = psutil.wait_procs([parent] + children, timeout=timeout)
+    for p in alive:
+        try:
+            p.kill()
+        except psutil.NoSuchProcess:
+            pass
 
 def reload_supervisor():
     if is_linux():
@@ -0,0 +1,267 @@
+"""
+Venv Cache - requirements hash'ine göre venv yeniden kullanımı
+
+- Venv anahtarı: Python sürümü + normalize edilmiş requirements.txt'nin hash'i.
+- Kurulumdan sonra venv'e bir işaret dosyası (MARKER_NAME) yazılır. Anahtar
+  değişmediyse kurulum tamamen atlanır; yükleme sırasında verilen
+  requirements_txt_changed bayrağına güvenilmez.
+- Hazır venv'ler VENV_TEMPLATE_DIR/<anahtar> altında şablon olarak saklanır.
+  Aynı bağımlılıklara sahip projeler venv'i `python -m venv` + pip ile
+  kurmak yerine şablonun bir kopyasını alır.
+
+Kopyalar node_modules deposu gibi reflink (FICLONE) ile, desteklenmiyorsa
+normal kopya ile oluşturulur; hardlink kullanılmaz. pip dosyaları silip
+yeniden yazsa da site-packages'a yerinde yazan başka araçlar (uygulamanın
+kendisi, elle yapılan yamalar, .pyc'ler) hardlink'li bir kopyada şablonu ve
+diğer projeleri bozardı. İçinde venv yolu geçen metin dosyaları (bin/
+altındaki script shebang'leri, activate) yeni yol ile yeniden yazılır.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+from contextlib import contextmanager
+from app.utils.object_store import clone_file, _reflink_unsupported
+
+MARKER_NAME = '.vdspanel-venv.json'
+# Her venv'e auto-setup tarafından eklenen paketler (anahtara dahil)
+BASE_PACKAGES = ('gunicorn',)
+
+
+def _config(key, default):
+    from flask import current_app, has_app_context
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def python_tag():
+    """Venv'leri oluşturan yorumlayıcının sürümü (örn. cpython-3.11.4)"""
+    version = '.'.join(str(part) for part in sys.version_info[:3])
+    return f"{sys.implementation.name}-{version}"
+
+
+def normalize_requirements(requirements_file):
+    """
+    Yorumlar, boş satırlar ve sıra farkları anahtarı değiştirmesin
+
+    Returns:
+        list: Sıralı, tekrarsız gereksinim satırları
+    """
+    lines = set()
+    with open(requirements_file, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = re.sub(r'(^|\s)#.*$', '', line).strip()
+            if line:
+                # Paket adları büyük/küçük harf ve -/_ farkı gözetmez
+                match = re.match(r'^([A-Za-z0-9][A-Za-z0-9._-]*)(.*)$', line)
+                if match:
+                    line = re.sub(r'[-_.]+', '-', match.group(1)).lower() + match.group(2).replace(' ', '')
+                lines.add(line)
+    return sorted(lines)
+
+
+def requirements_key(requirements_file):
+    """Venv anahtarı: Python sürümü + normalize requirements hash'i"""
+    h = hashlib.sha256()
+    h.update(python_tag().encode())
+    for line in normalize_requirements(requirements_file) + list(BASE_PACKAGES):
+        h.update(b'\n' + line.encode())
+    return h.hexdigest()[:24]
+
+
+def read_marker(venv_path):
+    try:
+        with open(os.path.join(venv_path, MARKER_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_marker(venv_path, key, source):
+    marker = {'key': key, 'python': python_tag(), 'source': source, 'installed_at': time.time()}
+    tmp_path = os.path.join(venv_path, MARKER_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(marker, f)
+    os.replace(tmp_path, os.path.join(venv_path, MARKER_NAME))
+    return marker
+
+
+def is_current(venv_path, key):
+    """Venv bu anahtarla kurulmuş ve hâlâ kullanılabilir mi"""
+    marker = read_marker(venv_path)
+    return (marker is not None and marker.get('key') == key
+            and os.path.exists(os.path.join(venv_path, 'bin', 'python')))
+
+
+def template_root():
+    """Şablon venv dizini, kapalıysa None"""
+    if not _config('VENV_CACHE_ENABLED', True):
+        return None
+    root = _config('VENV_TEMPLATE_DIR', None)
+    if root:
+        os.makedirs(root, exist_ok=True)
+    return root
+
+
+def template_path(key):
+    root = template_root()
+    return os.path.join(root, key) if root else None
+
+
+@contextmanager
+def _key_lock(root, key):
+    with open(os.path.join(root, f".{key}.lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _is_script(path):
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(2)
+    except OSError:
+        return False
+    return head == b'#!'
+
+
+def _copy_file(src, dst, reflink):
+    """Dosyayı reflink ile (destekleniyorsa), değilse normal kopya ile oluştur"""
+    if reflink.get('supported', True):
+        try:
+            clone_file(src, dst)
+            shutil.copystat(src, dst)
+            reflink['supported'] = True
+            return
+        except OSError as e:
+            if not _reflink_unsupported(e):
+                raise
+            # Aynı kopyalamada tekrar denenmez
+            reflink['supported'] = False
+    shutil.copy2(src, dst)
+
+
+def clone_venv(source, dest, prefix=None):
+    """
+    Venv'i reflink'lerle (desteklenmiyorsa normal kopya ile) kopyala
+
+    Sembolik linkler aynen kopyalanır; bin/ altında kaynak yolunu içeren
+    scriptler prefix (varsayılan: dest) yolu ile yeniden yazılır. Her dosya
+    kendi inode'una sahip olur: kopyadaki yerinde yazma kaynağa yansımaz.
+    """
+    source = os.path.abspath(source)
+    dest = os.path.abspath(dest)
+    old_prefix, new_prefix = source.encode(), os.path.abspath(prefix or dest).encode()
+    bin_dir = os.path.join(source, 'bin')
+    reflink = {}
+
+    for root, dirs, files in os.walk(source):
+        target_root = os.path.join(dest, os.path.relpath(root, source))
+        os.makedirs(target_root, exist_ok=True)
+        for name in list(dirs):
+            if os.path.islink(os.path.join(root, name)):
+                os.symlink(os.readlink(os.path.join(root, name)), os.path.join(target_root, name))
+                dirs.remove(name)
+        for name in files:
+            src = os.path.join(root, name)
+            dst = os.path.join(target_root, name)
+            if name == MARKER_NAME:
+                continue
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dst)
+                continue
+            if root == bin_dir and (name.startswith('activate') or _is_script(src)):
+                with open(src, 'rb') as f:
+                    content = f.read()
+                if old_prefix in content:
+                    # Yolu içeren dosya yeni yol ile yazılır
+                    with open(dst, 'wb') as f:
+                        f.write(content.replace(old_prefix, new_prefix))
+                    shutil.copymode(src, dst)
+                    continue
+            _copy_file(src, dst, reflink)
+
+
+def _replace_with_clone(source, venv_path):
+    """
+    venv_path'i source'un kopyası ile değiştir (yarım kopya bırakmaz)
+
+    Kopya oluşmadıysa (kaynak o sırada silindiyse) mevcut venv'e dokunulmaz.
+
+    Returns:
+        bool: Değiştirildiyse True
+    """
+    tmp_path = f"{venv_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    clone_venv(source, tmp_path, prefix=venv_path)
+    if not os.path.isdir(tmp_path):
+        return False
+    if os.path.lexists(venv_path):
+        shutil.rmtree(venv_path)
+    os.rename(tmp_path, venv_path)
+    return True
+
+
+def restore_from_template(key, venv_path):
+    """
+    Anahtara ait şablon varsa venv'i ondan oluştur
+
+    Returns:
+        bool: Şablondan oluşturulduysa True
+    """
+    template = template_path(key)
+    if not template or not is_current(template, key):
+        return False
+    with _key_lock(template_root(), key):
+        # Kilit beklenirken prune_templates şablonu silmiş olabilir
+        if not is_current(template, key) or not _replace_with_clone(template, venv_path):
+            return False
+        write_marker(venv_path, key, 'template')
+        # Son kullanım zamanı (prune için)
+        os.utime(os.path.join(template, MARKER_NAME))
+    return True
+
+
+def save_template(key, venv_path):
+    """Kurulumu biten venv'i şablon olarak sakla (şablon zaten varsa dokunmaz)"""
+    template = template_path(key)
+    if not template or is_current(template, key):
+        return False
+    with _key_lock(template_root(), key):
+        if is_current(template, key) or not _replace_with_clone(venv_path, template):
+            return False
+        write_marker(template, key, 'template')
+    prune_templates()
+    return True
+
+
+def prune_templates(keep=None):
+    """En uzun süredir kullanılmayan şablonları sil (VENV_TEMPLATE_KEEP adet kalır)"""
+    root = template_root()
+    if not root:
+        return []
+    if keep is None:
+        keep = _config('VENV_TEMPLATE_KEEP', 20)
+    templates = []
+    for entry in os.scandir(root):
+        if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'):
+            try:
+                used_at = os.path.getmtime(os.path.join(entry.path, MARKER_NAME))
+            except OSError:
+                used_at = 0
+            templates.append((used_at, entry.path))
+    templates.sort(reverse=True)
+    removed = []
+    for _, path in templates[keep:]:
+        # O anda kopyalanan şablon silinmesin
+        with _key_lock(root, os.path.basename(path)):
+            shutil.rmtree(path, ignore_errors=True)
+        removed.append(path)
+    return removed
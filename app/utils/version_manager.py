@@ -1,8 +1,19 @@
 import os
+import errno
+import ctypes
 import shutil
+from collections import Counter
 from datetime import datetime
+from flask import current_app
 from app import db
 from app.models import Project, ProjectVersion
+from app.utils.object_store import (
+    ObjectStore, BACKUP_IGNORE_PATTERNS, is_manifest_backup, read_manifest, write_manifest
+)
+
+# renameat2 sabitleri (linux/fcntl.h, linux/fs.h)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 1 << 1
 
 class VersionManager:
     """Proje versiyon yönetimi ve yedekleme sınıfı"""
@@ -17,11 +28,21 @@ class VersionManager:
             
         if not os.path.exists(self.base_backup_dir):
             os.makedirs(self.base_backup_dir)
+        
+        # Tüm projelerin yedekleri ortak içerik adresli depoyu kullanır
+        self.store = ObjectStore(
+            os.path.join(self.base_backup_dir, 'objects'),
+            use_reflink=current_app.config.get('BACKUP_REFLINK', True)
+        )
+        self._reference_counts = None
     
     def create_backup(self, project, description=None):
         """
         Projenin mevcut durumunu yedekler
         
+        Dosyalar ortak depoya (backups/objects) içerik hash'i ile bir kez yazılır;
+        versiyon, blob'lara işaret eden bir manifest dosyasıdır.
+        
         Args:
             project: Yedeklenecek Project nesnesi
             description: Yedek açıklaması (opsiyonel)
@@ -44,17 +65,36 @@ class VersionManager:
         if not os.path.exists(project_backup_dir):
             os.makedirs(project_backup_dir)
         
-        # Versiyon dizini adı: v1_20231121_143022 formatında
+        # Versiyon manifest adı: v1_20231121_143022.json formatında
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         version_dir_name = f"v{new_version_number}_{timestamp}"
-        backup_path = os.path.join(project_backup_dir, version_dir_name)
+        backup_path = os.path.join(project_backup_dir, f"{version_dir_name}.json")
+        
+        # Önceki versiyonun manifest'i: değişmeyen dosyalar yeniden okunmaz
+        previous_manifest = None
+        if last_version and is_manifest_backup(last_version.backup_path):
+            try:
+                previous_manifest = read_manifest(last_version.backup_path)
+            except (OSError, ValueError):
+                previous_manifest = None
         
         # Projeyi yedekle
         try:
-            shutil.copytree(project.path, backup_path, 
-                          ignore=shutil.ignore_patterns('__pycache__', '*.pyc', '*.pyo', 
-                                                       '.git', 'venv', 'env', 'node_modules',
-                                                       '*.log', '.DS_Store'))
+            manifest, stats = self.store.snapshot(
+                project.path,
+                workers=current_app.config.get('HASH_WORKERS'),
+                ignore=BACKUP_IGNORE_PATTERNS,
+                previous=previous_manifest
+            )
+            manifest.update({
+                'project': project.name,
+                'version_number': new_version_number,
+                'created_at': datetime.utcnow().isoformat()
+            })
+            write_manifest(backup_path, manifest)
+            print(f"[BACKUP] {project.name} v{new_version_number}: {stats['files']} dosya, "
+                  f"{stats['logical_bytes']} byte ({stats['reused']} değişmemiş, "
+                  f"{stats['new_objects']} yeni blob, {stats['new_bytes']} byte, {stats['reflinked']} reflink)")
             
             # Veritabanına kaydet
             version = ProjectVersion(
@@ -65,22 +105,29 @@ class VersionManager:
             )
             db.session.add(version)
             db.session.commit()
+            self._reference_counts = None
             
             return version
             
         except Exception as e:
-            # Hata durumunda yedek dizinini sil
+            # Hata durumunda manifest'i sil (kullanılmayan blob'lar GC ile temizlenir)
             if os.path.exists(backup_path):
-                shutil.rmtree(backup_path)
+                os.remove(backup_path)
             raise Exception(f"Yedekleme sırasında hata: {str(e)}")
     
     def restore_version(self, version_id, stop_project=True):
         """
         Belirtilen versiyonu geri yükler
         
+        Versiyon önce proje dizininin yanındaki bir staging dizinine açılır
+        (uygulama bu sırada çalışmaya devam eder), ardından canlı dizinle tek
+        bir atomik rename ile yer değiştirilir. Proje dizini bir symlink ise
+        link yeni dizine çevrilir. Staging sırasında hata olursa canlı dizine
+        dokunulmaz.
+        
         Args:
             version_id: Geri yüklenecek ProjectVersion ID'si
-            stop_project: Geri yüklemeden önce projeyi durdur
+            stop_project: Dizin değiştirilmeden önce projeyi durdur
             
         Returns:
             bool: Başarılı ise True
@@ -94,43 +141,56 @@ class VersionManager:
         if not os.path.exists(version.backup_path):
             raise ValueError(f"Yedek dizini bulunamadı: {version.backup_path}")
         
-        # Proje çalışıyorsa durdur
-        if stop_project and project.status == 'running':
-            from app.routes import stop_project_process
-            stop_project_process(project)
-        
         # Mevcut durumu yedekle (restore öncesi güvenlik)
         try:
-            safety_backup = self.create_backup(
+            self.create_backup(
                 project, 
                 description=f"Safety backup before restoring to v{version.version_number}"
             )
         except Exception as e:
             print(f"Güvenlik yedeği oluşturulamadı: {str(e)}")
-            safety_backup = None
         
-        # Mevcut proje dizinini sil
-        if os.path.exists(project.path):
-            shutil.rmtree(project.path)
+        # Versiyonu canlı dizinin yanına aç (aynı dosya sistemi: rename atomik)
+        live_path = os.path.normpath(project.path)
+        # Mikrosaniye: aynı saniyedeki ikinci restore, link'in gösterdiği dizinle çakışmaz
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        staging_path = f"{live_path}.restore-{timestamp}"
+        try:
+            self._materialize(version.backup_path, staging_path)
+        except Exception as e:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise Exception(f"Geri yükleme sırasında hata: {str(e)}")
+        
+        # Proje çalışıyorsa durdur (kesinti sadece dizin değişimi kadar)
+        if stop_project and project.status == 'running':
+            from app.routes import stop_project_process
+            stop_project_process(project)
         
-        # Yedekten geri yükle
         try:
-            shutil.copytree(version.backup_path, project.path)
-            db.session.commit()
-            return True
-            
+            old_path = swap_directory(staging_path, live_path)
         except Exception as e:
-            # Hata durumunda güvenlik yedeğini geri yükle
-            if safety_backup and os.path.exists(safety_backup.backup_path):
-                shutil.copytree(safety_backup.backup_path, project.path)
+            shutil.rmtree(staging_path, ignore_errors=True)
             raise Exception(f"Geri yükleme sırasında hata: {str(e)}")
+        
+        if old_path:
+            shutil.rmtree(old_path, ignore_errors=True)
+        db.session.commit()
+        return True
     
-    def delete_version(self, version_id):
+    def _materialize(self, backup_path, target_path):
+        """Yedeği target_path'e aç (manifest ise depodan, eski yedekse dizinden kopyala)"""
+        if is_manifest_backup(backup_path):
+            self.store.checkout(read_manifest(backup_path), target_path)
+        else:
+            shutil.copytree(backup_path, target_path)
+    
+    def delete_version(self, version_id, collect_garbage=True):
         """
         Bir versiyonu siler
         
         Args:
             version_id: Silinecek ProjectVersion ID'si
+            collect_garbage: Artık kullanılmayan blob'ları depodan sil
             
         Returns:
             bool: Başarılı ise True
@@ -139,16 +199,53 @@ class VersionManager:
         if not version:
             raise ValueError(f"Versiyon bulunamadı: {version_id}")
         
-        # Yedek dizinini sil
-        if os.path.exists(version.backup_path):
+        # Yedeği sil
+        if is_manifest_backup(version.backup_path):
+            os.remove(version.backup_path)
+        elif os.path.exists(version.backup_path):
             shutil.rmtree(version.backup_path)
         
         # Veritabanından sil
         db.session.delete(version)
         db.session.commit()
+        self._reference_counts = None
+        
+        if collect_garbage:
+            self.collect_garbage()
         
         return True
     
+    def _version_hashes(self, version):
+        """Versiyonun kullandığı blob'lar: {hash: size}"""
+        if not is_manifest_backup(version.backup_path):
+            return {}
+        try:
+            files = read_manifest(version.backup_path).get('files', {})
+        except (OSError, ValueError):
+            return {}
+        return {info['hash']: info['size'] for info in files.values()}
+    
+    def _get_reference_counts(self):
+        """Her blob'u kaç versiyonun kullandığı (tüm projeler)"""
+        if self._reference_counts is None:
+            counts = Counter()
+            for version in ProjectVersion.query.all():
+                counts.update(self._version_hashes(version).keys())
+            self._reference_counts = counts
+        return self._reference_counts
+    
+    def collect_garbage(self, grace_seconds=None):
+        """
+        Hiçbir versiyonun kullanmadığı blob'ları depodan siler
+        
+        Returns:
+            tuple: (silinen blob sayısı, boşaltılan byte)
+        """
+        live_hashes = set(self._get_reference_counts())
+        if grace_seconds is None:
+            return self.store.collect_garbage(live_hashes)
+        return self.store.collect_garbage(live_hashes, grace_seconds=grace_seconds)
+    
     def get_project_versions(self, project_id):
         """
         Bir projenin tüm versiyonlarını getirir
@@ -165,18 +262,30 @@ class VersionManager:
     
     def get_version_size(self, version_id):
         """
-        Bir versiyonun disk boyutunu hesaplar
+        Bir versiyonun boyutunu hesaplar
         
         Args:
             version_id: Versiyon ID'si
             
         Returns:
-            int: Boyut (bytes)
+            dict: {'logical_bytes': int, 'unique_bytes': int}
+                  logical: geri yüklenince oluşacak boyut
+                  unique: sadece bu versiyonun kullandığı blob'lar (silinince boşalacak alan)
         """
         version = ProjectVersion.query.get(version_id)
         if not version or not os.path.exists(version.backup_path):
-            return 0
+            return {'logical_bytes': 0, 'unique_bytes': 0}
+        
+        if is_manifest_backup(version.backup_path):
+            files = read_manifest(version.backup_path).get('files', {})
+            hashes = {info['hash']: info['size'] for info in files.values()}
+            counts = self._get_reference_counts()
+            return {
+                'logical_bytes': sum(info['size'] for info in files.values()),
+                'unique_bytes': sum(size for file_hash, size in hashes.items() if counts[file_hash] <= 1)
+            }
         
+        # Eski (dizin) yedekler
         total_size = 0
         for dirpath, dirnames, filenames in os.walk(version.backup_path):
             for filename in filenames:
@@ -184,7 +293,7 @@ class VersionManager:
                 if os.path.exists(filepath):
                     total_size += os.path.getsize(filepath)
         
-        return total_size
+        return {'logical_bytes': total_size, 'unique_bytes': total_size}
     
     def cleanup_old_versions(self, project_id, keep_count=5):
         """
@@ -205,9 +314,79 @@ class VersionManager:
         if len(versions) > keep_count:
             for version in versions[keep_count:]:
                 try:
-                    self.delete_version(version.id)
+                    self.delete_version(version.id, collect_garbage=False)
                     deleted_count += 1
                 except Exception as e:
                     print(f"Versiyon silinirken hata: {str(e)}")
+            
+            if deleted_count:
+                self.collect_garbage()
         
         return deleted_count
+
+
+def _rename_exchange(path_a, path_b):
+    """
+    İki yolu renameat2(RENAME_EXCHANGE) ile atomik olarak yer değiştir
+
+    Returns:
+        bool: Sistem desteklemiyorsa False
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+
+    if renameat2(AT_FDCWD, os.fsencode(path_a), AT_FDCWD, os.fsencode(path_b), RENAME_EXCHANGE) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(err, os.strerror(err), path_b)
+
+
+def _is_restore_dir(path, live_path):
+    """path, restore_version'ın live_path için oluşturduğu bir <live>.restore-* dizini mi"""
+    parent = os.path.realpath(os.path.dirname(os.path.abspath(live_path)))
+    prefix = os.path.join(parent, os.path.basename(live_path) + '.restore-')
+    return path.startswith(prefix) and os.sep not in path[len(prefix):]
+
+
+def swap_directory(staging_path, live_path):
+    """
+    Hazırlanan dizini canlı dizinin yerine koy
+
+    - live_path symlink ise: yeni link oluşturulup os.replace ile çevrilir;
+      eski hedef sadece panelin önceki bir restore'da oluşturduğu
+      <live>.restore-* dizini ise silinmek üzere döner (operatörün gösterdiği
+      dizine, ör. panel dışındaki bir release dizinine, dokunulmaz)
+    - dizin ise: RENAME_EXCHANGE ile tek adımda yer değiştirilir
+      (desteklenmiyorsa iki rename; arada çok kısa bir an dizin yoktur)
+
+    Returns:
+        str: Silinmesi gereken eski dizin yolu (yoksa None)
+    """
+    if os.path.islink(live_path):
+        old_target = os.path.realpath(live_path)
+        tmp_link = f"{staging_path}.link"
+        os.symlink(os.path.abspath(staging_path), tmp_link)
+        os.replace(tmp_link, live_path)
+        return old_target if _is_restore_dir(old_target, live_path) else None
+
+    if not os.path.exists(live_path):
+        os.rename(staging_path, live_path)
+        return None
+
+    if _rename_exchange(staging_path, live_path):
+        # Staging yolunda artık eski dizin var
+        return staging_path
+
+    old_path = f"{staging_path}.old"
+    os.rename(live_path, old_path)
+    try:
+        os.rename(staging_path, live_path)
+    except OSError:
+        os.rename(old_path, live_path)
+        raise
+    return old_path
@@ -0,0 +1,295 @@
+"""
+Wheelhouse - proje venv'lerinin ortak kullandığı, panelin yönettiği wheel deposu
+
+Aynı sunucudaki projeler genelde aynı paketleri (Flask, SQLAlchemy, numpy...)
+kullanır. Her proje için ayrı ayrı indirip derlemek yerine:
+
+1. Bütün gereksinimler `==` ile sabitlenmişse önce tamamen çevrimdışı kurulum
+   denenir (--no-index --find-links <wheelhouse>). Paketlerin hepsi depoda
+   varsa kurulum ağa çıkmadan saniyeler içinde biter.
+2. Eksik varsa `pip wheel` eksik paketlerin wheel'lerini depoya indirir/derler
+   (depodakiler tekrar indirilmez) ve kurulum yine çevrimdışı yapılır.
+3. Wheel'i üretilemeyen paketler (build bağımlılığı eksik vb.) için normal
+   `pip install --find-links <wheelhouse>` ile devam edilir.
+
+Sabitlenmemiş gereksinimler (`flask`, `requests>=2`) çevrimdışı kurulsaydı
+depodaki eski wheel'e sonsuza kadar takılırdı; bunlar doğrudan 3. adımla,
+index'e bakan normal resolver ile kurulur.
+
+Depoya yazma bir dosya kilidi ile tek seferde bir süreçle sınırlıdır; iş
+kuyruğundaki paralel kurulumlar aynı wheel'i iki kez derlemez. Kilit en fazla
+kalan sürenin yarısı kadar beklenir; alınamazsa (başka bir proje uzun bir
+derleme yapıyorsa) kurulum doğrudan 3. adımla devam eder.
+
+Depo WHEELHOUSE_MAX_MB ile sınırlıdır: her derlemeden sonra en uzun süredir
+kullanılmayan wheel'ler silinir (çevrimdışı kurulumda kullanılan wheel'lerin
+mtime'ı güncellenir).
+
+pip_install'a verilen timeout tüm adımların toplamı içindir: her adım
+ortak son tarihe kalan süre ile çalıştırılır.
+"""
+
+import os
+import re
+import time
+import fcntl
+import subprocess
+from contextlib import contextmanager
+
+PIP_ENV = {'PIP_DISABLE_PIP_VERSION_CHECK': '1'}
+LOCK_POLL_SECONDS = 0.5
+
+# name[extras] == version (; marker)
+PINNED_RE = re.compile(r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*===?\s*([^\s,;*]+)\s*(?:;.*)?$')
+
+
+def _config(key, default):
+    from flask import current_app, has_app_context
+    return current_app.config.get(key, default) if has_app_context() else default
+
+
+def wheelhouse_dir():
+    """Wheelhouse dizini, kapalıysa None"""
+    if not _config('WHEELHOUSE_ENABLED', True):
+        return None
+    path = _config('WHEELHOUSE_DIR', None)
+    if not path:
+        return None
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _build_lock(wheelhouse, timeout=None):
+    """Depo kilidi; timeout saniye içinde alınamazsa False verir"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with open(os.path.join(wheelhouse, '.lock'), 'a') as lock_file:
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    yield False
+                    return
+                time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _targets(packages, requirements):
+    targets = list(packages)
+    if requirements:
+        targets += ['-r', requirements]
+    return targets
+
+
+def _canonical(name):
+    return re.sub(r'[-_.]+', '_', name).lower()
+
+
+def _requirement_lines(requirements, cwd, seen=None):
+    """requirements dosyasının satırları (-r ile eklenen dosyalar dahil); okunamazsa None"""
+    path = os.path.join(cwd or '', requirements)
+    seen = seen if seen is not None else set()
+    if path in seen:
+        return []
+    seen.add(path)
+    try:
+        with open(path) as f:
+            text = f.read().replace('\\\n', ' ')
+    except OSError:
+        return None
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r'(^|\s)#.*$', '', line).strip()
+        if not line:
+            continue
+        option = line.split(None, 1)
+        if option[0] in ('-r', '--requirement') and len(option) == 2:
+            included = _requirement_lines(option[1].strip(), os.path.dirname(path), seen)
+            if included is None:
+                return None
+            lines += included
+        elif option[0] in ('-c', '--constraint'):
+            continue
+        else:
+            lines.append(line)
+    return lines
+
+
+def pinned_requirements(packages=(), requirements=None, cwd=None):
+    """
+    Bütün gereksinimler `==` ile sabitlenmişse {kanonik ad: sürüm}, değilse None
+
+    Seçenekler (-e, --index-url...), URL/yol gereksinimleri ve aralıklar
+    sabitlenmemiş sayılır.
+    """
+    lines = list(packages)
+    if requirements:
+        included = _requirement_lines(requirements, cwd)
+        if included is None:
+            return None
+        lines += included
+    pins = {}
+    for line in lines:
+        match = PINNED_RE.match(line.strip())
+        if not match:
+            return None
+        pins[_canonical(match.group(1))] = match.group(2)
+    return pins
+
+
+def _wheels(wheelhouse):
+    for entry in os.scandir(wheelhouse):
+        if entry.name.endswith('.whl') and entry.is_file(follow_symlinks=False):
+            yield entry
+
+
+def _touch_wheels(wheelhouse, pins):
+    """Çevrimdışı kurulumda kullanılan wheel'leri son kullanılan olarak işaretle"""
+    for entry in _wheels(wheelhouse):
+        parts = entry.name.split('-')
+        if len(parts) >= 2 and pins.get(_canonical(parts[0])) == parts[1]:
+            try:
+                os.utime(entry.path)
+            except OSError:
+                pass
+
+
+def prune_wheelhouse(max_bytes=None):
+    """
+    Depo WHEELHOUSE_MAX_MB'ı aşıyorsa en uzun süredir kullanılmayan wheel'leri sil
+
+    Çağıran depo kilidini tutmalıdır (build_wheels).
+
+    Returns:
+        (silinen wheel sayısı, boşaltılan byte)
+    """
+    wheelhouse = wheelhouse_dir()
+    if not wheelhouse:
+        return 0, 0
+    if max_bytes is None:
+        max_bytes = _config('WHEELHOUSE_MAX_MB', 2048) * 1024 * 1024
+    if not max_bytes:
+        return 0, 0
+    wheels = []
+    for entry in _wheels(wheelhouse):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        wheels.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in wheels)
+    removed = 0
+    freed = 0
+    for _, size, path in sorted(wheels):
+        if total - freed <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed += 1
+        freed += size
+    if removed:
+        print(f"[WHEELHOUSE] Pruned {removed} wheels ({freed // (1024 * 1024)} MB)")
+    return removed, freed
+
+
+def _remaining(deadline, args, timeout):
+    """Son tarihe kalan süre; dolduysa pip'in kendi timeout'u gibi TimeoutExpired"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise subprocess.TimeoutExpired(args, timeout)
+    return remaining
+
+
+def _run(args, cwd, timeout):
+    env = dict(os.environ, **PIP_ENV)
+    return subprocess.run(args, cwd=cwd, capture_output=True, text=True, timeout=timeout, env=env)
+
+
+def build_wheels(pip_path, packages=(), requirements=None, cwd=None, timeout=600, lock_timeout=None):
+    """
+    Paketlerin (ve bağımlılıklarının) wheel'lerini depoya ekle
+
+    Args:
+        timeout: Kilit beklemesi dahil toplam süre
+        lock_timeout: Kilit için en fazla bekleme (varsayılan: timeout)
+
+    Returns:
+        subprocess.CompletedProcess: pip wheel sonucu (wheelhouse kapalıysa veya
+        kilit zamanında alınamadıysa None)
+    """
+    wheelhouse = wheelhouse_dir()
+    if not wheelhouse:
+        return None
+    deadline = time.monotonic() + timeout
+    with _build_lock(wheelhouse, timeout if lock_timeout is None else lock_timeout) as locked:
+        if not locked:
+            return None
+        args = [pip_path, 'wheel', '--wheel-dir', wheelhouse, '--find-links', wheelhouse] + _targets(packages, requirements)
+        result = _run(args, cwd, _remaining(deadline, args, timeout))
+        prune_wheelhouse()
+        return result
+
+
+def pip_install(pip_path, packages=(), requirements=None, cwd=None, timeout=300, quiet=False):
+    """
+    Paketleri wheelhouse üzerinden venv'e kur
+
+    Args:
+        pip_path: Projenin venv'indeki pip
+        packages: Kurulacak paket adları
+        requirements: requirements dosyası (cwd'ye göre)
+        timeout: Bütün adımlar için toplam süre
+
+    Returns:
+        subprocess.CompletedProcess: Son kurulum denemesinin sonucu
+
+    Raises:
+        subprocess.TimeoutExpired: Toplam süre aşılırsa
+    """
+    deadline = time.monotonic() + timeout
+
+    def run(args):
+        return _run(args, cwd, _remaining(deadline, args, timeout))
+
+    targets = _targets(packages, requirements) + (['-q'] if quiet else [])
+    wheelhouse = wheelhouse_dir()
+    if not wheelhouse:
+        return run([pip_path, 'install'] + targets)
+
+    online = [pip_path, 'install', '--find-links', wheelhouse] + targets
+    pins = pinned_requirements(packages, requirements, cwd)
+    if pins is None:
+        # Sabitlenmemiş sürümler index'ten çözülmeli, depodaki eski wheel'e takılmasın
+        return run(online)
+
+    offline = [pip_path, 'install', '--no-index', '--find-links', wheelhouse] + targets
+    result = run(offline)
+    if result.returncode == 0:
+        print(f"[WHEELHOUSE] Installed offline: {' '.join(targets)}")
+        _touch_wheels(wheelhouse, pins)
+        return result
+
+    print(f"[WHEELHOUSE] Building missing wheels: {' '.join(targets)}")
+    remaining = _remaining(deadline, offline, timeout)
+    # Kilit için kalan sürenin en fazla yarısı beklenir, çevrimiçi kurulum için süre kalsın
+    built = build_wheels(pip_path, packages, requirements, cwd=cwd, timeout=remaining, lock_timeout=remaining / 2)
+    if built is None:
+        print("[WHEELHOUSE] Wheelhouse is busy with another build, installing online")
+    elif built.returncode == 0:
+        result = run(offline)
+        if result.returncode == 0:
+            _touch_wheels(wheelhouse, pins)
+            return result
+    else:
+        print(f"[WHEELHOUSE] pip wheel failed, falling back to online install: "
+              f"{(built.stderr or built.stdout).strip()[-500:]}")
+
+    return run(online)
+
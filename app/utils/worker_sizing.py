@@ -0,0 +1,162 @@
+"""
+Gunicorn worker ayarları - proje bazında worker sayısı, thread, worker class,
+max_requests ve timeout
+
+worker_count boşsa DEFAULT_WORKER_COUNT kullanılır. Proje otomatik boyutlandırmayı
+seçtiyse (worker_auto) worker sayısı şunlardan en küçüğüdür:
+    - CPU'ya göre: sync/gthread için 2*CPU+1, async (gevent/uvicorn) için CPU sayısı;
+      çalışan Python projeleri arasında bölünür
+    - Belleğe göre: kullanılabilir belleğin AUTO_MEMORY_FRACTION'ı, çalışan Python
+      projeleri arasında bölünür ve projenin ölçülen worker başına RSS'ine bölünür
+    - WORKER_AUTO_MAX
+"""
+
+import os
+import glob
+import psutil
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'gevent': 'gevent',
+    'uvicorn': 'uvicorn.workers.UvicornWorker',
+}
+ASYNC_WORKER_CLASSES = ('gevent', 'uvicorn')
+# Worker class'ın çalışması için venv'de olması gereken paket
+WORKER_CLASS_PACKAGES = {'gevent': 'gevent', 'uvicorn': 'uvicorn'}
+
+DEFAULT_WORKER_COUNT = 4
+DEFAULT_WORKER_TIMEOUT = 30
+DEFAULT_GTHREAD_THREADS = 4
+# Ölçüm yokken varsayılan worker başına bellek
+DEFAULT_WORKER_RSS = 100 * 1024 * 1024
+AUTO_MEMORY_FRACTION = 0.5
+WORKER_AUTO_MAX = 32
+# Yeni ölçümün hareketli ortalamadaki ağırlığı
+RSS_SMOOTHING = 0.3
+
+
+def measure_worker_rss(master_pid):
+    """Master'ın worker'larının ortalama RSS'i (byte), worker yoksa None"""
+    try:
+        workers = psutil.Process(master_pid).children()
+    except psutil.NoSuchProcess:
+        return None
+    sizes = []
+    for worker in workers:
+        try:
+            sizes.append(worker.memory_info().rss)
+        except psutil.NoSuchProcess:
+            pass
+    return sum(sizes) // len(sizes) if sizes else None
+
+
+def update_worker_rss(project):
+    """Çalışan projenin worker RSS ölçümünü hareketli ortalamaya ekle (commit çağırana aittir)"""
+    if project.project_type in ('nodejs', 'php') or not project.pid:
+        return None
+    rss = measure_worker_rss(project.pid)
+    if rss:
+        previous = project.worker_rss
+        project.worker_rss = rss if not previous else int(previous * (1 - RSS_SMOOTHING) + rss * RSS_SMOOTHING)
+    return rss
+
+
+def project_memory(project):
+    """Projenin şu anki bellek kullanımı: varsa cgroup sayacı, yoksa süreç ağacının RSS toplamı"""
+    from app.utils.cgroups import project_usage
+    usage = project_usage(project)
+    if usage and usage['memory_current'] is not None:
+        return usage['memory_current']
+    return _process_tree_rss(project.pid)
+
+
+def _process_tree_rss(pid):
+    try:
+        parent = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [parent] + parent.children(recursive=True))
+    except psutil.NoSuchProcess:
+        return 0
+
+
+def auto_worker_count(project, worker_class='sync'):
+    """Projenin CPU, bellek ve ölçülen RSS'ine göre worker sayısı"""
+    from app.models import Project
+
+    python_projects = Project.query.filter(
+        Project.status == 'running',
+        Project.project_type.notin_(('nodejs', 'php'))
+    ).count()
+    if project.status != 'running':
+        python_projects += 1
+    python_projects = max(python_projects, 1)
+
+    # CPU da bellek gibi çalışan Python projeleri arasında paylaşılır
+    cpus = os.cpu_count() or 1
+    cpu_limit = (cpus if worker_class in ASYNC_WORKER_CLASSES else 2 * cpus + 1) // python_projects
+
+    # Bu projenin şu anki kullanımı restart'ta boşalacağından kullanılabilir sayılır
+    available = psutil.virtual_memory().available
+    if project.pid:
+        available += project_memory(project)
+    budget = available * AUTO_MEMORY_FRACTION / python_projects
+    if project.memory_max_mb:
+        # cgroup memory.max aşılırsa OOM killer worker'ları öldürür
+        budget = min(budget, project.memory_max_mb * 1024 * 1024 * 0.9)
+    memory_limit = int(budget // (project.worker_rss or DEFAULT_WORKER_RSS))
+
+    return max(1, min(cpu_limit, memory_limit, WORKER_AUTO_MAX))
+
+
+def resolve_worker_settings(project):
+    """
+    Projenin geçerli worker ayarları
+
+    Returns:
+        dict: {'workers', 'worker_class', 'threads', 'timeout', 'max_requests', 'auto'}
+    """
+    worker_class = project.worker_class if project.worker_class in WORKER_CLASSES else 'sync'
+    threads = project.worker_threads or (DEFAULT_GTHREAD_THREADS if worker_class == 'gthread' else 1)
+    auto = not project.worker_count and bool(project.worker_auto)
+    if project.worker_count:
+        workers = project.worker_count
+    else:
+        workers = auto_worker_count(project, worker_class) if auto else DEFAULT_WORKER_COUNT
+    return {
+        'workers': workers,
+        'worker_class': worker_class,
+        'threads': threads,
+        'timeout': project.worker_timeout or DEFAULT_WORKER_TIMEOUT,
+        'max_requests': project.max_requests or 0,
+        'auto': auto,
+    }
+
+
+def gunicorn_worker_args(settings):
+    """resolve_worker_settings sonucundan gunicorn komut satırı argümanları"""
+    args = f"-w {settings['workers']} -k {WORKER_CLASSES[settings['worker_class']]} --timeout {settings['timeout']}"
+    if settings['threads'] > 1:
+        args += f" --threads {settings['threads']}"
+    if settings['max_requests']:
+        # Jitter: tüm worker'lar aynı anda yeniden başlamasın
+        args += f" --max-requests {settings['max_requests']} --max-requests-jitter {max(settings['max_requests'] // 10, 1)}"
+    return args
+
+
+def missing_worker_package(project_path, worker_class):
+    """Worker class'ın gerektirdiği paket venv'de yoksa paket adı, varsa None"""
+    from app.utils.system import get_project_venv_python
+
+    package = WORKER_CLASS_PACKAGES.get(worker_class)
+    python = get_project_venv_python(project_path)
+    if not package or not python:
+        return None
+    venv_dir = os.path.dirname(os.path.dirname(python))
+    pattern = os.path.join(venv_dir, 'lib', 'python*', 'site-packages', f'{package}-*.dist-info')
+    return None if glob.glob(pattern) else package
+
+
+def worker_signature(project):
+    """Launch imzası için yapılandırılmış (çözümlenmemiş) worker ayarları"""
+    return [project.worker_count, project.worker_class or 'sync', project.worker_threads,
+            project.worker_timeout, project.max_requests, bool(project.worker_auto)]
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Manifest yazma benchmark'ı - update_project_manifest
+
+Eski yöntem (tüm kayıtları sil + dosya başına ORM nesnesi ekle) ile toplu
+diff-apply yöntemini geçici bir SQLite veritabanında karşılaştırır.
+
+Kullanım:
+    python benchmark_manifest.py                 # 10k, 50k, 100k dosya
+    python benchmark_manifest.py --sizes 20000
+"""
+
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+
+from app import create_app, db
+from app.models import Project, FileManifest
+from app.utils.deployment_manager import update_project_manifest
+from config import Config
+
+
+def legacy_update_project_manifest(project_id, files_dict):
+    """Önceki uygulama: tüm manifest'i sil ve her dosya için ORM nesnesi ekle"""
+    FileManifest.query.filter_by(project_id=project_id).delete()
+    for file_path, info in files_dict.items():
+        db.session.add(FileManifest(
+            project_id=project_id,
+            file_path=file_path,
+            file_hash=info['hash'],
+            file_size=info.get('size', 0),
+            last_modified=datetime.utcnow(),
+            mtime_ns=info.get('mtime_ns'),
+            inode=info.get('inode')
+        ))
+    db.session.commit()
+
+
+def fake_files(count):
+    files = {}
+    for i in range(count):
+        path = f"pkg{i % 200}/module_{i}.py"
+        files[path] = {
+            'hash': hashlib.sha256(path.encode()).hexdigest(),
+            'size': 1000 + i,
+            'mtime_ns': 1700000000000000000 + i,
+            'inode': 100000 + i
+        }
+    return files
+
+
+def rescan_with_changes(files, ratio=0.01):
+    """Dosyaların ~%1'ini değiştir, %0.5 ekle, %0.5 sil (tipik deployment taraması)"""
+    changed = {path: dict(info) for path, info in files.items()}
+    paths = list(changed)
+    rng = random.Random(42)
+    for path in rng.sample(paths, int(len(paths) * ratio)):
+        changed[path]['hash'] = hashlib.sha256(f"{path}-v2".encode()).hexdigest()
+        changed[path]['mtime_ns'] += 1
+    for path in rng.sample(paths, int(len(paths) * ratio / 2)):
+        del changed[path]
+    for i in range(int(len(paths) * ratio / 2)):
+        path = f"new/added_{i}.py"
+        changed[path] = {'hash': hashlib.sha256(path.encode()).hexdigest(),
+                         'size': 10, 'mtime_ns': 1, 'inode': 1}
+    return changed
+
+
+def timed(func, project_id, files):
+    start = time.perf_counter()
+    func(project_id, files)
+    return time.perf_counter() - start
+
+
+def run(sizes):
+    db_dir = tempfile.mkdtemp()
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+    app = create_app(BenchConfig)
+    print(f"{'files':>8} {'scenario':<22} {'legacy rows/s':>14} {'batched rows/s':>15} {'speedup':>8}")
+
+    with app.app_context():
+        for count in sizes:
+            files = fake_files(count)
+            rescan = rescan_with_changes(files)
+            scenarios = [
+                ('initial scan', [files]),
+                ('rescan, no changes', [files, files]),
+                ('rescan, 1% changed', [files, rescan]),
+            ]
+
+            for name, steps in scenarios:
+                results = []
+                for func in (legacy_update_project_manifest, update_project_manifest):
+                    project = Project(name=f"bench-{count}-{name}-{func.__name__}", port=0, path=db_dir)
+                    db.session.add(project)
+                    db.session.commit()
+                    # Son adım ölçülür, öncekiler başlangıç durumunu hazırlar
+                    for step in steps[:-1]:
+                        update_project_manifest(project.id, step)
+                    elapsed = timed(func, project.id, steps[-1])
+                    results.append(len(steps[-1]) / elapsed)
+
+                    FileManifest.query.filter_by(project_id=project.id).delete()
+                    db.session.delete(project)
+                    db.session.commit()
+
+                legacy, batched = results
+                print(f"{count:>8} {name:<22} {legacy:>14,.0f} {batched:>15,.0f} {batched / legacy:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='update_project_manifest benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000],
+                        help='Dosya sayıları (varsayılan: 10000 50000 100000)')
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
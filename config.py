@@ -10,3 +10,74 @@ class Config:
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 1000 * 1024 * 1024  # 1000 MB (1 GB) max upload size
     UPLOAD_FOLDER = os.path.join(basedir, 'uploads')
+    
+    # Deployment manifest hashing (0 = auto: CPU count + 4)
+    HASH_WORKERS = int(os.environ.get('HASH_WORKERS') or 0)
+    
+    # Versiyon yedekleri: destekleyen dosya sistemlerinde (btrfs/XFS) reflink ile kopyala
+    BACKUP_REFLINK = os.environ.get('BACKUP_REFLINK', '1') != '0'
+    
+    # Deployment sonrası yeniden başlatma: 'blue_green' (Nginx arkasındaki projelerde
+    # kesintisiz), 'reload' (gunicorn SIGHUP/SIGUSR2) veya 'restart'. blue_green mümkün
+    # değilse reload, reload mümkün değilse tam restart yapılır.
+    DEPLOY_STRATEGY = os.environ.get('DEPLOY_STRATEGY', 'blue_green')
+    # Uygulama başlatıldıktan sonra HTTP yanıtı vermesi için beklenen süre (proje bazında değiştirilebilir)
+    APP_READY_TIMEOUT = int(os.environ.get('APP_READY_TIMEOUT') or 60)
+    # Yeni sürüm hazır sayılmadan önce GET ile kontrol edilen path (boşsa sadece port kontrolü)
+    DEPLOY_HEALTH_PATH = os.environ.get('DEPLOY_HEALTH_PATH') or None
+    BLUE_GREEN_READY_TIMEOUT = int(os.environ.get('BLUE_GREEN_READY_TIMEOUT') or 60)
+    DEPLOY_DRAIN_TIMEOUT = int(os.environ.get('DEPLOY_DRAIN_TIMEOUT') or 30)
+    # Graceful reload'da yeni worker'ların ayağa kalkması için beklenen süre
+    GRACEFUL_RELOAD_TIMEOUT = int(os.environ.get('GRACEFUL_RELOAD_TIMEOUT') or 60)
+
+    # Process supervisor: çöken uygulamaları (AppState.auto_restart) yeniden başlatır
+    PROCESS_SUPERVISOR = os.environ.get('PROCESS_SUPERVISOR', '1') != '0'
+    SUPERVISOR_SYNC_INTERVAL = int(os.environ.get('SUPERVISOR_SYNC_INTERVAL') or 5)
+    SUPERVISOR_LOCK_FILE = os.path.join(basedir, 'instance', 'supervisor.lock')
+
+    # cgroup v2: projeleri /sys/fs/cgroup/<CGROUP_PARENT>/<proje> altında sınırlarıyla çalıştır
+    # (cgroup v2 yoksa veya yetki devredilmemişse sınırsız başlatılır)
+    CGROUPS_ENABLED = os.environ.get('CGROUPS_ENABLED', '1') != '0'
+    CGROUP_PARENT = os.environ.get('CGROUP_PARENT', 'vdspanel')
+
+    # Proje logları: bu boyutu/süreyi aşan loglar döndürülür (<log>.1, <log>.2.gz, ...)
+    LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES') or 50 * 1024 * 1024)
+    LOG_ROTATE_SECONDS = int(os.environ.get('LOG_ROTATE_SECONDS', 86400))  # 0 = sadece boyut
+    LOG_ARCHIVES = int(os.environ.get('LOG_ARCHIVES') or 5)
+    # auto-fix'in okuduğu log sonu
+    LOG_READ_MAX_BYTES = 1024 * 1024
+
+    # Arka plan metrik örnekleyici (system_status ve /api/metrics bunu okur)
+    METRICS_SAMPLER = os.environ.get('METRICS_SAMPLER', '1') != '0'
+    METRICS_INTERVAL = int(os.environ.get('METRICS_INTERVAL') or 10)
+    METRICS_HISTORY_HOURS = float(os.environ.get('METRICS_HISTORY_HOURS') or 6)
+    # Geçmişi tutulan en fazla proje (proje sayısı daha büyükse o kullanılır)
+    METRICS_MAX_PROJECTS = int(os.environ.get('METRICS_MAX_PROJECTS') or 64)
+    METRICS_DIR = os.path.join(basedir, 'instance', 'metrics')
+
+    # Arka plan iş kuyruğu: kurulum, başlatma ve auto-fix HTTP isteği dışında çalışır
+    JOB_RUNNER = os.environ.get('JOB_RUNNER', '1') != '0'
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)
+    JOB_LOCK_FILE = os.path.join(basedir, 'instance', 'jobs.lock')
+
+    # Proje venv'lerinin ortak wheel deposu (pip kurulumları önce buradan çevrimdışı yapılır)
+    WHEELHOUSE_ENABLED = os.environ.get('WHEELHOUSE_ENABLED', '1') != '0'
+    WHEELHOUSE_DIR = os.environ.get('WHEELHOUSE_DIR') or os.path.join(basedir, 'instance', 'wheelhouse')
+    WHEELHOUSE_MAX_MB = int(os.environ.get('WHEELHOUSE_MAX_MB') or 2048)  # 0 = sınırsız
+
+    # requirements hash'ine göre saklanan hazır venv şablonları (reflink, yoksa normal kopya ile kopyalanır)
+    VENV_CACHE_ENABLED = os.environ.get('VENV_CACHE_ENABLED', '1') != '0'
+    VENV_TEMPLATE_DIR = os.environ.get('VENV_TEMPLATE_DIR') or os.path.join(basedir, 'instance', 'venvs')
+    VENV_TEMPLATE_KEEP = int(os.environ.get('VENV_TEMPLATE_KEEP') or 20)
+
+    # node_modules dosyalarının reflink ile paylaşıldığı içerik adresli depo (proje dizinleriyle aynı dosya sisteminde olmalı)
+    NODE_STORE_ENABLED = os.environ.get('NODE_STORE_ENABLED', '1') != '0'
+    NODE_STORE_DIR = os.environ.get('NODE_STORE_DIR') or os.path.join(basedir, 'instance', 'node-store')
+
+    # Kaynak hash'i ile anahtarlanan Next.js build çıktıları ve .next/cache
+    NEXT_BUILD_CACHE_ENABLED = os.environ.get('NEXT_BUILD_CACHE_ENABLED', '1') != '0'
+    NEXT_BUILD_CACHE_DIR = os.environ.get('NEXT_BUILD_CACHE_DIR') or os.path.join(basedir, 'instance', 'next-builds')
+    NEXT_BUILD_KEEP = int(os.environ.get('NEXT_BUILD_KEEP') or 3)
+
+    # Boot sonrası restore'da aynı anda başlatılan uygulama sayısı
+    RESTORE_CONCURRENCY = int(os.environ.get('RESTORE_CONCURRENCY') or 8)
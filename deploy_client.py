@@ -6,9 +6,14 @@ SSH gerektirmeyen, HTTP tabanlı deployment aracı
 Kullanım:
     python deploy_client.py --server https://your-server.com --project PROJECT_NAME --path /path/to/local/project
 
+    file_hasher.py, file_chunker.py ve file_compressor.py bu script ile aynı dizinde bulunmalıdır.
+    zstd sıkıştırma için opsiyonel: pip install zstandard
+
 Özellikler:
-    - Git benzeri dosya karşılaştırması (SHA256 hash)
+    - Git benzeri dosya karşılaştırması (SHA256 hash, paralel hesaplama)
     - Sadece değişen dosyaları gönderir
+    - Büyük dosyalarda sadece değişen parçaları gönderir (delta)
+    - Dosya bazlı zstd/gzip sıkıştırma (server ile anlaşılır)
     - Otomatik backup ve restart
     - Session-based authentication
 """
@@ -16,13 +21,27 @@ Kullanım:
 import os
 import sys
 import json
-import hashlib
 import base64
 import argparse
 import getpass
+import tarfile
+import tempfile
+import time
 import requests
 from datetime import datetime
 
+from file_hasher import hash_file, hash_files
+from file_chunker import DELTA_MIN_SIZE, chunk_file, compute_delta, iter_literal_blocks
+from file_compressor import negotiate_encoding, should_compress, compress_blocks, compress_bytes
+
+# Stream deployment arşivinin ilk üyesi (server ile aynı olmalı)
+STREAM_METADATA_NAME = '.vdspanel-deploy.json'
+STREAM_BLOCK_SIZE = 1024 * 1024
+# Literal veri dosya boyutunun bu oranını geçiyorsa delta yerine tüm dosya gönderilir
+DELTA_MAX_RATIO = 0.8
+# Sıkıştırılan stream üyeleri bu boyuta kadar bellekte, üstünde geçici dosyada tutulur
+COMPRESS_SPOOL_SIZE = 16 * 1024 * 1024
+
 # Yoksayılacak dosya/dizin kalıpları
 IGNORE_PATTERNS = {
     '__pycache__', '.git', '.svn', '.hg',
@@ -54,17 +73,10 @@ def should_ignore(path, name):
 
 def calculate_file_hash(file_path):
     """Dosyanın SHA256 hash'ini hesapla"""
-    sha256_hash = hashlib.sha256()
-    try:
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception:
-        return None
+    return hash_file(file_path)
 
 
-def scan_local_files(project_path):
+def scan_local_files(project_path, workers=None):
     """Yerel proje dosyalarını tara"""
     files = {}
     
@@ -74,6 +86,8 @@ def scan_local_files(project_path):
     
     print(f"Dosyalar taranıyor: {project_path}")
     
+    to_hash = {}  # full_path -> (relative_path, size)
+    
     for root, dirs, filenames in os.walk(project_path):
         # Yoksayılacak dizinleri filtrele
         dirs[:] = [d for d in dirs if not should_ignore(root, d)]
@@ -87,18 +101,26 @@ def scan_local_files(project_path):
             
             try:
                 stat = os.stat(full_path)
-                file_hash = calculate_file_hash(full_path)
-                
-                if file_hash:
-                    files[relative_path] = {
-                        'hash': file_hash,
-                        'size': stat.st_size,
-                        'full_path': full_path
-                    }
+                to_hash[full_path] = (relative_path, stat.st_size)
             except (OSError, IOError) as e:
                 print(f"  Uyarı: {relative_path} okunamadı: {e}")
                 continue
     
+    # Dosyaları paralel hash'le
+    hashes = hash_files(to_hash.keys(), workers=workers)
+    
+    for full_path, (relative_path, size) in to_hash.items():
+        file_hash = hashes.get(full_path)
+        if not file_hash:
+            print(f"  Uyarı: {relative_path} okunamadı")
+            continue
+        
+        files[relative_path] = {
+            'hash': file_hash,
+            'size': size,
+            'full_path': full_path
+        }
+    
     print(f"  {len(files)} dosya bulundu")
     return files
 
@@ -110,6 +132,7 @@ class DeploymentClient:
         self.username = username
         self.password = password
         self.logged_in = False
+        self.server_encodings = []
     
     def login(self):
         """Panel'e giriş yap"""
@@ -183,12 +206,92 @@ class DeploymentClient:
             print(f"  ~ {len(diff['modified'])} değişen dosya")
             print(f"  - {len(diff['deleted'])} silinen dosya")
             print(f"  = {diff['unchanged_count']} değişmeyen dosya")
+            self.server_encodings = data.get('encodings', [])
+            cache = data.get('hash_cache')
+            if cache:
+                print(f"  Server hash cache: {cache['hits']} isabet, {cache['misses']} yeniden hash")
             return diff
         
         print(f"  Hata: {data.get('error', 'Bilinmeyen hata')}")
         return None
     
-    def deploy(self, project_id, local_files, diff, description=None, restart_after=True):
+    def get_signatures(self, project_id, paths):
+        """Server'daki dosyaların parça imzalarını al (endpoint yoksa boş döner)"""
+        response = self.session.post(
+            f"{self.server_url}/api/deployment/{project_id}/signatures",
+            json={'paths': paths}
+        )
+        if response.status_code in (404, 405):
+            return {}
+        data = response.json()
+        return data.get('signatures', {}) if data.get('success') else {}
+    
+    def prepare_deltas(self, project_id, local_files, modified):
+        """
+        Değişen büyük dosyalar için delta hesapla
+        
+        Delta'sı hesaplanan dosyaların local_files kaydına 'delta' eklenir:
+        {'base_hash', 'ops', 'literals', 'literal_size'}
+        """
+        candidates = [
+            path for path in modified
+            if path in local_files and local_files[path]['size'] >= DELTA_MIN_SIZE
+        ]
+        if not candidates:
+            return
+        
+        print("Büyük dosyalar için delta hesaplanıyor...")
+        signatures = self.get_signatures(project_id, candidates)
+        saved = 0
+        
+        for path in candidates:
+            base_signature = signatures.get(path)
+            if not base_signature:
+                continue
+            
+            file_info = local_files[path]
+            local_signature = chunk_file(file_info['full_path'])
+            if not local_signature or local_signature['hash'] != file_info['hash']:
+                # Dosya tarandıktan sonra değişmiş, tamamını gönder
+                continue
+            
+            delta = compute_delta(local_signature, base_signature)
+            if delta['literal_size'] > file_info['size'] * DELTA_MAX_RATIO:
+                continue
+            
+            delta['base_hash'] = base_signature['hash']
+            file_info['delta'] = delta
+            saved += file_info['size'] - delta['literal_size']
+        
+        delta_count = sum(1 for path in candidates if 'delta' in local_files[path])
+        if delta_count:
+            print(f"  {delta_count} dosya delta ile gönderilecek ({saved / 1024:.1f} KB tasarruf)")
+    
+    def prepare_compression(self, local_files, files_to_deploy, compression='auto'):
+        """
+        Server ile ortak encoding'i seç ve sıkıştırılacak dosyaları işaretle
+        
+        Zaten sıkıştırılmış uzantılar (.png, .zip, .whl ...) ve küçük dosyalar atlanır.
+        """
+        encoding = negotiate_encoding(self.server_encodings, compression)
+        count = 0
+        for path in files_to_deploy:
+            file_info = local_files.get(path)
+            if not file_info:
+                continue
+            size = file_info['delta']['literal_size'] if 'delta' in file_info else file_info['size']
+            if encoding and should_compress(path, size):
+                file_info['encoding'] = encoding
+                count += 1
+            else:
+                file_info.pop('encoding', None)
+        
+        if encoding:
+            print(f"  {count} dosya {encoding} ile sıkıştırılacak")
+        elif compression != 'none':
+            print("  Sıkıştırma kullanılmıyor (ortak encoding yok)")
+    
+    def deploy(self, project_id, local_files, diff, description=None, restart_after=True, protocol='stream', use_delta=True, compression='auto', strategy=None):
         """Dosyaları deploy et"""
         files_to_deploy = diff['added'] + diff['modified']
         
@@ -200,6 +303,35 @@ class DeploymentClient:
         print(f"  {len(files_to_deploy)} dosya gönderilecek")
         print(f"  {len(diff['deleted'])} dosya silinecek")
         
+        if use_delta:
+            self.prepare_deltas(project_id, local_files, diff['modified'])
+        self.prepare_compression(local_files, files_to_deploy, compression)
+        
+        description = description or f'CLI deployment @ {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
+        
+        data = self.send_deployment(project_id, local_files, files_to_deploy, diff['deleted'], description, restart_after, protocol, strategy)
+        
+        # Server'daki sürümü delta'nın hesaplandığı sürümden farklı olan dosyalar varsa deploy
+        # hiç uygulanmadan reddedilir; bu dosyalar tam içerikle gönderilerek deploy tekrarlanır
+        mismatched = [path for path in data.get('base_mismatch', []) if 'delta' in local_files.get(path, {})]
+        if data.get('rejected') and mismatched:
+            data = self.resend_full(project_id, local_files, files_to_deploy, diff['deleted'], mismatched, description, restart_after, protocol, compression, strategy)
+        
+        return self._report_deploy_result(data)
+    
+    def send_deployment(self, project_id, local_files, files_to_deploy, deleted_files, description, restart_after=True, protocol='stream', strategy=None):
+        """
+        Hazırlanan dosyaları gönder (stream desteklenmiyorsa JSON paketi)
+        
+        Returns:
+            dict: Server yanıtı
+        """
+        if protocol == 'stream':
+            data = self.deploy_stream(project_id, local_files, files_to_deploy, deleted_files, description, restart_after, strategy)
+            if data is not None:
+                return data
+            print("  Server stream deployment desteklemiyor, JSON'a geçiliyor...")
+        
         # Dosya paketini hazırla
         package = {}
         total_size = 0
@@ -211,14 +343,26 @@ class DeploymentClient:
                 continue
             
             try:
-                with open(file_info['full_path'], 'rb') as f:
-                    content = f.read()
+                delta = file_info.get('delta')
+                if delta:
+                    # Sadece literal parçalar gönderilir
+                    content = b''.join(iter_literal_blocks(file_info['full_path'], delta['literals']))
+                    entry = {
+                        'size': file_info['size'],
+                        'hash': file_info['hash'],
+                        'delta': {'base_hash': delta['base_hash'], 'ops': delta['ops']}
+                    }
+                else:
+                    with open(file_info['full_path'], 'rb') as f:
+                        content = f.read()
+                    entry = {'size': len(content), 'hash': file_info['hash']}
+                
+                if file_info.get('encoding'):
+                    content = compress_bytes(content, file_info['encoding'])
+                    entry['encoding'] = file_info['encoding']
                 
-                package[path] = {
-                    'content': base64.b64encode(content).decode('utf-8'),
-                    'size': len(content),
-                    'hash': file_info['hash']
-                }
+                entry['content'] = base64.b64encode(content).decode('utf-8')
+                package[path] = entry
                 total_size += len(content)
                 
             except Exception as e:
@@ -234,29 +378,224 @@ class DeploymentClient:
             f"{self.server_url}/api/deployment/{project_id}/deploy",
             json={
                 'package': package,
-                'deleted_files': diff['deleted'],
-                'description': description or f'CLI deployment @ {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}',
-                'restart_after': restart_after
+                'deleted_files': deleted_files,
+                'description': description,
+                'restart_after': restart_after,
+                'strategy': strategy
             }
         )
         
-        data = response.json()
+        return response.json()
+    
+    def resend_full(self, project_id, local_files, files_to_deploy, deleted_files, mismatched, description, restart_after=True, protocol='stream', compression='auto', strategy=None):
+        """
+        Reddedilen deploy'u, delta tabanı server'da değişmiş dosyalar delta'sız olacak şekilde tekrarla
+        
+        Returns:
+            dict: Server yanıtı
+        """
+        print(f"  {len(mismatched)} dosya server'da farklı sürümde, tamamı gönderilerek deploy tekrarlanıyor...")
+        for path in mismatched:
+            local_files[path].pop('delta', None)
+        self.prepare_compression(local_files, mismatched, compression)
+        return self.send_deployment(project_id, local_files, files_to_deploy, deleted_files, description, restart_after, protocol, strategy)
+    
+    def deploy_stream(self, project_id, local_files, files_to_deploy, deleted_files, description, restart_after=True, strategy=None):
+        """
+        Dosyaları chunked binary tar stream olarak gönder
+        
+        Returns:
+            dict: Server yanıtı, endpoint yoksa None
+        """
+        files = {}
+        total_size = 0
+        for path in files_to_deploy:
+            file_info = local_files.get(path)
+            if not file_info:
+                print(f"  Uyarı: {path} bulunamadı, atlanıyor")
+                continue
+            files[path] = file_info
+            total_size += file_info['delta']['literal_size'] if 'delta' in file_info else file_info['size']
+        
+        print(f"  Toplam boyut: {total_size / 1024:.1f} KB (stream)")
+        
+        metadata = {
+            'files': {path: stream_file_metadata(info) for path, info in files.items()},
+            'deleted_files': deleted_files,
+            'description': description
+        }
+        
+        print("\nDeploy ediliyor (stream)...")
         
+        response = self.session.post(
+            f"{self.server_url}/api/deployment/{project_id}/deploy-stream",
+            params={'restart_after': '1' if restart_after else '0', 'strategy': strategy},
+            data=iter_deploy_stream(metadata, files),
+            headers={'Content-Type': 'application/x-tar'}
+        )
+        
+        if response.status_code in (404, 405):
+            return None
+        return response.json()
+    
+    def _report_deploy_result(self, data):
+        """Deployment sonucunu yazdır"""
         if data.get('success'):
             print(f"\n✓ Deployment başarılı!")
             print(f"  - {data.get('applied', 0)} dosya güncellendi")
             print(f"  - {data.get('deleted', 0)} dosya silindi")
             if data.get('restarted'):
-                print(f"  - Uygulama yeniden başlatıldı")
+                if data.get('strategy') == 'blue_green':
+                    print(f"  - Uygulama kesintisiz (blue/green) yeniden başlatıldı")
+                elif data.get('strategy') == 'reload':
+                    reload = data.get('reload') or {}
+                    print(f"  - Uygulama yerinde yeniden yüklendi ({len(reload.get('new_workers', []))} yeni worker)")
+                else:
+                    print(f"  - Uygulama yeniden başlatıldı")
+            for error in data.get('errors', []):
+                print(f"  ! {error}")
             return True
         else:
             print(f"\n✗ Deployment başarısız!")
             errors = data.get('errors', [])
+            if data.get('error'):
+                errors = errors + [data['error']]
             for error in errors:
                 print(f"  - {error}")
             return False
 
 
+def _tar_member(name, size):
+    """Tek bir tar üyesinin header'ını oluştur"""
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = int(time.time())
+    return info.tobuf(format=tarfile.PAX_FORMAT, encoding='utf-8', errors='surrogateescape')
+
+
+def _tar_padding(size):
+    remainder = size % tarfile.BLOCKSIZE
+    return tarfile.NUL * (tarfile.BLOCKSIZE - remainder) if remainder else b''
+
+
+def stream_file_metadata(file_info):
+    """Stream metadata'sındaki dosya kaydı (delta varsa op listesi dahil)"""
+    entry = {'hash': file_info['hash'], 'size': file_info['size']}
+    delta = file_info.get('delta')
+    if delta:
+        entry['delta'] = {'base_hash': delta['base_hash'], 'ops': delta['ops']}
+    if file_info.get('encoding'):
+        entry['encoding'] = file_info['encoding']
+    return entry
+
+
+def _iter_file_blocks(file_path):
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b''):
+            yield block
+
+
+def _iter_compressed_member(path, file_info):
+    """
+    Sıkıştırılmış tar üyesi: tar header'ı boyutu önceden istediği için içerik
+    önce geçici dosyaya (küçükse bellekte) sıkıştırılır, sonra gönderilir.
+    """
+    delta = file_info.get('delta')
+    spool = tempfile.SpooledTemporaryFile(max_size=COMPRESS_SPOOL_SIZE)
+    try:
+        if delta:
+            blocks = iter_literal_blocks(file_info['full_path'], delta['literals'], STREAM_BLOCK_SIZE)
+        else:
+            blocks = _iter_file_blocks(file_info['full_path'])
+        size = compress_blocks(blocks, file_info['encoding'], spool)
+    except OSError as e:
+        # Üye gönderilmez; server metadata'daki eksik dosyayı raporlar
+        spool.close()
+        print(f"  Hata: {path} okunamadı: {e}")
+        return
+    
+    with spool:
+        spool.seek(0)
+        yield _tar_member(path, size)
+        for block in iter(lambda: spool.read(STREAM_BLOCK_SIZE), b''):
+            yield block
+        yield _tar_padding(size)
+
+
+def _iter_delta_member(path, file_info):
+    """Delta dosyası için tar üyesi: içerik sadece literal parçalardır"""
+    delta = file_info['delta']
+    size = delta['literal_size']
+    yield _tar_member(path, size)
+    
+    remaining = size
+    try:
+        for block in iter_literal_blocks(file_info['full_path'], delta['literals'], STREAM_BLOCK_SIZE):
+            remaining -= len(block)
+            yield block
+    except OSError as e:
+        # Header gönderildi; server hash doğrulamasında dosyayı reddeder
+        print(f"  Hata: {path} okunamadı: {e}")
+    
+    while remaining > 0:
+        block = tarfile.NUL * min(STREAM_BLOCK_SIZE, remaining)
+        remaining -= len(block)
+        yield block
+    
+    yield _tar_padding(size)
+
+
+def iter_deploy_stream(metadata, files):
+    """
+    Deployment tar arşivini parça parça üret (tüm paket belleğe alınmaz)
+    
+    İlk üye .vdspanel-deploy.json metadata'sıdır, ardından dosyalar gelir.
+    Delta ile gönderilen dosyaların üyesi sadece literal parçaları içerir;
+    'encoding' işaretli dosyaların üyesi sıkıştırılmış olarak gönderilir.
+    
+    Args:
+        metadata: {'files': {...}, 'deleted_files': [...], 'description': str}
+        files: {relative_path: {'full_path': str, ...}}
+    """
+    meta_bytes = json.dumps(metadata).encode('utf-8')
+    yield _tar_member(STREAM_METADATA_NAME, len(meta_bytes)) + meta_bytes + _tar_padding(len(meta_bytes))
+    
+    for path, file_info in files.items():
+        if file_info.get('encoding'):
+            yield from _iter_compressed_member(path, file_info)
+            continue
+        
+        if file_info.get('delta'):
+            yield from _iter_delta_member(path, file_info)
+            continue
+        
+        try:
+            f = open(file_info['full_path'], 'rb')
+        except OSError as e:
+            # Server metadata'daki eksik dosyayı raporlar
+            print(f"  Hata: {path} okunamadı: {e}")
+            continue
+        
+        with f:
+            # Header boyutu ile gönderilen veri tutarlı olmalı (dosya bu arada değişse bile)
+            size = os.fstat(f.fileno()).st_size
+            yield _tar_member(path, size)
+            
+            remaining = size
+            while remaining > 0:
+                block = f.read(min(STREAM_BLOCK_SIZE, remaining))
+                if not block:
+                    block = tarfile.NUL * min(STREAM_BLOCK_SIZE, remaining)
+                remaining -= len(block)
+                yield block
+            
+            yield _tar_padding(size)
+    
+    # Arşiv sonu: iki boş blok
+    yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+
 def main():
     parser = argparse.ArgumentParser(description='VDS Panel Deployment Client')
     parser.add_argument('--server', '-s', required=True, help='Server URL (örn: https://panel.example.com)')
@@ -268,6 +607,11 @@ def main():
     parser.add_argument('--description', '-m', help='Deployment açıklaması')
     parser.add_argument('--list', '-l', action='store_true', help='Projeleri listele')
     parser.add_argument('--dry-run', action='store_true', help='Sadece karşılaştır, deploy etme')
+    parser.add_argument('--protocol', choices=['stream', 'json'], default='stream', help='Deployment protokolü (varsayılan: stream, desteklenmezse json)')
+    parser.add_argument('--compression', choices=['auto', 'zstd', 'gzip', 'none'], default='auto', help='Dosya sıkıştırma (varsayılan: auto, server ile anlaşılır)')
+    parser.add_argument('--strategy', choices=['blue_green', 'reload', 'restart'], default=None, help='Restart yöntemi (varsayılan: server ayarı)')
+    parser.add_argument('--no-delta', action='store_true', help='Büyük dosyaları delta yerine tamamen gönder')
+    parser.add_argument('--hash-workers', type=int, default=None, help='Paralel hash thread sayısı (varsayılan: CPU sayısı + 4)')
     
     args = parser.parse_args()
     
@@ -316,7 +660,7 @@ def main():
     
     # Yerel dosyaları tara
     print()
-    local_files = scan_local_files(os.path.abspath(args.path))
+    local_files = scan_local_files(os.path.abspath(args.path), workers=args.hash_workers)
     
     if not local_files:
         print("Hata: Yerel dosya bulunamadı")
@@ -375,7 +719,11 @@ def main():
         local_files,
         diff,
         description=args.description,
-        restart_after=not args.no_restart
+        restart_after=not args.no_restart,
+        protocol=args.protocol,
+        use_delta=not args.no_delta,
+        compression=args.compression,
+        strategy=args.strategy
     )
     
     sys.exit(0 if success else 1)
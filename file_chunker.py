@@ -0,0 +1,178 @@
+"""
+File Chunker - içerik tabanlı parçalama (content-defined chunking) ve delta hesaplama
+Server (deployment_manager) ve deploy_client.py tarafından ortak kullanılır.
+
+Parça sınırları içerikten (kayan pencere ile) belirlenir; dosyanın başına
+veri eklense bile sonraki parçaların sınırları (ve hash'leri) değişmez.
+Böylece değişen büyük dosyalarda sadece eksik parçalar gönderilir.
+
+Sadece standart kütüphaneye bağlıdır; deploy_client.py ile birlikte
+tek başına kopyalanabilir.
+"""
+
+import os
+import mmap
+import hashlib
+
+# Bu boyutun altındaki dosyalar delta yerine tamamen gönderilir
+DELTA_MIN_SIZE = 1024 * 1024  # 1 MB
+
+CHUNK_MIN_SIZE = 16 * 1024
+CHUNK_MAX_SIZE = 256 * 1024
+
+# Parça sınırı: her byte sabit bir tablo ile tek bir bit'e (0/1) çevrilir ve
+# bu bit dizisinde _ANCHOR aranır. Sınır son 14 byte'ın içeriğine bağlıdır
+# (rolling hash penceresi gibi), ancak translate/find C hızında çalışır.
+# Rastgele veride ~2^14 byte'ta bir eşleşir (ortalama ~32 KB, kaynak kodda ~50 KB).
+# Server ve client aynı tabloyu üretmeli: sabit, deterministik.
+_BIT_TABLE = bytes(hashlib.sha256(bytes([i])).digest()[0] & 1 for i in range(256))
+_ANCHOR = bytes([1, 0, 1, 1, 0, 0, 1, 0, 1, 1, 1, 0, 0, 0])
+
+# Delta op'larında literal (gönderilen veri) işareti
+LITERAL = -1
+
+
+def iter_cut_points(data):
+    """
+    Veri içindeki parça sınırlarını üret
+
+    Yields:
+        (start, end) tuple'ları
+    """
+    n = len(data)
+    start = 0
+
+    while start < n:
+        end = min(start + CHUNK_MAX_SIZE, n)
+        cut = end
+        # Anchor penceresi min boyuttan önce başlayabilir ama sınır min'den önce olamaz
+        scan_from = start + CHUNK_MIN_SIZE - len(_ANCHOR)
+
+        if scan_from + len(_ANCHOR) < end:
+            bits = data[scan_from:end].translate(_BIT_TABLE)
+            found = bits.find(_ANCHOR)
+            if found >= 0:
+                cut = scan_from + found + len(_ANCHOR)
+
+        yield start, cut
+        start = cut
+
+
+def chunk_file(file_path):
+    """
+    Dosyanın parça imzalarını hesapla
+
+    Returns:
+        dict: {'hash': str, 'size': int, 'chunks': [[offset, length, sha256], ...]}
+              okunamazsa None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return {'hash': hashlib.sha256(b'').hexdigest(), 'size': 0, 'chunks': []}
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                file_hash = hashlib.sha256()
+                chunks = []
+                for start, end in iter_cut_points(mm):
+                    piece = mm[start:end]
+                    file_hash.update(piece)
+                    chunks.append([start, end - start, hashlib.sha256(piece).hexdigest()])
+                return {'hash': file_hash.hexdigest(), 'size': size, 'chunks': chunks}
+    except (OSError, ValueError):
+        return None
+
+
+def compute_delta(local_signature, base_signature):
+    """
+    Yerel dosyayı server'daki (base) dosyadan yeniden oluşturacak op listesini hesapla
+
+    Args:
+        local_signature: chunk_file() sonucu (yerel dosya)
+        base_signature: Server'daki dosyanın imzası
+
+    Returns:
+        dict: {
+            'ops': [[base_offset, length] veya [LITERAL, length], ...],
+            'literals': [[local_offset, length], ...],  # gönderilecek aralıklar (sırayla)
+            'literal_size': int
+        }
+    """
+    base_index = {}
+    for offset, length, chunk_hash in base_signature.get('chunks', []):
+        base_index.setdefault(chunk_hash, (offset, length))
+
+    ops = []
+    literals = []
+    literal_size = 0
+
+    for offset, length, chunk_hash in local_signature['chunks']:
+        match = base_index.get(chunk_hash)
+        if match and match[1] == length:
+            base_offset = match[0]
+            # Ardışık referansları birleştir
+            if ops and ops[-1][0] != LITERAL and ops[-1][0] + ops[-1][1] == base_offset:
+                ops[-1][1] += length
+            else:
+                ops.append([base_offset, length])
+        else:
+            literal_size += length
+            if ops and ops[-1][0] == LITERAL:
+                ops[-1][1] += length
+                literals[-1][1] += length
+            else:
+                ops.append([LITERAL, length])
+                literals.append([offset, length])
+
+    return {'ops': ops, 'literals': literals, 'literal_size': literal_size}
+
+
+def iter_literal_blocks(file_path, literals, block_size=1024 * 1024):
+    """Delta için gönderilecek literal aralıkları sırayla oku"""
+    with open(file_path, 'rb') as f:
+        for offset, length in literals:
+            f.seek(offset)
+            remaining = length
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    raise IOError(f"{file_path} changed while sending delta")
+                remaining -= len(block)
+                yield block
+
+
+def apply_delta(base_file, ops, read_literal, out_file, block_size=1024 * 1024):
+    """
+    Base dosya ve literal veriden hedef dosyayı yeniden oluştur
+
+    Args:
+        base_file: Server'daki mevcut dosya (okuma modunda açık)
+        ops: compute_delta()['ops']
+        read_literal: read_literal(n) -> en fazla n byte literal veri
+        out_file: Yazılacak dosya
+
+    Returns:
+        (sha256 hex digest, yazılan byte sayısı)
+    """
+    sha256_hash = hashlib.sha256()
+    written = 0
+
+    for offset, length in ops:
+        if offset == LITERAL:
+            read = read_literal
+        else:
+            base_file.seek(offset)
+            read = base_file.read
+
+        remaining = length
+        while remaining > 0:
+            block = read(min(block_size, remaining))
+            if not block:
+                raise IOError("Delta source ended early")
+            sha256_hash.update(block)
+            out_file.write(block)
+            written += len(block)
+            remaining -= len(block)
+
+    return sha256_hash.hexdigest(), written
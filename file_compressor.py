@@ -0,0 +1,162 @@
+"""
+File Compressor - deployment transferleri için dosya bazlı sıkıştırma
+Server (deployment_manager) ve deploy_client.py tarafından ortak kullanılır.
+
+zstd için opsiyonel 'zstandard' paketi kullanılır; kurulu değilse sadece
+gzip (zlib) desteklenir. Client ve server ortak desteklenen en iyi
+encoding'i seçer (negotiate_encoding).
+
+Sadece standart kütüphaneye bağlıdır (zstandard opsiyonel); deploy_client.py
+ile birlikte tek başına kopyalanabilir.
+"""
+
+import io
+import os
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tercih sırası (en iyi önce)
+ENCODING_PREFERENCE = ('zstd', 'gzip')
+
+# Zaten sıkıştırılmış formatlar tekrar sıkıştırılmaz
+COMPRESSED_EXTENSIONS = {
+    '.gz', '.tgz', '.bz2', '.xz', '.lz', '.lzma', '.zst', '.zip', '.7z', '.rar',
+    '.whl', '.egg', '.jar', '.war',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico',
+    '.mp3', '.mp4', '.m4a', '.ogg', '.webm', '.mov', '.avi', '.mkv',
+    '.woff', '.woff2', '.pdf', '.br'
+}
+
+# Bu boyutun altındaki dosyalarda sıkıştırma kazancı header maliyetini karşılamaz
+MIN_COMPRESS_SIZE = 512
+
+# Açılırken okunan sıkıştırılmış blok boyutu (tek adımdaki genişlemeyi sınırlar)
+DECOMPRESS_READ_SIZE = 64 * 1024
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def supported_encodings():
+    """Bu ortamda kullanılabilen encoding'ler (tercih sırasıyla)"""
+    return [e for e in ENCODING_PREFERENCE if e != 'zstd' or zstandard is not None]
+
+
+def negotiate_encoding(offered, requested='auto'):
+    """
+    Karşı tarafın desteklediği encoding'lerden kullanılacak olanı seç
+
+    Args:
+        offered: Karşı tarafın desteklediği encoding listesi
+        requested: 'auto', 'none' veya belirli bir encoding
+
+    Returns:
+        str: Seçilen encoding, sıkıştırma yapılmayacaksa None
+    """
+    if requested == 'none':
+        return None
+    available = [e for e in supported_encodings() if e in (offered or [])]
+    if requested == 'auto':
+        return available[0] if available else None
+    return requested if requested in available else None
+
+
+def should_compress(path, size):
+    """Dosyanın sıkıştırılıp sıkıştırılmayacağı (uzantı ve boyuta göre)"""
+    if size < MIN_COMPRESS_SIZE:
+        return False
+    return os.path.splitext(path)[1].lower() not in COMPRESSED_EXTENSIONS
+
+
+def compressobj(encoding):
+    """compress(data)/flush() arayüzüne sahip streaming sıkıştırıcı"""
+    if encoding == 'gzip':
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompressobj(encoding):
+    """decompress(data)/flush() arayüzüne sahip streaming açıcı"""
+    if encoding == 'gzip':
+        return zlib.decompressobj(31)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_blocks(blocks, encoding, out_file):
+    """
+    Blokları sıkıştırıp out_file'a yaz
+
+    Returns:
+        int: Yazılan (sıkıştırılmış) byte sayısı
+    """
+    compressor = compressobj(encoding)
+    written = 0
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            out_file.write(data)
+            written += len(data)
+    data = compressor.flush()
+    out_file.write(data)
+    return written + len(data)
+
+
+def compress_bytes(data, encoding):
+    compressor = compressobj(encoding)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress_bytes(data, encoding, limit=None):
+    """Sıkıştırılmış veriyi aç; limit aşılırsa ValueError"""
+    return DecompressingReader(io.BytesIO(data), encoding, limit).read()
+
+
+class DecompressingReader:
+    """
+    Sıkıştırılmış bir dosya nesnesini okurken açan read(n) arayüzü
+
+    limit verilirse açılmış veri bu boyutu aştığında ValueError fırlatılır
+    (sıkıştırma bombalarına karşı; beklenen dosya boyutu kullanılır).
+    """
+
+    def __init__(self, fileobj, encoding, limit=None):
+        self.fileobj = fileobj
+        self.limit = limit
+        self._decompressor = decompressobj(encoding)
+        self._buffer = bytearray()
+        self._total = 0
+        self._eof = False
+
+    def _fill(self):
+        data = self.fileobj.read(DECOMPRESS_READ_SIZE)
+        if data:
+            out = self._decompressor.decompress(data)
+        else:
+            self._eof = True
+            out = self._decompressor.flush()
+
+        self._total += len(out)
+        if self.limit is not None and self._total > self.limit:
+            raise ValueError("Decompressed data exceeds expected size")
+        self._buffer += out
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            self._fill()
+
+        if size is None or size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
@@ -0,0 +1,86 @@
+"""
+File Hasher - paralel SHA256 hesaplama motoru
+Server (deployment_manager) ve deploy_client.py tarafından ortak kullanılır.
+
+Sadece standart kütüphaneye bağlıdır; deploy_client.py ile birlikte
+tek başına kopyalanabilir.
+"""
+
+import os
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Bu boyutun altındaki dosyalar tek read() ile okunur
+SMALL_FILE_SIZE = 1024 * 1024  # 1 MB
+# Büyük dosyalar mmap ile hash'lenir; mmap kullanılamazsa bu boyutta bloklarla okunur
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# Bu sayının altındaki iş listeleri için thread pool açılmaz
+PARALLEL_THRESHOLD = 8
+
+
+def default_worker_count():
+    """Varsayılan worker sayısı (HASH_WORKERS ortam değişkeni ile değiştirilebilir)"""
+    env_workers = os.environ.get('HASH_WORKERS')
+    if env_workers:
+        try:
+            workers = int(env_workers)
+            if workers > 0:
+                return workers
+        except ValueError:
+            pass
+    # hashlib büyük bloklarda GIL'i bırakır, I/O beklemesi için birkaç ekstra thread
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def hash_file(file_path):
+    """
+    Dosyanın SHA256 hash'ini hesapla
+
+    Returns:
+        str: hex digest, okunamazsa None
+    """
+    sha256_hash = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+
+            if size < SMALL_FILE_SIZE:
+                sha256_hash.update(f.read())
+                return sha256_hash.hexdigest()
+
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    sha256_hash.update(mm)
+                return sha256_hash.hexdigest()
+            except (ValueError, OSError):
+                # mmap desteklenmiyor (pipe, özel dosya sistemi vb.)
+                f.seek(0)
+                sha256_hash = hashlib.sha256()
+                for byte_block in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                    sha256_hash.update(byte_block)
+                return sha256_hash.hexdigest()
+    except Exception:
+        return None
+
+
+def hash_files(file_paths, workers=None):
+    """
+    Birden fazla dosyayı paralel olarak hash'le
+
+    Args:
+        file_paths: Dosya yolları listesi
+        workers: Thread sayısı (None/0 ise default_worker_count())
+
+    Returns:
+        dict: {file_path: hash veya None}
+    """
+    file_paths = list(file_paths)
+    if not workers or workers < 1:
+        workers = default_worker_count()
+
+    if workers == 1 or len(file_paths) < PARALLEL_THRESHOLD:
+        return {path: hash_file(path) for path in file_paths}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(file_paths, executor.map(hash_file, file_paths)))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Mevcut tablolara eklenen yeni kolonlar için migration script
+db.create_all() sadece eksik tabloları oluşturur, mevcut tablolara kolon eklemez.
+
+Kullanım:
+    python migrate_schema.py
+"""
+
+import os
+import sys
+
+project_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_dir)
+
+from app import create_app, db
+from sqlalchemy import text
+
+# (tablo, kolon, DDL tipi)
+COLUMNS = [
+    # Hash cache (stat anahtarı)
+    ('file_manifest', 'mtime_ns', 'BIGINT'),
+    ('file_manifest', 'inode', 'BIGINT'),
+    # Graceful reload
+    ('project', 'launch_signature', 'TEXT'),
+    # Readiness probing
+    ('project', 'ready_timeout', 'INTEGER'),
+    ('project', 'health_path', 'VARCHAR(256)'),
+    ('project', 'last_ready_seconds', 'FLOAT'),
+    # Gunicorn worker ayarları
+    ('project', 'worker_count', 'INTEGER'),
+    ('project', 'worker_auto', 'BOOLEAN DEFAULT 0'),
+    ('project', 'worker_threads', 'INTEGER'),
+    ('project', 'worker_class', "VARCHAR(20) DEFAULT 'sync'"),
+    ('project', 'worker_timeout', 'INTEGER'),
+    ('project', 'max_requests', 'INTEGER'),
+    ('project', 'worker_rss', 'BIGINT'),
+    # cgroup v2 sınırları
+    ('project', 'cpu_limit', 'FLOAT'),
+    ('project', 'memory_max_mb', 'INTEGER'),
+    ('project', 'memory_high_mb', 'INTEGER'),
+    ('project', 'io_weight', 'INTEGER'),
+    # Arka plan işleri: sonucu gösterildi mi
+    ('job', 'reported_at', 'DATETIME'),
+]
+
+
+def migrate():
+    app = create_app()
+    
+    with app.app_context():
+        db.create_all()
+        
+        with db.engine.connect() as conn:
+            for table, column, ddl in COLUMNS:
+                result = conn.execute(text(f"PRAGMA table_info({table})"))
+                existing = [row[1] for row in result]
+                if column in existing:
+                    print(f"  = {table}.{column} zaten var")
+                    continue
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                print(f"  + {table}.{column} eklendi")
+            conn.commit()
+        
+        print("\n✓ Migration tamamlandı!")
+
+
+if __name__ == '__main__':
+    migrate()
@@ -5,12 +5,14 @@ Server restart sonrası should_run=True olan uygulamaları otomatik başlatır.
 
 Kullanım:
     python restore_apps.py
+    python restore_apps.py --concurrency 16   # aynı anda başlatılan uygulama sayısı
 
 Bu script'i systemd service olarak veya crontab @reboot ile çalıştırabilirsiniz.
 """
 
 import os
 import sys
+import argparse
 
 # Proje dizinini path'e ekle
 project_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +22,11 @@ from app import create_app, db
 from app.utils.deployment_manager import restore_app_states, get_apps_to_restore
 
 def main():
+    parser = argparse.ArgumentParser(description='should_run=True olan uygulamaları başlat')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='Aynı anda başlatılan uygulama sayısı (varsayılan: RESTORE_CONCURRENCY)')
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("VDS Panel - App State Restore")
     print("=" * 50)
@@ -41,7 +48,8 @@ def main():
         print("\nStarting applications...")
         print("-" * 50)
         
-        results = restore_app_states()
+        restore = restore_app_states(concurrency=args.concurrency)
+        results = restore['results']
         
         # Sonuçları göster
         started = 0
@@ -53,7 +61,9 @@ def main():
             name = result['project']
             
             if status == 'started':
-                print(f"✓ {name}: Started (PID: {result.get('pid', 'N/A')})")
+                ready = result.get('ready_seconds')
+                ready_text = f", ready in {ready:.2f}s" if ready is not None else ""
+                print(f"✓ {name}: Started (PID: {result.get('pid', 'N/A')}{ready_text})")
                 started += 1
             elif status == 'already_running':
                 print(f"○ {name}: Already running (PID: {result.get('pid', 'N/A')})")
@@ -70,6 +80,7 @@ def main():
         print(f"  Started: {started}")
         print(f"  Already running: {already_running}")
         print(f"  Failed: {failed}")
+        print(f"  Total time: {restore['total_seconds']:.2f}s (concurrency {restore['concurrency']})")
         print("=" * 50)
 
 
@@ -1,10 +1,23 @@
 from app import create_app, db
 from app.models import User, Project
+from app.utils.supervisor import start_supervisor
+from app.utils.metrics import start_metrics_sampler
+from app.utils.job_runner import start_job_runner
 
 import click
 
 app = create_app()
 
+def is_server_process():
+    """gunicorn, `python run.py` or `flask run`; not CLI commands like `flask create-user`"""
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.info_name == 'run'
+
+if is_server_process():
+    start_supervisor(app)
+    start_metrics_sampler(app)
+    start_job_runner(app)
+
 @app.shell_context_processor
 def make_shell_context():
     return {'db': db, 'User': User, 'Project': Project}
@@ -37,7 +37,8 @@ User=root
 Group=root
 WorkingDirectory=/opt/vdspanel
 Environment="PATH=/opt/vdspanel/venv/bin"
-ExecStart=/opt/vdspanel/venv/bin/gunicorn -w 4 -b 0.0.0.0:8000 run:app
+# gthread: live log streams (SSE) hold a thread, not a whole worker
+ExecStart=/opt/vdspanel/venv/bin/gunicorn -w 4 -k gthread --threads 16 -b 0.0.0.0:8000 run:app
 
 [Install]
 WantedBy=multi-user.target
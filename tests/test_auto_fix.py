@@ -0,0 +1,65 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from app.utils import auto_fix
+
+APP_PY = """
+print('imported with side effects')
+
+def app(environ, start_response):
+    start_response('200 OK', [])
+    return [b'ok']
+
+def main():
+    pass
+
+class Server:
+    pass
+"""
+
+ASGI_PY = """
+async def application(scope, receive, send):
+    pass
+"""
+
+SLOW_PY = """
+import time
+time.sleep(30)
+app = None
+"""
+
+class EntryPointProbeCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name, content in (('app.py', APP_PY), ('asgi.py', ASGI_PY), ('slow.py', SLOW_PY)):
+            with open(os.path.join(self.dir, name), 'w') as f:
+                f.write(content)
+        self.timeout = auto_fix.PROBE_CANDIDATE_TIMEOUT
+        auto_fix.PROBE_CANDIDATE_TIMEOUT = 1
+
+    def tearDown(self):
+        auto_fix.PROBE_CANDIDATE_TIMEOUT = self.timeout
+        shutil.rmtree(self.dir)
+
+    def test_probe_classifies_candidates_concurrently(self):
+        candidates = ['slow:app', 'app:app', 'app:main', 'app:Server', 'app:missing',
+                      'asgi:application', 'nope:app']
+        started = time.time()
+        results, _ = auto_fix.probe_entry_points(self.dir, candidates, sys.executable)
+        self.assertLess(time.time() - started, 10)
+
+        self.assertEqual(results['app:app'], {'ok': True, 'kind': 'wsgi'})
+        self.assertEqual(results['asgi:application'], {'ok': True, 'kind': 'asgi'})
+        self.assertEqual(results['slow:app']['error'], 'timed out')
+        for failed in ('app:main', 'app:Server', 'app:missing', 'nope:app'):
+            self.assertFalse(results[failed]['ok'], failed)
+        self.assertIn('ModuleNotFoundError', results['nope:app']['error'])
+
+    def test_probe_failure_is_reported(self):
+        self.assertEqual(auto_fix.probe_entry_points(self.dir, ['app:app'], '/nonexistent/python'), (None, False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from app.utils.cgroups import limit_values, wrap_command, read_usage, apply_limits
+
+class CgroupCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, name, content):
+        with open(os.path.join(self.dir, name), 'w') as f:
+            f.write(content)
+
+    def test_limit_values(self):
+        values = limit_values({'cpu_limit': 1.5, 'memory_max_mb': 512, 'memory_high_mb': None, 'io_weight': 200})
+        self.assertEqual(values['cpu.max'], '150000 100000')
+        self.assertEqual(values['memory.max'], str(512 * 1024 * 1024))
+        self.assertEqual(values['memory.high'], 'max')
+        self.assertEqual(values['io.weight'], 'default 200')
+
+    def test_apply_limits_skips_missing_controllers(self):
+        self._write('memory.max', 'max')
+        apply_limits(self.dir, {'memory_max_mb': 64})
+        with open(os.path.join(self.dir, 'memory.max')) as f:
+            self.assertEqual(f.read(), str(64 * 1024 * 1024))
+        self.assertFalse(os.path.exists(os.path.join(self.dir, 'cpu.max')))
+
+    def test_wrap_command_moves_process_before_exec(self):
+        self._write('cgroup.procs', '')
+        output = subprocess.check_output(wrap_command(['echo', 'hello world'], self.dir))
+        self.assertEqual(output, b'hello world\n')
+        with open(os.path.join(self.dir, 'cgroup.procs')) as f:
+            self.assertTrue(f.read().strip().isdigit())
+        self.assertEqual(wrap_command(['echo'], None), ['echo'])
+
+    def test_read_usage(self):
+        self._write('cpu.stat', 'usage_usec 2500000\nuser_usec 2000000\n')
+        self._write('memory.current', '104857600\n')
+        self._write('io.stat', '8:0 rbytes=100 wbytes=50 rios=1\n8:16 rbytes=10 wbytes=5 rios=1\n')
+        self._write('cgroup.procs', '10\n11\n')
+        usage = read_usage(self.dir)
+        self.assertEqual(usage['cpu_usec'], 2500000)
+        self.assertEqual(usage['memory_current'], 104857600)
+        self.assertIsNone(usage['memory_peak'])
+        self.assertEqual((usage['io_read_bytes'], usage['io_write_bytes']), (110, 55))
+        self.assertEqual(usage['processes'], 2)
+        self.assertIsNone(read_usage(os.path.join(self.dir, 'missing')))
+
+if __name__ == '__main__':
+    unittest.main()
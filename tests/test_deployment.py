@@ -0,0 +1,509 @@
+import os
+import shutil
+import tempfile
+import time
+import hashlib
+import io
+import tarfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import Project, FileManifest, SubRoute, DeploymentLog
+from app.utils.deployment_manager import (
+    scan_project_files, DeploymentManager, read_stream_metadata, apply_deployment_stream,
+    update_project_manifest
+)
+from config import Config
+from file_hasher import hash_files
+from deploy_client import iter_deploy_stream, stream_file_metadata
+from file_chunker import chunk_file, compute_delta
+from file_compressor import should_compress, compress_bytes, decompress_bytes
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+def write_file(path, content, age=10):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    # Keep mtimes outside the racy window so the cache can trust them
+    old = time.time() - age
+    os.utime(path, (old, old))
+
+class HashCacheCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.project_dir = tempfile.mkdtemp()
+        write_file(os.path.join(self.project_dir, 'app.py'), b'print("hi")\n')
+        write_file(os.path.join(self.project_dir, 'pkg', 'mod.py'), b'x = 1\n')
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.project_dir)
+
+    def test_unchanged_files_are_cache_hits(self):
+        stats = {}
+        files = scan_project_files(self.project_dir, stats=stats)
+        self.assertEqual(stats, {'hits': 0, 'misses': 2})
+
+        stats = {}
+        again = scan_project_files(self.project_dir, cache=files, stats=stats)
+        self.assertEqual(stats, {'hits': 2, 'misses': 0})
+        self.assertEqual({p: i['hash'] for p, i in again.items()},
+                         {p: i['hash'] for p, i in files.items()})
+
+    def test_changed_file_is_rehashed(self):
+        files = scan_project_files(self.project_dir)
+        write_file(os.path.join(self.project_dir, 'app.py'), b'print("changed!")\n', age=5)
+
+        stats = {}
+        again = scan_project_files(self.project_dir, cache=files, stats=stats)
+        self.assertEqual(stats, {'hits': 1, 'misses': 1})
+        self.assertNotEqual(again['app.py']['hash'], files['app.py']['hash'])
+
+    def test_recently_modified_file_is_not_trusted(self):
+        path = os.path.join(self.project_dir, 'app.py')
+        write_file(os.path.join(self.project_dir, 'pkg', 'mod.py'), b'x = 1\n', age=100)
+        mtime_ns = os.stat(path).st_mtime_ns
+        # Hashed half a second after it was written
+        with mock.patch('app.utils.deployment_manager.time.time_ns', return_value=mtime_ns + 5 * 10 ** 8):
+            files = scan_project_files(self.project_dir)
+        self.assertIsNone(files['app.py']['mtime_ns'])
+
+        # Rewritten within the same mtime tick, then scanned well after the window
+        with open(path, 'wb') as f:
+            f.write(b'print("ho")\n')
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        stats = {}
+        with mock.patch('app.utils.deployment_manager.time.time_ns', return_value=mtime_ns + 10 * 10 ** 9):
+            again = scan_project_files(self.project_dir, cache=files, stats=stats)
+        self.assertEqual(stats, {'hits': 1, 'misses': 1})
+        self.assertNotEqual(again['app.py']['hash'], files['app.py']['hash'])
+
+    def test_cache_persists_in_file_manifest(self):
+        p = Project(name='cached', port=5000, path=self.project_dir)
+        db.session.add(p)
+        db.session.commit()
+
+        dm = DeploymentManager(p.id)
+        dm.scan_server_files()
+        self.assertEqual(dm.last_scan_stats, {'hits': 0, 'misses': 2})
+        self.assertIsNotNone(FileManifest.query.filter_by(file_path='app.py').first().inode)
+
+        dm = DeploymentManager(p.id)
+        dm.scan_server_files()
+        self.assertEqual(dm.last_scan_stats, {'hits': 2, 'misses': 0})
+
+    def test_manifest_update_only_touches_changed_rows(self):
+        p = Project(name='manifest', port=5000, path=self.project_dir)
+        db.session.add(p)
+        db.session.commit()
+
+        files = scan_project_files(self.project_dir)
+        self.assertEqual(update_project_manifest(p.id, files)['inserted'], 2)
+        ids = {m.file_path: m.id for m in FileManifest.query.filter_by(project_id=p.id)}
+
+        files['app.py'] = dict(files['app.py'], hash='f' * 64)
+        files['new.py'] = dict(files['app.py'])
+        del files[os.path.join('pkg', 'mod.py')]
+        stats = update_project_manifest(p.id, files)
+
+        self.assertEqual(stats, {'inserted': 1, 'updated': 1, 'deleted': 1, 'unchanged': 0})
+        rows = {m.file_path: m for m in FileManifest.query.filter_by(project_id=p.id)}
+        self.assertEqual(set(rows), {'app.py', 'new.py'})
+        self.assertEqual(rows['app.py'].id, ids['app.py'])
+        self.assertEqual(rows['app.py'].file_hash, 'f' * 64)
+
+class FileHasherCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parallel_hashes_match_sha256(self):
+        contents = {f'f{i}.bin': os.urandom(i * 997) for i in range(20)}
+        contents['empty.bin'] = b''
+        contents['large.bin'] = os.urandom(3 * 1024 * 1024 + 17)  # mmap path
+        paths = {}
+        for name, content in contents.items():
+            path = os.path.join(self.tmp_dir, name)
+            write_file(path, content)
+            paths[path] = hashlib.sha256(content).hexdigest()
+        missing = os.path.join(self.tmp_dir, 'missing.bin')
+
+        result = hash_files(list(paths) + [missing], workers=4)
+        self.assertIsNone(result.pop(missing))
+        self.assertEqual(result, paths)
+
+class DeploymentStreamCase(unittest.TestCase):
+    def setUp(self):
+        self.src_dir = tempfile.mkdtemp()
+        self.dst_dir = tempfile.mkdtemp()
+        write_file(os.path.join(self.dst_dir, 'old', 'gone.py'), b'bye\n')
+        write_file(os.path.join(self.dst_dir, 'keep.py'), b'keep\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.src_dir)
+        shutil.rmtree(self.dst_dir)
+
+    def build_stream(self, contents, deleted=(), tamper=None, encoding=None):
+        files = {}
+        for name, content in contents.items():
+            path = os.path.join(self.src_dir, name)
+            write_file(path, content)
+            files[name] = {'full_path': path, 'size': len(content),
+                           'hash': hashlib.sha256(content).hexdigest()}
+            if encoding and should_compress(name, len(content)):
+                files[name]['encoding'] = encoding
+        if tamper:
+            files[tamper]['hash'] = '0' * 64
+        metadata = {
+            'files': {p: stream_file_metadata(i) for p, i in files.items()},
+            'deleted_files': list(deleted),
+            'description': 'test'
+        }
+        return io.BytesIO(b''.join(iter_deploy_stream(metadata, files)))
+
+    def apply(self, stream):
+        with tarfile.open(fileobj=stream, mode='r|*') as tar:
+            metadata = read_stream_metadata(tar)
+            return apply_deployment_stream(self.dst_dir, tar, metadata)
+
+    def test_stream_writes_files_and_deletes(self):
+        big = os.urandom(3 * 1024 * 1024 + 5)
+        stream = self.build_stream({'app.py': b'print(1)\n', os.path.join('pkg', 'big.bin'): big},
+                                   deleted=[os.path.join('old', 'gone.py')])
+        result = self.apply(stream)
+
+        self.assertTrue(result['success'], result['errors'])
+        self.assertEqual((result['applied'], result['deleted']), (2, 1))
+        with open(os.path.join(self.dst_dir, 'pkg', 'big.bin'), 'rb') as f:
+            self.assertEqual(f.read(), big)
+        self.assertFalse(os.path.exists(os.path.join(self.dst_dir, 'old')))
+        self.assertTrue(os.path.exists(os.path.join(self.dst_dir, 'keep.py')))
+
+    def test_hash_mismatch_leaves_existing_file(self):
+        stream = self.build_stream({'keep.py': b'new content\n'}, tamper='keep.py')
+        result = self.apply(stream)
+
+        self.assertFalse(result['success'])
+        with open(os.path.join(self.dst_dir, 'keep.py'), 'rb') as f:
+            self.assertEqual(f.read(), b'keep\n')
+        self.assertEqual([n for n in os.listdir(self.dst_dir) if n.endswith('.vdspanel-tmp')], [])
+
+    def test_redeploy_keeps_file_mode(self):
+        script = os.path.join(self.dst_dir, 'start.sh')
+        write_file(script, b'#!/bin/sh\n')
+        os.chmod(script, 0o755)
+        result = self.apply(self.build_stream({'start.sh': b'#!/bin/sh\nexec app\n', 'new.py': b'x = 1\n'}))
+
+        self.assertTrue(result['success'], result['errors'])
+        self.assertEqual(os.stat(script).st_mode & 0o777, 0o755)
+        self.assertEqual(os.stat(os.path.join(self.dst_dir, 'new.py')).st_mode & 0o777, 0o644)
+
+    def test_compressed_members_are_decoded(self):
+        source = b'def handler(request):\n    return request.json\n' * 2000
+        image = os.urandom(4096)
+        stream = self.build_stream({'views.py': source, 'logo.png': image}, encoding='gzip')
+        self.assertLess(len(stream.getvalue()), len(source) // 4)
+        result = self.apply(stream)
+
+        self.assertTrue(result['success'], result['errors'])
+        with open(os.path.join(self.dst_dir, 'views.py'), 'rb') as f:
+            self.assertEqual(f.read(), source)
+        with open(os.path.join(self.dst_dir, 'logo.png'), 'rb') as f:
+            self.assertEqual(f.read(), image)
+
+    def test_decompression_is_bounded_by_expected_size(self):
+        bomb = compress_bytes(b'\0' * (1024 * 1024), 'gzip')
+        self.assertEqual(len(decompress_bytes(bomb, 'gzip', limit=1024 * 1024)), 1024 * 1024)
+        with self.assertRaises(ValueError):
+            decompress_bytes(bomb, 'gzip', limit=1000)
+
+    def test_delta_rebuilds_file_from_existing_chunks(self):
+        base = os.urandom(2 * 1024 * 1024)
+        local = base[:700000] + b'inserted bytes' + base[700000:]
+        write_file(os.path.join(self.dst_dir, 'data.bin'), base)
+        local_path = os.path.join(self.src_dir, 'data.bin')
+        write_file(local_path, local)
+
+        local_sig = chunk_file(local_path)
+        delta = compute_delta(local_sig, chunk_file(os.path.join(self.dst_dir, 'data.bin')))
+        self.assertLess(delta['literal_size'], len(local) // 4)
+        delta['base_hash'] = hashlib.sha256(base).hexdigest()
+
+        files = {'data.bin': {'full_path': local_path, 'size': len(local),
+                              'hash': local_sig['hash'], 'delta': delta}}
+        metadata = {'files': {p: stream_file_metadata(i) for p, i in files.items()},
+                    'deleted_files': [], 'description': 'delta'}
+        result = self.apply(io.BytesIO(b''.join(iter_deploy_stream(metadata, files))))
+
+        self.assertTrue(result['success'], result['errors'])
+        with open(os.path.join(self.dst_dir, 'data.bin'), 'rb') as f:
+            self.assertEqual(f.read(), local)
+
+    def test_delta_against_stale_base_rejects_the_deploy(self):
+        base = os.urandom(2 * 1024 * 1024)
+        local_path = os.path.join(self.src_dir, 'data.bin')
+        write_file(local_path, base + b'tail')
+        write_file(os.path.join(self.dst_dir, 'data.bin'), base)
+        delta = compute_delta(chunk_file(local_path), chunk_file(os.path.join(self.dst_dir, 'data.bin')))
+        delta['base_hash'] = hashlib.sha256(base).hexdigest()
+        # The server copy changed after the delta was computed
+        changed = b'x' + base[1:]
+        write_file(os.path.join(self.dst_dir, 'data.bin'), changed)
+
+        files = {'data.bin': {'full_path': local_path, 'size': len(base) + 4,
+                              'hash': hashlib.sha256(base + b'tail').hexdigest(), 'delta': delta}}
+        metadata = {'files': {p: stream_file_metadata(i) for p, i in files.items()},
+                    'deleted_files': [], 'description': 'delta'}
+        stream = io.BytesIO(b''.join(iter_deploy_stream(metadata, files)))
+
+        # The whole deploy is rejected before the app is stopped or a backup is taken
+        with create_app(TestConfig).app_context():
+            db.create_all()
+            project = Project(name='stale', port=6100, path=self.dst_dir)
+            db.session.add(project)
+            db.session.commit()
+            before_apply = mock.Mock()
+            result = DeploymentManager(project.id).receive_deployment_stream(stream, before_apply)
+            before_apply.assert_not_called()
+            self.assertEqual(DeploymentLog.query.count(), 0)
+            db.session.remove()
+            db.drop_all()
+        self.assertTrue(result['rejected'])
+        self.assertEqual(result['base_mismatch'], ['data.bin'])
+        self.assertEqual(stream.read(), b'')
+
+        # A base that changes after the check is still refused by the write itself
+        result = self.apply(io.BytesIO(b''.join(iter_deploy_stream(metadata, files))))
+        self.assertFalse(result['success'])
+        self.assertEqual(result['base_mismatch'], ['data.bin'])
+        with open(os.path.join(self.dst_dir, 'data.bin'), 'rb') as f:
+            self.assertEqual(f.read(), changed)
+
+    def test_paths_outside_project_are_rejected(self):
+        result = {'deleted': 0, 'errors': []}
+        from app.utils.deployment_manager import delete_deployed_files
+        delete_deployed_files(self.dst_dir, ['../outside.py', '/etc/passwd'], result)
+        self.assertEqual(result['deleted'], 0)
+        self.assertEqual(len(result['errors']), 2)
+
+class BlueGreenCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_nginx_upstream_can_be_overridden(self):
+        from app.routes import generate_nginx_config
+        host = Project(name='host', port=5000, domain='example.com', path='/tmp/host')
+        api = Project(name='api', port=5001, path='/tmp/api')
+        db.session.add_all([host, api])
+        db.session.commit()
+        db.session.add(SubRoute(host_project_id=host.id, mounted_project_id=api.id, route_path='/api'))
+        db.session.commit()
+        sub_routes = SubRoute.query.all()
+
+        config = generate_nginx_config(host, sub_routes, {api.id: 40123})
+        self.assertIn('proxy_pass http://127.0.0.1:5000;', config)
+        self.assertIn('proxy_pass http://127.0.0.1:40123;', config)
+        self.assertNotIn('127.0.0.1:5001', config)
+
+    def test_nodejs_projects_use_plain_restart(self):
+        from unittest import mock
+        from app.routes import choose_restart_method
+        from app.utils import blue_green
+        web = Project(name='web', port=5000, domain='example.com', path='/tmp/web',
+                      project_type='nodejs', status='running', pid=os.getpid())
+        db.session.add(web)
+        db.session.commit()
+
+        with mock.patch.object(blue_green, 'nginx_fronted_projects', return_value=[web]):
+            self.assertFalse(blue_green.can_blue_green(web))
+            self.assertEqual(choose_restart_method(web, 'blue_green'), 'restart')
+
+    def test_blue_green_hands_drain_to_a_job(self):
+        from unittest import mock
+        from app.models import Job
+        from app.utils import blue_green
+        web = Project(name='web', port=5000, domain='example.com', path='/tmp/web',
+                      status='running', pid=111)
+        db.session.add(web)
+        db.session.commit()
+
+        started = []
+        def start(project, port, timeout, health_path, instance=None):
+            started.append((port, instance))
+            return 222 if instance else 333
+
+        with mock.patch.object(blue_green, 'nginx_fronted_projects', return_value=[web]), \
+                mock.patch.object(blue_green, '_start_and_wait', side_effect=start), \
+                mock.patch.object(blue_green, '_switch_upstream', return_value=None), \
+                mock.patch.object(blue_green, 'drain_process') as drain, \
+                mock.patch.object(blue_green, 'record_launch'), \
+                mock.patch.object(blue_green.time, 'sleep'):
+            result = {}
+            self.assertTrue(blue_green.blue_green_restart(web, result))
+
+        # The spare instance has its own logs/cgroup; the permanent one uses the project's
+        self.assertEqual(started[0][1], 'spare')
+        self.assertEqual(started[1], (5000, None))
+        self.assertEqual(result['new_pid'], 222)
+        self.assertEqual(db.session.get(Job, result['job_id']).status, 'succeeded')
+        self.assertEqual([c.args[0] for c in drain.call_args_list], [111, 222])
+        self.assertEqual(web.pid, 333)
+
+    def test_spare_instance_keeps_project_logs(self):
+        import sys
+        from app.utils.system import start_local_process
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        with open(os.path.join(tmp_dir, 'idle.py'), 'w') as f:
+            f.write('import time\ntime.sleep(30)\n')
+        write_file(os.path.join(tmp_dir, 'web.err.log'), b'previous crash\n')
+
+        pid = start_local_process('web', f'{sys.executable} idle.py', tmp_dir, instance='spare')
+        self.assertIsNotNone(pid)
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+        self.assertTrue(os.path.exists(os.path.join(tmp_dir, 'web.spare.err.log')))
+        with open(os.path.join(tmp_dir, 'web.err.log'), 'rb') as f:
+            self.assertEqual(f.read(), b'previous crash\n')
+
+    def test_wait_for_ready_polls_port(self):
+        import socket
+        from app.utils.system import find_free_port, wait_for_ready
+        port = find_free_port()
+        self.assertFalse(wait_for_ready(port, timeout=0.5))
+        with socket.socket() as server:
+            server.bind(('127.0.0.1', port))
+            server.listen()
+            self.assertTrue(wait_for_ready(port, timeout=2))
+
+    def test_start_returns_once_app_serves(self):
+        import sys
+        from app.utils.system import find_free_port, start_local_process, pop_ready_time
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        port = find_free_port()
+        pid = start_local_process('web', f'{sys.executable} -m http.server {port} --bind 127.0.0.1',
+                                  tmp_dir, port=port, ready_timeout=10)
+        self.assertIsNotNone(pid)
+        os.killpg(pid, 15)
+        self.assertLess(pop_ready_time(pid), 10)
+
+        with open(os.path.join(tmp_dir, 'idle.py'), 'w') as f:
+            f.write('import time\ntime.sleep(30)\n')
+        started = time.monotonic()
+        self.assertIsNone(start_local_process('idle', f'{sys.executable} idle.py', tmp_dir,
+                                              port=find_free_port(), ready_timeout=1))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_auto_workers_are_bounded_by_cpu_and_memory(self):
+        import psutil
+        from app.utils.worker_sizing import resolve_worker_settings, gunicorn_worker_args
+        project = Project(name='web', port=5000, path='/tmp/web', worker_class='sync')
+        db.session.add(project)
+        db.session.commit()
+        # Existing projects keep the fixed default until they opt in
+        self.assertEqual(resolve_worker_settings(project)['workers'], 4)
+
+        project.worker_auto = True
+        project.worker_rss = 1024
+        self.assertEqual(resolve_worker_settings(project)['workers'], min(2 * os.cpu_count() + 1, 32))
+        project.worker_rss = psutil.virtual_memory().total
+        self.assertEqual(resolve_worker_settings(project)['workers'], 1)
+
+        # The CPU share is split across running Python projects like the memory budget
+        project.worker_rss = 1024
+        for n in range(3):
+            db.session.add(Project(name=f'other{n}', port=5001 + n, path=f'/tmp/other{n}', status='running'))
+        db.session.commit()
+        self.assertEqual(resolve_worker_settings(project)['workers'], max(1, min((2 * os.cpu_count() + 1) // 4, 32)))
+
+        project.worker_count, project.worker_class, project.max_requests = 2, 'uvicorn', 500
+        self.assertEqual(gunicorn_worker_args(resolve_worker_settings(project)),
+                         '-w 2 -k uvicorn.workers.UvicornWorker --timeout 30 '
+                         '--max-requests 500 --max-requests-jitter 50')
+
+    def test_restore_starts_mounted_apps_before_hosts(self):
+        import threading
+        from unittest import mock
+        from app.models import AppState
+        from app.utils.deployment_manager import restore_app_states
+        host = Project(name='host', port=5000, path='/tmp/host')
+        api = Project(name='api', port=5001, path='/tmp/api')
+        other = Project(name='other', port=5002, path='/tmp/other')
+        db.session.add_all([host, api, other])
+        db.session.commit()
+        db.session.add(SubRoute(host_project_id=host.id, mounted_project_id=api.id, route_path='/api'))
+        db.session.add_all([AppState(project_id=p.id, should_run=True) for p in (host, api, other)])
+        db.session.commit()
+
+        events = []
+        lock = threading.Lock()
+        def fake_restore(project_id):
+            with lock:
+                events.append(('start', project_id))
+            time.sleep(0.2)
+            with lock:
+                events.append(('end', project_id))
+            return {'project': project_id, 'status': 'started'}
+
+        with mock.patch('app.utils.deployment_manager.restore_app', side_effect=fake_restore):
+            restore = restore_app_states(concurrency=4)
+
+        self.assertEqual(len(restore['results']), 3)
+        self.assertLess(events.index(('end', api.id)), events.index(('start', host.id)))
+        # Bağımsız projeler paralel başlar
+        self.assertEqual({events[0], events[1]}, {('start', api.id), ('start', other.id)})
+        self.assertLess(restore['total_seconds'], 0.6)
+
+        self.app.config['LOGIN_DISABLED'] = True
+        client = self.app.test_client()
+        for value in ('0', '-2'):
+            response = client.post(f'/api/app-state/restore-all?concurrency={value}')
+            self.assertEqual(response.status_code, 400)
+        with mock.patch('app.utils.deployment_manager.restore_app', side_effect=fake_restore):
+            self.assertEqual(restore_app_states(concurrency=-1)['concurrency'], 1)
+
+    def test_reload_method_follows_launch_signature(self):
+        from unittest import mock
+        from app.utils.reload_manager import plan_reload, record_launch
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        site_packages = os.path.join(tmp_dir, 'venv', 'lib', 'python3.11', 'site-packages')
+        os.makedirs(os.path.join(site_packages, 'flask-3.0.0.dist-info'))
+        os.makedirs(os.path.join(tmp_dir, 'venv', 'bin'))
+        open(os.path.join(tmp_dir, 'venv', 'bin', 'python'), 'w').close()
+        project = Project(name='web', port=5000, path=tmp_dir, project_type='flask',
+                          entry_point='app:app', status='running', pid=os.getpid())
+        db.session.add(project)
+        db.session.commit()
+
+        with mock.patch('app.utils.reload_manager.is_gunicorn_master', return_value=True):
+            self.assertEqual(plan_reload(project)[0], 'restart')
+            record_launch(project)
+            self.assertEqual(plan_reload(project)[0], 'hup')
+            os.rename(os.path.join(site_packages, 'flask-3.0.0.dist-info'),
+                      os.path.join(site_packages, 'flask-3.1.0.dist-info'))
+            self.assertEqual(plan_reload(project)[0], 'usr2')
+            project.entry_point = 'wsgi:app'
+            self.assertEqual(plan_reload(project), ('restart', 'entry point changed'))
+
+if __name__ == '__main__':
+    unittest.main()
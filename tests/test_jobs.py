@@ -0,0 +1,143 @@
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app, db
+from app.models import Job, Project
+from app.utils.job_runner import HANDLERS, JobRunner, enqueue, job_handler, job_to_dict, unreported_job
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+@job_handler('test-echo')
+def echo_job(ctx, project, value=None, fail=False):
+    ctx.progress(f'working on {project.name if project else "-"}')
+    ctx.callback('step', 'second message')
+    if fail:
+        raise RuntimeError('boom')
+    return {'success': True, 'value': value}
+
+class JobRunnerCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.projects = []
+        for n in range(2):
+            project = Project(name=f'p{n}', port=6000 + n, path=f'/tmp/p{n}')
+            db.session.add(project)
+            self.projects.append(project)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _queue(self, project, **params):
+        job = Job(kind='test-echo', project_id=project.id, params=json.dumps(params), messages='[]', status='queued')
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+    def test_enqueue_runs_inline_when_testing(self):
+        job = enqueue('test-echo', project_id=self.projects[0].id, value=42)
+        self.assertIn('start', HANDLERS)
+        self.assertIn('setup', HANDLERS)
+        self.assertEqual(job.status, 'succeeded')
+        data = job_to_dict(job, after=1)
+        self.assertEqual(data['result'], {'success': True, 'value': 42})
+        self.assertEqual(data['message_count'], 2)
+        self.assertEqual([m['message'] for m in data['messages']], ['second message'])
+
+        failed = enqueue('test-echo', project_id=self.projects[0].id, fail=True)
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(failed.error, 'boom')
+
+    def test_finished_job_is_reported_once(self):
+        project_id = self.projects[0].id
+        self.assertIsNone(unreported_job(project_id))
+        job = enqueue('test-echo', project_id=project_id, fail=True)
+        self.assertEqual(unreported_job(project_id), job)
+
+        with self.app.test_request_context():
+            from flask import get_flashed_messages
+            from app.routes import _flash_job_messages
+            _flash_job_messages(job)
+            self.assertIn(('error', 'Error: boom'), get_flashed_messages(with_categories=True))
+        self.assertIsNone(unreported_job(project_id))
+
+    def test_stop_and_deploy_are_refused_during_a_job(self):
+        project = self.projects[0]
+        project.pid, project.status = 4242, 'running'
+        db.session.commit()
+        job_id = self._queue(project)
+        self.app.config['LOGIN_DISABLED'] = True
+        client = self.app.test_client()
+
+        with mock.patch('psutil.Process') as process:
+            response = client.post(f'/projects/{project.id}/stop')
+        self.assertEqual(response.status_code, 302)
+        process.assert_not_called()
+        self.assertEqual((project.pid, project.status), (4242, 'running'))
+
+        response = client.post(f'/api/deployment/{project.id}/deploy',
+                               json={'package': {'app.py': {'content': '', 'size': 0, 'hash': ''}}})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.get_json()['job_id'], job_id)
+        response = client.post(f'/api/deployment/{project.id}/deploy-stream', data=b'x' * 4096)
+        self.assertEqual(response.status_code, 409)
+
+    def test_asgi_entry_point_fix_relaunches_with_uvicorn(self):
+        project = self.projects[0]
+        project.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project.path)
+        db.session.commit()
+        launched = []
+
+        def launch(ctx, project, env_vars, entry_point):
+            launched.append((entry_point, project.worker_class))
+            return 4242 if len(launched) > 1 else None
+
+        with mock.patch('app.utils.project_jobs._launch', side_effect=launch), \
+                mock.patch('app.utils.project_jobs.time.sleep'), \
+                mock.patch('app.utils.system.get_project_venv_python', side_effect=[None, '/venv/bin/python']), \
+                mock.patch('app.utils.system.auto_setup_project', return_value=(True, 'ready')), \
+                mock.patch('app.utils.dependency_fix.auto_fix_dependencies', return_value=(False, '', [])), \
+                mock.patch('app.utils.auto_fix.should_attempt_auto_fix', return_value=True), \
+                mock.patch('app.utils.auto_fix.auto_fix_entry_point',
+                           return_value=(True, 'asgi:application', 'asgi', 'Auto-fixed')):
+            job = enqueue('start', project_id=project.id)
+
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(launched[-1], ('asgi:application', 'uvicorn'))
+        self.assertEqual(db.session.get(Project, project.id).worker_class, 'uvicorn')
+
+    def test_claim_serializes_jobs_of_a_project(self):
+        runner = JobRunner(self.app, workers=2)
+        first = self._queue(self.projects[0])
+        second = self._queue(self.projects[0])
+        other = self._queue(self.projects[1])
+
+        self.assertEqual(runner.claim(), first)
+        # p0 already has a running job, so its next job waits
+        self.assertEqual(runner.claim(), other)
+        self.assertIsNone(runner.claim())
+
+        db.session.get(Job, first).status = 'succeeded'
+        db.session.commit()
+        self.assertEqual(runner.claim(), second)
+
+    def test_recover_fails_interrupted_jobs(self):
+        runner = JobRunner(self.app)
+        job_id = self._queue(self.projects[0])
+        runner.claim()
+        self.assertEqual(runner.recover(), 1)
+        self.assertEqual(db.session.get(Job, job_id).status, 'failed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app.utils import log_stream
+from app.utils.log_stream import Subscriber, subscribe, unsubscribe
+
+class LogStreamCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'web.out.log')
+        with open(self.path, 'w') as f:
+            f.write('old line\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _collect(self, subscriber, count, timeout=5):
+        lines = []
+        deadline = time.monotonic() + timeout
+        while len(lines) < count and time.monotonic() < deadline:
+            lines += subscriber.get(0.2)[0]
+        return lines
+
+    def test_one_follower_fans_out_to_all_subscribers(self):
+        follower, first = subscribe(self.path)
+        same_follower, second = subscribe(self.path)
+        self.assertIs(follower, same_follower)
+
+        with open(self.path, 'a') as f:
+            f.write('hello\npart')
+            f.flush()
+            f.write('ial\n')
+        self.assertEqual(self._collect(first, 2), ['hello', 'partial'])
+        self.assertEqual(self._collect(second, 2), ['hello', 'partial'])
+
+        unsubscribe(follower, first)
+        self.assertFalse(follower.stop_event.is_set())
+        unsubscribe(follower, second)
+        self.assertTrue(follower.stop_event.is_set())
+        self.assertNotIn(follower.path, log_stream._followers)
+
+    def test_rotation_is_followed(self):
+        follower, subscriber = subscribe(self.path)
+        os.rename(self.path, self.path + '.1')
+        with open(self.path, 'w') as f:
+            f.write('new file\n')
+        self.assertEqual(self._collect(subscriber, 1), ['new file'])
+        unsubscribe(follower, subscriber)
+
+    def test_slow_subscriber_is_bounded(self):
+        subscriber = Subscriber(max_lines=3)
+        subscriber.put([str(i) for i in range(10)])
+        lines, dropped, _ = subscriber.get(0)
+        self.assertEqual(lines, ['7', '8', '9'])
+        self.assertEqual(dropped, 7)
+
+if __name__ == '__main__':
+    unittest.main()
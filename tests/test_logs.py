@@ -0,0 +1,51 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from app.utils.log_manager import tail_file, rotate_log, start_log, read_log
+
+class LogManagerCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'web.err.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, content):
+        with open(self.path, 'w') as f:
+            f.write(content)
+
+    def test_tail_reads_only_the_end(self):
+        self._write(''.join(f'line {i}\n' for i in range(10000)))
+        self.assertEqual(tail_file(self.path, max_bytes=20, block_size=7), '\nline 9998\nline 9999\n'[-20:])
+        self.assertEqual(tail_file(self.path, lines=2, block_size=5), 'line 9998\nline 9999\n')
+        self.assertEqual(tail_file(self.path, max_bytes=10 ** 9, lines=1), 'line 9999\n')
+
+    def test_rotation_keeps_previous_run_and_compresses_older(self):
+        for run in range(4):
+            with start_log(self.path, archives=2) as f:
+                f.write(f'run {run}\n')
+        # start_log compresses in the background; a synchronous rotation waits for it
+        rotate_log(self.path, archives=2, background=False)
+
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(read_log(self.path, previous=True), 'run 3\n')
+        with gzip.open(self.path + '.2.gz', 'rt') as f:
+            self.assertEqual(f.read(), 'run 2\n')
+        with gzip.open(self.path + '.3.gz', 'rt') as f:
+            self.assertEqual(f.read(), 'run 1\n')
+        self.assertFalse(os.path.exists(self.path + '.4.gz'))
+
+    def test_copy_truncate_keeps_file_in_place(self):
+        with open(self.path, 'a') as writer:
+            writer.write('before\n')
+            writer.flush()
+            rotate_log(self.path, copy_truncate=True, background=False)
+            writer.write('after\n')
+        self.assertEqual(read_log(self.path), 'after\n')
+        self.assertEqual(read_log(self.path, previous=True), 'before\n')
+
+if __name__ == '__main__':
+    unittest.main()
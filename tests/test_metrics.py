@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app, db
+from app.utils.metrics import MetricsRing, MetricsSampler, HOST_KEY
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class MetricsRingCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'ring.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_ring_wraps_and_keeps_latest(self):
+        ring = MetricsRing(self.path, capacity=4, slots=3)
+        for i in range(6):
+            ring.append(1000 + i, {HOST_KEY: [i, 0, 0, 0, 0, 0], 7: [i * 10, None, 0, 0, 0, 0]})
+        self.assertEqual(ring.series(HOST_KEY, 0)['v'], [2, 3, 4, 5])
+        self.assertEqual(ring.series(7, 0)['t'], [1002, 1003, 1004, 1005])
+        self.assertEqual(ring.series(7, 1)['v'], [None] * 4)
+        ring.close()
+
+        # Another process sees the same data through the file
+        reopened = MetricsRing(self.path, capacity=4, slots=3)
+        self.assertEqual(reopened.series(7, 0)['v'], [20, 30, 40, 50])
+        reopened.close()
+
+    def test_stopped_project_slot_is_reused(self):
+        ring = MetricsRing(self.path, capacity=4, slots=2)
+        ring.append(1, {HOST_KEY: [1] * 6, 5: [1] * 6})
+        ring.append(2, {HOST_KEY: [1] * 6, 6: [2] * 6})
+        self.assertEqual(ring.series(5, 0)['v'], [])
+        self.assertEqual(ring.series(6, 0)['v'], [None, 2])
+        ring.close()
+
+    def test_full_ring_reports_projects_without_slot(self):
+        ring = MetricsRing(self.path, capacity=4, slots=2)
+        self.assertEqual(ring.append(1, {HOST_KEY: [1] * 6, 5: [1] * 6, 6: [2] * 6}), [6])
+        ring.close()
+
+    def test_resized_ring_is_a_new_file(self):
+        from app.utils.metrics import ring_dimensions
+        ring = MetricsRing(self.path, capacity=4, slots=2)
+        ring.append(1, {HOST_KEY: [1] * 6})
+        self.assertEqual(ring_dimensions(self.path), (4, 2))
+
+        # The sampler restarts with more slots; the old mapping stays valid
+        bigger = MetricsRing(self.path, capacity=4, slots=5)
+        self.assertTrue(ring.is_stale())
+        self.assertFalse(bigger.is_stale())
+        self.assertEqual(ring_dimensions(self.path), (4, 5))
+        self.assertEqual(ring.series(HOST_KEY, 0)['v'], [1])
+        ring.close()
+        bigger.close()
+
+    def test_series_is_downsampled(self):
+        ring = MetricsRing(self.path, capacity=100, slots=1)
+        for i in range(100):
+            ring.append(1000 + i, {HOST_KEY: [i % 2] * 6})
+        series = ring.series(HOST_KEY, 0, points=10)
+        self.assertEqual(len(series['v']), 10)
+        self.assertEqual(series['v'], [0.5] * 10)
+        ring.close()
+
+class MetricsSamplerCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        TestConfig.METRICS_DIR = self.dir
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.dir)
+
+    def test_sample_writes_snapshot_and_series(self):
+        sampler = MetricsSampler(self.app)
+        sampler.sample()
+        snapshot = sampler.sample()
+        self.assertIn('cpu_percent', snapshot['host'])
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'snapshot.json')))
+        self.assertEqual(len(sampler.ring.series(HOST_KEY, 1)['v']), 2)
+        sampler.ring.close()
+
+if __name__ == '__main__':
+    unittest.main()
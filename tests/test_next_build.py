@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app
+from app.utils import next_build
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class NextBuildCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.project = os.path.join(self.dir, 'site')
+        os.makedirs(os.path.join(self.project, 'pages'))
+        self._write('package.json', '{"dependencies": {"next": "14"}}')
+        self._write('pages/index.js', 'export default () => 1')
+        TestConfig.NEXT_BUILD_CACHE_DIR = os.path.join(self.dir, 'cache')
+        self.app = create_app(TestConfig)
+        self.builds = []
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, rel, content):
+        with open(os.path.join(self.project, rel), 'w') as f:
+            f.write(content)
+
+    def _build(self):
+        # Stand-in for `next build`: wipes .next except the compile cache
+        next_dir = os.path.join(self.project, '.next')
+        with open(os.path.join(self.project, 'pages', 'index.js')) as f:
+            source = f.read()
+        cache = os.path.join(next_dir, 'cache')
+        self.builds.append(os.path.exists(os.path.join(cache, 'seen')))
+        for name in os.listdir(next_dir) if os.path.isdir(next_dir) else []:
+            if name != 'cache':
+                path = os.path.join(next_dir, name)
+                shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+        os.makedirs(cache, exist_ok=True)
+        open(os.path.join(cache, 'seen'), 'w').close()
+        with open(os.path.join(next_dir, 'BUILD_ID'), 'w') as f:
+            f.write(source)
+        return True
+
+    def _ensure(self, env=None):
+        return next_build.ensure_build('site', self.project, self.project, env or {}, self._build)
+
+    def _build_id(self):
+        with open(os.path.join(self.project, '.next', 'BUILD_ID')) as f:
+            return f.read()
+
+    def test_builds_only_when_source_changes_and_reuses_outputs(self):
+        with self.app.app_context():
+            self.assertTrue(self._ensure())
+            self.assertTrue(self._ensure())
+            self.assertEqual(len(self.builds), 1)
+
+            # NEXT_PUBLIC_* values are compiled into the bundle
+            self._ensure({'NEXT_PUBLIC_API': 'x', 'SECRET': 'y'})
+            self.assertEqual(len(self.builds), 2)
+
+            self._write('pages/index.js', 'export default () => 2')
+            self._ensure()
+            self.assertEqual(self._build_id(), 'export default () => 2')
+
+            # Rollback after a wipe: stored output and compile cache are reused
+            shutil.rmtree(os.path.join(self.project, '.next'))
+            self._write('pages/index.js', 'export default () => 1')
+            self.assertTrue(self._ensure())
+            self.assertEqual(len(self.builds), 3)
+            self.assertEqual(self._build_id(), 'export default () => 1')
+            self.assertTrue(os.path.exists(os.path.join(self.project, '.next', 'cache', 'seen')))
+
+            summary = next_build.build_summary('site', self.project)
+            self.assertEqual((summary['builds'], summary['reused']), (3, 1))
+            self.assertEqual(summary['last']['result'], 'restored')
+
+    def test_key_covers_env_files_and_build_named_sources(self):
+        with self.app.app_context():
+            key = next_build.build_key(self.project)
+            self._write('.env', 'NEXT_PUBLIC_API=https://a.example')
+            with_env = next_build.build_key(self.project)
+            self.assertNotEqual(with_env, key)
+            self._write('.env', 'NEXT_PUBLIC_API=https://b.example')
+            self.assertNotEqual(next_build.build_key(self.project), with_env)
+
+            with_env = next_build.build_key(self.project)
+            os.makedirs(os.path.join(self.project, 'lib', 'build'))
+            self._write('lib/build/config.js', 'module.exports = {}')
+            self.assertNotEqual(next_build.build_key(self.project), with_env)
+
+    def test_compile_cache_survives_wipe(self):
+        with self.app.app_context():
+            self._ensure()
+            shutil.rmtree(os.path.join(self.project, '.next'))
+            self._write('pages/index.js', 'export default () => 3')
+            self._ensure()
+            self.assertEqual(self.builds, [False, True])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import errno
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app.utils import node_store
+from app.utils.node_store import NodeStore
+
+class NodeStoreCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        # Store files are read-only
+        for root, dirs, files in os.walk(self.dir):
+            for name in files:
+                os.chmod(os.path.join(root, name), 0o644)
+        shutil.rmtree(self.dir)
+
+    def _project(self, name, files, package=None, lock=None):
+        path = os.path.join(self.dir, name)
+        os.makedirs(path)
+        for rel, content in files.items():
+            full = os.path.join(path, 'node_modules', rel)
+            os.makedirs(os.path.dirname(full), exist_ok=True)
+            with open(full, 'w') as f:
+                f.write(content)
+        with open(os.path.join(path, 'package.json'), 'w') as f:
+            json.dump(package or {'name': name, 'dependencies': {'react': '^18.2.0'}}, f)
+        if lock is not None:
+            with open(os.path.join(path, 'package-lock.json'), 'w') as f:
+                f.write(lock)
+        return path
+
+    def test_dependency_key_tracks_dependencies_and_lockfile(self):
+        a = self._project('a', {}, {'name': 'a', 'scripts': {'build': 'x'}, 'dependencies': {'react': '18'}})
+        b = self._project('b', {}, {'name': 'b', 'dependencies': {'react': '18'}})
+        self.assertEqual(node_store.dependency_key(a, 'v20'), node_store.dependency_key(b, 'v20'))
+        self.assertNotEqual(node_store.dependency_key(a, 'v20'), node_store.dependency_key(a, 'v18'))
+        key = node_store.dependency_key(a, 'v20')
+        with open(os.path.join(a, 'package-lock.json'), 'w') as f:
+            f.write('{"lockfileVersion": 3}')
+        self.assertNotEqual(node_store.dependency_key(a, 'v20'), key)
+
+        modules = os.path.join(a, 'node_modules')
+        os.makedirs(modules)
+        node_store.write_marker(modules, node_store.dependency_key(a, 'v20'), 'npm')
+        self.assertTrue(node_store.is_current(modules, node_store.dependency_key(a, 'v20')))
+        self.assertFalse(node_store.is_current(modules, key))
+
+    def test_identical_files_are_cloned_through_store(self):
+        files = {'react/index.js': 'module.exports = 1', 'react/README.md': 'docs', '.cache/build': 'tmp'}
+        p1 = self._project('p1', files)
+        p2 = self._project('p2', dict(files, **{'only/here.js': 'x'}))
+        store = NodeStore(os.path.join(self.dir, 'store'))
+
+        # Stand-in for FICLONE so the test runs on any filesystem
+        with mock.patch.object(node_store, 'clone_file', shutil.copyfile):
+            first = store.link_tree(os.path.join(p1, 'node_modules'))
+            self.assertEqual((first['adopted'], first['cloned']), (2, 0))
+            second = store.link_tree(os.path.join(p2, 'node_modules'))
+            self.assertEqual((second['adopted'], second['cloned']), (1, 2))
+
+        # Every project keeps its own inode: an in-place write stays local
+        index = lambda p: os.path.join(p, 'node_modules', 'react', 'index.js')
+        self.assertNotEqual(os.stat(index(p1)).st_ino, os.stat(index(p2)).st_ino)
+        with open(index(p2), 'w') as f:
+            f.write('patched')
+        with open(index(p1)) as f:
+            self.assertEqual(f.read(), 'module.exports = 1')
+        self.assertEqual(os.stat(index(p1)).st_mode & 0o777, 0o644)
+        # .cache is written at runtime and stays out of the store
+        self.assertEqual(len(os.listdir(os.path.join(self.dir, 'store'))), 3)
+
+        self.assertEqual(store.collect_garbage()[0], 0)
+        self.assertEqual(store.collect_garbage(max_age=-1)[0], 3)
+
+    def test_store_is_skipped_without_reflink(self):
+        p1 = self._project('p1', {'react/index.js': 'module.exports = 1'})
+        index = os.path.join(p1, 'node_modules', 'react', 'index.js')
+        # Left over from the hardlinked store of earlier versions
+        legacy = os.path.join(self.dir, 'legacy-object')
+        os.link(index, legacy)
+        store = NodeStore(os.path.join(self.dir, 'store'))
+        error = OSError(errno.EOPNOTSUPP, 'Operation not supported')
+        with mock.patch.object(node_store, 'clone_file', side_effect=error) as clone, \
+                mock.patch.object(node_store, 'hash_files') as hash_files:
+            stats = store.link_tree(os.path.join(p1, 'node_modules'))
+            store.link_tree(os.path.join(p1, 'node_modules'))
+        # One probe clone per store and filesystem, and node_modules is never hashed
+        self.assertEqual(clone.call_count, 1)
+        hash_files.assert_not_called()
+        self.assertEqual(os.listdir(os.path.join(self.dir, 'store')), [])
+        self.assertEqual(os.listdir(os.path.join(p1, 'node_modules')), ['react'])
+        self.assertIn('reflink not supported', stats['error'])
+        self.assertEqual(stats['unshared'], 1)
+        self.assertEqual(os.stat(index).st_nlink, 1)
+        with open(index) as f:
+            self.assertEqual(f.read(), 'module.exports = 1')
+
+    def test_unmarked_node_modules_is_reinstalled_once(self):
+        from app.utils import system
+        p1 = self._project('p1', {'react/index.js': 'stale'}, lock='{"lockfileVersion": 3}')
+        done = mock.Mock(returncode=0, stdout='added 1 package', stderr='')
+        with mock.patch.object(system, 'get_npm_path', return_value='/usr/bin/npm'), \
+                mock.patch.object(system, 'get_node_path', return_value='/usr/bin/node'), \
+                mock.patch.object(node_store, 'node_version', return_value='v20'), \
+                mock.patch.object(node_store, 'share_node_modules', return_value=None), \
+                mock.patch.object(system.subprocess, 'run', return_value=done) as run:
+            self.assertTrue(system.auto_setup_nodejs_project(p1, 'p1')[0])
+            self.assertEqual(run.call_args[0][0], ['/usr/bin/npm', 'ci'])
+            # Marked after the install: the next setup skips npm
+            self.assertEqual(node_store.read_marker(os.path.join(p1, 'node_modules'))['source'], 'npm')
+            run.reset_mock()
+            self.assertTrue(system.auto_setup_nodejs_project(p1, 'p1')[0])
+            run.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import unittest
+from flask import jsonify, request
+from app import create_app
+from config import Config
+from file_compressor import compress_bytes
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    MAX_CONTENT_LENGTH = 4096
+
+def echo_json():
+    return jsonify(request.get_json())
+
+def echo_form():
+    return jsonify({'form': dict(request.form),
+                    'files': {f.filename: f.read().decode() for f in request.files.values()}})
+
+class RequestEncodingCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app.add_url_rule('/test/json', view_func=echo_json, methods=['POST'])
+        self.app.add_url_rule('/test/form', view_func=echo_form, methods=['POST'])
+        self.client = self.app.test_client()
+
+    def _post(self, path, body, content_type, encoding='gzip'):
+        return self.client.post(path, data=compress_bytes(body, encoding),
+                                headers={'Content-Encoding': encoding, 'Content-Type': content_type})
+
+    def test_gzip_json_body(self):
+        response = self._post('/test/json', json.dumps({'files': ['a.py', 'b.py']}).encode(), 'application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'files': ['a.py', 'b.py']})
+
+    def test_gzip_multipart_form(self):
+        body = (b'--xyz\r\nContent-Disposition: form-data; name="project_name"\r\n\r\ndemo\r\n'
+                b'--xyz\r\nContent-Disposition: form-data; name="file"; filename="app.py"\r\n'
+                b'Content-Type: text/plain\r\n\r\nprint(1)\r\n--xyz--\r\n')
+        response = self._post('/test/form', body, 'multipart/form-data; boundary=xyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {'form': {'project_name': 'demo'}, 'files': {'app.py': 'print(1)'}})
+
+    def test_body_over_limit_after_decompression(self):
+        # A few hundred compressed bytes that expand past MAX_CONTENT_LENGTH
+        body = json.dumps({'padding': 'x' * 100000}).encode()
+        self.assertLess(len(compress_bytes(body, 'gzip')), TestConfig.MAX_CONTENT_LENGTH)
+        response = self._post('/test/json', body, 'application/json')
+        self.assertEqual(response.status_code, 413)
+
+    def test_unsupported_encoding(self):
+        response = self.client.post('/test/json', data=b'{}',
+                                    headers={'Content-Encoding': 'br', 'Content-Type': 'application/json'})
+        self.assertEqual(response.status_code, 415)
+        self.assertIn('gzip', response.headers['Accept-Encoding'])
+
+if __name__ == '__main__':
+    unittest.main()
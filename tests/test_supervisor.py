@@ -0,0 +1,82 @@
+import subprocess
+import sys
+import time
+import unittest
+from app import create_app, db
+from app.models import Project
+from app.utils.deployment_manager import get_or_create_app_state
+from app.utils.supervisor import ProcessSupervisor, CRASH_LOOP_LIMIT
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class SupervisorCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        self.project = Project(name='web', port=5000, path='/nonexistent', status='running', pid=self.process.pid)
+        db.session.add(self.project)
+        db.session.commit()
+        self.supervisor = ProcessSupervisor(self.app)
+        self.supervisor.exit_grace = 0
+        self.supervisor.sync()
+
+    def tearDown(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_crash_is_detected_and_restart_scheduled(self):
+        self.assertIn(self.project.id, self.supervisor.watches)
+        self.process.kill()
+        self.supervisor.run_once(timeout=2)
+        self.supervisor.run_once(timeout=0)
+
+        db.session.refresh(self.project)
+        self.assertEqual(self.project.status, 'crashed')
+        self.assertIn(self.project.id, self.supervisor.pending)
+        self.assertNotIn(self.project.id, self.supervisor.watches)
+
+    def test_zombie_counts_as_exited(self):
+        from app.utils.system import check_process_status
+        child = subprocess.Popen([sys.executable, '-c', 'pass'])
+        try:
+            # Exited but not reaped: still visible to kill(pid, 0)
+            deadline = time.time() + 5
+            while check_process_status(child.pid) and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertFalse(check_process_status(child.pid))
+        finally:
+            child.wait()
+
+    def test_intentional_stop_is_not_a_crash(self):
+        self.project.status = 'stopped'
+        self.project.pid = None
+        db.session.commit()
+        self.process.kill()
+        self.supervisor.run_once(timeout=2)
+        self.supervisor.run_once(timeout=0)
+
+        self.assertEqual(db.session.get(Project, self.project.id).status, 'stopped')
+        self.assertEqual(self.supervisor.pending, {})
+
+    def test_repeated_crashes_end_in_crash_loop(self):
+        for _ in range(CRASH_LOOP_LIMIT):
+            self.supervisor._handle_crash(self.project, 1, 0.5)
+        self.assertEqual(self.project.status, 'crash_loop')
+
+    def test_auto_restart_disabled(self):
+        get_or_create_app_state(self.project.id).auto_restart = False
+        self.supervisor._handle_crash(self.project, 1, 10)
+        self.assertEqual(self.project.status, 'crashed')
+        self.assertEqual(self.supervisor.pending, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from app import create_app
+from app.utils import venv_cache
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class VenvCacheCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        TestConfig.VENV_TEMPLATE_DIR = os.path.join(self.dir, 'templates')
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+        shutil.rmtree(self.dir)
+
+    def _requirements(self, name, content):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _venv(self, name):
+        path = os.path.join(self.dir, name, 'venv')
+        subprocess.check_call([sys.executable, '-m', 'venv', '--without-pip', path])
+        script = os.path.join(path, 'bin', 'hello')
+        with open(script, 'w') as f:
+            f.write(f"#!{path}/bin/python\nimport sys\nprint(sys.prefix)\n")
+        os.chmod(script, 0o755)
+        return path
+
+    def test_key_ignores_order_comments_and_name_case(self):
+        a = self._requirements('a.txt', 'Flask==3.0\n# web\nSQLAlchemy>=2\n\n')
+        b = self._requirements('b.txt', 'sqlalchemy >= 2  # orm\nflask==3.0\n')
+        c = self._requirements('c.txt', 'flask==3.1\nsqlalchemy>=2\n')
+        self.assertEqual(venv_cache.requirements_key(a), venv_cache.requirements_key(b))
+        self.assertNotEqual(venv_cache.requirements_key(a), venv_cache.requirements_key(c))
+
+    def test_template_is_cloned_with_fixed_paths(self):
+        key = venv_cache.requirements_key(self._requirements('r.txt', 'flask\n'))
+        source = self._venv('p1')
+        self.assertFalse(venv_cache.restore_from_template(key, os.path.join(self.dir, 'p2', 'venv')))
+
+        venv_cache.write_marker(source, key, 'install')
+        self.assertTrue(venv_cache.save_template(key, source))
+        self.assertFalse(venv_cache.save_template(key, source))
+
+        clone = os.path.join(self.dir, 'p2', 'venv')
+        self.assertTrue(venv_cache.restore_from_template(key, clone))
+        self.assertTrue(venv_cache.is_current(clone, key))
+        self.assertEqual(venv_cache.read_marker(clone)['source'], 'template')
+
+        # Scripts point at the clone; files get their own inode, so an in-place write stays local
+        output = subprocess.check_output([os.path.join(clone, 'bin', 'hello')]).decode().strip()
+        self.assertEqual(os.path.realpath(output), os.path.realpath(clone))
+        cfg = os.path.join(venv_cache.template_path(key), 'pyvenv.cfg')
+        with open(cfg) as f:
+            original = f.read()
+        self.assertNotEqual(os.stat(os.path.join(clone, 'pyvenv.cfg')).st_ino, os.stat(cfg).st_ino)
+        with open(os.path.join(clone, 'pyvenv.cfg'), 'a') as f:
+            f.write('patched = true\n')
+        with open(cfg) as f:
+            self.assertEqual(f.read(), original)
+
+    def test_vanished_template_keeps_working_venv(self):
+        venv = self._venv('p1')
+        # The template was pruned between the check and the copy
+        missing = os.path.join(self.dir, 'templates', 'gone')
+        self.assertFalse(venv_cache._replace_with_clone(missing, venv))
+        self.assertTrue(os.path.exists(os.path.join(venv, 'bin', 'python')))
+
+    def test_prune_keeps_most_recent_templates(self):
+        root = venv_cache.template_root()
+        for n, key in enumerate(['old', 'new']):
+            os.makedirs(os.path.join(root, key))
+            venv_cache.write_marker(os.path.join(root, key), key, 'template')
+            os.utime(os.path.join(root, key, venv_cache.MARKER_NAME), (n, n))
+        self.assertEqual(venv_cache.prune_templates(keep=1), [os.path.join(root, 'old')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app, db
+from app.models import Project, ProjectVersion
+from app.utils.version_manager import VersionManager
+from app.utils.object_store import read_manifest
+from config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+class VersionStoreCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.tmp_dir, 'project')
+        write_file(os.path.join(self.project_dir, 'app.py'), b'print("v1")\n')
+        write_file(os.path.join(self.project_dir, 'static', 'big.js'), b'x' * 100000)
+        write_file(os.path.join(self.project_dir, '__pycache__', 'app.pyc'), b'cache')
+        self.project = Project(name='versioned', port=5000, path=self.project_dir)
+        db.session.add(self.project)
+        db.session.commit()
+        self.vm = VersionManager(os.path.join(self.tmp_dir, 'backups'))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_identical_files_are_stored_once(self):
+        v1 = self.vm.create_backup(self.project)
+        write_file(os.path.join(self.project_dir, 'app.py'), b'print("v2")\n')
+        v2 = self.vm.create_backup(self.project)
+
+        self.assertEqual(len(list(self.vm.store.iter_objects())), 3)
+        size = self.vm.get_version_size(v2.id)
+        self.assertEqual(size['logical_bytes'], 100000 + len(b'print("v2")\n'))
+        self.assertEqual(size['unique_bytes'], len(b'print("v2")\n'))
+
+        self.vm.delete_version(v1.id, collect_garbage=False)
+        self.assertEqual(self.vm.collect_garbage(grace_seconds=0), (1, len(b'print("v1")\n')))
+
+    def test_unchanged_files_are_not_rehashed(self):
+        old = time.time() - 10
+        for name in ('app.py', os.path.join('static', 'big.js')):
+            os.utime(os.path.join(self.project_dir, name), (old, old))
+        self.vm.create_backup(self.project)
+        write_file(os.path.join(self.project_dir, 'app.py'), b'print("v2")\n')
+
+        previous = read_manifest(ProjectVersion.query.first().backup_path)
+        manifest, stats = self.vm.store.snapshot(self.project_dir, previous=previous)
+        self.assertEqual((stats['reused'], stats['new_objects']), (1, 1))
+        self.assertEqual(manifest['files']['app.py']['size'], len(b'print("v2")\n'))
+
+    def test_restore_rebuilds_tree_from_store(self):
+        os.chmod(os.path.join(self.project_dir, 'app.py'), 0o755)
+        v1 = self.vm.create_backup(self.project)
+        write_file(os.path.join(self.project_dir, 'app.py'), b'broken\n')
+        write_file(os.path.join(self.project_dir, 'extra.py'), b'new file\n')
+
+        self.assertTrue(self.vm.restore_version(v1.id, stop_project=False))
+
+        self.assertEqual(read_file(os.path.join(self.project_dir, 'app.py')), b'print("v1")\n')
+        self.assertEqual(os.stat(os.path.join(self.project_dir, 'app.py')).st_mode & 0o777, 0o755)
+        self.assertEqual(read_file(os.path.join(self.project_dir, 'static', 'big.js')), b'x' * 100000)
+        self.assertFalse(os.path.exists(os.path.join(self.project_dir, 'extra.py')))
+        self.assertFalse(os.path.exists(os.path.join(self.project_dir, '__pycache__')))
+        # Restore öncesi güvenlik yedeği de alınır
+        self.assertEqual(ProjectVersion.query.count(), 2)
+
+    def test_failed_restore_leaves_live_tree_untouched(self):
+        v1 = self.vm.create_backup(self.project)
+        write_file(os.path.join(self.project_dir, 'app.py'), b'live\n')
+        for _, path, _ in self.vm.store.iter_objects():
+            os.remove(path)
+
+        with self.assertRaises(Exception):
+            self.vm.restore_version(v1.id, stop_project=False)
+
+        self.assertEqual(read_file(os.path.join(self.project_dir, 'app.py')), b'live\n')
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ['backups', 'project'])
+
+    def test_symlinked_project_is_flipped(self):
+        real_dir = self.project_dir + '-real'
+        os.rename(self.project_dir, real_dir)
+        os.symlink(real_dir, self.project_dir)
+        v1 = self.vm.create_backup(self.project)
+        write_file(os.path.join(real_dir, 'app.py'), b'live\n')
+
+        self.vm.restore_version(v1.id, stop_project=False)
+
+        self.assertTrue(os.path.islink(self.project_dir))
+        self.assertEqual(read_file(os.path.join(self.project_dir, 'app.py')), b'print("v1")\n')
+        # The operator's own link target is left alone
+        self.assertEqual(read_file(os.path.join(real_dir, 'app.py')), b'live\n')
+
+        # A target the panel created on an earlier restore is cleaned up
+        restored_dir = os.path.realpath(self.project_dir)
+        self.vm.restore_version(v1.id, stop_project=False)
+        self.assertFalse(os.path.exists(restored_dir))
+        self.assertTrue(os.path.exists(real_dir))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import fcntl
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from app import create_app
+from app.utils.wheelhouse import pip_install, prune_wheelhouse
+from config import Config
+
+# Fake pip: 'wheel' drops a wheel into --wheel-dir, offline 'install' only
+# succeeds when the wheel is already there
+FAKE_PIP = """#!/bin/sh
+echo "$@" >> "$(dirname "$0")/calls.log"
+case "$1" in
+  wheel) touch "$3/demo-1.0-py3-none-any.whl" ;;
+  install) if [ "$2" = "--no-index" ] && [ ! -f "$4/demo-1.0-py3-none-any.whl" ]; then exit 1; fi ;;
+esac
+exit 0
+"""
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+class WheelhouseCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.pip = os.path.join(self.dir, 'pip')
+        with open(self.pip, 'w') as f:
+            f.write(FAKE_PIP)
+        os.chmod(self.pip, os.stat(self.pip).st_mode | stat.S_IEXEC)
+        TestConfig.WHEELHOUSE_DIR = os.path.join(self.dir, 'wheelhouse')
+        self.app = create_app(TestConfig)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _calls(self):
+        with open(os.path.join(self.dir, 'calls.log')) as f:
+            return [line.split()[0] + (' offline' if '--no-index' in line else '') for line in f]
+
+    def test_builds_once_then_installs_offline(self):
+        with self.app.app_context():
+            self.assertEqual(pip_install(self.pip, ['demo==1.0']).returncode, 0)
+            self.assertEqual(self._calls(), ['install offline', 'wheel', 'install offline'])
+
+            # Second project: served from the wheelhouse without building
+            self.assertEqual(pip_install(self.pip, ['demo==1.0']).returncode, 0)
+            self.assertEqual(self._calls()[3:], ['install offline'])
+
+    def test_unpinned_requirements_use_the_resolver(self):
+        with open(os.path.join(self.dir, 'requirements.txt'), 'w') as f:
+            f.write('# app\ndemo==1.0\nrequests>=2  # any\n')
+        with self.app.app_context():
+            pip_install(self.pip, ['demo'])
+            pip_install(self.pip, requirements='requirements.txt', cwd=self.dir)
+        # No offline step: a cached old wheel must not satisfy 'demo' forever
+        self.assertEqual(self._calls(), ['install', 'install'])
+        with open(os.path.join(self.dir, 'calls.log')) as f:
+            self.assertIn('--find-links', f.readline())
+
+    def test_prune_removes_least_recently_used_wheels(self):
+        with self.app.app_context():
+            os.makedirs(TestConfig.WHEELHOUSE_DIR)
+            for age, name in enumerate(['new-1.0-py3-none-any.whl', 'old-1.0-py3-none-any.whl',
+                                        'demo-1.0-py3-none-any.whl']):
+                path = os.path.join(TestConfig.WHEELHOUSE_DIR, name)
+                with open(path, 'wb') as f:
+                    f.write(b'x' * 100)
+                os.utime(path, (time.time() - age * 3600,) * 2)
+            # demo is the oldest but an offline install just used it
+            pip_install(self.pip, ['demo==1.0'])
+            self.assertEqual(prune_wheelhouse(max_bytes=200), (1, 100))
+        self.assertEqual(sorted(os.listdir(TestConfig.WHEELHOUSE_DIR)),
+                         ['demo-1.0-py3-none-any.whl', 'new-1.0-py3-none-any.whl'])
+
+    def test_busy_wheelhouse_falls_back_to_online_install(self):
+        with self.app.app_context():
+            os.makedirs(TestConfig.WHEELHOUSE_DIR)
+            with open(os.path.join(TestConfig.WHEELHOUSE_DIR, '.lock'), 'a') as lock_file:
+                # Another project's long build holds the lock
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                started = time.monotonic()
+                self.assertEqual(pip_install(self.pip, ['demo==1.0'], timeout=2).returncode, 0)
+            # Waits at most half of the budget for the lock
+            self.assertLess(time.monotonic() - started, 2)
+            self.assertEqual(self._calls(), ['install offline', 'install'])
+
+    def test_plain_install_without_wheelhouse(self):
+        TestConfig.WHEELHOUSE_ENABLED = False
+        try:
+            with create_app(TestConfig).app_context():
+                pip_install(self.pip, requirements='requirements.txt', quiet=True)
+        finally:
+            TestConfig.WHEELHOUSE_ENABLED = True
+        with open(os.path.join(self.dir, 'calls.log')) as f:
+            self.assertEqual(f.read().split(), ['install', '-r', 'requirements.txt', '-q'])
+
+if __name__ == '__main__':
+    unittest.main()